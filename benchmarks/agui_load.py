@@ -0,0 +1,551 @@
+# benchmarks/agui_load.py
+"""
+Offline load test for the AG-UI websocket backend and its orchestrator hop.
+
+A child process serves the AG-UI FastAPI app and an orchestrator app that
+answers ag_ui_backend.a2a_client's requests with an OrchestratorAgent on a
+PydanticAI FunctionModel, whose latency and output length are set on the
+command line, so no LLM provider or network access is needed. Simulated
+clients then each open a websocket on their own thread and send
+RunAgentInput runs one after another, as a user would. The report gives
+throughput, p50/p95/p99 latency to RUN_STARTED, to the first agent event and
+to RUN_FINISHED, the error rate and the servers' memory growth.
+
+    PYTHONPATH=src python benchmarks/agui_load.py --clients 50 --runs 5
+    PYTHONPATH=src python benchmarks/agui_load.py --llm-latency 0.5 --json out.json
+
+With ``--llm-fixtures DIR`` the orchestrator replays model responses recorded
+with LLM_REPLAY_MODE=record (core.replay_model) instead of the fake model.
+Requests that were not recorded fail the run unless ``--replay-fallback`` is
+given, which answers them with the next unused recording instead.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+import httpx
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    SystemPromptPart,
+    TextPart,
+    UserPromptPart,
+)
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from websockets.asyncio.client import connect
+
+from ai_research_assistant.core.metric_sketch import QuantileSketch
+
+# What a2a_client turns orchestrator failures into (it sends text, not errors)
+ERROR_TEXT_PREFIXES = (
+    "Error communicating with orchestrator",
+    "An internal error occurred",
+)
+QUANTILES = (0.5, 0.95, 0.99)
+SERVER_START_TIMEOUT_SECONDS = 60.0
+
+
+@dataclass
+class LoadConfig:
+    clients: int = 20
+    runs_per_client: int = 3
+    # Fake LLM: seconds before the first token, then per token
+    llm_latency: float = 0.05
+    token_latency: float = 0.0
+    tokens: int = 200
+    # Replay recorded responses of this model instead (core.replay_model)
+    llm_fixtures: Optional[str] = None
+    llm_provider: str = "google"
+    llm_model: str = "gemini-2.5-pro"
+    replay_latency_scale: float = 1.0
+    replay_fallback: bool = False
+    # Pause between a client's runs
+    think_time: float = 0.0
+    run_timeout: float = 60.0
+    batch_frames: bool = False
+
+
+@dataclass
+class LoadReport:
+    config: LoadConfig
+    runs: int = 0
+    completed: int = 0
+    errors: int = 0
+    error_kinds: Dict[str, int] = field(default_factory=dict)
+    duration_seconds: float = 0.0
+    events: int = 0
+    latency_ms: Dict[str, Dict[str, Optional[float]]] = field(default_factory=dict)
+    rss_before_mb: Optional[float] = None
+    rss_after_mb: Optional[float] = None
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.runs if self.runs else 0.0
+
+    @property
+    def runs_per_second(self) -> float:
+        return self.completed / self.duration_seconds if self.duration_seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **asdict(self),
+            "error_rate": self.error_rate,
+            "runs_per_second": self.runs_per_second,
+            "rss_growth_mb": (
+                self.rss_after_mb - self.rss_before_mb
+                if self.rss_after_mb is not None and self.rss_before_mb is not None
+                else None
+            ),
+        }
+
+
+# --- Fake LLM -----------------------------------------------------------------
+
+
+def fake_text(tokens: int) -> str:
+    return " ".join(f"token{index}" for index in range(tokens))
+
+
+def fake_llm(latency: float, tokens: int, token_latency: float = 0.0) -> FunctionModel:
+    """
+    A FunctionModel that answers every request with ``tokens`` words after
+    ``latency`` seconds plus ``token_latency`` per token, never calling tools.
+    """
+    text = fake_text(tokens)
+
+    async def respond(messages: List[ModelMessage], info: AgentInfo) -> ModelResponse:
+        await asyncio.sleep(latency + tokens * token_latency)
+        return ModelResponse(parts=[TextPart(text)])
+
+    async def stream(messages: List[ModelMessage], info: AgentInfo):
+        await asyncio.sleep(latency)
+        for index in range(tokens):
+            if token_latency:
+                await asyncio.sleep(token_latency)
+            yield f"token{index}" if index == 0 else f" token{index}"
+
+    return FunctionModel(respond, stream_function=stream)
+
+
+# --- Servers (child process) --------------------------------------------------
+
+
+def model_history(history: List[Dict[str, Any]]) -> List[ModelMessage]:
+    """AG-UI history dicts as PydanticAI messages, for the fake orchestrator."""
+    messages: List[ModelMessage] = []
+    for message in history:
+        content = message.get("content") or ""
+        role = message.get("role")
+        if role == "assistant":
+            messages.append(ModelResponse(parts=[TextPart(content)]))
+        elif role == "system":
+            messages.append(ModelRequest(parts=[SystemPromptPart(content)]))
+        else:
+            messages.append(ModelRequest(parts=[UserPromptPart(content)]))
+    return messages
+
+
+def create_orchestrator_app(agent: Any):
+    """
+    Serves ``agent`` on the MessageEnvelope contract ag_ui_backend.a2a_client
+    posts to CHIEF_LEGAL_ORCHESTRATOR_A2A_URL.
+    """
+    from fastapi import FastAPI
+
+    from ai_research_assistant.core.models import MessageEnvelope, Part, TaskResult
+
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health() -> Dict[str, str]:
+        return {"status": "ok"}
+
+    @app.post("/")
+    async def handle(envelope: MessageEnvelope) -> Dict[str, Any]:
+        parameters = envelope.skill_invocation.parameters
+        output = await agent.run(
+            parameters["user_prompt"],
+            message_history=model_history(parameters.get("history") or []),
+        )
+        return MessageEnvelope(
+            conversation_id=envelope.conversation_id,
+            source_agent_id="chief_legal_orchestrator",
+            target_agent_id=envelope.source_agent_id,
+            task_result=TaskResult(parts=[Part(content=str(output))]),
+        ).model_dump(mode="json", exclude_none=True)
+
+    return app
+
+
+def _serve(
+    config: LoadConfig, agui_port: int, orchestrator_port: int, workdir: str
+) -> None:
+    """Child process: the AG-UI app and the fake orchestrator, until killed."""
+    os.environ.update(
+        {
+            "CHIEF_LEGAL_ORCHESTRATOR_A2A_URL": f"http://127.0.0.1:{orchestrator_port}/",
+            "AG_UI_CONVERSATION_DB_PATH": os.path.join(workdir, "history.db"),
+            "AG_UI_SPILL_DB_PATH": os.path.join(workdir, "spill.db"),
+            "AG_UI_ARTIFACT_DIR": os.path.join(workdir, "artifacts"),
+            "LOG_LEVEL": "WARNING",
+        }
+    )
+    if config.llm_fixtures:
+        os.environ.update(
+            {
+                "LLM_REPLAY_MODE": "replay",
+                "LLM_REPLAY_DIR": os.path.abspath(config.llm_fixtures),
+                "LLM_REPLAY_LATENCY_SCALE": str(config.replay_latency_scale),
+                "LLM_REPLAY_FALLBACK": str(config.replay_fallback).lower(),
+            }
+        )
+    # Imported only now, so the settings above are the ones read
+    import uvicorn
+
+    from ai_research_assistant.ag_ui_backend import router
+    from ai_research_assistant.ag_ui_backend.main import app as agui_app
+    from ai_research_assistant.agents.orchestrator_agent.agent import (
+        OrchestratorAgent,
+    )
+    from ai_research_assistant.agents.orchestrator_agent.config import (
+        OrchestratorAgentConfig,
+    )
+    from ai_research_assistant.core.history_compaction import (
+        HistoryCompactor,
+        llm_summarizer,
+    )
+    from ai_research_assistant.core.unified_llm_factory import get_llm_factory
+
+    if config.llm_fixtures:
+        model = get_llm_factory().create_llm_from_config(
+            {"provider": config.llm_provider, "model_name": config.llm_model}
+        )
+    else:
+        model = fake_llm(config.llm_latency, config.tokens, config.token_latency)
+    agent = OrchestratorAgent(
+        config=OrchestratorAgentConfig(
+            workflow_state_db_path=os.path.join(workdir, "workflows.db")
+        ),
+        llm_instance=model,
+    )
+    compactor = router._history_compactor(OrchestratorAgentConfig)
+    if compactor is not None:
+        # Long threads are summarized by the fake model too, never a provider
+        router._history_compactors[OrchestratorAgentConfig] = HistoryCompactor(
+            llm_summarizer(lambda: model),
+            token_budget=compactor.token_budget,
+            keep_recent=compactor.keep_recent,
+        )
+
+    async def serve() -> None:
+        servers = [
+            uvicorn.Server(
+                uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+            )
+            for app, port in (
+                (agui_app, agui_port),
+                (create_orchestrator_app(agent), orchestrator_port),
+            )
+        ]
+        await asyncio.gather(*(server.serve() for server in servers))
+
+    asyncio.run(serve())
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    """Resident memory of a process (Linux only; None elsewhere)."""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+async def _wait_until_up(urls: List[str], process: multiprocessing.Process) -> None:
+    deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+    async with httpx.AsyncClient(timeout=1.0) as client:
+        for url in urls:
+            while True:
+                if not process.is_alive():
+                    raise RuntimeError("Load test servers exited during startup")
+                try:
+                    if (await client.get(url)).status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"{url} did not come up")
+                await asyncio.sleep(0.1)
+
+
+# --- Clients ------------------------------------------------------------------
+
+
+class RunTimings:
+    """Per-run latencies, in milliseconds, across every client."""
+
+    def __init__(self) -> None:
+        self.sketches = {
+            name: QuantileSketch()
+            for name in ("run_started", "first_agent_event", "completed")
+        }
+
+    def add(self, name: str, seconds: float) -> None:
+        self.sketches[name].add(seconds * 1000)
+
+    def summary(self) -> Dict[str, Dict[str, Optional[float]]]:
+        return {
+            name: {f"p{int(q * 100)}": sketch.quantile(q) for q in QUANTILES}
+            for name, sketch in self.sketches.items()
+        }
+
+
+async def _run_client(
+    url: str, config: LoadConfig, timings: RunTimings, report: LoadReport
+) -> None:
+    thread_id = str(uuid.uuid4())
+    messages: List[Dict[str, Any]] = []
+
+    async def next_events(websocket) -> List[Dict[str, Any]]:
+        frame = json.loads(await websocket.recv())
+        return frame if isinstance(frame, list) else [frame]
+
+    async with connect(
+        f"{url}/ag_ui/ws/{thread_id}{'?batch=true' if config.batch_frames else ''}",
+        max_size=None,
+    ) as websocket:
+        # Connect snapshots
+        for _ in range(2):
+            snapshot = await next_events(websocket)
+            report.events += len(snapshot)
+
+        for turn in range(config.runs_per_client):
+            run_id = str(uuid.uuid4())
+            messages.append(
+                {
+                    "id": str(uuid.uuid4()),
+                    "role": "user",
+                    "content": f"Question {turn}: what is the status of claim {thread_id[:8]}?",
+                }
+            )
+            start = time.perf_counter()
+            await websocket.send(
+                json.dumps(
+                    {
+                        "thread_id": thread_id,
+                        "run_id": run_id,
+                        "messages": messages,
+                        "tools": [],
+                        "context": [],
+                        "state": {},
+                        "forwarded_props": {},
+                    }
+                )
+            )
+            answer: List[str] = []
+            outcome = None
+            async with asyncio.timeout(config.run_timeout):
+                while outcome is None:
+                    for event in await next_events(websocket):
+                        report.events += 1
+                        elapsed = time.perf_counter() - start
+                        kind = event.get("type")
+                        if kind == "RUN_STARTED":
+                            timings.add("run_started", elapsed)
+                        elif kind == "RUN_FINISHED":
+                            timings.add("completed", elapsed)
+                            outcome = "completed"
+                        elif kind == "RUN_ERROR":
+                            outcome = "run_error"
+                        else:
+                            if not answer:
+                                timings.add("first_agent_event", elapsed)
+                            if kind == "TEXT_MESSAGE_CONTENT":
+                                answer.append(event.get("delta", ""))
+                            else:
+                                answer.append("")
+            text = "".join(answer)
+            if outcome == "completed" and text.startswith(ERROR_TEXT_PREFIXES):
+                outcome = "orchestrator_error"
+            if outcome == "completed":
+                report.completed += 1
+            else:
+                report.errors += 1
+                report.error_kinds[outcome] = report.error_kinds.get(outcome, 0) + 1
+            messages.append({"id": run_id, "role": "assistant", "content": text})
+            if config.think_time:
+                await asyncio.sleep(config.think_time)
+
+
+async def drive_clients(url: str, config: LoadConfig, report: LoadReport) -> None:
+    """Runs every simulated client against the AG-UI backend at ``url``."""
+    timings = RunTimings()
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(_run_client(url, config, timings, report) for _ in range(config.clients)),
+        return_exceptions=True,
+    )
+    report.duration_seconds = time.perf_counter() - start
+    for result in results:
+        if isinstance(result, BaseException):
+            # A client that failed mid-run: the rest of its runs count as errors
+            kind = type(result).__name__
+            report.error_kinds[kind] = report.error_kinds.get(kind, 0) + 1
+    report.errors += (
+        config.clients * config.runs_per_client - report.completed - report.errors
+    )
+    report.runs = config.clients * config.runs_per_client
+    report.latency_ms = timings.summary()
+
+
+async def run_load(config: LoadConfig) -> LoadReport:
+    """Starts the servers, warms them up, applies the load and stops them."""
+    agui_port, orchestrator_port = _free_port(), _free_port()
+    report = LoadReport(config=config)
+    with tempfile.TemporaryDirectory(prefix="agui-load-") as workdir:
+        process = multiprocessing.get_context("spawn").Process(
+            target=_serve,
+            args=(config, agui_port, orchestrator_port, workdir),
+            daemon=True,
+        )
+        process.start()
+        try:
+            await _wait_until_up(
+                [
+                    f"http://127.0.0.1:{agui_port}/",
+                    f"http://127.0.0.1:{orchestrator_port}/health",
+                ],
+                process,
+            )
+            url = f"ws://127.0.0.1:{agui_port}"
+            # One run first, so imports and first-use costs are not measured
+            await _run_client(
+                url,
+                LoadConfig(**{**asdict(config), "runs_per_client": 1}),
+                RunTimings(),
+                LoadReport(config=config),
+            )
+            report.rss_before_mb = rss_mb(process.pid)
+            await drive_clients(url, config, report)
+            report.rss_after_mb = rss_mb(process.pid)
+        finally:
+            process.terminate()
+            process.join(timeout=10)
+    return report
+
+
+def format_report(report: LoadReport) -> str:
+    config = report.config
+    if config.llm_fixtures:
+        llm = (
+            f"replayed {config.llm_provider}:{config.llm_model} "
+            f"x{config.replay_latency_scale:g} latency"
+        )
+    else:
+        llm = f"fake LLM {config.llm_latency * 1000:.0f} ms + {config.tokens} tokens"
+    lines = [
+        f"{config.clients} clients x {config.runs_per_client} runs, {llm}",
+        f"  completed runs:  {report.completed}/{report.runs} "
+        f"in {report.duration_seconds:.2f} s ({report.runs_per_second:.1f} runs/s, "
+        f"{report.events / max(report.duration_seconds, 1e-9):.0f} events/s)",
+        f"  error rate:      {report.error_rate:.2%} {report.error_kinds or ''}",
+    ]
+    for name, quantiles in report.latency_ms.items():
+        values = "  ".join(
+            f"{label} {value:8.1f}" if value is not None else f"{label}      n/a"
+            for label, value in quantiles.items()
+        )
+        lines.append(f"  {name + ' ms:':<24} {values}")
+    if report.rss_before_mb is not None and report.rss_after_mb is not None:
+        lines.append(
+            f"  server RSS:      {report.rss_before_mb:.1f} -> "
+            f"{report.rss_after_mb:.1f} MB "
+            f"({report.rss_after_mb - report.rss_before_mb:+.1f} MB)"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    defaults = LoadConfig()
+    parser.add_argument("--clients", type=int, default=defaults.clients)
+    parser.add_argument("--runs", type=int, default=defaults.runs_per_client)
+    parser.add_argument("--llm-latency", type=float, default=defaults.llm_latency)
+    parser.add_argument("--token-latency", type=float, default=defaults.token_latency)
+    parser.add_argument("--tokens", type=int, default=defaults.tokens)
+    parser.add_argument(
+        "--llm-fixtures", help="Replay responses recorded to this directory"
+    )
+    parser.add_argument("--llm-provider", default=defaults.llm_provider)
+    parser.add_argument("--llm-model", default=defaults.llm_model)
+    parser.add_argument(
+        "--replay-latency-scale",
+        type=float,
+        default=defaults.replay_latency_scale,
+        help="Multiplies recorded latencies (0 for none)",
+    )
+    parser.add_argument(
+        "--replay-fallback",
+        action="store_true",
+        help="Answer unrecorded requests with the next unused recording",
+    )
+    parser.add_argument("--think-time", type=float, default=defaults.think_time)
+    parser.add_argument("--run-timeout", type=float, default=defaults.run_timeout)
+    parser.add_argument("--batch", action="store_true", help="?batch=true sockets")
+    parser.add_argument("--json", help="Also write the report to this file")
+    parser.add_argument(
+        "--max-error-rate",
+        type=float,
+        help="Exit with status 1 if the error rate is above this (for CI)",
+    )
+    args = parser.parse_args()
+
+    report = asyncio.run(
+        run_load(
+            LoadConfig(
+                clients=args.clients,
+                runs_per_client=args.runs,
+                llm_latency=args.llm_latency,
+                token_latency=args.token_latency,
+                tokens=args.tokens,
+                llm_fixtures=args.llm_fixtures,
+                llm_provider=args.llm_provider,
+                llm_model=args.llm_model,
+                replay_latency_scale=args.replay_latency_scale,
+                replay_fallback=args.replay_fallback,
+                think_time=args.think_time,
+                run_timeout=args.run_timeout,
+                batch_frames=args.batch,
+            )
+        )
+    )
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump(report.to_dict(), output, indent=2)
+    if args.max_error_rate is not None and report.error_rate > args.max_error_rate:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
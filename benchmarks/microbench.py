@@ -0,0 +1,712 @@
+# benchmarks/microbench.py
+"""
+Micro-benchmarks for core hot paths, compared against stored baselines.
+
+Each benchmark times one operation in a loop calibrated to take at least
+``--min-time`` seconds. The best of ``--repeat`` samples is compared with
+benchmarks/microbench_baseline.json. A benchmark slower than its baseline by
+more than the threshold percentage is measured again in a fresh process
+(``--confirm``), since timings vary between processes. If it is still
+slower, it is a regression and the run exits with status 1. The threshold
+comes from ``--threshold``, then from the benchmark's own setting
+(SQLite-backed benchmarks are noisier), then from the baseline file.
+``--save-baseline`` records the median of ``--rounds`` processes.
+Baselines depend on the machine: record them again on the machine that
+runs the comparison.
+
+    PYTHONPATH=src python benchmarks/microbench.py
+    PYTHONPATH=src python benchmarks/microbench.py -k state_manager --threshold 40
+    PYTHONPATH=src python benchmarks/microbench.py --save-baseline
+"""
+
+import argparse
+import asyncio
+import functools
+import inspect
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncContextManager, Callable, Dict, List, Optional
+
+DEFAULT_BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "microbench_baseline.json"
+)
+DEFAULT_THRESHOLD_PERCENT = 25.0
+DEFAULT_MIN_TIME = 0.1
+DEFAULT_REPEAT = 7
+
+
+@dataclass
+class Benchmark:
+    name: str
+    description: str
+    # Async context manager yielding the operation to time (sync or async)
+    setup: Callable[[], AsyncContextManager[Callable[[], Any]]]
+    threshold_percent: Optional[float] = None
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    best_us: Optional[float] = None
+    median_us: Optional[float] = None
+    loops: int = 0
+    skipped: Optional[str] = None
+
+
+@dataclass
+class Comparison:
+    name: str
+    baseline_us: Optional[float]
+    current_us: Optional[float]
+    threshold_percent: float
+
+    @property
+    def change_percent(self) -> Optional[float]:
+        if not self.baseline_us or self.current_us is None:
+            return None
+        return (self.current_us / self.baseline_us - 1) * 100
+
+    @property
+    def regressed(self) -> bool:
+        change = self.change_percent
+        return change is not None and change > self.threshold_percent
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(
+    name: str, description: str, threshold_percent: Optional[float] = None
+) -> Callable:
+    """Registers an async context manager function as a benchmark setup."""
+
+    def register(setup: Callable) -> Callable:
+        BENCHMARKS[name] = Benchmark(name, description, setup, threshold_percent)
+        return setup
+
+    return register
+
+
+# --- Measurement ---
+
+
+async def _time_loops(operation: Callable[[], Any], loops: int) -> float:
+    if inspect.iscoroutinefunction(operation):
+        start = time.perf_counter()
+        for _ in range(loops):
+            await operation()
+        return time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(loops):
+        operation()
+    return time.perf_counter() - start
+
+
+async def measure(
+    operation: Callable[[], Any],
+    min_time: float = DEFAULT_MIN_TIME,
+    repeat: int = DEFAULT_REPEAT,
+) -> BenchmarkResult:
+    """Best and median time per call, as timeit's autorange would pick loops."""
+    await _time_loops(operation, 1)  # warm caches and lazy imports
+    loops = 1
+    for multiplier in itertools.cycle((2, 2.5, 2)):
+        if await _time_loops(operation, loops) >= min_time:
+            break
+        loops = int(loops * multiplier)
+    samples = [await _time_loops(operation, loops) / loops for _ in range(repeat)]
+    return BenchmarkResult(
+        name="",
+        best_us=min(samples) * 1e6,
+        median_us=statistics.median(samples) * 1e6,
+        loops=loops,
+    )
+
+
+async def run_benchmark(
+    bench: Benchmark, min_time: float = DEFAULT_MIN_TIME, repeat: int = DEFAULT_REPEAT
+) -> BenchmarkResult:
+    try:
+        async with bench.setup() as operation:
+            result = await measure(operation, min_time, repeat)
+    except ImportError as e:
+        # Optional dependencies of the code under test (e.g. numpy)
+        return BenchmarkResult(name=bench.name, skipped=f"missing dependency: {e}")
+    result.name = bench.name
+    return result
+
+
+async def run_benchmarks(
+    names: List[str], min_time: float = DEFAULT_MIN_TIME, repeat: int = DEFAULT_REPEAT
+) -> List[BenchmarkResult]:
+    return [await run_benchmark(BENCHMARKS[name], min_time, repeat) for name in names]
+
+
+def _run_names(names: List[str], min_time: float, repeat: int) -> List[Dict]:
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(run_benchmarks(names, min_time, repeat))
+    return [asdict(result) for result in results]
+
+
+def run_in_fresh_process(
+    names: List[str],
+    min_time: float = DEFAULT_MIN_TIME,
+    repeat: int = DEFAULT_REPEAT,
+) -> List[BenchmarkResult]:
+    """
+    Runs benchmarks in a new interpreter. Timings vary more between processes
+    (memory layout, hash seed) than within one, so independent measurements
+    need separate processes.
+    """
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        rows = pool.submit(_run_names, names, min_time, repeat).result()
+    return [BenchmarkResult(**row) for row in rows]
+
+
+def confirm_regressions(
+    results: List[BenchmarkResult],
+    baseline: Dict[str, Any],
+    threshold_percent: Optional[float] = None,
+    attempts: int = 2,
+    min_time: float = DEFAULT_MIN_TIME,
+    repeat: int = DEFAULT_REPEAT,
+) -> List[BenchmarkResult]:
+    """
+    Measures benchmarks that look regressed again in a fresh process, up to
+    ``attempts`` times, keeping the faster result, so one noisy run does not
+    fail the suite.
+    """
+    results = list(results)
+    for _ in range(attempts):
+        comparisons = compare(results, baseline, threshold_percent)
+        suspects = [c.name for c in comparisons if c.regressed]
+        if not suspects:
+            break
+        again = {r.name: r for r in run_in_fresh_process(suspects, min_time, repeat)}
+        for i, result in enumerate(results):
+            retry = again.get(result.name)
+            if retry and retry.best_us is not None and retry.best_us < result.best_us:
+                results[i] = retry
+    return results
+
+
+def measure_baseline(
+    names: List[str],
+    rounds: int = 3,
+    min_time: float = DEFAULT_MIN_TIME,
+    repeat: int = DEFAULT_REPEAT,
+) -> List[BenchmarkResult]:
+    """Each benchmark's best time, as the median over ``rounds`` processes."""
+    runs = [run_in_fresh_process(names, min_time, repeat) for _ in range(rounds)]
+    results = []
+    for attempts in zip(*runs):
+        measured = [result for result in attempts if result.best_us is not None]
+        if not measured:
+            results.append(attempts[0])
+            continue
+        results.append(
+            BenchmarkResult(
+                name=measured[0].name,
+                best_us=statistics.median(r.best_us for r in measured),
+                median_us=statistics.median(r.median_us for r in measured),
+                loops=measured[0].loops,
+            )
+        )
+    return results
+
+
+# --- Baselines ---
+
+
+def machine_info() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {"threshold_percent": DEFAULT_THRESHOLD_PERCENT, "benchmarks": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(
+    path: str, results: List[BenchmarkResult], baseline: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Records ``results`` in the baseline, keeping benchmarks not run."""
+    benchmarks = dict(baseline.get("benchmarks", {}))
+    for result in results:
+        if result.best_us is not None:
+            benchmarks[result.name] = {"best_us": round(result.best_us, 4)}
+    updated = {
+        "threshold_percent": baseline.get(
+            "threshold_percent", DEFAULT_THRESHOLD_PERCENT
+        ),
+        "machine": machine_info(),
+        "benchmarks": dict(sorted(benchmarks.items())),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(updated, f, indent=2)
+        f.write("\n")
+    return updated
+
+
+def compare(
+    results: List[BenchmarkResult],
+    baseline: Dict[str, Any],
+    threshold_percent: Optional[float] = None,
+) -> List[Comparison]:
+    """
+    Compares results with the baseline. ``threshold_percent`` overrides the
+    per-benchmark and baseline thresholds.
+    """
+    default = baseline.get("threshold_percent", DEFAULT_THRESHOLD_PERCENT)
+    comparisons = []
+    for result in results:
+        bench = BENCHMARKS.get(result.name)
+        threshold = threshold_percent
+        if threshold is None and bench is not None:
+            threshold = bench.threshold_percent
+        if threshold is None:
+            threshold = default
+        recorded = baseline.get("benchmarks", {}).get(result.name)
+        comparisons.append(
+            Comparison(
+                name=result.name,
+                baseline_us=recorded["best_us"] if recorded else None,
+                current_us=result.best_us,
+                threshold_percent=threshold,
+            )
+        )
+    return comparisons
+
+
+def format_results(
+    results: List[BenchmarkResult], comparisons: List[Comparison]
+) -> str:
+    lines = [
+        f"{'benchmark':<40} {'best us':>12} {'median us':>12} "
+        f"{'baseline':>12} {'change':>9}"
+    ]
+    for result, comparison in zip(results, comparisons):
+        if result.skipped:
+            lines.append(f"{result.name:<40} skipped ({result.skipped})")
+            continue
+        baseline = (
+            f"{comparison.baseline_us:12.3f}"
+            if comparison.baseline_us is not None
+            else f"{'new':>12}"
+        )
+        change = comparison.change_percent
+        verdict = ""
+        if comparison.regressed:
+            verdict = f"  REGRESSION (> {comparison.threshold_percent:g}%)"
+        lines.append(
+            f"{result.name:<40} {result.best_us:12.3f} {result.median_us:12.3f} "
+            f"{baseline} "
+            f"{f'{change:+8.1f}%' if change is not None else ' ' * 9}{verdict}"
+        )
+    return "\n".join(lines)
+
+
+# --- Benchmarks ---
+
+
+@benchmark(
+    "rate_limiter.token_bucket_consume",
+    "TokenBucket.consume on a bucket that never runs dry",
+)
+@asynccontextmanager
+async def _token_bucket_consume():
+    from ai_research_assistant.core.rate_limiter import TokenBucket
+
+    bucket = TokenBucket(capacity=10**12, refill_rate=10**9)
+    yield bucket.consume
+
+
+def _unthrottled_limiter():
+    from ai_research_assistant.core.rate_limiter import (
+        RateLimitConfig,
+        UniversalRateLimiter,
+    )
+
+    return UniversalRateLimiter(
+        RateLimitConfig(requests_per_minute=10**12, tokens_per_minute=10**12)
+    )
+
+
+@benchmark(
+    "rate_limiter.wait_if_needed",
+    "UniversalRateLimiter acquire of 500 tokens, never throttled",
+)
+@asynccontextmanager
+async def _wait_if_needed():
+    yield functools.partial(_unthrottled_limiter().wait_if_needed, 500)
+
+
+@benchmark(
+    "rate_limiter.await_if_needed",
+    "UniversalRateLimiter async acquire of 500 tokens, never throttled",
+)
+@asynccontextmanager
+async def _await_if_needed():
+    yield functools.partial(_unthrottled_limiter().await_if_needed, 500)
+
+
+# Orchestrator result parts of each kind a2a_client decodes
+A2A_PART_SAMPLES = [
+    ("text/plain", "Reviewed the decision letter."),
+    ("application/vnd.agent-plan.v1+json", {"plan": ["Collect", "Draft", "File"]}),
+    ("application/vnd.agent-status.v1+json", {"message": "Searching", "step": 2}),
+    (
+        "application/vnd.code-diff.v1+json",
+        {"uri": "file:///appeal.md", "diff": "-old\n+new"},
+    ),
+    ("application/vnd.notification.v1+json", {"severity": "info", "message": "Saved"}),
+    (
+        "application/vnd.legal-clause-analysis.v1+json",
+        {
+            "uri": "file:///decision.pdf",
+            "clause_text": "Section 22",
+            "analysis": "Applies to the hearing loss claim.",
+            "risk_level": "medium",
+        },
+    ),
+]
+
+
+def make_parts(count: int) -> List[Any]:
+    from ai_research_assistant.core.models import Part
+
+    return [
+        Part(type=mime_type, content=content)
+        for mime_type, content in itertools.islice(
+            itertools.cycle(A2A_PART_SAMPLES), count
+        )
+    ]
+
+
+@benchmark(
+    "a2a.decode_parts",
+    "A2AClient decoding of a task result with 500 mixed parts into AG-UI events",
+)
+@asynccontextmanager
+async def _decode_parts():
+    from ai_research_assistant.ag_ui_backend.a2a_client import decode_parts
+
+    yield functools.partial(decode_parts, make_parts(500), "m-1")
+
+
+def _case_state() -> Dict[str, Any]:
+    return {
+        "case": {"id": "A-1", "claimant": "J. Doe", "stage": "review"},
+        "documents": [
+            {"id": f"doc-{n}", "title": f"Exhibit {n}", "status": "pending"}
+            for n in range(200)
+        ],
+        "progress": {"percent": 0, "step": "intake"},
+    }
+
+
+def _conversation(state: Dict[str, Any]) -> Any:
+    from ai_research_assistant.ag_ui_backend.state_manager import (
+        AGUIConversationState,
+    )
+
+    return AGUIConversationState("bench", initial_state=state)
+
+
+@benchmark(
+    "ag_ui_state.patch_state",
+    "AGUIConversationState JSON patch of one value in a 200-document state",
+)
+@asynccontextmanager
+async def _patch_state():
+    conversation = _conversation(_case_state())
+    counter = itertools.count(1)
+
+    def patch() -> None:
+        conversation.patch_state(
+            [{"op": "replace", "path": "/progress/percent", "value": next(counter)}]
+        )
+
+    yield patch
+
+
+@benchmark(
+    "ag_ui_state.update_state",
+    "AGUIConversationState diff and apply of a snapshot with one change",
+)
+@asynccontextmanager
+async def _update_state():
+    conversation = _conversation(_case_state())
+    snapshot = _case_state()
+    counter = itertools.count(1)
+
+    def update() -> None:
+        snapshot["documents"][7]["status"] = f"reviewed-{next(counter)}"
+        conversation.update_state(snapshot)
+
+    yield update
+
+
+@benchmark(
+    "ag_ui_state.snapshot_event",
+    "AGUIConversationState STATE_SNAPSHOT event for a 200-document state",
+)
+@asynccontextmanager
+async def _snapshot_event():
+    yield _conversation(_case_state()).state_snapshot_event
+
+
+@asynccontextmanager
+async def _state_manager(prefill: int = 0):
+    from ai_research_assistant.core.state_manager import AgentStateManager
+
+    with tempfile.TemporaryDirectory() as workdir:
+        manager = AgentStateManager(db_path=os.path.join(workdir, "state.db"))
+        await manager.initialize()
+        try:
+            for n in range(prefill):
+                await manager.store_metric(_metric(n))
+            await manager.flush_metrics()
+            yield manager
+        finally:
+            await manager.close()
+
+
+def _metric(n: int) -> Dict[str, Any]:
+    return {
+        "name": "llm_latency",
+        "value": float(n % 97),
+        "metric_type": "histogram",
+        "tags": {"provider": ("google", "openai")[n % 2], "case_id": f"case-{n % 20}"},
+        "agent_id": "orchestrator",
+    }
+
+
+@benchmark(
+    "state_manager.store_metric",
+    "AgentStateManager metric write, with its share of the batched flushes",
+    threshold_percent=50.0,
+)
+@asynccontextmanager
+async def _store_metric():
+    async with _state_manager() as manager:
+        counter = itertools.count()
+
+        async def store() -> None:
+            await manager.store_metric(_metric(next(counter)))
+
+        yield store
+
+
+@benchmark(
+    "state_manager.get_metrics",
+    "AgentStateManager query of 50 metrics by name and tag among 5000",
+    threshold_percent=50.0,
+)
+@asynccontextmanager
+async def _get_metrics():
+    async with _state_manager(prefill=5000) as manager:
+        yield functools.partial(
+            manager.get_metrics,
+            metric_name="llm_latency",
+            tags={"case_id": "case-3"},
+            limit=50,
+        )
+
+
+@benchmark(
+    "state_manager.summarize_by_tag",
+    "AgentStateManager per-tag aggregate over 5000 metrics",
+    threshold_percent=50.0,
+)
+@asynccontextmanager
+async def _summarize_by_tag():
+    async with _state_manager(prefill=5000) as manager:
+        yield functools.partial(
+            manager.summarize_metrics_by_tag, "llm_latency", "provider"
+        )
+
+
+# Requests taking different routes; the last matches no pattern, so every
+# trigger is scanned
+ROUTING_PROMPTS = [
+    "Please set up a new database for the app",
+    "Create database collections for my case",
+    "Summarize the medical report from Dr. Lee",
+    "Can you investigate precedents on tinnitus?",
+    "Prepare appeal for the hearing loss claim",
+    "Hello there",
+    "Compare two WCAT rulings",
+]
+
+
+@benchmark(
+    "ceo.analyze_user_request",
+    f"CEO agent routing of {len(ROUTING_PROMPTS)} requests",
+)
+@asynccontextmanager
+async def _analyze_user_request():
+    from ai_research_assistant.agents.ceo_agent.prompts import analyze_user_request
+
+    def route() -> None:
+        for prompt in ROUTING_PROMPTS:
+            analyze_user_request(prompt)
+
+    yield route
+
+
+def _envelope() -> Any:
+    from ai_research_assistant.core.models import (
+        MessageEnvelope,
+        SkillInvocation,
+        TaskResult,
+    )
+
+    return MessageEnvelope(
+        source_agent_id="chief_legal_orchestrator",
+        target_agent_id="ag_ui_backend",
+        skill_invocation=SkillInvocation(
+            skill_name="handle_user_request",
+            parameters={
+                "user_prompt": "Status of my appeal?",
+                "history": [
+                    {"role": "user", "content": f"Message {n}"} for n in range(10)
+                ],
+            },
+        ),
+        task_result=TaskResult(status="completed", parts=make_parts(20)),
+    )
+
+
+@benchmark(
+    "models.envelope_dump_json",
+    "MessageEnvelope with 20 result parts serialized to JSON",
+)
+@asynccontextmanager
+async def _envelope_dump_json():
+    yield functools.partial(_envelope().model_dump_json, exclude_none=True)
+
+
+@benchmark(
+    "models.envelope_validate_json",
+    "MessageEnvelope with 20 result parts parsed from JSON",
+)
+@asynccontextmanager
+async def _envelope_validate_json():
+    from ai_research_assistant.core.models import MessageEnvelope
+
+    data = _envelope().model_dump_json(exclude_none=True)
+    yield functools.partial(MessageEnvelope.model_validate_json, data)
+
+
+@benchmark(
+    "agent_finder.find_best_agent_card",
+    "Agent finder search of 50 agent cards with 768-dimension embeddings",
+)
+@asynccontextmanager
+async def _find_best_agent_card():
+    import numpy as np
+
+    from ai_research_assistant.mcp.server import (
+        EMBEDDING_DIMENSION,
+        find_best_agent_card,
+    )
+
+    rng = random.Random(0)
+    cards = [{"agent_name": f"agent-{n}"} for n in range(50)]
+    embeddings = np.array(
+        [[rng.random() for _ in range(EMBEDDING_DIMENSION)] for _ in cards]
+    )
+    query = [rng.random() for _ in range(EMBEDDING_DIMENSION)]
+    yield functools.partial(find_best_agent_card, cards, embeddings, query)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "-k", dest="filter", help="Only run benchmarks whose name contains this"
+    )
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        help="Regression threshold in percent, for every benchmark",
+    )
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=3,
+        help="Processes whose median is saved with --save-baseline",
+    )
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument(
+        "--confirm",
+        type=int,
+        default=2,
+        help="Times a benchmark that looks regressed is measured again",
+    )
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--list", action="store_true", help="List the benchmarks")
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if not args.filter or args.filter in name]
+    if args.list:
+        for name in names:
+            print(f"{name:<40} {BENCHMARKS[name].description}")
+        return
+
+    # Setup code logs at INFO; keep the table readable
+    logging.basicConfig(level=logging.WARNING)
+    baseline = load_baseline(args.baseline)
+    if args.save_baseline:
+        results = measure_baseline(names, args.rounds, args.min_time, args.repeat)
+    else:
+        results = asyncio.run(run_benchmarks(names, args.min_time, args.repeat))
+        results = confirm_regressions(
+            results, baseline, args.threshold, args.confirm, args.min_time, args.repeat
+        )
+    comparisons = compare(results, baseline, args.threshold)
+    print(format_results(results, comparisons))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as output:
+            json.dump([asdict(result) for result in results], output, indent=2)
+    if args.save_baseline:
+        save_baseline(args.baseline, results, baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return
+    recorded_on = baseline.get("machine")
+    if recorded_on and recorded_on != machine_info():
+        print(f"Note: the baseline was recorded on another machine: {recorded_on}")
+    regressions = [comparison for comparison in comparisons if comparison.regressed]
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed past their threshold")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ from typing import Optional
 
 import httpx
 
+from ai_research_assistant.core.tracing import inject, start_span
+
 logger = logging.getLogger(__name__)
 
 
@@ -59,33 +61,45 @@ async def send_a2a_message(
     if context_id:
         a2a_payload["params"]["contextId"] = context_id
 
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        try:
-            response = await client.post(
-                url,
-                json=a2a_payload,
-                headers={"Content-Type": "application/json"},
-            )
-            response.raise_for_status()
-            response_data = response.json()
-
-            logger.debug(f"A2A response from {agent_name}: {response_data}")
-
-            # Parse the A2A response according to the protocol
-            result = _extract_response_content(response_data, agent_name)
-            logger.info(f"✅ Successfully received response from {agent_name}")
-            return result
-
-        except httpx.HTTPStatusError as e:
-            error_details = e.response.text
-            logger.error(
-                f"HTTP error from {agent_name}: {e.response.status_code} - {error_details}"
-            )
-            return f"Error: Received HTTP {e.response.status_code} from {agent_name}. Details: {error_details}"
-
-        except Exception as e:
-            logger.error(f"Communication error with {agent_name}: {e}", exc_info=True)
-            return f"Error: Could not communicate with {agent_name}. Is the service running on {url}?"
+    with start_span(
+        f"a2a.send {agent_name}",
+        kind="client",
+        attributes={"a2a.url": url, "conversation.id": context_id},
+    ) as span:
+        # W3C trace context travels in both task and message metadata so the
+        # receiving worker can parent its spans on this one
+        trace_metadata = inject({})
+        a2a_payload["params"]["metadata"] = dict(trace_metadata)
+        a2a_payload["params"]["message"]["metadata"] = dict(trace_metadata)
+        headers = {"Content-Type": "application/json", **trace_metadata}
+
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            try:
+                response = await client.post(url, json=a2a_payload, headers=headers)
+                response.raise_for_status()
+                response_data = response.json()
+
+                logger.debug(f"A2A response from {agent_name}: {response_data}")
+
+                # Parse the A2A response according to the protocol
+                result = _extract_response_content(response_data, agent_name)
+                logger.info(f"✅ Successfully received response from {agent_name}")
+                return result
+
+            except httpx.HTTPStatusError as e:
+                error_details = e.response.text
+                span.record_error(f"HTTP {e.response.status_code}")
+                logger.error(
+                    f"HTTP error from {agent_name}: {e.response.status_code} - {error_details}"
+                )
+                return f"Error: Received HTTP {e.response.status_code} from {agent_name}. Details: {error_details}"
+
+            except Exception as e:
+                span.record_error(e)
+                logger.error(
+                    f"Communication error with {agent_name}: {e}", exc_info=True
+                )
+                return f"Error: Could not communicate with {agent_name}. Is the service running on {url}?"
 
 
 def _extract_response_content(response_data: dict, agent_name: str) -> str:
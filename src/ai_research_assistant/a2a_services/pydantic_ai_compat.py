@@ -0,0 +1,22 @@
+# src/ai_research_assistant/a2a_services/pydantic_ai_compat.py
+"""
+The private pydantic-ai A2A worker API that traced_worker builds on.
+
+pydantic_ai._a2a is not a public module and may change in any release, so it
+is only imported here. ``AgentWorker`` and ``worker_lifespan`` are None when
+the installed pydantic-ai no longer provides them; callers then fall back to
+the public ``Agent.to_a2a()``.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pydantic_ai._a2a import AgentWorker, worker_lifespan
+except ImportError as e:
+    logger.warning(f"pydantic-ai A2A worker API unavailable ({e})")
+    AgentWorker = None
+    worker_lifespan = None
+
+__all__ = ["AgentWorker", "worker_lifespan"]
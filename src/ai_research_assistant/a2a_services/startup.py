@@ -18,6 +18,12 @@ sys.path.insert(0, str(project_root))
 
 import uvicorn
 
+from ai_research_assistant.a2a_services.traced_worker import create_traced_a2a_app
+from ai_research_assistant.config.global_settings import settings
+from ai_research_assistant.core.metrics import instrument_app
+from ai_research_assistant.core.run_instrumentation import StateManagerSink
+from ai_research_assistant.core.state_manager import AgentStateManager
+from ai_research_assistant.core.tracing import configure_tracing
 from ai_research_assistant.core.unified_llm_factory import get_llm_factory
 from ai_research_assistant.mcp.client import create_mcp_toolsets_from_config
 
@@ -141,13 +147,20 @@ def main():
         logger.info(
             f"✅ Created {class_name} instance with factory model and {len(toolsets)} toolsets"
         )
+
+        # Persist every LLM run record as tagged metrics in the agent state
+        # database, sharing the agent's own state manager if it has one
+        state_manager = (
+            getattr(agent_instance, "state_manager", None) or AgentStateManager()
+        )
+        agent_instance.add_instrumentation_sink(StateManagerSink(state_manager))
     except Exception as e:
         logger.error(f"Failed to create {class_name} instance: {e}", exc_info=True)
         sys.exit(1)
 
-    # Use PydanticAI's native A2A support - NO custom wrappers needed
+    # Use PydanticAI's native A2A worker, wrapped only to continue traces
     try:
-        logger.info("Creating A2A app using PydanticAI native to_a2a() method")
+        logger.info("Creating A2A app using PydanticAI's native A2A worker")
 
         # Get the underlying PydanticAI agent for A2A conversion
         if hasattr(agent_instance, "pydantic_agent"):
@@ -156,16 +169,27 @@ def main():
             # Fallback for agents that ARE the PydanticAI agent
             pydantic_agent = agent_instance
 
-        # Create A2A app with metadata from agent card
-        app = pydantic_agent.to_a2a(
+        # Create A2A app with metadata from agent card; tasks continue the
+        # caller's trace from the traceparent in the A2A metadata
+        configure_tracing(
+            service_name=agent_name, export_path=settings.TRACE_EXPORT_PATH
+        )
+        app = create_traced_a2a_app(
+            pydantic_agent,
             name=card.get("agent_name", "Unknown Agent"),
             url=f"http://localhost:{args.port}",
             version=card.get("version", "1.0.0"),
             description=card.get("description", "AI Research Agent"),
+            # Writes buffered run metrics and closes the state database
+            on_shutdown=[state_manager.close],
         )
         logger.info(
             f"✅ Native PydanticAI A2A app created for {card.get('agent_name')}"
         )
+
+        # Expose in-process performance metrics for Prometheus scraping and,
+        # with ADMIN_API_TOKEN set, the on-demand profiler
+        instrument_app(app, service=agent_name, admin_token=settings.ADMIN_API_TOKEN)
     except Exception as e:
         logger.error(f"Failed to create A2A app: {e}", exc_info=True)
         sys.exit(1)
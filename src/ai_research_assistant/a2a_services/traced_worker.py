@@ -0,0 +1,114 @@
+# src/ai_research_assistant/a2a_services/traced_worker.py
+"""
+Trace-aware A2A serving.
+
+TracingAgentWorker is PydanticAI's AgentWorker with each task run wrapped in a
+server span parented on the ``traceparent`` the caller put in the task (or
+message) metadata, so spans from every hop of a request share one trace.
+
+AgentWorker is private to pydantic-ai (see pydantic_ai_compat). Without it,
+create_traced_a2a_app serves the agent with ``to_a2a()``, untraced.
+"""
+
+import logging
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, Awaitable, Callable, Optional, Sequence
+
+from fasta2a.applications import FastA2A
+from fasta2a.broker import InMemoryBroker
+from fasta2a.schema import TaskSendParams
+from fasta2a.storage import InMemoryStorage
+from pydantic_ai import Agent
+
+from ai_research_assistant.a2a_services.pydantic_ai_compat import (
+    AgentWorker,
+    worker_lifespan,
+)
+from ai_research_assistant.core.run_instrumentation import instrumentation_context
+from ai_research_assistant.core.tracing import extract, start_span
+
+logger = logging.getLogger(__name__)
+
+if AgentWorker is not None:
+
+    class TracingAgentWorker(AgentWorker):
+        """AgentWorker that continues the caller's trace for every task."""
+
+        async def run_task(self, params: TaskSendParams) -> None:
+            parent = extract(params.get("metadata")) or extract(
+                params.get("message", {}).get("metadata")
+            )
+            session_id: Optional[str] = params.get("session_id")
+            with start_span(
+                f"a2a.task {self.agent.name or 'agent'}",
+                kind="server",
+                parent=parent,
+                attributes={
+                    "a2a.task_id": params["id"],
+                    "conversation.id": session_id,
+                },
+            ):
+                with instrumentation_context(conversation_id=session_id):
+                    await super().run_task(params)
+
+
+def create_traced_a2a_app(
+    agent: Agent[Any, Any],
+    *,
+    name: Optional[str] = None,
+    url: str = "http://localhost:8000",
+    version: str = "1.0.0",
+    description: Optional[str] = None,
+    on_shutdown: Sequence[Callable[[], Awaitable[Any]]] = (),
+) -> FastA2A:
+    """
+    Equivalent of ``agent.to_a2a()`` that serves tasks with TracingAgentWorker.
+
+    ``on_shutdown`` callbacks are awaited in order once the app's lifespan,
+    and with it the worker, has ended.
+    """
+    if AgentWorker is None:
+        logger.warning(
+            f"Serving {name or agent.name} without A2A task tracing: this "
+            f"pydantic-ai has no compatible AgentWorker"
+        )
+        app = agent.to_a2a(name=name, url=url, version=version, description=description)
+    else:
+        storage = InMemoryStorage()
+        broker = InMemoryBroker()
+        worker = TracingAgentWorker(agent=agent, broker=broker, storage=storage)
+        app = FastA2A(
+            storage=storage,
+            broker=broker,
+            name=name or agent.name,
+            url=url,
+            version=version,
+            description=description,
+            lifespan=partial(worker_lifespan, worker=worker),
+        )
+    if on_shutdown:
+        app.router.lifespan_context = _with_shutdown(
+            app.router.lifespan_context, on_shutdown
+        )
+    return app
+
+
+def _with_shutdown(
+    lifespan: Callable[[Any], Any], callbacks: Sequence[Callable[[], Awaitable[Any]]]
+) -> Callable[[Any], Any]:
+    """Wraps a lifespan so ``callbacks`` run after it ends, even on error."""
+
+    @asynccontextmanager
+    async def lifespan_with_shutdown(app: Any):
+        try:
+            async with lifespan(app) as state:
+                yield state
+        finally:
+            for callback in callbacks:
+                try:
+                    await callback()
+                except Exception as e:
+                    logger.error(f"Shutdown callback failed: {e}", exc_info=True)
+
+    return lifespan_with_shutdown
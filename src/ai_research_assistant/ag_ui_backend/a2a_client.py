@@ -1,22 +1,18 @@
 # src/ai_research_assistant/ag_ui_backend/a2a_client.py
 import logging
 import uuid
+from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Type
 from uuid import UUID
 
 import httpx
-from ag_ui.core import (
-    EventType,
-    TextMessageContentEvent,
-    TextMessageEndEvent,
-    TextMessageStartEvent,
-)
+from ag_ui.core import EventType
 
 # Use the official AG-UI Python SDK
 from ag_ui.core import Message as AGUIMessage
 from ag_ui.core import Tool as AGUITool
-from pydantic import BaseModel  # For project's MessageEnvelope
+from pydantic import BaseModel, TypeAdapter  # For project's MessageEnvelope
 
 from ..config.global_settings import settings
 from ..core.models import (
@@ -27,10 +23,12 @@ from ..core.models import (
     LegalClauseAnalysisPart,
     MessageEnvelope,
     NotificationPart,
+    Part,
     PlanPart,
     SkillInvocation,
     StatusPart,
 )
+from ..core.tracing import inject
 
 logger = logging.getLogger(__name__)
 
@@ -98,6 +96,153 @@ class ContractSummaryEvent(BaseCustomEvent):
     data: ContractSummaryPart
 
 
+# --- Part decoding ---
+
+
+@dataclass(frozen=True)
+class PartDecoder:
+    """How parts of one MIME type become a custom AG-UI event."""
+
+    event_type: str
+    adapter: TypeAdapter
+
+
+# MIME type -> decoder; add entries with register_part_type
+PART_DECODERS: Dict[str, PartDecoder] = {}
+
+
+def register_part_type(mime_type: str, event_type: str, part_type: Any) -> None:
+    """
+    Decodes task result parts of ``mime_type`` by validating their content as
+    ``part_type`` (any type pydantic accepts) and emitting them as events of
+    ``event_type``. The TypeAdapter is built here, once, not per part.
+    """
+    PART_DECODERS[mime_type] = PartDecoder(event_type, TypeAdapter(part_type))
+
+
+def register_event_class(mime_type: str, event_class: Type[BaseCustomEvent]) -> None:
+    """register_part_type taking the event type and part type from a model."""
+    register_part_type(
+        mime_type,
+        event_class.model_fields["type"].default,
+        event_class.model_fields["data"].annotation,
+    )
+
+
+for _mime_type, _event_class in (
+    ("application/vnd.agent-plan.v1+json", PlanEvent),
+    ("application/vnd.agent-status.v1+json", StatusEvent),
+    ("application/vnd.code-diff.v1+json", CodeDiffEvent),
+    ("application/vnd.file-content.v1+json", FileContentEvent),
+    ("application/vnd.notification.v1+json", NotificationEvent),
+    ("application/vnd.ide-command.v1+json", IDECommandEvent),
+    ("application/vnd.legal-clause-analysis.v1+json", LegalAnalysisEvent),
+    ("application/vnd.contract-summary.v1+json", ContractSummaryEvent),
+):
+    register_event_class(_mime_type, _event_class)
+
+
+# The wire dicts below are what model_dump(by_alias=True, exclude_none=True)
+# gives for the corresponding events, built without the model round trip.
+
+
+def text_message_events(message_id: str, delta: str) -> List[Dict[str, Any]]:
+    """TEXT_MESSAGE_START/CONTENT/END for a complete assistant message."""
+    return [
+        {
+            "type": EventType.TEXT_MESSAGE_START,
+            "messageId": message_id,
+            "role": "assistant",
+        },
+        {
+            "type": EventType.TEXT_MESSAGE_CONTENT,
+            "messageId": message_id,
+            "delta": delta,
+        },
+        {"type": EventType.TEXT_MESSAGE_END, "messageId": message_id},
+    ]
+
+
+def decode_parts(parts: List[Part], message_id: str) -> List[Dict[str, Any]]:
+    """
+    AG-UI events for a task result's parts: one assistant text message
+    holding the text parts (and anything that could not be decoded), with a
+    custom event for each part of a registered MIME type.
+    """
+    events: List[Dict[str, Any]] = [
+        {
+            "type": EventType.TEXT_MESSAGE_START,
+            "messageId": message_id,
+            "role": "assistant",
+        }
+    ]
+    text_content_parts: List[str] = []
+
+    for part in parts:
+        content_type = part.type
+        content = part.content
+        if content_type == "text/plain" and isinstance(content, str):
+            text_content_parts.append(content)
+            continue
+        decoder = PART_DECODERS.get(content_type)
+        if decoder is None:
+            # Default to treating unknown content as plain text
+            text_content_parts.append(str(content))
+            continue
+        if not isinstance(content, dict):
+            logger.warning(
+                f"Mismatched content for {content_type}: expected dict, got {type(content)}"
+            )
+            text_content_parts.append(str(content))
+            continue
+        try:
+            data = decoder.adapter.dump_python(
+                decoder.adapter.validate_python(content), exclude_none=True
+            )
+        except Exception as e:
+            logger.error(
+                f"Failed to process part type {content_type}: {e}",
+                exc_info=True,
+            )
+            text_content_parts.append(f"Error processing content: {str(e)}")
+            continue
+        events.append(
+            {"type": decoder.event_type, "message_id": message_id, "data": data}
+        )
+
+    if text_content_parts:
+        events.append(
+            {
+                "type": EventType.TEXT_MESSAGE_CONTENT,
+                "messageId": message_id,
+                "delta": " ".join(text_content_parts),
+            }
+        )
+    events.append({"type": EventType.TEXT_MESSAGE_END, "messageId": message_id})
+    return events
+
+
+@dataclass
+class HistoryContext:
+    """
+    How much of a conversation's history the orchestrator already holds.
+
+    An orchestrator that caches history answers with ``contextId`` in its
+    response metadata; later requests then send that id, the number of
+    messages it holds as ``history_offset`` and only the messages after them.
+    A 409 response means it no longer has the context, and the full history is
+    sent again. Orchestrators that never return a contextId get the full
+    history every time, as before.
+    """
+
+    context_id: Optional[str] = None
+    length: int = 0
+
+    def reset(self) -> None:
+        self.context_id = None
+        self.length = 0
+
+
 class A2AClient:
     def __init__(
         self, orchestrator_url: str = settings.CHIEF_LEGAL_ORCHESTRATOR_A2A_URL
@@ -112,37 +257,55 @@ class A2AClient:
         message_history: List[AGUIMessage],
         tools: List[AGUITool],  # These are tool *definitions* from UI
         current_state: Dict[str, Any],
+        serialized_history: Optional[List[Dict[str, Any]]] = None,
+        history_context: Optional[HistoryContext] = None,
     ) -> List[Dict[str, Any]]:
+        """
+        ``serialized_history``, if given, is ``message_history`` already
+        dumped (see AGUIConversationState.serialized_history), so it is not
+        dumped again here. With a ``history_context`` only the messages the
+        orchestrator does not hold yet are sent, and the context is updated
+        from the response.
+        """
         logger.info(
             f"Sending request to Orchestrator for conversation {conversation_id}. Prompt: {user_prompt[:100]}..."
         )
 
-        history_dicts = [
-            msg.model_dump(by_alias=True, exclude_none=True) for msg in message_history
-        ]
-
-        skill_invocation = SkillInvocation(
-            skill_name="handle_user_request",
-            parameters={"user_prompt": user_prompt, "history": history_dicts},
+        history_dicts = (
+            serialized_history
+            if serialized_history is not None
+            else [
+                msg.model_dump(by_alias=True, exclude_none=True)
+                for msg in message_history
+            ]
         )
-
-        envelope = MessageEnvelope(
-            conversation_id=UUID(conversation_id),
-            skill_invocation=skill_invocation,
-            source_agent_id="ag_ui_backend",
-            target_agent_id="chief_legal_orchestrator",
+        conversation_uuid = UUID(conversation_id)
+        full_parameters = {"user_prompt": user_prompt, "history": history_dicts}
+        use_context = (
+            history_context is not None
+            and history_context.context_id is not None
+            and history_context.length <= len(history_dicts)
         )
 
-        ag_ui_events_data = []
         try:
-            logger.debug(
-                f"A2A Request Envelope: {envelope.model_dump_json(indent=2, exclude_none=True)}"
-            )
-            response = await self.http_client.post(
-                self.orchestrator_url,
-                json=envelope.model_dump(exclude_none=True),
-                timeout=120.0,
-            )
+            if use_context:
+                response = await self._post(
+                    conversation_uuid,
+                    {
+                        "user_prompt": user_prompt,
+                        "context_id": history_context.context_id,
+                        "history_offset": history_context.length,
+                        "history": history_dicts[history_context.length :],
+                    },
+                )
+                if response.status_code == httpx.codes.CONFLICT:
+                    logger.info(
+                        f"Orchestrator lost history context {history_context.context_id}, resending full history"
+                    )
+                    history_context.reset()
+                    response = await self._post(conversation_uuid, full_parameters)
+            else:
+                response = await self._post(conversation_uuid, full_parameters)
             response.raise_for_status()
             orchestrator_response_data_dict = response.json()
 
@@ -153,189 +316,27 @@ class A2AClient:
             logger.info(
                 f"Received response from Orchestrator: {orchestrator_response_envelope.message_id}"
             )
-            logger.debug(
-                f"A2A Response Envelope: {orchestrator_response_envelope.model_dump_json(indent=2, exclude_none=True)}"
-            )
+            if history_context is not None:
+                context_id = orchestrator_response_envelope.metadata.get("contextId")
+                if context_id:
+                    history_context.context_id = str(context_id)
+                    history_context.length = len(history_dicts)
+                else:
+                    history_context.reset()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"A2A Response Envelope: {orchestrator_response_envelope.model_dump_json(indent=2, exclude_none=True)}"
+                )
 
             task_result = orchestrator_response_envelope.task_result
             assistant_message_id = str(uuid.uuid4())
 
             if task_result:
-                ag_ui_events_data.append(
-                    TextMessageStartEvent(
-                        type=EventType.TEXT_MESSAGE_START,
-                        message_id=assistant_message_id,
-                        role="assistant",
-                    ).model_dump(by_alias=True, exclude_none=True)
-                )
-
-                text_content_parts = []
-
-                for part in task_result.parts:
-                    content_type = part.type
-                    content = part.content
-
-                    event_to_add = None
-                    try:
-                        if content_type == "text/plain" and isinstance(content, str):
-                            text_content_parts.append(content)
-
-                        elif content_type == "application/vnd.agent-plan.v1+json":
-                            if isinstance(content, dict):
-                                validated_data = PlanPart.model_validate(content)
-                                event_to_add = PlanEvent(
-                                    message_id=assistant_message_id, data=validated_data
-                                )
-                            else:
-                                logger.warning(
-                                    f"Mismatched content for {content_type}: expected dict, got {type(content)}"
-                                )
-                                text_content_parts.append(str(content))
-
-                        elif content_type == "application/vnd.agent-status.v1+json":
-                            if isinstance(content, dict):
-                                validated_data = StatusPart.model_validate(content)
-                                event_to_add = StatusEvent(
-                                    message_id=assistant_message_id, data=validated_data
-                                )
-                            else:
-                                logger.warning(
-                                    f"Mismatched content for {content_type}: expected dict, got {type(content)}"
-                                )
-                                text_content_parts.append(str(content))
-
-                        elif content_type == "application/vnd.code-diff.v1+json":
-                            if isinstance(content, dict):
-                                validated_data = CodeDiffPart.model_validate(content)
-                                event_to_add = CodeDiffEvent(
-                                    message_id=assistant_message_id, data=validated_data
-                                )
-                            else:
-                                logger.warning(
-                                    f"Mismatched content for {content_type}: expected dict, got {type(content)}"
-                                )
-                                text_content_parts.append(str(content))
-
-                        elif content_type == "application/vnd.file-content.v1+json":
-                            if isinstance(content, dict):
-                                validated_data = FileContentPart.model_validate(content)
-                                event_to_add = FileContentEvent(
-                                    message_id=assistant_message_id, data=validated_data
-                                )
-                            else:
-                                logger.warning(
-                                    f"Mismatched content for {content_type}: expected dict, got {type(content)}"
-                                )
-                                text_content_parts.append(str(content))
-
-                        elif content_type == "application/vnd.notification.v1+json":
-                            if isinstance(content, dict):
-                                validated_data = NotificationPart.model_validate(
-                                    content
-                                )
-                                event_to_add = NotificationEvent(
-                                    message_id=assistant_message_id, data=validated_data
-                                )
-                            else:
-                                logger.warning(
-                                    f"Mismatched content for {content_type}: expected dict, got {type(content)}"
-                                )
-                                text_content_parts.append(str(content))
-
-                        elif content_type == "application/vnd.ide-command.v1+json":
-                            if isinstance(content, dict):
-                                validated_data = IDECommandPart.model_validate(content)
-                                event_to_add = IDECommandEvent(
-                                    message_id=assistant_message_id, data=validated_data
-                                )
-                            else:
-                                logger.warning(
-                                    f"Mismatched content for {content_type}: expected dict, got {type(content)}"
-                                )
-                                text_content_parts.append(str(content))
-
-                        elif (
-                            content_type
-                            == "application/vnd.legal-clause-analysis.v1+json"
-                        ):
-                            if isinstance(content, dict):
-                                validated_data = LegalClauseAnalysisPart.model_validate(
-                                    content
-                                )
-                                event_to_add = LegalAnalysisEvent(
-                                    message_id=assistant_message_id, data=validated_data
-                                )
-                            else:
-                                logger.warning(
-                                    f"Mismatched content for {content_type}: expected dict, got {type(content)}"
-                                )
-                                text_content_parts.append(str(content))
-
-                        elif content_type == "application/vnd.contract-summary.v1+json":
-                            if isinstance(content, dict):
-                                validated_data = ContractSummaryPart.model_validate(
-                                    content
-                                )
-                                event_to_add = ContractSummaryEvent(
-                                    message_id=assistant_message_id, data=validated_data
-                                )
-                            else:
-                                logger.warning(
-                                    f"Mismatched content for {content_type}: expected dict, got {type(content)}"
-                                )
-                                text_content_parts.append(str(content))
-
-                        else:
-                            # Default to treating unknown content as plain text
-                            text_content_parts.append(str(content))
-                    except Exception as e:
-                        logger.error(
-                            f"Failed to process part type {content_type}: {e}",
-                            exc_info=True,
-                        )
-                        text_content_parts.append(f"Error processing content: {str(e)}")
-
-                    if event_to_add:
-                        ag_ui_events_data.append(
-                            event_to_add.model_dump(by_alias=True, exclude_none=True)
-                        )
-
-                if text_content_parts:
-                    ag_ui_events_data.append(
-                        TextMessageContentEvent(
-                            type=EventType.TEXT_MESSAGE_CONTENT,
-                            message_id=assistant_message_id,
-                            delta=" ".join(text_content_parts),
-                        ).model_dump(by_alias=True, exclude_none=True)
-                    )
-
-                ag_ui_events_data.append(
-                    TextMessageEndEvent(
-                        type=EventType.TEXT_MESSAGE_END, message_id=assistant_message_id
-                    ).model_dump(by_alias=True, exclude_none=True)
-                )
-
-            else:
-                # Fallback for responses without a TaskResult
-                ag_ui_events_data.append(
-                    TextMessageStartEvent(
-                        type=EventType.TEXT_MESSAGE_START,
-                        message_id=assistant_message_id,
-                        role="assistant",
-                    ).model_dump(by_alias=True, exclude_none=True)
-                )
-                ag_ui_events_data.append(
-                    TextMessageContentEvent(
-                        type=EventType.TEXT_MESSAGE_CONTENT,
-                        message_id=assistant_message_id,
-                        delta="Orchestrator processed the request.",
-                    ).model_dump(by_alias=True, exclude_none=True)
-                )
-                ag_ui_events_data.append(
-                    TextMessageEndEvent(
-                        type=EventType.TEXT_MESSAGE_END, message_id=assistant_message_id
-                    ).model_dump(by_alias=True, exclude_none=True)
-                )
+                return decode_parts(task_result.parts, assistant_message_id)
+            # Fallback for responses without a TaskResult
+            return text_message_events(
+                assistant_message_id, "Orchestrator processed the request."
+            )
 
         except httpx.HTTPStatusError as e:
             error_content = e.response.text
@@ -344,50 +345,38 @@ class A2AClient:
                 exc_info=True,
             )
             # Create AG-UI error event
-            err_msg_id = str(uuid.uuid4())
-            ag_ui_events_data.append(
-                TextMessageStartEvent(
-                    type=EventType.TEXT_MESSAGE_START,
-                    message_id=err_msg_id,
-                    role="assistant",
-                ).model_dump(by_alias=True, exclude_none=True)
-            )
-            ag_ui_events_data.append(
-                TextMessageContentEvent(
-                    type=EventType.TEXT_MESSAGE_CONTENT,
-                    message_id=err_msg_id,
-                    delta=f"Error communicating with orchestrator: {e.response.status_code}",
-                ).model_dump(by_alias=True, exclude_none=True)
-            )
-            ag_ui_events_data.append(
-                TextMessageEndEvent(
-                    type=EventType.TEXT_MESSAGE_END, message_id=err_msg_id
-                ).model_dump(by_alias=True, exclude_none=True)
+            return text_message_events(
+                str(uuid.uuid4()),
+                f"Error communicating with orchestrator: {e.response.status_code}",
             )
         except Exception as e:
             logger.error(f"Error in A2A client: {e}", exc_info=True)
-            err_msg_id = str(uuid.uuid4())
-            ag_ui_events_data.append(
-                TextMessageStartEvent(
-                    type=EventType.TEXT_MESSAGE_START,
-                    message_id=err_msg_id,
-                    role="assistant",
-                ).model_dump(by_alias=True, exclude_none=True)
-            )
-            ag_ui_events_data.append(
-                TextMessageContentEvent(
-                    type=EventType.TEXT_MESSAGE_CONTENT,
-                    message_id=err_msg_id,
-                    delta=f"An internal error occurred: {str(e)}",
-                ).model_dump(by_alias=True, exclude_none=True)
-            )
-            ag_ui_events_data.append(
-                TextMessageEndEvent(
-                    type=EventType.TEXT_MESSAGE_END, message_id=err_msg_id
-                ).model_dump(by_alias=True, exclude_none=True)
+            return text_message_events(
+                str(uuid.uuid4()), f"An internal error occurred: {str(e)}"
             )
 
-        return ag_ui_events_data
+    async def _post(
+        self, conversation_id: UUID, parameters: Dict[str, Any]
+    ) -> httpx.Response:
+        envelope = MessageEnvelope(
+            conversation_id=conversation_id,
+            skill_invocation=SkillInvocation(
+                skill_name="handle_user_request", parameters=parameters
+            ),
+            source_agent_id="ag_ui_backend",
+            target_agent_id="chief_legal_orchestrator",
+            metadata=inject({}),
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"A2A Request Envelope: {envelope.model_dump_json(indent=2, exclude_none=True)}"
+            )
+        return await self.http_client.post(
+            self.orchestrator_url,
+            json=envelope.model_dump(mode="json", exclude_none=True),
+            headers=inject({}),
+            timeout=120.0,
+        )
 
 
 # --- End of src/savagelysubtle_airesearchagent/ag_ui_backend/a2a_client.py ---
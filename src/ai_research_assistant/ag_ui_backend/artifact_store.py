@@ -0,0 +1,71 @@
+# src/ai_research_assistant/ag_ui_backend/artifact_store.py
+"""
+Content-addressed storage for oversized AG-UI message bodies.
+
+Message snapshots and history pages replace tool outputs larger than
+``inline_limit`` bytes with a short preview and a reference to a file here;
+clients fetch the full body from ``GET /ag_ui/artifacts/{artifact_id}`` only
+when it is opened. The id is the SHA-256 of the content, so identical outputs
+are stored once and a reference never goes stale.
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_ARTIFACT_ID_RE = re.compile(r"^[0-9a-f]{64}$")
+
+PREVIEW_CHARS = 280
+
+
+class ArtifactStore:
+    """Stores text bodies as files named by their SHA-256 under ``root``."""
+
+    def __init__(self, root: str, inline_limit: int = 16384) -> None:
+        self.root = Path(root)
+        self.inline_limit = inline_limit
+
+    def is_oversized(self, content: str) -> bool:
+        # Cheap bound first: a str never encodes to fewer bytes than chars
+        return len(content) > self.inline_limit or (
+            len(content) * 4 > self.inline_limit
+            and len(content.encode("utf-8")) > self.inline_limit
+        )
+
+    def path(self, artifact_id: str) -> Optional[Path]:
+        """File for an id, or None if the id is malformed."""
+        if not _ARTIFACT_ID_RE.match(artifact_id):
+            return None
+        return self.root / artifact_id[:2] / artifact_id
+
+    def _write(self, artifact_id: str, data: bytes) -> None:
+        path = self.path(artifact_id)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix(".tmp")
+        temporary.write_bytes(data)
+        temporary.replace(path)
+
+    async def put(self, content: str) -> Dict[str, Any]:
+        """Stores ``content`` (off the event loop) and returns its reference."""
+        data = content.encode("utf-8")
+        artifact_id = hashlib.sha256(data).hexdigest()
+        await asyncio.to_thread(self._write, artifact_id, data)
+        logger.debug(f"Stored artifact {artifact_id} ({len(data)} bytes)")
+        return {"id": artifact_id, "bytes": len(data)}
+
+    async def get(self, artifact_id: str) -> Optional[str]:
+        path = self.path(artifact_id)
+        if path is None:
+            return None
+        try:
+            data = await asyncio.to_thread(path.read_bytes)
+        except FileNotFoundError:
+            return None
+        return data.decode("utf-8")
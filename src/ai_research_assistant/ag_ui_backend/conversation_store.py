@@ -0,0 +1,439 @@
+# src/ai_research_assistant/ag_ui_backend/conversation_store.py
+"""
+Durable history for AG-UI conversations.
+
+Messages are append-only rows keyed by (thread_id, seq) and are never
+rewritten; the thread's shared state is one row per thread carrying a version
+that increases with every write. The seq of the last event emitted on the
+thread is kept too, so a new event log continues after it. Writes are buffered and committed in batches,
+like AgentStateManager's metrics, and reads are paged by seq, so a long thread
+is never loaded with a single query.
+
+The schema and statements stick to SQL that SQLite and Postgres both accept
+(``ON CONFLICT ... DO NOTHING/UPDATE``, ``excluded``, no AUTOINCREMENT), and
+the per-thread seq plus the unique (thread_id, message_id) index let several
+backend workers append to the same thread without duplicating messages.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import aiosqlite
+from ag_ui.core import Message as AGUIMessage
+from pydantic import TypeAdapter
+
+logger = logging.getLogger(__name__)
+
+_MESSAGE_ADAPTER = TypeAdapter(AGUIMessage)
+
+# Called after commit with the seq a message was stored at, or the version a
+# state write produced
+OnStored = Callable[[int], None]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ag_ui_threads (
+    thread_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    state_version INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ag_ui_messages (
+    thread_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    message_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    body TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (thread_id, seq)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_ag_ui_messages_message_id
+    ON ag_ui_messages(thread_id, message_id);
+CREATE TABLE IF NOT EXISTS ag_ui_event_seqs (
+    thread_id TEXT PRIMARY KEY,
+    last_seq INTEGER NOT NULL
+);
+"""
+
+
+@dataclass
+class StoredConversation:
+    """A thread as read from the store; ``messages`` are (seq, message) pairs."""
+
+    thread_id: str
+    state: Dict[str, Any]
+    state_version: int
+    messages: List[Tuple[int, AGUIMessage]] = field(default_factory=list)
+    last_event_seq: int = 0  # seq of the last event emitted on the thread
+
+    @property
+    def last_seq(self) -> int:
+        return self.messages[-1][0] if self.messages else 0
+
+
+class ConversationStore:
+    """
+    aiosqlite-backed conversation repository with write-behind batching.
+
+    append_message and save_state only buffer; rows are committed in one
+    transaction once ``batch_size`` writes are pending or ``flush_interval``
+    seconds have passed. Writes made before initialize() are kept and committed
+    by it. Reads see committed rows only, so callers that need their own
+    pending writes should flush() first. A write's ``on_stored`` callback is
+    told where it landed once committed, so the writer need not read it back.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        batch_size: int = 50,
+        flush_interval: float = 0.2,
+        page_size: int = 200,
+    ) -> None:
+        self.db_path = db_path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.page_size = max(1, page_size)
+        self._connection: Optional[aiosqlite.Connection] = None
+        # thread_id -> (message_id, role, body, created_at, on_stored) in
+        # append order
+        self._pending_messages: Dict[
+            str, List[Tuple[str, str, str, float, Optional[OnStored]]]
+        ] = {}
+        # thread_id -> (latest state, on_stored); only the latest write per
+        # thread is kept
+        self._pending_states: Dict[str, Tuple[Dict[str, Any], Optional[OnStored]]] = {}
+        # thread_id -> highest event seq emitted
+        self._pending_event_seqs: Dict[str, int] = {}
+        self._pending_count = 0
+        self._flush_lock = asyncio.Lock()
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def initialized(self) -> bool:
+        return self._connection is not None
+
+    async def initialize(self) -> None:
+        """Opens the database, creates the schema and commits earlier writes."""
+        if self._connection is not None:
+            return
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        connection = aiosqlite.connect(self.db_path)
+        connection.daemon = True
+        self._connection = await connection
+        self._connection.row_factory = aiosqlite.Row
+        await self._connection.execute("PRAGMA journal_mode=WAL")
+        await self._connection.execute("PRAGMA synchronous=NORMAL")
+        await self._connection.executescript(_SCHEMA)
+        await self._connection.commit()
+        logger.info(f"Initialized ConversationStore with {self.db_path}")
+        await self.flush()
+
+    def _require_connection(self) -> aiosqlite.Connection:
+        if self._connection is None:
+            raise RuntimeError(
+                "ConversationStore not initialized. Call initialize() first."
+            )
+        return self._connection
+
+    # --- Writes ---
+
+    def append_message(
+        self,
+        thread_id: str,
+        message: AGUIMessage,
+        on_stored: Optional[OnStored] = None,
+    ) -> None:
+        """
+        Buffers a message for the thread's append-only history. ``on_stored``
+        gets its seq, unless the thread already held the message.
+        """
+        body = _MESSAGE_ADAPTER.dump_json(
+            message, by_alias=True, exclude_none=True
+        ).decode("utf-8")
+        self._pending_messages.setdefault(thread_id, []).append(
+            (message.id, message.role, body, time.time(), on_stored)
+        )
+        self._pending_count += 1
+        self._schedule()
+
+    def save_state(
+        self,
+        thread_id: str,
+        state: Dict[str, Any],
+        on_stored: Optional[OnStored] = None,
+    ) -> None:
+        """
+        Buffers the thread's latest shared state. It is serialized at flush, so
+        only the last of several writes in a batch is encoded; the caller must
+        replace rather than mutate it (AGUIConversationState's copy-on-write
+        state satisfies this). ``on_stored`` of the write that is committed
+        gets the state_version it produced.
+        """
+        if thread_id not in self._pending_states:
+            self._pending_count += 1
+        self._pending_states[thread_id] = (state, on_stored)
+        self._schedule()
+
+    def save_event_seq(self, thread_id: str, seq: int) -> None:
+        """Buffers the seq of the thread's latest event; it never goes back."""
+        previous = self._pending_event_seqs.get(thread_id)
+        if previous is None:
+            self._pending_count += 1
+        elif previous >= seq:
+            return
+        self._pending_event_seqs[thread_id] = seq
+        self._schedule()
+
+    def _schedule(self) -> None:
+        if self._connection is None:
+            return
+        if self._pending_count >= self.batch_size:
+            self._start_background_flush()
+        elif self._flush_timer is None:
+            self._flush_timer = asyncio.get_running_loop().call_later(
+                self.flush_interval, self._start_background_flush
+            )
+
+    def _start_background_flush(self) -> None:
+        self._flush_timer = None
+        if self._pending_count and (
+            self._flush_task is None or self._flush_task.done()
+        ):
+            self._flush_task = asyncio.create_task(self._flush_in_background())
+
+    async def _flush_in_background(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Background conversation flush failed: {e}")
+
+    async def flush(self) -> int:
+        """Commits all buffered writes in one transaction. Returns rows written."""
+        async with self._flush_lock:
+            if not self._pending_count or self._connection is None:
+                return 0
+            conn = self._connection
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+
+            messages, self._pending_messages = self._pending_messages, {}
+            states, self._pending_states = self._pending_states, {}
+            event_seqs, self._pending_event_seqs = self._pending_event_seqs, {}
+            batch_size, self._pending_count = self._pending_count, 0
+            now = time.time()
+            stored: List[Tuple[OnStored, int]] = []
+            try:
+                # Serializes writers so each thread's next seq is read and used
+                # in the same transaction.
+                if not conn.in_transaction:
+                    await conn.execute("BEGIN IMMEDIATE")
+                await conn.executemany(
+                    """
+                    INSERT INTO ag_ui_threads
+                        (thread_id, state, state_version, created_at, updated_at)
+                    VALUES (?, '{}', 0, ?, ?)
+                    ON CONFLICT (thread_id) DO NOTHING
+                    """,
+                    [(thread_id, now, now) for thread_id in messages],
+                )
+                for thread_id, rows in messages.items():
+                    async with conn.execute(
+                        "SELECT MAX(seq) FROM ag_ui_messages WHERE thread_id = ?",
+                        (thread_id,),
+                    ) as cursor:
+                        last_seq = (await cursor.fetchone())[0] or 0
+                    await conn.executemany(
+                        """
+                        INSERT INTO ag_ui_messages
+                            (thread_id, seq, message_id, role, body, created_at)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (thread_id, message_id) DO NOTHING
+                        """,
+                        [
+                            (thread_id, last_seq + offset, *row[:4])
+                            for offset, row in enumerate(rows, start=1)
+                        ],
+                    )
+                    if any(row[4] is not None for row in rows):
+                        # Rows skipped as duplicates have no seq of their own
+                        async with conn.execute(
+                            "SELECT message_id, seq FROM ag_ui_messages "
+                            "WHERE thread_id = ? AND seq > ?",
+                            (thread_id, last_seq),
+                        ) as cursor:
+                            seqs = {
+                                inserted["message_id"]: inserted["seq"]
+                                for inserted in await cursor.fetchall()
+                            }
+                        stored.extend(
+                            (row[4], seqs[row[0]])
+                            for row in rows
+                            if row[4] is not None and row[0] in seqs
+                        )
+                await conn.executemany(
+                    """
+                    INSERT INTO ag_ui_threads
+                        (thread_id, state, state_version, created_at, updated_at)
+                    VALUES (?, ?, 1, ?, ?)
+                    ON CONFLICT (thread_id) DO UPDATE SET
+                        state = excluded.state,
+                        state_version = ag_ui_threads.state_version + 1,
+                        updated_at = excluded.updated_at
+                    """,
+                    [
+                        (thread_id, json.dumps(state), now, now)
+                        for thread_id, (state, _) in states.items()
+                    ],
+                )
+                await conn.executemany(
+                    """
+                    INSERT INTO ag_ui_event_seqs (thread_id, last_seq)
+                    VALUES (?, ?)
+                    ON CONFLICT (thread_id) DO UPDATE SET last_seq = CASE
+                        WHEN excluded.last_seq > ag_ui_event_seqs.last_seq
+                        THEN excluded.last_seq
+                        ELSE ag_ui_event_seqs.last_seq
+                    END
+                    """,
+                    list(event_seqs.items()),
+                )
+                for thread_id, (_, on_stored) in states.items():
+                    if on_stored is None:
+                        continue
+                    async with conn.execute(
+                        "SELECT state_version FROM ag_ui_threads WHERE thread_id = ?",
+                        (thread_id,),
+                    ) as cursor:
+                        stored.append((on_stored, (await cursor.fetchone())[0]))
+                await conn.commit()
+            except Exception:
+                await conn.rollback()
+                # Keep the writes so a later flush can retry them.
+                for thread_id, rows in messages.items():
+                    self._pending_messages[thread_id] = (
+                        rows + self._pending_messages.get(thread_id, [])
+                    )
+                for thread_id, pending in states.items():
+                    self._pending_states.setdefault(thread_id, pending)
+                for thread_id, seq in event_seqs.items():
+                    self._pending_event_seqs[thread_id] = max(
+                        seq, self._pending_event_seqs.get(thread_id, seq)
+                    )
+                self._pending_count += batch_size
+                raise
+            for on_stored, position in stored:
+                try:
+                    on_stored(position)
+                except Exception as e:
+                    logger.error(f"Conversation store on_stored callback failed: {e}")
+            return batch_size
+
+    async def delete_thread(self, thread_id: str) -> None:
+        """Removes a thread, its history and any of its pending writes."""
+        dropped = len(self._pending_messages.pop(thread_id, []))
+        if self._pending_states.pop(thread_id, None) is not None:
+            dropped += 1
+        if self._pending_event_seqs.pop(thread_id, None) is not None:
+            dropped += 1
+        self._pending_count -= dropped
+        conn = self._require_connection()
+        async with self._flush_lock:
+            await conn.execute(
+                "DELETE FROM ag_ui_messages WHERE thread_id = ?", (thread_id,)
+            )
+            await conn.execute(
+                "DELETE FROM ag_ui_threads WHERE thread_id = ?", (thread_id,)
+            )
+            await conn.execute(
+                "DELETE FROM ag_ui_event_seqs WHERE thread_id = ?", (thread_id,)
+            )
+            await conn.commit()
+
+    # --- Reads ---
+
+    async def load_messages(
+        self, thread_id: str, after_seq: int = 0, limit: Optional[int] = None
+    ) -> List[Tuple[int, AGUIMessage]]:
+        """One page of (seq, message) pairs with seq > after_seq, oldest first."""
+        conn = self._require_connection()
+        async with conn.execute(
+            """
+            SELECT seq, body FROM ag_ui_messages
+            WHERE thread_id = ? AND seq > ?
+            ORDER BY seq
+            LIMIT ?
+            """,
+            (thread_id, after_seq, limit or self.page_size),
+        ) as cursor:
+            rows = await cursor.fetchall()
+        return [
+            (row["seq"], _MESSAGE_ADAPTER.validate_json(row["body"])) for row in rows
+        ]
+
+    async def iter_messages(
+        self, thread_id: str, after_seq: int = 0
+    ) -> AsyncIterator[Tuple[int, AGUIMessage]]:
+        """Yields the thread's messages after ``after_seq``, a page at a time."""
+        while True:
+            page = await self.load_messages(thread_id, after_seq=after_seq)
+            for item in page:
+                yield item
+            if len(page) < self.page_size:
+                return
+            after_seq = page[-1][0]
+
+    async def load_conversation(
+        self, thread_id: str, after_seq: int = 0
+    ) -> Optional[StoredConversation]:
+        """Reads the thread's state and messages after ``after_seq``, or None."""
+        conn = self._require_connection()
+        async with conn.execute(
+            "SELECT state, state_version FROM ag_ui_threads WHERE thread_id = ?",
+            (thread_id,),
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        async with conn.execute(
+            "SELECT last_seq FROM ag_ui_event_seqs WHERE thread_id = ?",
+            (thread_id,),
+        ) as cursor:
+            event_row = await cursor.fetchone()
+        return StoredConversation(
+            thread_id=thread_id,
+            state=json.loads(row["state"]),
+            state_version=row["state_version"],
+            messages=[item async for item in self.iter_messages(thread_id, after_seq)],
+            last_event_seq=event_row["last_seq"] if event_row is not None else 0,
+        )
+
+    async def message_count(self, thread_id: str) -> int:
+        conn = self._require_connection()
+        async with conn.execute(
+            "SELECT COUNT(*) FROM ag_ui_messages WHERE thread_id = ?", (thread_id,)
+        ) as cursor:
+            return (await cursor.fetchone())[0]
+
+    async def close(self) -> None:
+        """Commits pending writes and closes the connection."""
+        if self._connection is None:
+            return
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+        try:
+            await self.flush()
+        finally:
+            await self._connection.close()
+            self._connection = None
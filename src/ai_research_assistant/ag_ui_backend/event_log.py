@@ -0,0 +1,94 @@
+# src/ai_research_assistant/ag_ui_backend/event_log.py
+"""
+Per-thread replay buffer for AG-UI events.
+
+Every event the backend emits on a thread is appended to that thread's
+ThreadEventLog and stamped with a ``seq`` that increases by one per event. A
+client that reconnects with the last seq it saw is sent only the events after
+it; once those have rolled out of the bounded buffer it gets snapshots instead.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EVENT_BUFFER_SIZE = 1000
+
+
+class ThreadEventLog:
+    """
+    Bounded ring buffer of a thread's emitted events.
+
+    A new log starts numbering at the current time in milliseconds rather than
+    at 1, and continue_after() moves it past the last seq stored for the thread
+    by an earlier log, so a thread's seqs never repeat. A seq remembered from a
+    log that no longer exists (restarted backend) therefore never replays the
+    wrong events: the client gets a snapshot, or nothing if it had seen them all.
+
+    ``lock`` serializes appending-and-sending with a reconnect's replay, so a
+    client sees every event exactly once and in order. ``on_append`` is called
+    with the seq of every appended event.
+    """
+
+    def __init__(
+        self,
+        capacity: Optional[int] = None,
+        on_append: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        self.capacity = max(1, capacity or DEFAULT_EVENT_BUFFER_SIZE)
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=self.capacity)
+        self._next_seq = int(time.time() * 1000)
+        self.on_append = on_append
+        self.lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    @property
+    def last_seq(self) -> int:
+        """Seq of the most recent event (one less than the first, if none)."""
+        return self._next_seq - 1
+
+    def append(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Records an event; returns a copy stamped with its seq."""
+        stamped = {**event, "seq": self._next_seq}
+        self._next_seq += 1
+        self._events.append(stamped)
+        if self.on_append is not None:
+            self.on_append(stamped["seq"])
+        return stamped
+
+    def continue_after(self, seq: int) -> None:
+        """
+        Numbers this log's events after ``seq``, the last one issued by an
+        earlier log for the thread. Ignored once this log has events, whose
+        seqs must stay consecutive.
+        """
+        if not self._events and seq >= self._next_seq:
+            self._next_seq = seq + 1
+
+    def dump(self) -> Dict[str, Any]:
+        """The buffered events and the next seq, as JSON for restore()."""
+        return {"events": list(self._events), "next_seq": self._next_seq}
+
+    def restore(self, dumped: Dict[str, Any]) -> None:
+        """Continues a dumped log: its events are replayable and seqs go on."""
+        self._events.clear()
+        self._events.extend(dumped.get("events", []))
+        self._next_seq = dumped.get("next_seq", self._next_seq)
+
+    def since(self, last_seq: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Events after ``last_seq``, oldest first, or None if some of them have
+        already been dropped (or ``last_seq`` was never issued by this log).
+        """
+        if last_seq > self.last_seq:
+            return None
+        first_seq = self._events[0]["seq"] if self._events else self._next_seq
+        if last_seq < first_seq - 1:
+            return None
+        return list(self._events)[last_seq - first_seq + 1 :]
@@ -0,0 +1,216 @@
+# src/ai_research_assistant/ag_ui_backend/event_writer.py
+"""
+Per-connection outbound writer for AG-UI websocket events.
+
+All events for a socket go through one EventWriter, whose task is the only
+sender on that socket. Adjacent TEXT_MESSAGE_CONTENT events for the same
+message that arrive within ``coalesce_window`` seconds are merged into one, so
+a streamed answer leaves as a few frames instead of one per token. Clients that
+connect with ``?batch=true`` receive each flush as a single JSON array frame.
+
+The queue is bounded: a producer waits while it is full, which throttles the
+run to the client's reading speed, and a client that has not drained it for
+``send_timeout`` seconds is disconnected rather than buffered without limit.
+Anything it missed is still in the thread's event log for its reconnect.
+Producers that must queue events in order under a lock use push() there and
+wait_for_room() once the lock is released.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from ag_ui.core import EventType
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+_CLOSE = object()
+
+# Close code for a client dropped for reading too slowly ("try again later")
+SLOW_CLIENT_CLOSE_CODE = 1013
+
+
+def _message_id(event: Dict[str, Any]) -> Optional[str]:
+    return event.get("messageId", event.get("message_id"))
+
+
+def coalesce_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Merges runs of TEXT_MESSAGE_CONTENT events for the same message into one
+    event with the concatenated delta. The merged event keeps the ``seq`` of
+    the last event in the run, which is the position a client has reached once
+    it has applied it. The input events are not modified.
+    """
+    merged: List[Dict[str, Any]] = []
+    for event in events:
+        previous = merged[-1] if merged else None
+        if (
+            previous is not None
+            and event.get("type") == EventType.TEXT_MESSAGE_CONTENT
+            and previous.get("type") == EventType.TEXT_MESSAGE_CONTENT
+            and _message_id(event) == _message_id(previous)
+        ):
+            merged[-1] = {
+                **event,
+                "delta": previous.get("delta", "") + event.get("delta", ""),
+            }
+        else:
+            merged.append(event)
+    return merged
+
+
+class EventWriter:
+    """
+    Queues events for one websocket and sends them from a single task.
+
+    ``send_json`` has the same signature as WebSocket.send_json, so the writer
+    can stand in for the socket wherever events are sent. It and push raise
+    ConnectionError once the writer has failed or been closed.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_queue: int = 1000,
+        coalesce_window: float = 0.02,
+        max_batch: int = 64,
+        send_timeout: float = 10.0,
+        batch_frames: bool = False,
+    ) -> None:
+        self.websocket = websocket
+        self.coalesce_window = coalesce_window
+        self.max_batch = max(1, max_batch)
+        self.send_timeout = send_timeout
+        self.batch_frames = batch_frames
+        self.max_queue = max(1, max_queue)
+        # Unbounded so push never waits; producers are held to max_queue by
+        # wait_for_room, which waits while _has_room is clear
+        self._queue: "asyncio.Queue[Any]" = asyncio.Queue()
+        self._has_room = asyncio.Event()
+        self._has_room.set()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self.events_sent = 0
+        self.frames_sent = 0
+        self._task = asyncio.create_task(self._run(), name="ag_ui-event-writer")
+
+    @property
+    def failed(self) -> bool:
+        return self._error is not None
+
+    @property
+    def closed(self) -> bool:
+        """Whether events can no longer be queued: closed, aborted or failed."""
+        return self._closed or self._error is not None
+
+    async def send_json(self, event: Dict[str, Any]) -> None:
+        """Queues an event, waiting (up to send_timeout) while the queue is full."""
+        self.push(event)
+        await self.wait_for_room()
+
+    def push(self, event: Dict[str, Any]) -> None:
+        """Queues an event without waiting, even if the queue is full."""
+        if self._closed or self._error is not None:
+            raise ConnectionError("Event writer is closed") from self._error
+        self._queue.put_nowait(event)
+        if self._queue.qsize() > self.max_queue:
+            self._has_room.clear()
+
+    async def wait_for_room(self) -> None:
+        """Waits (up to send_timeout) until the queue is back within max_queue."""
+        if self._has_room.is_set():
+            # No wait_for task per event; it can also swallow a cancellation
+            # of the caller that races with the wait completing
+            return
+        try:
+            await asyncio.wait_for(self._has_room.wait(), timeout=self.send_timeout)
+        except asyncio.TimeoutError:
+            await self._fail(
+                TimeoutError(
+                    f"Client read nothing for {self.send_timeout}s "
+                    f"with {self._queue.qsize()} events queued"
+                )
+            )
+            raise ConnectionError("Client is reading too slowly") from self._error
+
+    async def _fail(self, error: BaseException) -> None:
+        if self._error is not None:
+            return
+        self._error = error
+        logger.warning(f"Dropping AG-UI websocket client: {error}")
+        await self.abort(SLOW_CLIENT_CLOSE_CODE)
+
+    async def abort(self, code: int) -> None:
+        """Drops what is queued and closes the socket with ``code``."""
+        self._closed = True
+        self._has_room.set()
+        self._task.cancel()
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass  # Already gone
+
+    async def _next_batch(self, first: Any) -> List[Any]:
+        """``first`` plus whatever follows it within the coalescing window."""
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.coalesce_window
+        while len(batch) < self.max_batch and batch[-1] is not _CLOSE:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            # Only a streaming text message is worth waiting for more of
+            remaining = deadline - loop.time()
+            if remaining <= 0 or batch[-1].get("type") != (
+                EventType.TEXT_MESSAGE_CONTENT
+            ):
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch(await self._queue.get())
+            if self._queue.qsize() <= self.max_queue:
+                self._has_room.set()
+            closing = batch[-1] is _CLOSE
+            events = [event for event in batch if event is not _CLOSE]
+            frames = coalesce_events(events)
+            try:
+                if self.batch_frames and frames:
+                    await self.websocket.send_json(frames)
+                    self.frames_sent += 1
+                else:
+                    for frame in frames:
+                        await self.websocket.send_json(frame)
+                        self.frames_sent += 1
+            except Exception as e:
+                self._error = e
+                logger.debug(f"AG-UI websocket send failed, writer stopping: {e}")
+                self._has_room.set()  # Producers find out from their next push
+                return
+            self.events_sent += len(events)
+            if closing:
+                return
+
+    async def close(self, timeout: Optional[float] = None) -> None:
+        """Sends what is already queued (within ``timeout``) and stops."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._error is not None or self._task.done():
+            return
+        timeout = self.send_timeout if timeout is None else timeout
+        self._queue.put_nowait(_CLOSE)
+        try:
+            await asyncio.wait({self._task}, timeout=timeout)
+        finally:
+            if not self._task.done():
+                logger.debug("AG-UI event writer did not drain before closing")
+                self._task.cancel()
@@ -3,10 +3,14 @@ import logging
 from fastapi import FastAPI
 
 from ..config.global_settings import settings
+from ..core.metrics import instrument_app
+from ..core.tracing import configure_tracing
 
 # TODO: Add MCP HTTP API router when implemented
 # from ..mcp.http_api import mcp_router
+from .router import cancel_all_runs, shared_bus, start_shared_bus
 from .router import router as ag_ui_router
+from .state_manager import global_state_manager
 
 logging.basicConfig(
     level=settings.LOG_LEVEL.upper(),
@@ -23,13 +27,28 @@ app = FastAPI(
 # Mount AG-UI only under /ag_ui
 app.include_router(ag_ui_router, prefix="/ag_ui")
 
+# Prometheus/OpenMetrics scrape endpoint at /metrics; loop stalls at
+# /debug/slow-callbacks when ADMIN_API_TOKEN is set
+instrument_app(
+    app,
+    service="ag_ui_backend",
+    slow_callback_threshold=settings.SLOW_CALLBACK_THRESHOLD_MS / 1000,
+    admin_token=settings.ADMIN_API_TOKEN,
+)
+
+# Spans from this service start the trace for each AG-UI run
+configure_tracing(service_name="ag_ui_backend", export_path=settings.TRACE_EXPORT_PATH)
+
 # TODO: Mount MCP HTTP API at root when implemented
 # app.include_router(mcp_router)
 
 
 @app.get("/")
 async def root():
-    return {"message": "Backend running. AG-UI WS at /ag_ui/ws/{thread_id}"}
+    return {
+        "message": "Backend running. AG-UI WS at /ag_ui/ws/{thread_id}, "
+        "SSE runs at POST /ag_ui/runs"
+    }
 
 
 @app.on_event("startup")
@@ -38,9 +57,21 @@ async def startup_event():
     logger.info(
         f"ChiefLegalOrchestrator A2A URL: {settings.CHIEF_LEGAL_ORCHESTRATOR_A2A_URL}"
     )
+    if global_state_manager.conversation_store is not None:
+        await global_state_manager.conversation_store.initialize()
+    # Lets runs on this worker be cancelled from sockets held by others
+    await start_shared_bus()
     logger.info("Backend ready.")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Backend shutting down...")
+    # Cancelled runs emit RUN_CANCELLED and finish their history writes
+    await cancel_all_runs()
+    await shared_bus.close()
+    # Conversations evicted in the last moments are still being written
+    await global_state_manager.flush_spills()
+    if global_state_manager.conversation_store is not None:
+        # Commits buffered messages so a restart does not lose them
+        await global_state_manager.conversation_store.close()
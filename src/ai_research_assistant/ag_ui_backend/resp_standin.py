@@ -0,0 +1,191 @@
+# src/ai_research_assistant/ag_ui_backend/resp_standin.py
+"""
+Minimal Redis-protocol server for running several AG-UI workers locally.
+
+It implements only what RedisBus uses (PING, SELECT, GET, SET, DEL, PUBLISH,
+SUBSCRIBE, UNSUBSCRIBE, QUIT), keeps everything in memory and needs no
+packages, so a development machine can run multiple uvicorn workers without
+installing Redis:
+
+    python -m ai_research_assistant.ag_ui_backend.resp_standin --port 6379
+    AG_UI_SHARED_BUS_URL=redis://localhost:6379 uvicorn ... --workers 4
+
+Production deployments should point AG_UI_SHARED_BUS_URL at a real Redis.
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+def _bulk(value: Optional[str]) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    data = value.encode("utf-8")
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+def _array(*values: bytes) -> bytes:
+    return b"*%d\r\n" % len(values) + b"".join(values)
+
+
+def _integer(value: int) -> bytes:
+    return b":%d\r\n" % value
+
+
+async def _read_command(reader: asyncio.StreamReader) -> Optional[List[str]]:
+    """One client command (a RESP array of bulk strings), or None at EOF."""
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        # Inline command, as typed into telnet
+        return line.decode("utf-8").split()
+    args = []
+    for _ in range(int(line[1:-2])):
+        header = await reader.readline()
+        data = await reader.readexactly(int(header[1:-2]) + 2)
+        args.append(data[:-2].decode("utf-8"))
+    return args
+
+
+class RespStandIn:
+    """In-memory server for the subset of Redis that RedisBus uses."""
+
+    def __init__(self) -> None:
+        self.values: Dict[str, str] = {}
+        self.channels: Dict[str, Set[asyncio.StreamWriter]] = {}
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._clients: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self, host: str = "127.0.0.1", port: int = 6379) -> None:
+        """Starts listening; port 0 picks a free port (see ``port``)."""
+        self._server = await asyncio.start_server(self._serve_client, host, port)
+        logger.info(f"RESP stand-in listening on {host}:{self.port}")
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        # Ends every client handler at EOF rather than by cancellation
+        for writer in self._clients.values():
+            writer.close()
+        await asyncio.gather(*self._clients, return_exceptions=True)
+
+    async def _serve_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        subscriptions: Set[str] = set()
+        task = asyncio.current_task()
+        self._clients[task] = writer
+        try:
+            while True:
+                command = await _read_command(reader)
+                if not command:
+                    if command is None:
+                        break
+                    continue
+                name, args = command[0].upper(), command[1:]
+                if name == "QUIT":
+                    writer.write(b"+OK\r\n")
+                    break
+                writer.write(self._execute(name, args, writer, subscriptions))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for channel in subscriptions:
+                self._leave(channel, writer)
+            writer.close()
+            self._clients.pop(task, None)
+
+    def _execute(
+        self,
+        name: str,
+        args: List[str],
+        writer: asyncio.StreamWriter,
+        subscriptions: Set[str],
+    ) -> bytes:
+        if name == "PING":
+            return b"+PONG\r\n"
+        if name == "SELECT":
+            return b"+OK\r\n"  # One keyspace for every db
+        if name == "GET" and len(args) == 1:
+            return _bulk(self.values.get(args[0]))
+        if name == "SET" and len(args) >= 2:
+            self.values[args[0]] = args[1]
+            return b"+OK\r\n"
+        if name == "DEL" and args:
+            return _integer(sum(self.values.pop(key, None) is not None for key in args))
+        if name == "PUBLISH" and len(args) == 2:
+            return _integer(self._publish(args[0], args[1]))
+        if name == "SUBSCRIBE" and args:
+            replies = []
+            for channel in args:
+                subscriptions.add(channel)
+                self.channels.setdefault(channel, set()).add(writer)
+                replies.append(
+                    _array(
+                        _bulk("subscribe"), _bulk(channel), _integer(len(subscriptions))
+                    )
+                )
+            return b"".join(replies)
+        if name == "UNSUBSCRIBE":
+            replies = []
+            for channel in args or list(subscriptions):
+                subscriptions.discard(channel)
+                self._leave(channel, writer)
+                replies.append(
+                    _array(
+                        _bulk("unsubscribe"),
+                        _bulk(channel),
+                        _integer(len(subscriptions)),
+                    )
+                )
+            return b"".join(replies)
+        return f"-ERR unsupported command '{name}'\r\n".encode("utf-8")
+
+    def _publish(self, channel: str, message: str) -> int:
+        subscribers = self.channels.get(channel, set())
+        frame = _array(_bulk("message"), _bulk(channel), _bulk(message))
+        for subscriber in subscribers:
+            subscriber.write(frame)
+        return len(subscribers)
+
+    def _leave(self, channel: str, writer: asyncio.StreamWriter) -> None:
+        subscribers = self.channels.get(channel)
+        if subscribers is not None:
+            subscribers.discard(writer)
+            if not subscribers:
+                del self.channels[channel]
+
+
+async def _serve_forever(host: str, port: int) -> None:
+    standin = RespStandIn()
+    await standin.start(host, port)
+    await asyncio.Event().wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Local Redis-protocol stand-in for the AG-UI shared bus"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
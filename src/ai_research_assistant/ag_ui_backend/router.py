@@ -1,11 +1,14 @@
 # src/savagelysubtle_airesearchagent/ag_ui_backend/router.py
+import asyncio
 import json
 import logging
 import uuid
-from typing import Dict, Optional
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
 
 # Use the official AG-UI Python SDK
 from ag_ui.core import (
+    CustomEvent,
     EventType,
     RunAgentInput,
     RunErrorEvent,
@@ -15,34 +18,610 @@ from ag_ui.core import (
 from ag_ui.core import Message as AGUIMessage
 from ag_ui.core import ToolMessage as AGUIToolMessage  # Renamed
 from ag_ui.core import UserMessage as AGUIUserMessage  # Renamed to avoid conflict
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Header, WebSocket, WebSocketDisconnect
+from fastapi.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
 from pydantic import BaseModel, Field
 
+from ..agents.orchestrator_agent.config import OrchestratorAgentConfig
+from ..config.global_settings import settings
+from ..core.history_compaction import HistoryCompactor, compactor_for
+
 # Import LLM provider for API key testing
 from ..core.llm_provider import get_llm_model
+from ..core.metrics import WEBSOCKET_CONNECTIONS
+from ..core.tracing import start_span
 from .a2a_client import A2AClient
+from .event_writer import EventWriter
+from .shared_bus import SharedBus, create_shared_bus
+from .sse_stream import SSE_MEDIA_TYPE, SSEStream, parse_last_event_id
 from .state_manager import AGUIConversationState, global_state_manager
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 a2a_client = A2AClient()
 
-active_connections: Dict[str, WebSocket] = {}  # thread_id -> WebSocket
+
+# Agent config class -> compactor for histories sent to that agent
+_history_compactors: Dict[type, Optional[HistoryCompactor]] = {}
+
+
+def _history_compactor(agent_config: type) -> Optional[HistoryCompactor]:
+    """
+    Compaction for histories sent to the agent configured by ``agent_config``
+    (see compactor_for), built on first use.
+    """
+    if agent_config not in _history_compactors:
+        _history_compactors[agent_config] = compactor_for(agent_config())
+    return _history_compactors[agent_config]
+
+
+# thread_id -> writer of the thread's current socket
+active_connections: Dict[str, EventWriter] = {}
+WEBSOCKET_CONNECTIONS.set_function(lambda: len(active_connections))
+# thread_id -> run_id -> task, for every run in flight
+run_tasks: Dict[str, Dict[str, asyncio.Task]] = {}
+
+# Several workers may serve the same threads. Events for a thread whose socket
+# this worker does not hold are published on the thread's channel, which the
+# worker holding it subscribes to; run cancellation and socket takeovers are
+# broadcast on the control channel; the run registry records which worker
+# each run in flight belongs to.
+WORKER_ID = uuid.uuid4().hex
+# Close code for a socket whose thread was taken over on another worker
+TAKEN_OVER_CLOSE_CODE = 1008
+CONTROL_CHANNEL = "ag_ui:control"
+shared_bus: SharedBus = create_shared_bus(settings.AG_UI_SHARED_BUS_URL)
+# thread_id -> sockets this worker holds for it
+_thread_sockets: Dict[str, int] = {}
+# thread_id -> events waiting to be published, in seq order
+_relay_outbox: Dict[str, Deque[Dict[str, Any]]] = {}
+
+
+def _thread_channel(thread_id: str) -> str:
+    return f"ag_ui:thread:{thread_id}"
+
+
+def _run_key(thread_id: str, run_id: str) -> str:
+    return f"ag_ui:run:{thread_id}:{run_id}"
+
+
+async def _bus_call(operation: Any, description: str) -> Any:
+    """
+    Awaits a shared bus operation. An unreachable bus only costs the
+    cross-worker part of the feature, so errors are logged and None returned.
+    """
+    try:
+        return await operation
+    except Exception as e:
+        logger.warning(f"Shared bus {description} failed: {e}")
+        return None
+
+
+async def _on_thread_message(message: Dict[str, Any]) -> None:
+    """An event published by another worker for a socket held here."""
+    if message.get("worker") == WORKER_ID:
+        return
+    connection = active_connections.get(message.get("threadId"))
+    if connection is None:
+        return
+    try:
+        await connection.send_json(message["event"])
+    except Exception as e:
+        logger.debug(f"Thread {message.get('threadId')}: Relayed event dropped ({e})")
+
+
+async def _on_control_message(message: Dict[str, Any]) -> None:
+    if message.get("worker") == WORKER_ID:
+        return
+    thread_id = message.get("threadId")
+    kind = message.get("kind")
+    if kind == "takeover":
+        # The newest socket for a thread gets its events, as within a worker;
+        # the old one would be sent nothing more, so it is closed
+        connection = active_connections.pop(thread_id, None)
+        if connection is not None:
+            logger.info(f"Thread {thread_id}: Socket taken over by another worker")
+            await connection.abort(TAKEN_OVER_CLOSE_CODE)
+    elif kind == "cancel":
+        run_id = message.get("runId")
+        for task_run_id, task in list(run_tasks.get(thread_id, {}).items()):
+            if run_id is None or task_run_id == run_id:
+                task.cancel()
+
+
+async def start_shared_bus() -> None:
+    """Subscribes this worker to the control channel; called on startup."""
+    await shared_bus.subscribe(CONTROL_CHANNEL, _on_control_message)
+
+
+async def _join_thread(thread_id: str) -> None:
+    _thread_sockets[thread_id] = _thread_sockets.get(thread_id, 0) + 1
+    if _thread_sockets[thread_id] == 1:
+        await _bus_call(
+            shared_bus.subscribe(_thread_channel(thread_id), _on_thread_message),
+            f"subscribe to thread {thread_id}",
+        )
+    await _bus_call(
+        shared_bus.publish(
+            CONTROL_CHANNEL,
+            {"kind": "takeover", "threadId": thread_id, "worker": WORKER_ID},
+        ),
+        f"takeover of thread {thread_id}",
+    )
+
+
+async def _leave_thread(thread_id: str) -> None:
+    _thread_sockets[thread_id] -= 1
+    if _thread_sockets[thread_id] == 0:
+        del _thread_sockets[thread_id]
+        await _bus_call(
+            shared_bus.unsubscribe(_thread_channel(thread_id), _on_thread_message),
+            f"unsubscribe from thread {thread_id}",
+        )
+
+
+async def _emit(
+    thread_id: str,
+    conversation_state: AGUIConversationState,
+    event_data_dict: Dict[str, Any],
+) -> None:
+    """
+    Records an event in the thread's event log and queues it for the thread's
+    current socket. A send that fails because the client has gone away is not
+    an error: the event stays in the log for the client's reconnect. Without a
+    socket here, the event is published for another worker that may hold one.
+
+    The log's lock is held only to append and queue the event, which keeps
+    queues in seq order; waiting for the client or the bus happens after.
+    """
+    event_log = conversation_state.event_log
+    relay: Optional[Deque[Dict[str, Any]]] = None
+    async with event_log.lock:
+        event = event_log.append(event_data_dict)
+        connection = active_connections.get(thread_id)
+        try:
+            if connection is None:
+                relay = _queue_relay(thread_id, event)
+            else:
+                connection.push(event)
+        except ConnectionError as e:
+            logger.debug(
+                f"Thread {thread_id}: Event {event['seq']} kept for replay ({e})"
+            )
+            return
+    if connection is None:
+        if relay is not None:
+            await _drain_relay(thread_id, relay)
+        return
+    try:
+        await connection.wait_for_room()
+    except ConnectionError as e:
+        logger.debug(f"Thread {thread_id}: Event {event['seq']} kept for replay ({e})")
+
+
+def _queue_relay(
+    thread_id: str, event: Dict[str, Any]
+) -> Optional[Deque[Dict[str, Any]]]:
+    """
+    Queues an event for publishing to other workers. Returns the queue if the
+    caller is to publish it with _drain_relay, or None if another emit on
+    the thread is already doing so and will publish this event after its own.
+    """
+    outbox = _relay_outbox.get(thread_id)
+    if outbox is not None:
+        outbox.append(event)
+        return None
+    outbox = _relay_outbox[thread_id] = deque([event])
+    return outbox
+
+
+async def _drain_relay(thread_id: str, outbox: Deque[Dict[str, Any]]) -> None:
+    try:
+        while outbox:
+            event = outbox.popleft()
+            await _bus_call(
+                shared_bus.publish(
+                    _thread_channel(thread_id),
+                    {"threadId": thread_id, "worker": WORKER_ID, "event": event},
+                ),
+                f"relay of thread {thread_id} event",
+            )
+    finally:
+        if _relay_outbox.get(thread_id) is outbox:
+            del _relay_outbox[thread_id]
+
+
+async def _forward_state_event(
+    thread_id: str,
+    conversation_state: AGUIConversationState,
+    event_data_dict: Dict[str, Any],
+) -> None:
+    """
+    Folds an orchestrator state event into the conversation and emits a
+    sequenced StateDeltaEvent; snapshots are reduced to the patch against the
+    current state, and nothing is emitted if they change nothing.
+    """
+    if event_data_dict.get("type") == EventType.STATE_SNAPSHOT:
+        patch_ops = conversation_state.update_state(
+            event_data_dict.get("snapshot") or {}
+        )
+        if patch_ops:
+            await _emit(
+                thread_id,
+                conversation_state,
+                conversation_state.state_delta_event(patch_ops),
+            )
+    elif conversation_state.patch_state(event_data_dict.get("delta") or []):
+        await _emit(
+            thread_id,
+            conversation_state,
+            conversation_state.state_delta_event(event_data_dict.get("delta") or []),
+        )
+    else:
+        # The delta does not apply to our copy; resynchronize the client
+        await _emit(
+            thread_id, conversation_state, conversation_state.state_snapshot_event()
+        )
+
+
+async def _send_messages_page(
+    connection: EventWriter,
+    conversation_state: AGUIConversationState,
+    request: Dict[str, Any],
+) -> None:
+    """
+    Answers a ``{"type": "GET_MESSAGES", "before": cursor, "limit": n}``
+    request with a MESSAGES_PAGE custom event sent to the requesting client
+    only; ``before`` is the ``cursor`` of the snapshot or the previous page.
+    """
+    before = request.get("before")
+    limit = int(request.get("limit") or settings.AG_UI_SNAPSHOT_WINDOW)
+    page = await conversation_state.message_page(
+        before=int(before) if before is not None else None,
+        limit=min(max(1, limit), settings.AG_UI_MESSAGE_PAGE_MAX),
+    )
+    # Not an event of the thread: it is neither logged nor replayed
+    await connection.send_json(
+        CustomEvent(type=EventType.CUSTOM, name="MESSAGES_PAGE", value=page).model_dump(
+            by_alias=True, exclude_none=True
+        )
+    )
+
+
+def _refuse_run(thread_id: str, run_id: str) -> Optional[str]:
+    """Why a new run cannot start on the thread now, or None if it can."""
+    runs = run_tasks.get(thread_id, {})
+    if run_id in runs:
+        return f"Run {run_id} is already in progress."
+    if len(runs) >= settings.AG_UI_MAX_CONCURRENT_RUNS:
+        return (
+            f"Too many concurrent runs ({len(runs)}); wait for one to finish "
+            "or cancel it."
+        )
+    return None
+
+
+def _run_prompt(run_input: RunAgentInput) -> Tuple[str, Optional[AGUIMessage]]:
+    """
+    The run's prompt and the user message to add to the conversation for it:
+    the last of ``run_input.messages``, or else one made from
+    ``forwarded_props["user_prompt"]``. The prompt is empty if there is
+    neither; the run is then refused and nothing should be added.
+    """
+    user_message: Optional[AGUIMessage] = None
+    if run_input.messages and run_input.messages[-1].role == "user":
+        user_message = run_input.messages[-1]
+        if user_message.content:
+            return user_message.content, user_message
+
+    forwarded_props = run_input.forwarded_props
+    if not (forwarded_props and "user_prompt" in forwarded_props):
+        return "", None
+    user_prompt = forwarded_props["user_prompt"]
+    if user_message is None:
+        user_message = AGUIUserMessage(
+            id=str(uuid.uuid4()), role="user", content=user_prompt
+        )
+    return user_prompt, user_message
+
+
+async def _run_agent(
+    thread_id: str,
+    conversation_state: AGUIConversationState,
+    run_input: RunAgentInput,
+    run_id: str,
+    user_prompt: str,
+    message_history: List[AGUIMessage],
+) -> None:
+    """
+    One run from RUN_STARTED to RUN_FINISHED, RUN_ERROR or RUN_CANCELLED.
+    """
+    await _bus_call(
+        shared_bus.set(_run_key(thread_id, run_id), WORKER_ID),
+        f"registration of run {run_id}",
+    )
+    try:
+        start_event = RunStartedEvent(
+            type=EventType.RUN_STARTED, thread_id=thread_id, run_id=run_id
+        )
+        await _emit(
+            thread_id,
+            conversation_state,
+            start_event.model_dump(by_alias=True, exclude_none=True),
+        )
+
+        # Cached dumps, older turns summarized; only new messages are sent if
+        # the orchestrator keeps a context for this conversation. The context
+        # is this run's copy, taken back only if no other run moved it on.
+        serialized_history, history_context, history_version = (
+            conversation_state.history_request(
+                len(message_history), _history_compactor(OrchestratorAgentConfig)
+            )
+        )
+        with start_span(
+            "ag_ui.run",
+            kind="server",
+            attributes={"conversation.id": thread_id, "run.id": run_id},
+        ):
+            orchestrator_events_data = await a2a_client.send_to_orchestrator(
+                conversation_id=thread_id,
+                user_prompt=user_prompt,
+                message_history=message_history,
+                tools=run_input.tools,
+                current_state=conversation_state.current_state,
+                serialized_history=serialized_history,
+                history_context=history_context,
+            )
+        conversation_state.commit_history_context(history_context, history_version)
+
+        for event_data_dict in orchestrator_events_data:
+            if event_data_dict.get("type") in (
+                EventType.STATE_SNAPSHOT,
+                EventType.STATE_DELTA,
+            ):
+                await _forward_state_event(
+                    thread_id, conversation_state, event_data_dict
+                )
+            else:
+                await _emit(thread_id, conversation_state, event_data_dict)
+
+        finish_event = RunFinishedEvent(
+            type=EventType.RUN_FINISHED, thread_id=thread_id, run_id=run_id
+        )
+        await _emit(
+            thread_id,
+            conversation_state,
+            finish_event.model_dump(by_alias=True, exclude_none=True),
+        )
+    except asyncio.CancelledError:
+        logger.info(f"Thread {thread_id}: Run {run_id} cancelled")
+        # Not an SDK event type; sent like ACK_TOOL_RESULT
+        await _emit(
+            thread_id,
+            conversation_state,
+            {"type": "RUN_CANCELLED", "threadId": thread_id, "runId": run_id},
+        )
+        raise
+    except Exception as e:
+        logger.error(f"Thread {thread_id}: Run {run_id} failed: {e}", exc_info=True)
+        error_event = RunErrorEvent(
+            type=EventType.RUN_ERROR,
+            message=f"An internal error occurred: {str(e)}",
+        )
+        await _emit(
+            thread_id,
+            conversation_state,
+            error_event.model_dump(by_alias=True, exclude_none=True),
+        )
+    finally:
+        await _bus_call(
+            shared_bus.delete(_run_key(thread_id, run_id)),
+            f"removal of run {run_id}",
+        )
+
+
+def _start_run(
+    thread_id: str,
+    conversation_state: AGUIConversationState,
+    run_input: RunAgentInput,
+    run_id: str,
+    user_prompt: str,
+) -> asyncio.Task:
+    """
+    Starts a run and registers it in run_tasks before returning, so a check
+    with _refuse_run followed by this call reserves the run atomically. The
+    conversation is pinned until the task is done, even if it is cancelled
+    before it gets to run, so it cannot be evicted while the run writes to it.
+    """
+    global_state_manager.pin_conversation(thread_id)
+    # History before the current user message, as of when the run was asked for
+    task = asyncio.create_task(
+        _run_agent(
+            thread_id,
+            conversation_state,
+            run_input,
+            run_id,
+            user_prompt,
+            conversation_state.messages[:-1],
+        ),
+        name=f"ag_ui-run-{run_id}",
+    )
+    runs = run_tasks.setdefault(thread_id, {})
+    runs[run_id] = task
+
+    def forget(_: asyncio.Task) -> None:
+        if runs.get(run_id) is task:
+            del runs[run_id]
+        if not runs and run_tasks.get(thread_id) is runs:
+            del run_tasks[thread_id]
+        global_state_manager.release_conversation(thread_id)
+
+    task.add_done_callback(forget)
+    return task
+
+
+async def _cancel_run_request(
+    thread_id: str,
+    conversation_state: AGUIConversationState,
+    run_id: Optional[str],
+) -> None:
+    """
+    Handles ``{"type": "CANCEL_RUN", "run_id": ...}``; without a run_id every
+    run on the thread is cancelled. Each cancelled run emits RUN_CANCELLED.
+    Runs held by other workers are cancelled through the control channel.
+    """
+    runs = run_tasks.get(thread_id, {})
+    targets = list(runs.values()) if run_id is None else [runs.get(run_id)]
+    owner = None
+    if run_id is not None and targets[0] is None:
+        owner = await _bus_call(
+            shared_bus.get(_run_key(thread_id, run_id)), f"lookup of run {run_id}"
+        )
+    if run_id is None or owner not in (None, WORKER_ID):
+        await _bus_call(
+            shared_bus.publish(
+                CONTROL_CHANNEL,
+                {
+                    "kind": "cancel",
+                    "threadId": thread_id,
+                    "runId": run_id,
+                    "worker": WORKER_ID,
+                },
+            ),
+            f"cancellation of run {run_id}",
+        )
+        targets = [task for task in targets if task is not None]
+    if None in targets:
+        error_event = RunErrorEvent(
+            type=EventType.RUN_ERROR, message=f"Run {run_id} is not in progress."
+        )
+        await _emit(
+            thread_id,
+            conversation_state,
+            error_event.model_dump(by_alias=True, exclude_none=True),
+        )
+        return
+    for task in targets:
+        task.cancel()
+
+
+async def _finish_runs(
+    thread_id: str, connection: EventWriter, tasks: Set[asyncio.Task]
+) -> None:
+    """
+    Teardown for a closed socket's runs. They get a grace period to finish
+    (their events are logged for a reconnecting client); those still running
+    after it are cancelled unless a new connection has taken over the thread.
+    """
+    pending = {task for task in tasks if not task.done()}
+    if not pending:
+        return
+    try:
+        _, pending = await asyncio.wait(
+            pending, timeout=settings.AG_UI_RUN_DISCONNECT_GRACE_SECONDS
+        )
+        if not pending or active_connections.get(thread_id) is not connection:
+            return
+    except asyncio.CancelledError:
+        for task in pending:
+            task.cancel()
+        raise
+    logger.info(f"Thread {thread_id}: Cancelling {len(pending)} runs after disconnect")
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def cancel_all_runs() -> None:
+    """Cancels every run in flight and waits for them; used on shutdown."""
+    tasks = [task for runs in run_tasks.values() for task in runs.values()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
 
 
 @router.websocket("/ws/{thread_id}")
-async def websocket_endpoint(websocket: WebSocket, thread_id: str):
+async def websocket_endpoint(
+    websocket: WebSocket,
+    thread_id: str,
+    last_seq: Optional[int] = None,
+    state_seq: Optional[int] = None,
+    batch: bool = False,
+):
+    """
+    AG-UI conversation socket. Every event sent after the initial snapshots
+    carries the thread's event ``seq``. A reconnecting client passes the last
+    one it received as ``?last_seq=`` and is sent only the events it missed,
+    including those emitted while it was offline; if they have rolled out of
+    the buffer it gets snapshots instead. Failing that, ``?state_seq=`` (the
+    last ``stateSeq`` it applied) still avoids a full StateSnapshotEvent.
+    The messages snapshot holds only the newest messages; older ones are
+    fetched with GET_MESSAGES requests (see _send_messages_page).
+
+    Each RunAgentInput starts a run task (at most AG_UI_MAX_CONCURRENT_RUNS
+    per thread), so tool results, page requests and ``{"type": "CANCEL_RUN",
+    "run_id": ...}`` are handled while runs are in flight.
+
+    Events are sent through the connection's EventWriter, which merges
+    streamed text deltas and, with ``?batch=true``, sends JSON array frames.
+    """
     await websocket.accept()
-    active_connections[thread_id] = websocket
     logger.info(f"WebSocket connection established for thread_id: {thread_id}")
 
-    conversation_state: AGUIConversationState = (
-        global_state_manager.get_or_create_conversation(thread_id)
-    )
-    await conversation_state.send_state_snapshot(websocket)
-    await conversation_state.send_messages_snapshot(websocket)
-
+    connection: Optional[EventWriter] = None
+    joined = False
+    connection_runs: Set[asyncio.Task] = set()  # runs started by this socket
+    # Pinned while the socket is open so eviction never drops a live thread
+    global_state_manager.pin_conversation(thread_id)
     try:
+        conversation_state: AGUIConversationState = (
+            await global_state_manager.open_conversation(thread_id)
+        )
+
+        connection = EventWriter(
+            websocket,
+            max_queue=settings.AG_UI_OUTBOUND_QUEUE_SIZE,
+            coalesce_window=settings.AG_UI_COALESCE_WINDOW_SECONDS,
+            max_batch=settings.AG_UI_MAX_BATCH_EVENTS,
+            send_timeout=settings.AG_UI_SLOW_CLIENT_TIMEOUT_SECONDS,
+            batch_frames=batch,
+        )
+
+        # Held while taking over the thread so events emitted meanwhile by a
+        # run still in flight are neither duplicated nor sent out of order.
+        # The replay and snapshots are queued on the writer ahead of them, so
+        # they are coalesced and batched like every other event.
+        joined = True  # _join_thread counts the socket before its first await
+        await _join_thread(thread_id)
+        async with conversation_state.event_log.lock:
+            active_connections[thread_id] = connection
+            missed_events = (
+                conversation_state.event_log.since(last_seq)
+                if last_seq is not None
+                else None
+            )
+            if missed_events is not None:
+                for event in missed_events:
+                    connection.push(event)
+                logger.info(
+                    f"Thread {thread_id}: Replayed {len(missed_events)} events after {last_seq}"
+                )
+            else:
+                if (
+                    state_seq is None
+                    or not await conversation_state.send_state_catch_up(
+                        connection, state_seq
+                    )
+                ):
+                    await conversation_state.send_state_snapshot(connection)
+                await conversation_state.send_messages_snapshot(connection)
+        await connection.wait_for_room()
+
         while True:
             raw_data = await websocket.receive_text()
             logger.debug(
@@ -54,84 +633,60 @@ async def websocket_endpoint(websocket: WebSocket, thread_id: str):
             try:
                 data = json.loads(raw_data)
 
+                if data.get("type") == "GET_MESSAGES":
+                    await _send_messages_page(connection, conversation_state, data)
+
                 # Heuristic: if 'thread_id' and 'messages' are present, treat as RunAgentInput
-                if (
+                elif (
                     "thread_id" in data and "messages" in data and "run_id" in data
                 ):  # Check for RunAgentInput fields
                     run_input = RunAgentInput.model_validate(data)
                     run_id_for_operation = run_input.run_id or run_id_for_operation
 
-                    # Add new user message from input to conversation state
-                    user_message_to_process: Optional[AGUIMessage] = None
-                    if run_input.messages:
-                        latest_message_from_ui = run_input.messages[-1]
-                        if latest_message_from_ui.role == "user":
-                            user_message_to_process = latest_message_from_ui
-                            conversation_state.add_message(user_message_to_process)
-
-                    user_prompt_content = (
-                        user_message_to_process.content
-                        if user_message_to_process and user_message_to_process.content
-                        else ""
-                    )
+                    refusal = _refuse_run(thread_id, run_id_for_operation)
+                    if refusal is not None:
+                        logger.warning(f"Thread {thread_id}: {refusal}")
+                        error_event = RunErrorEvent(
+                            type=EventType.RUN_ERROR, message=refusal
+                        )
+                        await _emit(
+                            thread_id,
+                            conversation_state,
+                            error_event.model_dump(by_alias=True, exclude_none=True),
+                        )
+                        continue
 
+                    user_prompt_content, user_message = _run_prompt(run_input)
                     if not user_prompt_content:
-                        if (
-                            run_input.forwarded_props
-                            and "user_prompt" in run_input.forwarded_props
-                        ):
-                            user_prompt_content = run_input.forwarded_props[
-                                "user_prompt"
-                            ]
-                            if not user_message_to_process:
-                                user_msg_obj = AGUIUserMessage(
-                                    id=str(uuid.uuid4()),
-                                    role="user",
-                                    content=user_prompt_content,
-                                )
-                                conversation_state.add_message(user_msg_obj)
-                        else:
-                            logger.warning(
-                                f"Thread {thread_id}: No user prompt found in RunAgentInput."
-                            )
-                            error_event = RunErrorEvent(
-                                type=EventType.RUN_ERROR,
-                                message="No user prompt provided.",
-                            )
-                            await websocket.send_json(
-                                error_event.model_dump(by_alias=True, exclude_none=True)
-                            )
-                            continue
-
-                    start_event = RunStartedEvent(
-                        type=EventType.RUN_STARTED,
-                        thread_id=thread_id,
-                        run_id=run_id_for_operation,
-                    )
-                    await websocket.send_json(
-                        start_event.model_dump(by_alias=True, exclude_none=True)
-                    )
+                        logger.warning(
+                            f"Thread {thread_id}: No user prompt found in RunAgentInput."
+                        )
+                        error_event = RunErrorEvent(
+                            type=EventType.RUN_ERROR,
+                            message="No user prompt provided.",
+                        )
+                        await _emit(
+                            thread_id,
+                            conversation_state,
+                            error_event.model_dump(by_alias=True, exclude_none=True),
+                        )
+                        continue
 
-                    orchestrator_events_data = await a2a_client.send_to_orchestrator(
-                        conversation_id=thread_id,
-                        user_prompt=user_prompt_content,
-                        message_history=conversation_state.messages[
-                            :-1
-                        ],  # History before current user message
-                        tools=run_input.tools,
-                        current_state=conversation_state.current_state,
+                    conversation_state.add_message(user_message)
+                    # Runs as its own task so this loop keeps receiving
+                    connection_runs.add(
+                        _start_run(
+                            thread_id,
+                            conversation_state,
+                            run_input,
+                            run_id_for_operation,
+                            user_prompt_content,
+                        )
                     )
 
-                    for event_data_dict in orchestrator_events_data:
-                        await websocket.send_json(event_data_dict)
-
-                    finish_event = RunFinishedEvent(
-                        type=EventType.RUN_FINISHED,
-                        thread_id=thread_id,
-                        run_id=run_id_for_operation,
-                    )
-                    await websocket.send_json(
-                        finish_event.model_dump(by_alias=True, exclude_none=True)
+                elif data.get("type") == "CANCEL_RUN":
+                    await _cancel_run_request(
+                        thread_id, conversation_state, data.get("run_id")
                     )
 
                 elif "role" in data and data["role"] == "tool":
@@ -140,11 +695,13 @@ async def websocket_endpoint(websocket: WebSocket, thread_id: str):
                     logger.info(
                         f"Thread {thread_id}: Received tool result for {tool_message.tool_call_id}"
                     )
-                    await websocket.send_json(
+                    await _emit(
+                        thread_id,
+                        conversation_state,
                         {
                             "type": "ACK_TOOL_RESULT",
                             "tool_call_id": tool_message.tool_call_id,
-                        }
+                        },
                     )
                 else:
                     logger.warning(
@@ -154,8 +711,10 @@ async def websocket_endpoint(websocket: WebSocket, thread_id: str):
                         type=EventType.RUN_ERROR,
                         message="Unknown message structure",
                     )
-                    await websocket.send_json(
-                        error_event.model_dump(by_alias=True, exclude_none=True)
+                    await _emit(
+                        thread_id,
+                        conversation_state,
+                        error_event.model_dump(by_alias=True, exclude_none=True),
                     )
 
             except ValueError as e:
@@ -167,8 +726,10 @@ async def websocket_endpoint(websocket: WebSocket, thread_id: str):
                     type=EventType.RUN_ERROR,
                     message=f"Invalid data format: {str(e)}",
                 )
-                await websocket.send_json(
-                    error_event.model_dump(by_alias=True, exclude_none=True)
+                await _emit(
+                    thread_id,
+                    conversation_state,
+                    error_event.model_dump(by_alias=True, exclude_none=True),
                 )
             except Exception as e:
                 logger.error(
@@ -178,15 +739,222 @@ async def websocket_endpoint(websocket: WebSocket, thread_id: str):
                     type=EventType.RUN_ERROR,
                     message=f"An internal error occurred: {str(e)}",
                 )
-                await websocket.send_json(
-                    error_event.model_dump(by_alias=True, exclude_none=True)
+                await _emit(
+                    thread_id,
+                    conversation_state,
+                    error_event.model_dump(by_alias=True, exclude_none=True),
                 )
 
     except WebSocketDisconnect:
         logger.info(f"WebSocket connection closed for thread_id: {thread_id}")
     finally:
-        if thread_id in active_connections:
+        try:
+            if connection is not None:
+                await _finish_runs(thread_id, connection, connection_runs)
+        finally:
+            if connection is not None:
+                await connection.close()
+                # A newer connection for the thread may already have taken over
+                if active_connections.get(thread_id) is connection:
+                    del active_connections[thread_id]
+            if joined:
+                await _leave_thread(thread_id)
+            global_state_manager.release_conversation(thread_id)
+
+
+async def _close_after_run(
+    run: Optional[asyncio.Task], connection: EventWriter, stream: SSEStream
+) -> None:
+    """Ends an SSE stream once its run is over and its events are written."""
+    if run is not None:
+        await asyncio.wait({run})
+    await connection.close()
+    stream.end()
+
+
+async def _release_stream(
+    thread_id: str,
+    conversation_state: AGUIConversationState,
+    connection: EventWriter,
+    run: Optional[asyncio.Task],
+    displaced: Optional[EventWriter],
+    displaced_seq: int,
+) -> None:
+    """
+    Teardown for an SSE request, as for a closed socket, except that the
+    connection the stream displaced (if still open) gets the thread back.
+    """
+    try:
+        if run is not None:
+            await _finish_runs(thread_id, connection, {run})
+    finally:
+        await connection.close()
+        try:
+            await _restore_connection(
+                thread_id, conversation_state, connection, displaced, displaced_seq
+            )
+        finally:
+            await _leave_thread(thread_id)
+            global_state_manager.release_conversation(thread_id)
+
+
+async def _restore_connection(
+    thread_id: str,
+    conversation_state: AGUIConversationState,
+    connection: EventWriter,
+    displaced: Optional[EventWriter],
+    displaced_seq: int,
+) -> None:
+    """
+    Hands the thread back from an ended SSE stream to the connection it
+    displaced, replaying the events logged after ``displaced_seq`` (or
+    snapshots, if they are gone) so it misses nothing. A connection that took
+    over from the stream keeps the thread.
+    """
+    async with conversation_state.event_log.lock:
+        if active_connections.get(thread_id) is not connection:
+            return
+        if displaced is None or displaced.closed:
             del active_connections[thread_id]
+            return
+        active_connections[thread_id] = displaced
+        try:
+            missed_events = conversation_state.event_log.since(displaced_seq)
+            if missed_events is None:
+                await conversation_state.send_state_snapshot(displaced)
+                await conversation_state.send_messages_snapshot(displaced)
+            else:
+                for event in missed_events:
+                    displaced.push(event)
+        except ConnectionError:
+            return  # The socket's own teardown removes it
+    try:
+        await displaced.wait_for_room()
+    except ConnectionError:
+        pass
+
+
+async def _stream_run(
+    thread_id: str,
+    conversation_state: AGUIConversationState,
+    run: Optional[asyncio.Task],
+    last_seq: int,
+) -> AsyncIterator[str]:
+    """
+    SSE frames for one POST /runs request: the events logged since
+    ``last_seq`` (or snapshots, if they are gone), then ``run``'s events until
+    it ends. The run was started or looked up by the request handler; the
+    stream only follows it.
+    """
+    global_state_manager.pin_conversation(thread_id)
+    stream = SSEStream(keepalive=settings.AG_UI_SSE_KEEPALIVE_SECONDS)
+    connection = EventWriter(
+        stream,
+        max_queue=settings.AG_UI_OUTBOUND_QUEUE_SIZE,
+        coalesce_window=settings.AG_UI_COALESCE_WINDOW_SECONDS,
+        max_batch=settings.AG_UI_MAX_BATCH_EVENTS,
+        send_timeout=settings.AG_UI_SLOW_CLIENT_TIMEOUT_SECONDS,
+    )
+    closer: Optional[asyncio.Task] = None
+    displaced: Optional[EventWriter] = None
+    displaced_seq = 0
+    try:
+        # Counts this stream before its first await, so teardown always leaves
+        await _join_thread(thread_id)
+        # Takes over the thread like a socket (see websocket_endpoint) until
+        # the stream ends; a socket held here then gets it back
+        async with conversation_state.event_log.lock:
+            displaced = active_connections.get(thread_id)
+            displaced_seq = conversation_state.event_log.last_seq
+            active_connections[thread_id] = connection
+            missed_events = conversation_state.event_log.since(last_seq)
+            if missed_events is None:
+                await conversation_state.send_state_snapshot(connection)
+                await conversation_state.send_messages_snapshot(connection)
+            else:
+                for event in missed_events:
+                    connection.push(event)
+        await connection.wait_for_room()
+
+        # A run finished already leaves the replay as the whole stream
+        closer = asyncio.create_task(_close_after_run(run, connection, stream))
+
+        async for frame in stream.frames():
+            yield frame
+    finally:
+        if closer is not None:
+            closer.cancel()
+        await stream.close()
+        # Not cut short if the request is being cancelled by a disconnect
+        await asyncio.shield(
+            _release_stream(
+                thread_id, conversation_state, connection, run, displaced, displaced_seq
+            )
+        )
+
+
+@router.post("/runs")
+async def run_over_sse(
+    run_input: RunAgentInput, last_event_id: Optional[str] = Header(None)
+) -> Response:
+    """
+    Runs the agent on ``run_input`` and streams the run's events as
+    Server-Sent Events, for clients that cannot keep a websocket open. The
+    events are the ones a socket on the thread would get, through the same
+    run pipeline, each with its ``seq`` as the SSE event id.
+
+    A client whose stream broke repeats the request with a ``Last-Event-ID``
+    header: no new run is started, the events it missed are replayed (or
+    snapshots sent, if they have left the buffer) and the run is followed to
+    its end. Runs are only followed on the worker the request reaches.
+    """
+    thread_id = run_input.thread_id
+    run_id = run_input.run_id or str(uuid.uuid4())
+    conversation_state = await global_state_manager.open_conversation(thread_id)
+
+    last_seq = parse_last_event_id(last_event_id)
+    if last_seq is None:
+        # Validated and reserved with no await in between, so two requests
+        # cannot both pass the check and a refused run adds nothing to the
+        # history; the run is started here and the stream replays it from
+        # this seq, whenever the stream begins
+        user_prompt, user_message = _run_prompt(run_input)
+        if not user_prompt:
+            return JSONResponse(
+                {"status": "error", "error": "No user prompt provided."},
+                status_code=400,
+            )
+        refusal = _refuse_run(thread_id, run_id)
+        if refusal is not None:
+            logger.warning(f"Thread {thread_id}: {refusal}")
+            return JSONResponse({"status": "error", "error": refusal}, status_code=409)
+        conversation_state.add_message(user_message)
+        last_seq = conversation_state.event_log.last_seq
+        run = _start_run(thread_id, conversation_state, run_input, run_id, user_prompt)
+    else:
+        run = run_tasks.get(thread_id, {}).get(run_id)
+
+    return StreamingResponse(
+        _stream_run(thread_id, conversation_state, run, last_seq),
+        media_type=SSE_MEDIA_TYPE,
+        # Proxies must pass each event on as it is written
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/artifacts/{artifact_id}")
+async def get_artifact(artifact_id: str) -> Response:
+    """Full body of a tool output sent in a snapshot as an artifact reference."""
+    artifact_store = global_state_manager.artifact_store
+    content = (
+        await artifact_store.get(artifact_id) if artifact_store is not None else None
+    )
+    if content is None:
+        return JSONResponse(
+            {"status": "error", "error": f"Unknown artifact {artifact_id}"},
+            status_code=404,
+        )
+    return PlainTextResponse(content)
 
 
 # API Key Testing Endpoint (kept in AG-UI service)
@@ -0,0 +1,324 @@
+# src/ai_research_assistant/ag_ui_backend/shared_bus.py
+"""
+Shared state and pub/sub between AG-UI backend workers.
+
+Every worker holds its own websockets and runs, so events emitted by a run on
+one worker may be for a socket held by another. Workers exchange them through
+a SharedBus: a small key/value store plus publish/subscribe channels, with
+messages carried as JSON dicts.
+
+Two implementations are provided. InProcessBus keeps everything in the
+current process and is the default (a single worker). RedisBus speaks the
+Redis protocol (RESP) over a plain asyncio connection, so it works against
+Redis itself or the dependency-free stand-in in resp_standin. Use
+create_shared_bus with ``AG_UI_SHARED_BUS_URL`` to pick one.
+"""
+
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBE_TIMEOUT_SECONDS = 5.0
+
+MessageHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class SharedBusError(Exception):
+    """Raised for error replies and broken connections to a bus server."""
+
+
+class SharedBus(ABC):
+    """
+    Key/value store and pub/sub channels shared by backend workers.
+
+    Handlers subscribed to a channel are awaited one message at a time, in
+    publish order, so they must not wait on a subscription themselves. A
+    handler that raises is logged and does not stop delivery to other
+    handlers or later messages.
+    """
+
+    def __init__(self) -> None:
+        self._handlers: Dict[str, List[MessageHandler]] = {}
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str) -> None: ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    async def publish(self, channel: str, message: Dict[str, Any]) -> int:
+        """Sends ``message`` to the channel; returns how many subscribers got it."""
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        handlers = self._handlers.setdefault(channel, [])
+        handlers.append(handler)
+        if len(handlers) == 1:
+            await self._subscribe_channel(channel)
+
+    async def unsubscribe(self, channel: str, handler: MessageHandler) -> None:
+        handlers = self._handlers.get(channel)
+        if not handlers or handler not in handlers:
+            return
+        handlers.remove(handler)
+        if not handlers:
+            del self._handlers[channel]
+            await self._unsubscribe_channel(channel)
+
+    @abstractmethod
+    async def _subscribe_channel(self, channel: str) -> None:
+        """Starts delivery of ``channel``, once it has its first handler."""
+
+    @abstractmethod
+    async def _unsubscribe_channel(self, channel: str) -> None:
+        """Stops delivery of ``channel``, once its last handler is gone."""
+
+    async def _dispatch(self, channel: str, message: Dict[str, Any]) -> None:
+        for handler in list(self._handlers.get(channel, ())):
+            try:
+                await handler(message)
+            except Exception as e:
+                logger.error(
+                    f"Shared bus handler for {channel} failed: {e}", exc_info=True
+                )
+
+    async def close(self) -> None:
+        self._handlers.clear()
+
+
+class InProcessBus(SharedBus):
+    """
+    SharedBus for a single worker. Published messages are delivered by one
+    dispatcher task, so handlers never run inside the publisher's call.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._values: Dict[str, str] = {}
+        self._queue: "asyncio.Queue[Tuple[str, Dict[str, Any]]]" = asyncio.Queue()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._values.get(key)
+
+    async def set(self, key: str, value: str) -> None:
+        self._values[key] = value
+
+    async def delete(self, key: str) -> None:
+        self._values.pop(key, None)
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> int:
+        receivers = len(self._handlers.get(channel, ()))
+        if receivers:
+            if (
+                self._dispatcher is None
+                or self._dispatcher.done()
+                or self._dispatcher.get_loop() is not asyncio.get_running_loop()
+            ):
+                # A bus created at import time may outlive an event loop
+                self._queue = asyncio.Queue()
+                self._dispatcher = asyncio.create_task(
+                    self._run_dispatcher(), name="ag_ui-shared-bus"
+                )
+            # Serialized like a remote bus, so no object is shared with handlers
+            self._queue.put_nowait((channel, json.loads(json.dumps(message))))
+        return receivers
+
+    async def _subscribe_channel(self, channel: str) -> None:
+        pass  # publish() delivers to whatever handlers _handlers holds
+
+    async def _unsubscribe_channel(self, channel: str) -> None:
+        pass
+
+    async def _run_dispatcher(self) -> None:
+        while True:
+            channel, message = await self._queue.get()
+            await self._dispatch(channel, message)
+
+    async def close(self) -> None:
+        await super().close()
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+
+
+def encode_command(*args: Any) -> bytes:
+    """A RESP array of bulk strings, the form clients send commands in."""
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    """
+    Reads one RESP value. Bulk strings come back as str (None for a null),
+    integers as int and arrays as lists; error replies are returned as
+    SharedBusError instances for the caller to raise.
+    """
+    line = await reader.readline()
+    if not line:
+        raise SharedBusError("Connection closed by bus server")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode("utf-8")
+    if kind == b"-":
+        return SharedBusError(payload.decode("utf-8"))
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2].decode("utf-8")
+    if kind == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    raise SharedBusError(f"Unexpected RESP reply: {line!r}")
+
+
+class RedisBus(SharedBus):
+    """
+    SharedBus on a Redis-protocol server. Commands share one connection;
+    subscriptions use a second one, read by a background task, because a
+    subscribed connection accepts no other commands.
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.db = db
+        self._command_lock = asyncio.Lock()
+        self._command_streams: Optional[
+            Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+        ] = None
+        self._subscriber: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._subscriber_lock = asyncio.Lock()
+        self._confirmations: Dict[str, asyncio.Future] = {}
+
+    async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        if self.db:
+            writer.write(encode_command("SELECT", self.db))
+            reply = await read_reply(reader)
+            if isinstance(reply, SharedBusError):
+                raise reply
+        return reader, writer
+
+    async def _command(self, *args: Any) -> Any:
+        async with self._command_lock:
+            if self._command_streams is None:
+                self._command_streams = await self._connect()
+            reader, writer = self._command_streams
+            try:
+                writer.write(encode_command(*args))
+                await writer.drain()
+                reply = await read_reply(reader)
+            except (ConnectionError, asyncio.IncompleteReadError, SharedBusError):
+                # Reconnect on the next command
+                self._command_streams = None
+                writer.close()
+                raise
+        if isinstance(reply, SharedBusError):
+            raise reply
+        return reply
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._command("GET", key)
+
+    async def set(self, key: str, value: str) -> None:
+        await self._command("SET", key, value)
+
+    async def delete(self, key: str) -> None:
+        await self._command("DEL", key)
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> int:
+        return await self._command(
+            "PUBLISH", channel, json.dumps(message, separators=(",", ":"))
+        )
+
+    async def _subscribe_channel(self, channel: str) -> None:
+        """Returns once the server has confirmed the subscription."""
+        async with self._subscriber_lock:
+            channels = [channel]
+            if self._subscriber is None:
+                reader, self._subscriber = await self._connect()
+                self._reader_task = asyncio.create_task(
+                    self._read_messages(reader), name="ag_ui-shared-bus-reader"
+                )
+                # Includes channels kept from a connection that was lost
+                channels = list(self._handlers)
+            confirmed = asyncio.get_running_loop().create_future()
+            self._confirmations[channel] = confirmed
+            self._subscriber.write(encode_command("SUBSCRIBE", *channels))
+            await self._subscriber.drain()
+        await asyncio.wait_for(confirmed, timeout=SUBSCRIBE_TIMEOUT_SECONDS)
+
+    async def _unsubscribe_channel(self, channel: str) -> None:
+        async with self._subscriber_lock:
+            if self._subscriber is not None:
+                self._subscriber.write(encode_command("UNSUBSCRIBE", channel))
+                await self._subscriber.drain()
+
+    async def _read_messages(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                reply = await read_reply(reader)
+                if not isinstance(reply, list) or len(reply) != 3:
+                    continue
+                kind, channel, payload = reply
+                if kind == "message":
+                    await self._dispatch(channel, json.loads(payload))
+                elif kind == "subscribe":
+                    confirmed = self._confirmations.pop(channel, None)
+                    if confirmed is not None and not confirmed.done():
+                        confirmed.set_result(None)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(
+                f"Shared bus subscription to {self.host}:{self.port} lost: {e}"
+            )
+            self._subscriber = None
+
+    async def close(self) -> None:
+        await super().close()
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        for writer in (
+            self._subscriber,
+            self._command_streams[1] if self._command_streams else None,
+        ):
+            if writer is not None:
+                writer.close()
+        self._subscriber = None
+        self._command_streams = None
+
+
+def create_shared_bus(url: Optional[str]) -> SharedBus:
+    """
+    InProcessBus for an empty url or ``memory://``, RedisBus for
+    ``redis://host:port/db``.
+    """
+    if not url or url.startswith("memory://"):
+        return InProcessBus()
+    parsed = urlparse(url)
+    if parsed.scheme != "redis":
+        raise ValueError(f"Unsupported shared bus URL: {url}")
+    db = int(parsed.path.lstrip("/") or 0)
+    return RedisBus(parsed.hostname or "localhost", parsed.port or 6379, db)
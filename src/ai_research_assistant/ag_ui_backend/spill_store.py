@@ -0,0 +1,185 @@
+# src/ai_research_assistant/ag_ui_backend/spill_store.py
+"""
+On-disk store for AG-UI conversations evicted from memory.
+
+Each conversation is one SQLite row holding its state, its messages and any
+other JSON the caller wants to keep with them (see
+AGUIConversationState.spill_extras) as compressed JSON. zstd is used when the
+``zstandard`` package is installed and zlib otherwise; the codec is stored per
+row so either build can read the other's data.
+
+The methods are blocking; AGUIStateManager calls them through
+asyncio.to_thread so compression and disk I/O stay off the event loop.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ag_ui.core import Message as AGUIMessage
+from pydantic import TypeAdapter
+
+try:
+    import zstandard
+except ImportError:  # optional; zlib is always available
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+_MESSAGES_ADAPTER = TypeAdapter(List[AGUIMessage])
+
+
+def _compress(data: bytes) -> Tuple[str, bytes]:
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=3).compress(data)
+    return "zlib", zlib.compress(data, 6)
+
+
+def _decompress(codec: str, payload: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed rows")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    if codec == "zlib":
+        return zlib.decompress(payload)
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+class ConversationSpillStore:
+    """
+    SQLite-backed spill area keyed by thread_id.
+
+    The connection is opened on first write; reads and deletes against a
+    database that was never written return without creating one.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.db_path != ":memory:":
+                Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ag_ui_conversations (
+                    thread_id TEXT PRIMARY KEY,
+                    codec TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    message_count INTEGER NOT NULL,
+                    spilled_at REAL NOT NULL
+                )
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _is_empty(self) -> bool:
+        return (
+            self._conn is None
+            and self.db_path != ":memory:"
+            and not Path(self.db_path).exists()
+        )
+
+    def save(
+        self,
+        thread_id: str,
+        state: Dict[str, Any],
+        messages: List[AGUIMessage],
+        extras: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """Writes (or replaces) a conversation; returns the compressed size."""
+        document = {
+            "state": state,
+            "messages": _MESSAGES_ADAPTER.dump_python(
+                messages, mode="json", by_alias=True, exclude_none=True
+            ),
+            "extras": extras or {},
+        }
+        raw = json.dumps(document, separators=(",", ":")).encode("utf-8")
+        codec, payload = _compress(raw)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO ag_ui_conversations "
+                "(thread_id, codec, payload, message_count, spilled_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (thread_id, codec, payload, len(messages), time.time()),
+            )
+            conn.commit()
+        return len(payload)
+
+    def load(
+        self, thread_id: str
+    ) -> Optional[Tuple[Dict[str, Any], List[AGUIMessage], Dict[str, Any]]]:
+        """Returns (state, messages, extras) for a spilled conversation, or None."""
+        if self._is_empty():
+            return None
+        with self._lock:
+            row = (
+                self._connection()
+                .execute(
+                    "SELECT codec, payload FROM ag_ui_conversations WHERE thread_id = ?",
+                    (thread_id,),
+                )
+                .fetchone()
+            )
+        if row is None:
+            return None
+        document = json.loads(_decompress(row[0], row[1]))
+        return (
+            document["state"],
+            _MESSAGES_ADAPTER.validate_python(document["messages"]),
+            document.get("extras", {}),
+        )
+
+    def delete(self, thread_id: str) -> None:
+        if self._is_empty():
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "DELETE FROM ag_ui_conversations WHERE thread_id = ?", (thread_id,)
+            )
+            conn.commit()
+
+    def contains(self, thread_id: str) -> bool:
+        if self._is_empty():
+            return False
+        with self._lock:
+            row = (
+                self._connection()
+                .execute(
+                    "SELECT 1 FROM ag_ui_conversations WHERE thread_id = ?",
+                    (thread_id,),
+                )
+                .fetchone()
+            )
+        return row is not None
+
+    def count(self) -> int:
+        if self._is_empty():
+            return 0
+        with self._lock:
+            return (
+                self._connection()
+                .execute("SELECT COUNT(*) FROM ag_ui_conversations")
+                .fetchone()[0]
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
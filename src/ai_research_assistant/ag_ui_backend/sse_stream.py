@@ -0,0 +1,101 @@
+# src/ai_research_assistant/ag_ui_backend/sse_stream.py
+"""
+Server-Sent Events transport for AG-UI runs.
+
+An SSEStream stands in for a websocket: it has the ``send_json`` and
+``close`` the rest of the backend sends through, so a run streamed over HTTP
+goes through the same EventWriter, event log and replay as one on a socket.
+Each event becomes one SSE frame in the form the AG-UI SDK's EventEncoder
+uses (``data: <json>``), preceded by ``id: <seq>`` so a client that loses the
+stream can resume it with a ``Last-Event-ID`` header.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SSE_MEDIA_TYPE = "text/event-stream"
+# Sent when nothing else is, so proxies do not time out an idle stream
+KEEPALIVE_FRAME = ": keep-alive\n\n"
+
+_END = object()
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """One SSE frame for ``event``, with its ``seq`` as the event id."""
+    data = json.dumps(event, separators=(",", ":"), default=str)
+    seq = event.get("seq")
+    return f"id: {seq}\ndata: {data}\n\n" if seq is not None else f"data: {data}\n\n"
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    """The seq in a ``Last-Event-ID`` header, or None if absent or not ours."""
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+class SSEStream:
+    """
+    Websocket stand-in whose frames are read by iterating ``frames()``.
+
+    Frames sent before iteration starts (a replay) are buffered. After that
+    ``send_json`` returns only once the client has been written everything
+    sent so far, so the EventWriter feeding the stream is throttled to the
+    client's reading speed exactly as with a socket. Once the client is gone
+    (``close``), sends raise ConnectionError and the events stay in the
+    thread's event log for a resuming request.
+    """
+
+    def __init__(self, keepalive: Optional[float] = 15.0) -> None:
+        self.keepalive = keepalive
+        self._frames: "asyncio.Queue[Any]" = asyncio.Queue()
+        self._written = asyncio.Event()
+        self._written.set()
+        self._streaming = False
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    async def send_json(self, data: Any) -> None:
+        if self._closed:
+            raise ConnectionError("SSE client has gone away")
+        for event in data if isinstance(data, list) else [data]:
+            self._frames.put_nowait(format_sse(event))
+        if self._streaming:
+            self._written.clear()
+            await self._written.wait()
+
+    def end(self) -> None:
+        """Ends ``frames()`` after the frames already sent."""
+        self._frames.put_nowait(_END)
+
+    async def close(self, code: Optional[int] = None) -> None:
+        """The client is gone; frames not yet written are dropped."""
+        self._closed = True
+        while not self._frames.empty():
+            self._frames.get_nowait()
+        self._frames.put_nowait(_END)
+        self._written.set()
+
+    async def frames(self) -> AsyncIterator[str]:
+        self._streaming = True
+        while True:
+            if self._frames.empty():
+                # The previous frame has been written (this generator resumes
+                # only once it has), and nothing else is waiting
+                self._written.set()
+            try:
+                frame = await asyncio.wait_for(self._frames.get(), self.keepalive)
+            except asyncio.TimeoutError:
+                yield KEEPALIVE_FRAME
+                continue
+            if frame is _END:
+                return
+            yield frame
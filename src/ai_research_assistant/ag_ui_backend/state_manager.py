@@ -1,12 +1,14 @@
 # src/savagelysubtle_airesearchagent/ag_ui_backend/state_manager.py
+import asyncio
 import copy
 import logging
-from typing import Any, Dict, List, Optional
+import time
+from collections import OrderedDict, deque
+from dataclasses import asdict, replace
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
 
-import jsonpatch  # pip install jsonpatch
 from ag_ui.core import (
     EventType,
-    MessagesSnapshotEvent,
     # JsonPatchOperation is not directly in ag_ui.core, assume List[Any] for delta as per SDK
     StateDeltaEvent,
     StateSnapshotEvent,
@@ -18,76 +20,547 @@ from ag_ui.core import (
 )
 from fastapi import WebSocket
 
+from ..config.global_settings import settings
+from ..core.history_compaction import HistoryCompactor, HistorySummary
+from ..core.metrics import (
+    AG_UI_CONVERSATION_EVICTIONS,
+    AG_UI_CONVERSATION_REHYDRATIONS,
+    AG_UI_CONVERSATIONS,
+)
+from .a2a_client import HistoryContext
+from .artifact_store import PREVIEW_CHARS, ArtifactStore
+from .conversation_store import ConversationStore
+from .event_log import ThreadEventLog
+from .spill_store import ConversationSpillStore
+from .state_patch import apply_state_patch, make_state_patch
+
 logger = logging.getLogger(__name__)
 
+# State patches kept per conversation so reconnecting clients can catch up
+STATE_HISTORY_LIMIT = 64
+
 
 class AGUIConversationState:
-    """Manages state for a single AG-UI conversation thread."""
+    """
+    Manages state for a single AG-UI conversation thread.
+
+    current_state is copy-on-write: every change builds a new document that
+    shares unchanged subtrees with the previous one (see state_patch), so it
+    must be replaced rather than mutated in place. Each change that alters the
+    state increments ``state_seq`` and is kept as a JSON patch, which lets the
+    state be streamed as StateDeltaEvents whose ``seq`` reveals gaps.
+
+    Message snapshots hold only the newest ``snapshot_window`` messages and a
+    cursor for paging back through the rest with message_page. Tool outputs
+    too large for ``artifact_store`` to inline are sent as a preview plus an
+    artifact reference; self.messages always keeps the full content.
+
+    self.messages is append-only, which lets serialized_history dump each
+    message once and reuse it on every later orchestrator call. Long
+    histories are sent through compacted_history, which replaces the older
+    turns with a running summary kept in ``history_summary``.
+
+    Runs on one thread may overlap, so each orchestrator call works on its
+    own copy of ``history_context`` (history_request) and hands it back with
+    commit_history_context. A copy is only taken back if nothing changed
+    the shared context or the summary since it was made; updates are thus
+    applied one at a time and never from a stale view of the history.
+    """
 
     def __init__(
         self,
         thread_id: str,
         initial_state: Optional[Dict[str, Any]] = None,
         initial_messages: Optional[List[AGUIMessage]] = None,
+        store: Optional[ConversationStore] = None,
+        event_buffer_size: Optional[int] = None,
+        snapshot_window: Optional[int] = None,
+        artifact_store: Optional[ArtifactStore] = None,
     ):
         self.thread_id = thread_id
         self.current_state: Dict[str, Any] = initial_state or {}
         self.messages: List[AGUIMessage] = initial_messages or []
+        # Durable history; new messages and state writes are appended to it,
+        # and each committed write advances synced_seq or state_version
+        self.store = store
+        self.synced_seq = 0  # stored messages up to this seq are in memory
+        self.state_version = 0  # stored state version current_state reflects
+        self.state_seq = 0  # incremented by every change to current_state
+        self._state_history: Deque[Tuple[int, List[Dict[str, Any]]]] = deque(
+            maxlen=STATE_HISTORY_LIMIT
+        )
+        # Events emitted on this thread, replayed to reconnecting clients; the
+        # last seq is stored so the thread's next log continues after it
+        self.event_log = ThreadEventLog(
+            event_buffer_size,
+            on_append=self._event_logged if store is not None else None,
+        )
+        self.snapshot_window = snapshot_window  # None sends every message
+        self.artifact_store = artifact_store
+        self._artifact_refs: Dict[str, Dict[str, Any]] = {}  # message id -> ref
+        # Dumps of self.messages[: len(self._serialized)], for orchestrator calls
+        self._serialized: List[Dict[str, Any]] = []
+        self.history_context = HistoryContext()  # history the orchestrator holds
+        self.history_summary = HistorySummary()
+        # Bumped whenever history_context or history_summary changes
+        self._history_version = 0
+        self._summary_task: Optional[asyncio.Task] = None
         logger.info(f"AGUIConversationState initialized for thread_id: {thread_id}")
 
     def add_message(self, message: AGUIMessage):
         self.messages.append(message)
+        if self.store is not None:
+            self.store.append_message(
+                self.thread_id, message, on_stored=self._message_stored
+            )
         logger.debug(
             f"Thread {self.thread_id}: Message added: {message.id} ({message.role})"
         )
 
-    def update_state(self, new_state_snapshot: Dict[str, Any]):
-        # Create a deep copy to avoid reference issues
-        self.current_state = copy.deepcopy(new_state_snapshot)
-        logger.debug(f"Thread {self.thread_id}: State snapshot updated.")
+    def serialized_history(self, end: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        ``self.messages[:end]`` dumped as the orchestrator expects them. Only
+        messages added since the previous call are dumped; the returned dicts
+        are shared with the cache and must not be modified.
+        """
+        for message in self.messages[len(self._serialized) :]:
+            self._serialized.append(
+                message.model_dump(by_alias=True, exclude_none=True)
+            )
+        return self._serialized[:end]
+
+    def compacted_history(
+        self, end: Optional[int], compactor: Optional[HistoryCompactor]
+    ) -> List[Dict[str, Any]]:
+        """
+        serialized_history(end) with the turns covered by history_summary
+        replaced by the summary. If that is still over the compactor's budget,
+        the summary is refreshed in the background and used from the next
+        call on; this call never waits for it.
+        """
+        history = self.serialized_history(end)
+        if compactor is None:
+            return history
+        if compactor.needs_refresh(history, self.history_summary) and (
+            self._summary_task is None or self._summary_task.done()
+        ):
+            self._summary_task = asyncio.create_task(
+                self._refresh_summary(compactor, history),
+                name=f"ag_ui-summary-{self.thread_id}",
+            )
+        return compactor.compact(history, self.history_summary)
+
+    def history_request(
+        self, end: Optional[int], compactor: Optional[HistoryCompactor]
+    ) -> Tuple[List[Dict[str, Any]], HistoryContext, int]:
+        """
+        compacted_history(end, compactor) for one orchestrator call, with a
+        private copy of history_context for the call to update and the
+        version to pass to commit_history_context along with it.
+        """
+        history = self.compacted_history(end, compactor)
+        return history, replace(self.history_context), self._history_version
+
+    def commit_history_context(self, context: HistoryContext, version: int) -> bool:
+        """
+        Makes ``context``, as updated by an orchestrator call, the shared one,
+        unless another call or a summary refresh has changed it since
+        history_request returned ``version``.
+        """
+        if version != self._history_version:
+            logger.debug(
+                f"Thread {self.thread_id}: Dropped history context from a "
+                f"superseded request"
+            )
+            return False
+        self.history_context = context
+        self._history_version += 1
+        return True
+
+    async def _refresh_summary(
+        self, compactor: HistoryCompactor, history: List[Dict[str, Any]]
+    ) -> None:
+        try:
+            summary = await compactor.refresh(history, self.history_summary)
+        except Exception as e:
+            logger.warning(
+                f"Thread {self.thread_id}: History summary refresh failed: {e}"
+            )
+            return
+        if summary.covered <= self.history_summary.covered:
+            return
+        self.history_summary = summary
+        # The compacted history no longer extends what the orchestrator holds,
+        # so contexts from calls made before this point are not taken back
+        self.history_context = HistoryContext()
+        self._history_version += 1
+        logger.info(
+            f"Thread {self.thread_id}: History summary now covers "
+            f"{summary.covered} messages"
+        )
+
+    def _event_logged(self, seq: int) -> None:
+        self.store.save_event_seq(self.thread_id, seq)
+
+    def _message_stored(self, seq: int) -> None:
+        # Only a seq right after synced_seq proves nothing stored is missing
+        if seq == self.synced_seq + 1:
+            self.synced_seq = seq
+
+    def _state_stored(self, version: int) -> None:
+        self.state_version = max(self.state_version, version)
+
+    def spill_extras(self) -> Dict[str, Any]:
+        """
+        What is spilled with the state and messages so that a rehydrated
+        conversation carries on where it stopped: state_seq, how much of the
+        stored history it already holds, the event log (seqs continue and
+        missed events still replay), the history summary and what the
+        orchestrator holds. Recent state patches are not kept, so
+        a client behind state_seq gets a snapshot; artifact references are
+        rebuilt from their content hashes when next sent.
+        """
+        return {
+            "state_seq": self.state_seq,
+            "synced_seq": self.synced_seq,
+            "state_version": self.state_version,
+            "event_log": self.event_log.dump(),
+            "history_summary": asdict(self.history_summary),
+            "history_context": asdict(self.history_context),
+        }
+
+    def restore_spill_extras(self, extras: Dict[str, Any]) -> None:
+        self.state_seq = extras.get("state_seq", self.state_seq)
+        self.synced_seq = extras.get("synced_seq", self.synced_seq)
+        self.state_version = extras.get("state_version", self.state_version)
+        if "event_log" in extras:
+            self.event_log.restore(extras["event_log"])
+        if "history_summary" in extras:
+            self.history_summary = HistorySummary(**extras["history_summary"])
+        if "history_context" in extras:
+            self.history_context = HistoryContext(**extras["history_context"])
+
+    def _commit_state(
+        self,
+        new_state: Dict[str, Any],
+        patch_ops: List[Dict[str, Any]],
+        persist: bool = True,
+    ) -> None:
+        if not patch_ops:
+            return
+        self.current_state = new_state
+        self.state_seq += 1
+        self._state_history.append((self.state_seq, patch_ops))
+        if persist and self.store is not None:
+            self.store.save_state(
+                self.thread_id, self.current_state, on_stored=self._state_stored
+            )
+
+    def update_state(self, new_state_snapshot: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Replaces the state with a snapshot by applying the minimal patch between
+        them; returns that patch (empty if nothing changed).
+        """
+        # Only the changed values are copied, and the snapshot itself is never
+        # referenced, so the caller may keep mutating it
+        patch_ops = copy.deepcopy(
+            make_state_patch(self.current_state, new_state_snapshot)
+        )
+        self._commit_state(
+            apply_state_patch(self.current_state, patch_ops, copy_values=False),
+            patch_ops,
+        )
+        logger.debug(
+            f"Thread {self.thread_id}: State snapshot updated ({len(patch_ops)} ops)."
+        )
+        return patch_ops
 
     def patch_state(
         self, patch_ops: List[Dict[str, Any]]
     ) -> bool:  # AG-UI SDK uses List[Any] for delta, assume list of dicts for jsonpatch
+        patch_ops = copy.deepcopy(patch_ops)
         try:
-            self.current_state = jsonpatch.apply_patch(self.current_state, patch_ops)
-            logger.debug(f"Thread {self.thread_id}: State patched successfully.")
-            return True
-        except (jsonpatch.JsonPatchException, Exception) as e:
+            new_state = apply_state_patch(
+                self.current_state, patch_ops, copy_values=False
+            )
+        except Exception as e:
             logger.error(f"Thread {self.thread_id}: Error applying state patch: {e}")
             return False
+        self._commit_state(new_state, patch_ops)
+        logger.debug(f"Thread {self.thread_id}: State patched successfully.")
+        return True
 
-    async def send_state_snapshot(self, websocket: WebSocket):
+    def replace_state(self, new_state: Dict[str, Any]) -> None:
+        """Adopts state loaded from the store without writing it back."""
+        patch_ops = make_state_patch(self.current_state, new_state)
+        self._commit_state(new_state, patch_ops, persist=False)
+
+    def state_delta_since(self, seq: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        The patch taking a client at ``seq`` to the current state, or None if
+        ``seq`` is unknown or too old and a full snapshot is needed.
+        """
+        if seq == self.state_seq:
+            return []
+        if seq > self.state_seq or not self._state_history:
+            return None
+        if seq < self._state_history[0][0] - 1:
+            return None
+        return [
+            operation
+            for entry_seq, patch_ops in self._state_history
+            if entry_seq > seq
+            for operation in patch_ops
+        ]
+
+    def state_snapshot_event(self) -> Dict[str, Any]:
         event = StateSnapshotEvent(
             type=EventType.STATE_SNAPSHOT,  # Explicitly set type
             snapshot=self.current_state,
         )
         # SDK models have alias generator for camelCase, FastAPI should handle it.
-        await websocket.send_json(event.model_dump(by_alias=True, exclude_none=True))
+        # The models forbid extra fields, so stateSeq is added after dumping.
+        return {
+            **event.model_dump(by_alias=True, exclude_none=True),
+            "stateSeq": self.state_seq,
+        }
+
+    def state_delta_event(self, patch_ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """A StateDeltaEvent for a patch that brings a client to ``state_seq``."""
+        event = StateDeltaEvent(
+            type=EventType.STATE_DELTA,  # Explicitly set type
+            delta=patch_ops,
+        )
+        return {
+            **event.model_dump(by_alias=True, exclude_none=True),
+            "stateSeq": self.state_seq,
+        }
+
+    # The send_* methods below write straight to one client and are not
+    # recorded in event_log; each carries the log position it reflects as seq.
+
+    async def send_state_snapshot(self, websocket: WebSocket):
+        await websocket.send_json(
+            {**self.state_snapshot_event(), "seq": self.event_log.last_seq}
+        )
         logger.debug(f"Thread {self.thread_id}: Sent StateSnapshotEvent.")
 
-    async def send_messages_snapshot(self, websocket: WebSocket):
-        event = MessagesSnapshotEvent(
-            type=EventType.MESSAGES_SNAPSHOT,  # Explicitly set type
-            messages=self.messages,  # Fixed: pass Message objects directly instead of dict conversion
+    async def _message_payload(self, message: AGUIMessage) -> Dict[str, Any]:
+        payload = message.model_dump(by_alias=True, exclude_none=True)
+        if message.role != "tool" or self.artifact_store is None:
+            return payload
+        ref = self._artifact_refs.get(message.id)
+        if ref is None:
+            if not self.artifact_store.is_oversized(message.content):
+                return payload
+            try:
+                ref = await self.artifact_store.put(message.content)
+            except OSError as e:
+                logger.error(
+                    f"Thread {self.thread_id}: Failed to store tool output "
+                    f"{message.id} as an artifact, sending it inline: {e}"
+                )
+                return payload
+            self._artifact_refs[message.id] = ref
+        payload["content"] = message.content[:PREVIEW_CHARS]
+        payload["artifact"] = ref
+        return payload
+
+    async def message_page(
+        self, before: Optional[int] = None, limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Up to ``limit`` messages ending just before index ``before`` (the
+        newest ones if None), oldest first. ``cursor`` is the ``before`` for
+        the next older page, or None once the start of history is reached.
+        """
+        end = len(self.messages) if before is None else max(0, before)
+        end = min(end, len(self.messages))
+        start = 0 if limit is None else max(0, end - limit)
+        messages = [
+            await self._message_payload(message) for message in self.messages[start:end]
+        ]
+        return {
+            "messages": messages,
+            "cursor": start if start > 0 else None,
+            "hasMore": start > 0,
+        }
+
+    async def send_messages_snapshot(
+        self, websocket: WebSocket, limit: Optional[int] = None
+    ):
+        """Sends the newest ``limit`` (default ``snapshot_window``) messages."""
+        page = await self.message_page(
+            limit=limit if limit is not None else self.snapshot_window
+        )
+        # Built by hand: MessagesSnapshotEvent forbids the cursor fields and
+        # artifact references, and the messages are already dumped
+        await websocket.send_json(
+            {
+                "type": EventType.MESSAGES_SNAPSHOT,
+                **page,
+                "seq": self.event_log.last_seq,
+            }
+        )
+        logger.debug(
+            f"Thread {self.thread_id}: Sent MessagesSnapshotEvent "
+            f"({len(page['messages'])} of {len(self.messages)} messages)."
         )
-        await websocket.send_json(event.model_dump(by_alias=True, exclude_none=True))
-        logger.debug(f"Thread {self.thread_id}: Sent MessagesSnapshotEvent.")
 
     async def send_state_delta(
         self, websocket: WebSocket, patch_ops: List[Dict[str, Any]]
     ):
-        event = StateDeltaEvent(
-            type=EventType.STATE_DELTA,  # Explicitly set type
-            delta=patch_ops,
+        await websocket.send_json(
+            {**self.state_delta_event(patch_ops), "seq": self.event_log.last_seq}
         )
-        await websocket.send_json(event.model_dump(by_alias=True, exclude_none=True))
         logger.debug(f"Thread {self.thread_id}: Sent StateDeltaEvent.")
 
+    async def send_state_catch_up(self, websocket: WebSocket, since_seq: int) -> bool:
+        """
+        Sends the delta from ``since_seq`` if it is still known (nothing if the
+        client is current); returns False when a snapshot is needed instead.
+        """
+        patch_ops = self.state_delta_since(since_seq)
+        if patch_ops is None:
+            return False
+        if patch_ops:
+            await self.send_state_delta(websocket, patch_ops)
+        return True
+
 
 class AGUIStateManager:
-    def __init__(self):
-        self.conversations: Dict[str, AGUIConversationState] = {}  # thread_id -> state
+    """
+    Holds AG-UI conversations in memory with bounded size.
+
+    Conversations are kept in least-recently-used order. Once there are more
+    than ``max_conversations``, or a conversation has not been touched for
+    ``idle_ttl_seconds``, it is spilled to ``spill_store`` and dropped from
+    memory; the next open_conversation (or get_or_create_conversation/
+    get_conversation) for that thread rehydrates it. Pinned conversations
+    (open websockets) are never evicted. Without a spill store the manager is
+    unbounded, as before.
+
+    Within an event loop spills are written by a background task in a worker
+    thread, and open_conversation reads them back the same way; a
+    conversation whose spill is still being written is taken back from
+    memory. Outside a loop the store is used directly.
+
+    With a ``conversation_store`` every conversation also writes its messages
+    and state through to durable storage, and sync_conversation merges in what
+    was stored by an earlier process or another worker.
+    """
+
+    def __init__(
+        self,
+        max_conversations: Optional[int] = None,
+        idle_ttl_seconds: Optional[float] = None,
+        spill_store: Optional[ConversationSpillStore] = None,
+        conversation_store: Optional[ConversationStore] = None,
+        event_buffer_size: Optional[int] = None,
+        snapshot_window: Optional[int] = None,
+        artifact_store: Optional[ArtifactStore] = None,
+    ):
+        self.conversations: "OrderedDict[str, AGUIConversationState]" = (
+            OrderedDict()
+        )  # thread_id -> state, least recently used first
+        self.max_conversations = max_conversations
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.spill_store = spill_store
+        self.conversation_store = conversation_store
+        self.event_buffer_size = event_buffer_size
+        self.snapshot_window = snapshot_window
+        self.artifact_store = artifact_store
+        self._last_access: Dict[str, float] = {}
+        self._pins: Dict[str, int] = {}
+        # thread_id -> (conversation, document) whose spill is being written
+        self._spilling: Dict[str, Tuple[AGUIConversationState, Tuple]] = {}
+        self._spill_tasks: Set[asyncio.Task] = set()
+        # Spill store writes, deletes and rehydrating reads, one at a time
+        self._spill_lock = asyncio.Lock()
+
+    def _touch(self, thread_id: str) -> None:
+        self.conversations.move_to_end(thread_id)
+        self._last_access[thread_id] = time.monotonic()
+
+    def _adopt_spilled(
+        self,
+        thread_id: str,
+        loaded: Tuple[Dict[str, Any], List[AGUIMessage], Dict[str, Any]],
+    ) -> AGUIConversationState:
+        state, messages, extras = loaded
+        conversation = AGUIConversationState(
+            thread_id,
+            state,
+            messages,
+            store=self.conversation_store,
+            event_buffer_size=self.event_buffer_size,
+            snapshot_window=self.snapshot_window,
+            artifact_store=self.artifact_store,
+        )
+        conversation.restore_spill_extras(extras)
+        self.conversations[thread_id] = conversation
+        AG_UI_CONVERSATION_REHYDRATIONS.inc()
+        logger.info(
+            f"Rehydrated conversation {thread_id} ({len(messages)} messages) from disk"
+        )
+        return conversation
+
+    def _rehydrate(self, thread_id: str) -> Optional[AGUIConversationState]:
+        if self.spill_store is None:
+            return None
+        if thread_id in self._spilling:
+            # Its spill is still being written and is deleted once it is
+            conversation, _ = self._spilling.pop(thread_id)
+            self.conversations[thread_id] = conversation
+            return conversation
+        try:
+            loaded = self.spill_store.load(thread_id)
+        except Exception as e:
+            logger.error(f"Thread {thread_id}: Failed to rehydrate conversation: {e}")
+            return None
+        if loaded is None:
+            return None
+        conversation = self._adopt_spilled(thread_id, loaded)
+        self.spill_store.delete(thread_id)
+        return conversation
+
+    async def _rehydrate_off_loop(self, thread_id: str) -> None:
+        """_rehydrate with the spill store read in a worker thread."""
+        async with self._spill_lock:
+            if thread_id in self.conversations or thread_id in self._spilling:
+                return
+            try:
+                loaded = await asyncio.to_thread(self.spill_store.load, thread_id)
+            except Exception as e:
+                logger.error(
+                    f"Thread {thread_id}: Failed to rehydrate conversation: {e}"
+                )
+                return
+            # Rehydrated by a synchronous caller while it was being read
+            if (
+                loaded is None
+                or thread_id in self.conversations
+                or thread_id in self._spilling
+            ):
+                return
+            self._adopt_spilled(thread_id, loaded)
+            await asyncio.to_thread(self.spill_store.delete, thread_id)
+
+    async def open_conversation(self, thread_id: str) -> AGUIConversationState:
+        """
+        get_or_create_conversation followed by sync_conversation, without
+        blocking the loop on the spill store when the thread was evicted.
+        """
+        if (
+            self.spill_store is not None
+            and thread_id not in self.conversations
+            and thread_id not in self._spilling
+        ):
+            await self._rehydrate_off_loop(thread_id)
+        conversation = self.get_or_create_conversation(thread_id)
+        # Picks up history stored before a restart or written by another worker
+        await self.sync_conversation(conversation)
+        return conversation
 
     def get_or_create_conversation(
         self,
@@ -95,21 +568,214 @@ class AGUIStateManager:
         initial_state: Optional[Dict[str, Any]] = None,
         initial_messages: Optional[List[AGUIMessage]] = None,
     ) -> AGUIConversationState:
-        if thread_id not in self.conversations:
+        if thread_id not in self.conversations and self._rehydrate(thread_id) is None:
             self.conversations[thread_id] = AGUIConversationState(
-                thread_id, initial_state, initial_messages
+                thread_id,
+                initial_state,
+                initial_messages,
+                store=self.conversation_store,
+                event_buffer_size=self.event_buffer_size,
+                snapshot_window=self.snapshot_window,
+                artifact_store=self.artifact_store,
             )
+        self._touch(thread_id)
+        self.evict(keep=thread_id)
         return self.conversations[thread_id]
 
     def get_conversation(self, thread_id: str) -> Optional[AGUIConversationState]:
-        return self.conversations.get(thread_id)
+        if thread_id not in self.conversations and self._rehydrate(thread_id) is None:
+            return None
+        self._touch(thread_id)
+        self.evict(keep=thread_id)
+        return self.conversations[thread_id]
+
+    async def sync_conversation(self, conversation: AGUIConversationState) -> int:
+        """
+        Merges stored history into an in-memory conversation: messages stored
+        since its last sync (by this or another worker) that it does not hold
+        yet, and the stored state if it is newer. A conversation that has not
+        emitted events yet numbers them after the thread's last stored event.
+        Returns messages merged.
+        """
+        store = self.conversation_store
+        if store is None or not store.initialized:
+            return 0
+        try:
+            # Our own buffered writes must be visible before comparing
+            await store.flush()
+            stored = await store.load_conversation(
+                conversation.thread_id, after_seq=conversation.synced_seq
+            )
+        except Exception as e:
+            logger.error(
+                f"Thread {conversation.thread_id}: Failed to load stored history: {e}"
+            )
+            return 0
+        if stored is None:
+            return 0
+        known_ids = {message.id for message in conversation.messages}
+        merged = [
+            message for _, message in stored.messages if message.id not in known_ids
+        ]
+        conversation.messages.extend(merged)
+        conversation.synced_seq = max(conversation.synced_seq, stored.last_seq)
+        conversation.event_log.continue_after(stored.last_event_seq)
+        if stored.state_version > conversation.state_version:
+            conversation.replace_state(stored.state)
+            conversation.state_version = stored.state_version
+        if merged:
+            logger.info(
+                f"Thread {conversation.thread_id}: Loaded {len(merged)} stored messages"
+            )
+        return len(merged)
 
     def remove_conversation(self, thread_id: str):
         if thread_id in self.conversations:
             del self.conversations[thread_id]
             logger.info(f"Removed conversation state for thread_id: {thread_id}")
+        self._last_access.pop(thread_id, None)
+        self._pins.pop(thread_id, None)
+        # A spill still being written is deleted once it is
+        self._spilling.pop(thread_id, None)
+        if self.spill_store is not None:
+            self.spill_store.delete(thread_id)
+
+    def pin_conversation(self, thread_id: str) -> None:
+        """Protects a conversation from eviction until release_conversation."""
+        self._pins[thread_id] = self._pins.get(thread_id, 0) + 1
+
+    def release_conversation(self, thread_id: str) -> None:
+        """Drops one pin; an unpinned conversation becomes evictable again."""
+        remaining = self._pins.get(thread_id, 0) - 1
+        if remaining > 0:
+            self._pins[thread_id] = remaining
+        else:
+            self._pins.pop(thread_id, None)
+        if thread_id in self.conversations:
+            self._touch(thread_id)
+        self.evict()
+
+    def _spill(self, thread_id: str, reason: str) -> None:
+        conversation = self.conversations[thread_id]
+        # current_state is copy-on-write, so only the message list is copied
+        document = (
+            conversation.current_state,
+            list(conversation.messages),
+            conversation.spill_extras(),
+        )
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            try:
+                size = self.spill_store.save(thread_id, *document)
+            except Exception as e:
+                logger.error(f"Thread {thread_id}: Failed to spill conversation: {e}")
+                return
+            logger.debug(f"Spilled conversation {thread_id} ({size} bytes, {reason})")
+        else:
+            self._spilling[thread_id] = (conversation, document)
+            task = asyncio.create_task(
+                self._spill_in_background(conversation, document, reason),
+                name=f"ag_ui-spill-{thread_id}",
+            )
+            self._spill_tasks.add(task)
+            task.add_done_callback(self._spill_tasks.discard)
+        del self.conversations[thread_id]
+        self._last_access.pop(thread_id, None)
+        AG_UI_CONVERSATION_EVICTIONS.inc(reason=reason)
+
+    async def _spill_in_background(
+        self,
+        conversation: AGUIConversationState,
+        document: Tuple[Dict[str, Any], List[AGUIMessage], Dict[str, Any]],
+        reason: str,
+    ) -> None:
+        thread_id = conversation.thread_id
+        async with self._spill_lock:
+            try:
+                size = await asyncio.to_thread(
+                    self.spill_store.save, thread_id, *document
+                )
+            except Exception as e:
+                logger.error(f"Thread {thread_id}: Failed to spill conversation: {e}")
+                if self._spill_is_current(thread_id, document):
+                    # Kept in memory, as the least recently used, rather than lost
+                    del self._spilling[thread_id]
+                    self.conversations[thread_id] = conversation
+                    self.conversations.move_to_end(thread_id, last=False)
+                    self._last_access[thread_id] = time.monotonic()
+                return
+            if self._spill_is_current(thread_id, document):
+                del self._spilling[thread_id]
+                logger.debug(
+                    f"Spilled conversation {thread_id} ({size} bytes, {reason})"
+                )
+                return
+            # Taken back or removed while it was written: the row is stale
+            try:
+                await asyncio.to_thread(self.spill_store.delete, thread_id)
+            except Exception as e:
+                logger.error(f"Thread {thread_id}: Failed to delete stale spill: {e}")
+
+    def _spill_is_current(self, thread_id: str, document: Tuple) -> bool:
+        """False once the conversation was taken back, removed or spilled anew."""
+        in_flight = self._spilling.get(thread_id)
+        return in_flight is not None and in_flight[1] is document
 
+    async def flush_spills(self) -> None:
+        """Waits for spills being written; used on shutdown."""
+        while self._spill_tasks:
+            await asyncio.gather(*self._spill_tasks, return_exceptions=True)
 
-global_state_manager = AGUIStateManager()
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Spills idle and over-capacity conversations, never touching pinned ones
+        or ``keep``; returns how many were spilled.
+        """
+        if self.spill_store is None:
+            return 0
+        evicted = 0
+        now = time.monotonic()
+        for thread_id in list(self.conversations):
+            if thread_id in self._pins or thread_id == keep:
+                continue
+            over_capacity = (
+                self.max_conversations is not None
+                and len(self.conversations) > self.max_conversations
+            )
+            idle = (
+                self.idle_ttl_seconds is not None
+                and now - self._last_access.get(thread_id, now) >= self.idle_ttl_seconds
+            )
+            if not (over_capacity or idle):
+                # Oldest first: once one survives, the newer ones do too
+                break
+            self._spill(thread_id, "capacity" if over_capacity else "idle")
+            evicted += 1
+        return evicted
+
+
+global_state_manager = AGUIStateManager(
+    max_conversations=settings.AG_UI_MAX_CONVERSATIONS,
+    idle_ttl_seconds=settings.AG_UI_CONVERSATION_IDLE_TTL_SECONDS,
+    spill_store=ConversationSpillStore(settings.AG_UI_SPILL_DB_PATH),
+    event_buffer_size=settings.AG_UI_EVENT_BUFFER_SIZE,
+    snapshot_window=settings.AG_UI_SNAPSHOT_WINDOW,
+    artifact_store=ArtifactStore(
+        settings.AG_UI_ARTIFACT_DIR,
+        inline_limit=settings.AG_UI_MAX_INLINE_TOOL_BYTES,
+    ),
+    # Opened by the backend's startup hook; writes before that are buffered
+    conversation_store=(
+        ConversationStore(
+            settings.AG_UI_CONVERSATION_DB_PATH,
+            batch_size=settings.AG_UI_CONVERSATION_BATCH_SIZE,
+            flush_interval=settings.AG_UI_CONVERSATION_FLUSH_INTERVAL_SECONDS,
+        )
+        if settings.AG_UI_CONVERSATION_DB_PATH
+        else None
+    ),
+)
+AG_UI_CONVERSATIONS.set_function(lambda: len(global_state_manager.conversations))
 
 # --- End of src/savagelysubtle_airesearchagent/ag_ui_backend/state_manager.py ---
@@ -0,0 +1,170 @@
+# src/ai_research_assistant/ag_ui_backend/state_patch.py
+"""
+Copy-on-write JSON Patch (RFC 6902) for AG-UI shared state.
+
+apply_state_patch never mutates the document it is given. Only the containers
+on the path of each operation are shallow-copied, and everything else is shared
+with the previous version, so applying a small patch to a large case state
+costs time proportional to the path depth rather than to the state's size.
+Values taken from the patch are deep-copied unless the caller already owns a
+private copy of the patch, so the caller's objects can never alias the stored
+state.
+"""
+
+import copy
+import logging
+from typing import Any, Dict, List, Tuple
+
+import jsonpatch
+from jsonpointer import JsonPointer, JsonPointerException
+
+logger = logging.getLogger(__name__)
+
+PatchOperation = Dict[str, Any]
+
+_MISSING = object()
+
+
+def make_state_patch(old: Any, new: Any) -> List[PatchOperation]:
+    """Minimal JSON Patch turning ``old`` into ``new`` (empty if equal)."""
+    if old is new:
+        return []
+    return jsonpatch.make_patch(old, new).patch
+
+
+def _parts(path: str) -> List[str]:
+    try:
+        return JsonPointer(path).parts
+    except JsonPointerException as e:
+        raise jsonpatch.JsonPatchConflict(f"Invalid path {path!r}: {e}") from e
+
+
+def _index(container: Any, part: str, allow_end: bool) -> Any:
+    if isinstance(container, dict):
+        return part
+    if isinstance(container, list):
+        if allow_end and part == "-":
+            return len(container)
+        if not part.isdigit() or (part != "0" and part.startswith("0")):
+            raise jsonpatch.JsonPatchConflict(f"Invalid list index {part!r}")
+        index = int(part)
+        limit = len(container) + (1 if allow_end else 0)
+        if index >= limit:
+            raise jsonpatch.JsonPatchConflict(f"List index {index} out of range")
+        return index
+    raise jsonpatch.JsonPatchConflict(f"Cannot address {part!r} in a scalar")
+
+
+def _get(document: Any, parts: List[str]) -> Any:
+    node = document
+    for part in parts:
+        key = _index(node, part, allow_end=False)
+        if isinstance(node, dict) and key not in node:
+            raise jsonpatch.JsonPatchConflict(f"Member {part!r} does not exist")
+        node = node[key]
+    return node
+
+
+def _copy_path(document: Any, parts: List[str]) -> Tuple[Any, Any]:
+    """Shallow-copies the containers down to the parent of ``parts[-1]``."""
+    root = copy.copy(document)
+    node = root
+    for part in parts[:-1]:
+        key = _index(node, part, allow_end=False)
+        if isinstance(node, dict) and key not in node:
+            raise jsonpatch.JsonPatchConflict(f"Member {part!r} does not exist")
+        child = copy.copy(node[key])
+        node[key] = child
+        node = child
+    return root, node
+
+
+def _add(document: Any, parts: List[str], value: Any) -> Any:
+    if not parts:
+        return value
+    root, parent = _copy_path(document, parts)
+    key = _index(parent, parts[-1], allow_end=True)
+    if isinstance(parent, list):
+        parent.insert(key, value)
+    else:
+        parent[key] = value
+    return root
+
+
+def _remove(document: Any, parts: List[str]) -> Any:
+    if not parts:
+        raise jsonpatch.JsonPatchConflict("Cannot remove the whole document")
+    root, parent = _copy_path(document, parts)
+    key = _index(parent, parts[-1], allow_end=False)
+    if isinstance(parent, dict) and key not in parent:
+        raise jsonpatch.JsonPatchConflict(f"Member {parts[-1]!r} does not exist")
+    del parent[key]
+    return root
+
+
+def _replace(document: Any, parts: List[str], value: Any) -> Any:
+    if not parts:
+        return value
+    root, parent = _copy_path(document, parts)
+    key = _index(parent, parts[-1], allow_end=False)
+    if isinstance(parent, dict) and key not in parent:
+        raise jsonpatch.JsonPatchConflict(f"Member {parts[-1]!r} does not exist")
+    parent[key] = value
+    return root
+
+
+def _value(operation: PatchOperation, copy_values: bool) -> Any:
+    value = operation.get("value", _MISSING)
+    if value is _MISSING:
+        raise jsonpatch.JsonPatchException(
+            f"Operation {operation.get('op')!r} is missing 'value'"
+        )
+    return copy.deepcopy(value) if copy_values else value
+
+
+def apply_state_patch(
+    document: Any, operations: List[PatchOperation], copy_values: bool = True
+) -> Any:
+    """
+    Returns ``document`` with ``operations`` applied, leaving it untouched.
+    With ``copy_values=False`` the result shares values with ``operations``.
+
+    Raises jsonpatch.JsonPatchException (or a subclass) if any operation is
+    malformed, conflicts with the document or fails a ``test``; operations are
+    all-or-nothing because the input is never modified.
+    """
+    for operation in operations:
+        op = operation.get("op")
+        if "path" not in operation:
+            raise jsonpatch.JsonPatchException(f"Operation {op!r} is missing 'path'")
+        parts = _parts(operation["path"])
+        if op == "add":
+            document = _add(document, parts, _value(operation, copy_values))
+        elif op == "remove":
+            document = _remove(document, parts)
+        elif op == "replace":
+            document = _replace(document, parts, _value(operation, copy_values))
+        elif op in ("move", "copy"):
+            if "from" not in operation:
+                raise jsonpatch.JsonPatchException(
+                    f"Operation {op!r} is missing 'from'"
+                )
+            source = _parts(operation["from"])
+            value = _get(document, source)
+            if op == "move":
+                if parts[: len(source)] == source and parts != source:
+                    raise jsonpatch.JsonPatchConflict(
+                        "Cannot move a value into one of its children"
+                    )
+                document = _remove(document, source)
+            else:
+                value = copy.deepcopy(value)
+            document = _add(document, parts, value)
+        elif op == "test":
+            if _get(document, parts) != operation.get("value", _MISSING):
+                raise jsonpatch.JsonPatchTestFailed(
+                    f"Test failed at {operation['path']!r}"
+                )
+        else:
+            raise jsonpatch.JsonPatchException(f"Unknown operation {op!r}")
+    return document
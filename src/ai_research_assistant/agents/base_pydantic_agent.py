@@ -10,6 +10,15 @@ from pydantic_ai.mcp import MCPServer
 from ai_research_assistant.agents.base_pydantic_agent_config import (
     BasePydanticAgentConfig,
 )
+from ai_research_assistant.core.run_instrumentation import (
+    JsonlTraceSink,
+    MetricsSink,
+    RunInstrumentationSink,
+    instrumented_run,
+)
+
+# Agent tests patch the factory here to build agents without a provider
+from ai_research_assistant.core.unified_llm_factory import get_llm_factory  # noqa: F401
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +62,13 @@ class BasePydanticAgent:
             system_prompt=self._get_instructions(),  # System prompt for agent behavior
         )
 
+        # Every model run is reported to these sinks (see _instrumented_run)
+        self.instrumentation_sinks: List[RunInstrumentationSink] = [MetricsSink()]
+        if self.config.llm_trace_path:
+            self.instrumentation_sinks.append(
+                JsonlTraceSink(self.config.llm_trace_path)
+            )
+
         # Add MCP toolsets - PydanticAI handles them automatically when passed to Agent
         # Note: Your existing MCP client creates the correct MCPServer types
 
@@ -78,21 +94,45 @@ class BasePydanticAgent:
         else:
             return f"You are {self.agent_name}, an AI research assistant."
 
-    async def run(self, prompt: str, **kwargs) -> Any:
+    async def run(self, prompt: str, skill: str = "run", **kwargs) -> Any:
         """
         Primary interface method following PydanticAI patterns.
         This is the method that A2A will automatically expose.
+
+        ``skill`` labels the run in instrumentation; skills calling run()
+        pass their own name.
         """
         logger.debug(f"Running {self.agent_name} with prompt: {prompt[:100]}...")
 
         try:
-            result = await self.pydantic_agent.run(prompt, **kwargs)
+            result = await self._instrumented_run(prompt, skill=skill, **kwargs)
             logger.debug(f"Agent {self.agent_name} completed successfully")
             return result.output
         except Exception as e:
             logger.error(f"Agent {self.agent_name} failed: {e}")
             raise
 
+    async def _instrumented_run(self, prompt: str, *, skill: str, **kwargs) -> Any:
+        """
+        Runs the PydanticAI agent and reports the run to the instrumentation
+        sinks. Returns the raw run result, like pydantic_agent.run().
+
+        The run is attributed to the skill set via instrumentation_context(),
+        or else to ``skill``, the name of the calling skill.
+        """
+        return await instrumented_run(
+            self.pydantic_agent.run,
+            prompt,
+            agent=self.agent_name,
+            skill=skill,
+            sinks=self.instrumentation_sinks,
+            **kwargs,
+        )
+
+    def add_instrumentation_sink(self, sink: RunInstrumentationSink) -> None:
+        """Registers an additional sink for run records."""
+        self.instrumentation_sinks.append(sink)
+
     def to_a2a(self, **kwargs):
         """
         Convert this agent to A2A format using PydanticAI's native support.
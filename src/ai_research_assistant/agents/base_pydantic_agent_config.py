@@ -50,6 +50,31 @@ class BasePydanticAgentConfig(BaseModel):
         default="AI Research Agent", description="Agent description for A2A"
     )
 
+    llm_trace_path: Optional[str] = Field(
+        default=None,
+        description="Optional JSONL file receiving one record per LLM run.",
+    )
+
+    # --- CONVERSATION HISTORY COMPACTION ---
+    # Applied only when HISTORY_COMPACTION_ENABLED is set (see compactor_for)
+    history_token_budget: Optional[int] = Field(
+        default=None,
+        description=(
+            "Estimated tokens of conversation history sent to this agent before "
+            "older turns are folded into a running summary (None disables)."
+        ),
+    )
+    history_keep_recent: int = Field(
+        default=6, description="Most recent messages always sent verbatim."
+    )
+    history_summary_provider: str = Field(
+        default="google", description="Provider of the summarization model."
+    )
+    history_summary_model: Optional[str] = Field(
+        default=None,
+        description="Model that writes history summaries (defaults to llm_model).",
+    )
+
     custom_settings: Dict[str, Any] = Field(default_factory=dict)
 
     class Config:
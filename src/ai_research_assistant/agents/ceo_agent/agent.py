@@ -204,7 +204,7 @@ class CEOAgent(BasePydanticAgent):
                 logger.info("Forcing delegation for work request")
 
             # Use the new run method signature
-            result = await self.run(user_prompt, **kwargs)
+            result = await self.run(user_prompt, skill="respond_to_user", **kwargs)
 
             response = str(result)
             logger.info(f"CEO Agent response generated: {len(response)} characters")
@@ -1,6 +1,9 @@
 # src/ai_research_assistant/agents/orchestrator_agent/agent.py
 import logging
-from typing import Any, List, Optional
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 
 from pydantic_ai.mcp import MCPServer
 
@@ -10,6 +13,13 @@ from ai_research_assistant.agents.base_pydantic_agent import (
 from ai_research_assistant.agents.orchestrator_agent.config import (
     OrchestratorAgentConfig,
 )
+from ai_research_assistant.core.run_instrumentation import instrumentation_context
+from ai_research_assistant.core.state_manager import AgentStateManager
+from ai_research_assistant.core.workflow_engine import (
+    ArtifactRef,
+    WorkflowDAG,
+    WorkflowEngine,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +44,10 @@ class OrchestratorAgent(BasePydanticAgent):
         )
         self.config: OrchestratorAgentConfig = self.config  # type: ignore
 
+        # Workflow checkpoints survive restarts so completed LLM work is reused
+        self.state_manager = AgentStateManager(self.config.workflow_state_db_path)
+        self.workflow_engine = WorkflowEngine(state_manager=self.state_manager)
+
         logger.info(
             f"OrchestratorAgent '{self.config.agent_name}' initialized with "
             f"{'factory-created model' if llm_instance else 'config model'} and "
@@ -49,89 +63,111 @@ class OrchestratorAgent(BasePydanticAgent):
         """
         Initiates and manages a full legal research workflow based on a user query and initial documents.
 
+        The workflow runs as two checkpointed steps: the orchestration run itself
+        and writing its result to the summary report. Passing the ``workflow_id``
+        of an interrupted workflow in ``workflow_options`` resumes it from its last
+        completed step instead of starting over; it must be resumed with the same
+        query and documents.
+
         This matches the agent card skill definition exactly.
         """
         logger.info(
             f"Starting full research workflow for query: '{user_query[:100]}...'"
         )
+        workflow_id = (workflow_options or {}).get("workflow_id") or str(uuid.uuid4())
 
         try:
-            # Enhanced orchestration prompt with ChromaDB tool awareness
-            execution_prompt = (
-                "You are the Orchestrator Agent responsible for coordinating complex workflows for SafeAppealNavigator, "
-                "a specialized legal case management system for WorkSafe BC and WCAT appeals. "
-                "Your primary goal is to fulfill the user's request using the most appropriate tools available.\n\n"
-                "**SafeAppealNavigator Context:**\n"
-                "This system helps injured workers, legal advocates, and families navigate Workers' Compensation appeals. "
-                "You coordinate database operations, legal document processing, research, and case management workflows.\n\n"
-                "**Available ChromaDB Tools (Legal Case Management Database):**\n"
-                "• chroma_create_collection - Create specialized collections for legal case organization\n"
-                "• chroma_list_collections - List existing case management collections\n"
-                "• chroma_add_documents - Store legal documents, medical reports, WCAT decisions with embeddings\n"
-                "• chroma_query_documents - Perform semantic search for case precedents and similar documents\n"
-                "• chroma_get_documents - Retrieve case documents with legal metadata filtering\n"
-                "• chroma_update_documents - Modify case documents and legal metadata\n"
-                "• chroma_delete_documents - Remove outdated case documents\n"
-                "• chroma_get_collection_info - Get legal collection statistics and health metrics\n"
-                "• chroma_modify_collection - Optimize collections for legal document search performance\n"
-                "• chroma_peek_collection - Preview legal collection contents and structure\n"
-                "• chroma_delete_collection - Remove entire legal collections (use with extreme caution)\n\n"
-                "**SafeAppealNavigator Database Collections Framework:**\n"
-                "When creating databases for 'the app', establish these legal case management collections:\n"
-                "• **case_files** - Primary case documents, correspondence, claim forms, decision letters\n"
-                "• **medical_records** - Medical reports, assessments, treatment records, IME reports\n"
-                "• **wcat_decisions** - WCAT precedent decisions, similar cases, appeal outcomes\n"
-                "• **legal_policies** - WorkSafe BC policies, procedures, regulations, guidelines\n"
-                "• **templates** - Appeal letter templates, legal document formats, form templates\n"
-                "• **research_findings** - Legal research results, precedent analysis, case law summaries\n\n"
-                "**Task Analysis Framework for Legal Cases:**\n"
-                "1. **Simple Questions** → Provide direct response with legal context\n"
-                "2. **Database Setup for App** → Create comprehensive legal case management database with all 6 collections\n"
-                "3. **Document Processing** → Handle legal documents, medical reports, WCAT decisions\n"
-                "4. **Legal Research** → Search for precedents, policies, similar cases\n"
-                "5. **Case Management** → Organize evidence, timelines, appeal preparation\n\n"
-                "**Database Creation Best Practices:**\n"
-                "• Use descriptive collection names that reflect legal case organization\n"
-                "• Configure optimal HNSW parameters for legal document similarity search\n"
-                "• Set up metadata schemas appropriate for legal case management\n"
-                "• Consider user's jurisdiction (primarily BC WorkSafe and WCAT)\n"
-                "• Optimize for semantic search across legal and medical terminology\n\n"
-                f"**Current User Query:** '{user_query}'\n"
-                f"**Initial Documents:** {initial_document_mcp_paths or 'None provided'}\n"
-                f"**Workflow Options:** {workflow_options or 'Default settings'}\n\n"
-                "**Analysis Required:**\n"
-                "If this is a database setup request for SafeAppealNavigator, create the comprehensive 6-collection "
-                "legal case management system. If it's document processing, research, or case management, use the "
-                "appropriate tools and provide legal context in your response.\n\n"
-                "Proceed with analyzing the request and using the most appropriate ChromaDB tools or other capabilities. "
-                "Always provide clear explanations of what you're creating and why it's optimized for legal case management."
+            dag = WorkflowDAG(
+                name="full_research_workflow",
+                workflow_id=workflow_id,
+                metadata={
+                    "query": user_query,
+                    "initial_document_mcp_paths": initial_document_mcp_paths or [],
+                },
+            )
+            dag.add_node(
+                "execute_request",
+                self,
+                "_execute_workflow_prompt",
+                parameters={
+                    "prompt": _workflow_prompt(
+                        user_query, initial_document_mcp_paths, workflow_options
+                    )
+                },
+            )
+            dag.add_node(
+                "write_report",
+                self,
+                "_write_workflow_report",
+                parameters={
+                    "workflow_id": workflow_id,
+                    "user_query": user_query,
+                    "summary": ArtifactRef("execute_request", "output"),
+                },
             )
 
-            # Use PydanticAI's native run method
-            result = await self.pydantic_agent.run(execution_prompt)
-
-            # Generate workflow ID and return structured response as per agent card
-            import uuid
-
-            workflow_id = str(uuid.uuid4())
+            await self.state_manager.initialize()
+            with instrumentation_context(conversation_id=workflow_id):
+                run = await self.workflow_engine.run(dag)
+            if run.status != "completed":
+                errors = [r.error for r in run.node_results.values() if r.error]
+                raise RuntimeError(
+                    errors[0]
+                    if errors
+                    else f"Workflow finished with status {run.status}"
+                )
 
+            # Return structured response as per agent card
             return {
                 "workflow_id": workflow_id,
                 "status": "completed",
-                "summary_report_mcp_path": f"/tmp/workflow_reports/{workflow_id}_summary.md",
+                "summary_report_mcp_path": run.output("write_report")["path"],
             }
 
         except Exception as e:
             logger.error(f"Error during research workflow: {e}", exc_info=True)
-            import uuid
-
-            error_workflow_id = str(uuid.uuid4())
+            try:
+                report_path = self._save_report(
+                    f"{workflow_id}_error.md",
+                    f"# Research workflow {workflow_id} failed\n\n"
+                    f"**Query:** {user_query}\n\n**Error:** {e}\n",
+                )
+            except OSError as report_error:
+                logger.error(f"Could not write error report: {report_error}")
+                report_path = None
             return {
-                "workflow_id": error_workflow_id,
+                "workflow_id": workflow_id,
                 "status": "error",
-                "summary_report_mcp_path": f"/tmp/workflow_reports/{error_workflow_id}_error.md",
+                "summary_report_mcp_path": report_path,
             }
 
+    async def _execute_workflow_prompt(self, prompt: str) -> Dict[str, Any]:
+        """Workflow step: runs the orchestration prompt once."""
+        result = await self._instrumented_run(prompt, skill="_execute_workflow_prompt")
+        return {"status": "success", "output": str(getattr(result, "output", result))}
+
+    async def _write_workflow_report(
+        self, workflow_id: str, user_query: str, summary: str
+    ) -> Dict[str, Any]:
+        """Workflow step: writes the orchestration result to the summary report."""
+        path = self._save_report(
+            f"{workflow_id}_summary.md",
+            f"# Research workflow {workflow_id}\n\n"
+            f"**Query:** {user_query}\n\n{summary}\n",
+        )
+        return {"status": "success", "path": path}
+
+    def _save_report(self, file_name: str, content: str) -> str:
+        """Writes a workflow report and returns its path."""
+        report_dir = Path(
+            self.config.workflow_report_dir
+            or Path(self.state_manager.db_path).parent / "workflow_reports"
+        )
+        report_dir.mkdir(parents=True, exist_ok=True)
+        path = report_dir / file_name
+        path.write_text(content, encoding="utf-8")
+        return str(path)
+
     async def get_workflow_status(self, workflow_id: str) -> dict:
         """
         Retrieves the current status and progress of a given workflow ID.
@@ -141,20 +177,48 @@ class OrchestratorAgent(BasePydanticAgent):
         logger.info(f"Checking status for workflow: {workflow_id}")
 
         try:
-            # For now, return a mock status - in real implementation would check actual workflow state
+            await self.state_manager.initialize()
+            workflow = await self.state_manager.get_workflow(workflow_id)
+            if workflow is None:
+                return {
+                    "workflow_id": workflow_id,
+                    "status": "not_found",
+                    "progress_percentage": 0.0,
+                    "details": {"error": f"Unknown workflow: {workflow_id}"},
+                }
+
+            completed = [s for s in workflow["steps"] if s["status"] == "completed"]
+            total_steps = max(workflow["total_steps"], 1)
+            remaining = max(workflow["total_steps"] - len(completed), 0)
+
+            # ETA: mean duration of completed steps times the number still to run
+            durations = [
+                s["finished_at"] - s["started_at"]
+                for s in completed
+                if s["started_at"] is not None and s["finished_at"] is not None
+            ]
+            eta_seconds = None
+            if workflow["status"] == "running" and durations:
+                eta_seconds = sum(durations) / len(durations) * remaining
+
+            finished = workflow["status"] != "running"
             return {
                 "workflow_id": workflow_id,
-                "status": "completed",
-                "progress_percentage": 100.0,
+                "status": workflow["status"],
+                "progress_percentage": round(100.0 * len(completed) / total_steps, 1),
                 "details": {
-                    "started_at": "2025-01-28T10:00:00Z",
-                    "completed_at": "2025-01-28T10:05:00Z",
-                    "steps_completed": [
-                        "database_setup",
-                        "document_processing",
-                        "analysis",
+                    "name": workflow["name"],
+                    "started_at": _iso(workflow["created_at"]),
+                    "updated_at": _iso(workflow["updated_at"]),
+                    "completed_at": _iso(workflow["updated_at"]) if finished else None,
+                    "eta_seconds": eta_seconds,
+                    "steps_completed": [s["step_id"] for s in completed],
+                    "steps_failed": [
+                        s["step_id"]
+                        for s in workflow["steps"]
+                        if s["status"] == "failed"
                     ],
-                    "next_steps": [],
+                    "total_steps": workflow["total_steps"],
                 },
             }
         except Exception as e:
@@ -173,3 +237,67 @@ class OrchestratorAgent(BasePydanticAgent):
         """
         result = await self.handle_full_research_workflow(user_prompt)
         return f"Workflow {result['workflow_id']} completed with status: {result['status']}"
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+def _workflow_prompt(
+    user_query: str,
+    initial_document_mcp_paths: Optional[List[str]],
+    workflow_options: Optional[dict],
+) -> str:
+    """The orchestration prompt for a full research workflow request."""
+    # Enhanced orchestration prompt with ChromaDB tool awareness
+    return (
+        "You are the Orchestrator Agent responsible for coordinating complex workflows for SafeAppealNavigator, "
+        "a specialized legal case management system for WorkSafe BC and WCAT appeals. "
+        "Your primary goal is to fulfill the user's request using the most appropriate tools available.\n\n"
+        "**SafeAppealNavigator Context:**\n"
+        "This system helps injured workers, legal advocates, and families navigate Workers' Compensation appeals. "
+        "You coordinate database operations, legal document processing, research, and case management workflows.\n\n"
+        "**Available ChromaDB Tools (Legal Case Management Database):**\n"
+        "• chroma_create_collection - Create specialized collections for legal case organization\n"
+        "• chroma_list_collections - List existing case management collections\n"
+        "• chroma_add_documents - Store legal documents, medical reports, WCAT decisions with embeddings\n"
+        "• chroma_query_documents - Perform semantic search for case precedents and similar documents\n"
+        "• chroma_get_documents - Retrieve case documents with legal metadata filtering\n"
+        "• chroma_update_documents - Modify case documents and legal metadata\n"
+        "• chroma_delete_documents - Remove outdated case documents\n"
+        "• chroma_get_collection_info - Get legal collection statistics and health metrics\n"
+        "• chroma_modify_collection - Optimize collections for legal document search performance\n"
+        "• chroma_peek_collection - Preview legal collection contents and structure\n"
+        "• chroma_delete_collection - Remove entire legal collections (use with extreme caution)\n\n"
+        "**SafeAppealNavigator Database Collections Framework:**\n"
+        "When creating databases for 'the app', establish these legal case management collections:\n"
+        "• **case_files** - Primary case documents, correspondence, claim forms, decision letters\n"
+        "• **medical_records** - Medical reports, assessments, treatment records, IME reports\n"
+        "• **wcat_decisions** - WCAT precedent decisions, similar cases, appeal outcomes\n"
+        "• **legal_policies** - WorkSafe BC policies, procedures, regulations, guidelines\n"
+        "• **templates** - Appeal letter templates, legal document formats, form templates\n"
+        "• **research_findings** - Legal research results, precedent analysis, case law summaries\n\n"
+        "**Task Analysis Framework for Legal Cases:**\n"
+        "1. **Simple Questions** → Provide direct response with legal context\n"
+        "2. **Database Setup for App** → Create comprehensive legal case management database with all 6 collections\n"
+        "3. **Document Processing** → Handle legal documents, medical reports, WCAT decisions\n"
+        "4. **Legal Research** → Search for precedents, policies, similar cases\n"
+        "5. **Case Management** → Organize evidence, timelines, appeal preparation\n\n"
+        "**Database Creation Best Practices:**\n"
+        "• Use descriptive collection names that reflect legal case organization\n"
+        "• Configure optimal HNSW parameters for legal document similarity search\n"
+        "• Set up metadata schemas appropriate for legal case management\n"
+        "• Consider user's jurisdiction (primarily BC WorkSafe and WCAT)\n"
+        "• Optimize for semantic search across legal and medical terminology\n\n"
+        f"**Current User Query:** '{user_query}'\n"
+        f"**Initial Documents:** {initial_document_mcp_paths or 'None provided'}\n"
+        f"**Workflow Options:** {workflow_options or 'Default settings'}\n\n"
+        "**Analysis Required:**\n"
+        "If this is a database setup request for SafeAppealNavigator, create the comprehensive 6-collection "
+        "legal case management system. If it's document processing, research, or case management, use the "
+        "appropriate tools and provide legal context in your response.\n\n"
+        "Proceed with analyzing the request and using the most appropriate ChromaDB tools or other capabilities. "
+        "Always provide clear explanations of what you're creating and why it's optimized for legal case management."
+    )
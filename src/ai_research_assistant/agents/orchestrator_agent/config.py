@@ -1,5 +1,5 @@
 # File: src/ai_research_assistant/agents/orchestrator_agent/config.py
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from pydantic import Field
 
@@ -50,5 +50,17 @@ class OrchestratorAgentConfig(BasePydanticAgentConfig):
         "• Coordinate efficiently while ensuring comprehensive legal case management"
     )
 
+    # Long AG-UI threads are summarized down to this many history tokens
+    # when HISTORY_COMPACTION_ENABLED is set
+    history_token_budget: Optional[int] = 12000
+    history_keep_recent: int = 8
+    history_summary_model: Optional[str] = "gemini-2.5-flash"
+
+    # SQLite file holding workflow checkpoints (None uses AGENT_STATE_DB_PATH)
+    workflow_state_db_path: Optional[str] = None
+    # Directory for workflow summary reports (None uses a workflow_reports
+    # directory next to the workflow state database)
+    workflow_report_dir: Optional[str] = None
+
     # Custom settings for the Orchestrator agent
     custom_settings: Dict[str, Any] = Field(default_factory=dict)
@@ -85,7 +85,9 @@ class BrowserAgent(BasePydanticAgent):
 
         try:
             # Use PydanticAI's native run method
-            result = await self.pydantic_agent.run(prompt_for_llm)
+            result = await self._instrumented_run(
+                prompt_for_llm, skill="conduct_comprehensive_research"
+            )
 
             # For now, we return the direct output. In a more advanced implementation,
             # you would parse this output into the LegalResearchFindingsSummary model.
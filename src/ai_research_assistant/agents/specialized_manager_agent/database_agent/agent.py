@@ -85,7 +85,9 @@ class DatabaseAgent(BasePydanticAgent):
             )
 
             # Use PydanticAI's native run method
-            result = await self.pydantic_agent.run(query_prompt)
+            result = await self._instrumented_run(
+                query_prompt, skill="query_and_synthesize_report"
+            )
 
             # Generate report path and return structured response
             report_id = str(uuid.uuid4())
@@ -125,7 +127,9 @@ class DatabaseAgent(BasePydanticAgent):
 
         try:
             # Use PydanticAI's native run method with system prompt and ChromaDB tools
-            result = await self.pydantic_agent.run(user_prompt)
+            result = await self._instrumented_run(
+                user_prompt, skill="handle_user_request"
+            )
             return str(result)
 
         except Exception as e:
@@ -157,8 +161,9 @@ class DatabaseAgent(BasePydanticAgent):
             # Check if collection exists
             collection_exists = False
             try:
-                await self.pydantic_agent.run(
-                    f"Check if collection '{collection_name}' exists using chroma_get_collection_info tool"
+                await self._instrumented_run(
+                    f"Check if collection '{collection_name}' exists using chroma_get_collection_info tool",
+                    skill="intake_documents",
                 )
                 collection_exists = True
             except:
@@ -166,15 +171,17 @@ class DatabaseAgent(BasePydanticAgent):
 
             # Create collection if needed
             if not collection_exists and create_if_not_exists:
-                await self.pydantic_agent.run(
-                    f"Create a new collection named '{collection_name}' using chroma_create_collection tool"
+                await self._instrumented_run(
+                    f"Create a new collection named '{collection_name}' using chroma_create_collection tool",
+                    skill="intake_documents",
                 )
                 logger.info(f"Created new collection: {collection_name}")
 
             # Add documents to collection
-            result = await self.pydantic_agent.run(
+            result = await self._instrumented_run(
                 f"Add the following {len(documents)} documents to collection '{collection_name}' "
-                f"using chroma_add_documents tool. Documents: {documents}"
+                f"using chroma_add_documents tool. Documents: {documents}",
+                skill="intake_documents",
             )
 
             return {
@@ -214,8 +221,9 @@ class DatabaseAgent(BasePydanticAgent):
 
         try:
             # Query all documents from source collection
-            documents_result = await self.pydantic_agent.run(
-                f"Retrieve all documents from collection '{source_collection}' using chroma_get_documents tool"
+            documents_result = await self._instrumented_run(
+                f"Retrieve all documents from collection '{source_collection}' using chroma_get_documents tool",
+                skill="sort_documents_into_collections",
             )
 
             # Sort documents based on criteria
@@ -227,14 +235,16 @@ class DatabaseAgent(BasePydanticAgent):
                 filter_metadata = criterion_rule.get("filter_metadata", {})
 
                 # Create target collection if needed
-                await self.pydantic_agent.run(
-                    f"Create collection '{target_collection}' if it doesn't exist using chroma_create_collection"
+                await self._instrumented_run(
+                    f"Create collection '{target_collection}' if it doesn't exist using chroma_create_collection",
+                    skill="sort_documents_into_collections",
                 )
 
                 # Query and move matching documents
-                matching_docs_result = await self.pydantic_agent.run(
+                matching_docs_result = await self._instrumented_run(
                     f"Query documents from '{source_collection}' with metadata filter {filter_metadata} "
-                    f"and add them to '{target_collection}' collection"
+                    f"and add them to '{target_collection}' collection",
+                    skill="sort_documents_into_collections",
                 )
 
                 sorted_counts[target_collection] = "Documents sorted based on criteria"
@@ -270,8 +280,9 @@ class DatabaseAgent(BasePydanticAgent):
         try:
             if operation == "cleanup_empty_collections":
                 # List all collections and remove empty ones
-                collections_result = await self.pydantic_agent.run(
-                    "List all collections and delete any that have zero documents"
+                collections_result = await self._instrumented_run(
+                    "List all collections and delete any that have zero documents",
+                    skill="maintain_database",
                 )
                 return {
                     "status": "success",
@@ -288,9 +299,10 @@ class DatabaseAgent(BasePydanticAgent):
                     }
 
                 # Modify collection with optimized HNSW parameters
-                result = await self.pydantic_agent.run(
+                result = await self._instrumented_run(
                     f"Optimize collection '{collection_name}' by modifying its HNSW parameters "
-                    f"for better performance using chroma_modify_collection"
+                    f"for better performance using chroma_modify_collection",
+                    skill="maintain_database",
                 )
                 return {
                     "status": "success",
@@ -300,8 +312,9 @@ class DatabaseAgent(BasePydanticAgent):
 
             elif operation == "collection_stats":
                 # Get statistics for all collections
-                stats_result = await self.pydantic_agent.run(
-                    "Get count and info for all collections to generate database statistics"
+                stats_result = await self._instrumented_run(
+                    "Get count and info for all collections to generate database statistics",
+                    skill="maintain_database",
                 )
                 return {
                     "status": "success",
@@ -344,10 +357,11 @@ class DatabaseAgent(BasePydanticAgent):
 
         try:
             # Create collection with specific configuration
-            result = await self.pydantic_agent.run(
+            result = await self._instrumented_run(
                 f"Create a new collection named '{collection_name}' for {collection_type} documents. "
                 f"Use embedding function '{embedding_function or 'default'}' and metadata {metadata or {}}. "
-                f"Use chroma_create_collection tool with appropriate HNSW configuration."
+                f"Use chroma_create_collection tool with appropriate HNSW configuration.",
+                skill="create_specialized_collection",
             )
 
             return {
@@ -138,8 +138,8 @@ class DocumentAgent(BasePydanticAgent):
 
         try:
             # Use PydanticAI's native run method with file I/O tools
-            result = await self.pydantic_agent.run(
-                f"Read the document at path: {file_path}"
+            result = await self._instrumented_run(
+                f"Read the document at path: {file_path}", skill="read_document"
             )
 
             content = str(result)
@@ -153,9 +153,10 @@ class DocumentAgent(BasePydanticAgent):
 
             if extract_metadata:
                 # Extract basic metadata using LLM
-                metadata_result = await self.pydantic_agent.run(
+                metadata_result = await self._instrumented_run(
                     f"Extract key metadata from this document content:\n\n{content[:2000]}\n\n"
-                    "Return as JSON with keys: title, author, date, document_type, summary"
+                    "Return as JSON with keys: title, author, date, document_type, summary",
+                    skill="read_document",
                 )
                 try:
                     metadata = json.loads(str(metadata_result))
@@ -186,8 +187,9 @@ class DocumentAgent(BasePydanticAgent):
 
         try:
             # Use PydanticAI's native run method with read_multiple_files tool
-            result = await self.pydantic_agent.run(
-                f"Read multiple documents from these paths: {file_paths}"
+            result = await self._instrumented_run(
+                f"Read multiple documents from these paths: {file_paths}",
+                skill="read_multiple_documents",
             )
 
             documents = []
@@ -254,8 +256,9 @@ class DocumentAgent(BasePydanticAgent):
                     final_content = "\n".join(header_lines) + "\n\n" + content
 
             # Use PydanticAI's native run method with write_file tool
-            result = await self.pydantic_agent.run(
-                f"Write the following content to file at {file_path}:\n\n{final_content}"
+            result = await self._instrumented_run(
+                f"Write the following content to file at {file_path}:\n\n{final_content}",
+                skill="create_document",
             )
 
             return {
@@ -295,11 +298,12 @@ class DocumentAgent(BasePydanticAgent):
             template_content = template_result["content"]
 
             # Fill template with data using LLM
-            filled_result = await self.pydantic_agent.run(
+            filled_result = await self._instrumented_run(
                 f"Fill this template with the provided data.\n\n"
                 f"Template:\n{template_content}\n\n"
                 f"Data:\n{json.dumps(template_data, indent=2)}\n\n"
-                f"Replace all placeholders with appropriate data values."
+                f"Replace all placeholders with appropriate data values.",
+                skill="create_report_from_template",
             )
 
             filled_content = str(filled_result)
@@ -361,8 +365,9 @@ class DocumentAgent(BasePydanticAgent):
             new_content = existing_content + separator + content_to_append
 
             # Use PydanticAI's native run method to write back
-            result = await self.pydantic_agent.run(
-                f"Write the following updated content to file at {file_path}:\n\n{new_content}"
+            result = await self._instrumented_run(
+                f"Write the following updated content to file at {file_path}:\n\n{new_content}",
+                skill="append_to_document",
             )
 
             return {
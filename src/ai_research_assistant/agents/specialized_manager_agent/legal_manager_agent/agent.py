@@ -11,6 +11,12 @@ from ai_research_assistant.agents.base_pydantic_agent import (
 from ai_research_assistant.agents.specialized_manager_agent.legal_manager_agent.config import (
     LegalManagerAgentConfig,
 )
+from ai_research_assistant.core.workflow_engine import (
+    ArtifactRef,
+    NodeStatus,
+    WorkflowDAG,
+    WorkflowEngine,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +37,7 @@ class LegalManagerAgent(BasePydanticAgent):
             toolsets=toolsets,
         )
         self.config: LegalManagerAgentConfig = self.config  # type: ignore
+        self.workflow_engine = WorkflowEngine()
 
         logger.info(
             f"LegalManagerAgent '{self.config.agent_name}' initialized with "
@@ -108,7 +115,9 @@ class LegalManagerAgent(BasePydanticAgent):
             )
 
             # Use PydanticAI's native run method to generate memo content
-            memo_result = await self.pydantic_agent.run(memo_prompt)
+            memo_result = await self._instrumented_run(
+                memo_prompt, skill="draft_legal_memo"
+            )
 
             memo_content = str(memo_result)
 
@@ -151,7 +160,7 @@ class LegalManagerAgent(BasePydanticAgent):
             document_content = f"Mock content from {document_path}"
 
             # Verify citations using LLM with specific focus on legal standards
-            verification_result = await self.pydantic_agent.run(
+            verification_result = await self._instrumented_run(
                 f"Verify all legal citations in the following document using {citation_style} style:\n\n"
                 f"{document_content}\n\n"
                 f"Focus on:\n"
@@ -159,7 +168,8 @@ class LegalManagerAgent(BasePydanticAgent):
                 f"2. WorkSafe BC policy references\n"
                 f"3. Canadian case law citations using McGill Guide\n"
                 f"4. Statute and regulation citations\n"
-                f"Identify any incorrect citations and provide corrections."
+                f"Identify any incorrect citations and provide corrections.",
+                skill="verify_citations",
             )
 
             return {
@@ -210,7 +220,7 @@ class LegalManagerAgent(BasePydanticAgent):
             document_content = f"Mock legal document content from {document_path}"
 
             # Perform comprehensive review using LLM with legal expertise
-            review_result = await self.pydantic_agent.run(
+            review_result = await self._instrumented_run(
                 f"Perform a comprehensive legal review of the following SafeAppealNavigator document:\n\n"
                 f"{document_content}\n\n"
                 f"Review criteria: {review_criteria}\n\n"
@@ -220,7 +230,8 @@ class LegalManagerAgent(BasePydanticAgent):
                 f"3. Document structure and professional legal formatting\n"
                 f"4. Missing elements or sections for workers' compensation appeals\n"
                 f"5. Recommendations for strengthening legal arguments\n"
-                f"6. Compliance with WCAT appeal procedures and requirements"
+                f"6. Compliance with WCAT appeal procedures and requirements",
+                skill="review_legal_document",
             )
 
             return {
@@ -256,25 +267,49 @@ class LegalManagerAgent(BasePydanticAgent):
                 research_data = workflow_data.get("research_summary", {})
                 output_path = workflow_data.get("output_path")
 
-                # Draft memo based on research
-                memo_result = await self.draft_legal_memo(
-                    research_summary=research_data,
-                    memo_type="research_memo",
-                    output_path=output_path,
+                # Draft memo based on research, then verify the citations of the
+                # drafted memo once it exists (data dependency on its output path)
+                dag = WorkflowDAG(name=workflow_type)
+                dag.add_node(
+                    "draft_memo",
+                    self,
+                    "draft_legal_memo",
+                    parameters={
+                        "research_summary": research_data,
+                        "memo_type": "research_memo",
+                        "output_path": output_path,
+                    },
                 )
-
-                if memo_result["status"] == "success" and output_path:
-                    # Verify citations in the created memo
-                    citation_result = await self.verify_citations(
-                        document_path=output_path,
-                        citation_style=workflow_data.get("citation_style", "bluebook"),
+                if output_path:
+                    dag.add_node(
+                        "verify_citations",
+                        self,
+                        "verify_citations",
+                        parameters={
+                            "document_path": ArtifactRef("draft_memo", "output_path"),
+                            "citation_style": workflow_data.get(
+                                "citation_style", "bluebook"
+                            ),
+                        },
                     )
 
+                run = await self.workflow_engine.run(dag)
+                memo_result = run.output("draft_memo")
+                if memo_result is None:
+                    return {
+                        "status": "error",
+                        "workflow_type": workflow_type,
+                        "error": run.node_results["draft_memo"].error,
+                    }
+
+                citation_node = run.node_results.get("verify_citations")
+                if citation_node and citation_node.status is not NodeStatus.SKIPPED:
                     return {
                         "status": "success",
                         "workflow_type": workflow_type,
+                        "workflow": run.to_dict(),
                         "memo_result": memo_result,
-                        "citation_result": citation_result,
+                        "citation_result": run.output("verify_citations"),
                     }
 
                 return memo_result
@@ -284,7 +319,7 @@ class LegalManagerAgent(BasePydanticAgent):
                 appeal_type = workflow_data.get("appeal_type", "standard")
                 case_data = workflow_data.get("case_data", {})
 
-                workflow_result = await self.pydantic_agent.run(
+                workflow_result = await self._instrumented_run(
                     f"Coordinate comprehensive appeal preparation workflow for {appeal_type} WCAT appeal:\n\n"
                     f"Case Data: {case_data}\n\n"
                     f"Workflow should include:\n"
@@ -293,7 +328,8 @@ class LegalManagerAgent(BasePydanticAgent):
                     f"3. Appeal letter drafting\n"
                     f"4. Evidence summary preparation\n"
                     f"5. Citation verification\n"
-                    f"6. Final quality review"
+                    f"6. Final quality review",
+                    skill="manage_legal_workflow",
                 )
 
                 return {
@@ -50,17 +50,74 @@ class GlobalSettings(BaseSettings):
     AG_UI_BACKEND_PORT: int = 10200
     AG_UI_BACKEND_URL: str = f"http://{AG_UI_BACKEND_HOST}:{AG_UI_BACKEND_PORT}"
 
+    # AG-UI conversations kept in memory; the rest are spilled to SQLite
+    AG_UI_MAX_CONVERSATIONS: int = 500
+    AG_UI_CONVERSATION_IDLE_TTL_SECONDS: float = 1800.0
+    AG_UI_SPILL_DB_PATH: str = "./data/ag_ui/conversations.db"
+    # Durable conversation history (empty disables); writes are batched
+    AG_UI_CONVERSATION_DB_PATH: str = "./data/ag_ui/history.db"
+    AG_UI_CONVERSATION_BATCH_SIZE: int = 50
+    AG_UI_CONVERSATION_FLUSH_INTERVAL_SECONDS: float = 0.2
+    # Events kept per thread for replay to reconnecting websocket clients
+    AG_UI_EVENT_BUFFER_SIZE: int = 1000
+    # Messages in a connect snapshot; older history is paged with GET_MESSAGES
+    AG_UI_SNAPSHOT_WINDOW: int = 50
+    AG_UI_MESSAGE_PAGE_MAX: int = 200
+    # Tool outputs above this size are sent as artifact references
+    AG_UI_MAX_INLINE_TOOL_BYTES: int = 16384
+    AG_UI_ARTIFACT_DIR: str = "./data/ag_ui/artifacts"
+    # Runs in flight per thread, and how long runs outlive their socket
+    AG_UI_MAX_CONCURRENT_RUNS: int = 2
+    AG_UI_RUN_DISCONNECT_GRACE_SECONDS: float = 30.0
+    # Outbound websocket writer: queued events per connection, how long to
+    # wait for more text deltas to merge, and when to drop a stalled client
+    AG_UI_OUTBOUND_QUEUE_SIZE: int = 1000
+    AG_UI_COALESCE_WINDOW_SECONDS: float = 0.02
+    AG_UI_MAX_BATCH_EVENTS: int = 64
+    AG_UI_SLOW_CLIENT_TIMEOUT_SECONDS: float = 10.0
+    # Comment frames sent on idle SSE run streams (POST /ag_ui/runs)
+    AG_UI_SSE_KEEPALIVE_SECONDS: float = 15.0
+    # Shared state and pub/sub between backend workers: empty for a single
+    # worker, or redis://host:port/db (Redis or ag_ui_backend.resp_standin)
+    AG_UI_SHARED_BUS_URL: str = ""
+
     GRADIO_SERVER_PORT: int = 7860
 
     # Database Paths/URIs
     DATABASE_URL_SQLITE: str = "sqlite:///./data/sqlite/cases.db"
     CHROMA_DB_PATH: str = "./data/chroma_db"
+    # Agent metrics and workflow checkpoints (AgentStateManager)
+    AGENT_STATE_DB_PATH: str = "./data/agent_state.db"
     NEO4J_URI: str = "bolt://localhost:7687"
     NEO4J_USER: str = "neo4j"
     NEO4J_PASSWORD: str = "password"
 
     LOG_LEVEL: str = "INFO"
 
+    # Event loop callbacks blocking longer than this are reported (ms)
+    SLOW_CALLBACK_THRESHOLD_MS: int = 100
+
+    # Bearer token for the /debug/profile and /debug/slow-callbacks admin
+    # endpoints (not mounted if unset)
+    ADMIN_API_TOKEN: str | None = None
+
+    # Record/replay of LLM responses for offline benchmarks: "record" wraps
+    # the real models, "replay" answers from the fixtures without them.
+    # Latency scale 0 replays instantly. Unrecorded requests fail unless
+    # fallback is set, which answers them with the next unused recording
+    LLM_REPLAY_MODE: str = ""
+    LLM_REPLAY_DIR: str = "./benchmarks/fixtures/llm"
+    LLM_REPLAY_LATENCY_SCALE: float = 1.0
+    LLM_REPLAY_FALLBACK: bool = False
+
+    # Rolling summarization of long conversation histories sent to agents
+    # (see core.history_compaction). Off unless set; the budget, recent turns
+    # and summarizing model come from the receiving agent's history_* config
+    HISTORY_COMPACTION_ENABLED: bool = False
+
+    # Tracing: JSONL file that every service appends finished spans to
+    TRACE_EXPORT_PATH: str | None = None
+
     # Pydantic Settings configuration
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", extra="ignore"
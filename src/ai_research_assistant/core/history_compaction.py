@@ -0,0 +1,188 @@
+# src/ai_research_assistant/core/history_compaction.py
+"""
+Rolling summarization of long conversation histories.
+
+Once the history sent with a request grows past a token budget, the older
+turns are folded into a running summary and only the most recent turns are
+sent verbatim, preceded by one system message carrying the summary. Each
+refresh summarizes the previous summary plus the turns that have aged out
+since, so the cost of a refresh does not grow with the age of the thread.
+
+Histories are lists of AG-UI message dicts (``id``, ``role``, ``content``,
+optionally ``toolCalls``), as carried in ``SkillInvocation.parameters
+["history"]``.
+
+Compaction is opt-in with HISTORY_COMPACTION_ENABLED; compactor_for builds
+the compactor for an agent from the history_* fields of its config.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pydantic_ai import Agent
+
+from ..config.global_settings import settings
+from .unified_llm_factory import get_llm_factory
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_MESSAGE_ID = "history-summary"
+
+HISTORY_SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between a user and an "
+    "AI legal case assistant. Merge the existing summary with the new turns "
+    "into one updated summary. Keep facts, names, dates, claim and decision "
+    "numbers, documents referred to, decisions made and open questions; drop "
+    "pleasantries and repetition. Write plain prose of at most a few "
+    "paragraphs and reply with the summary only."
+)
+
+# Rough characters per token; close enough for a budget check and free
+CHARS_PER_TOKEN = 4
+# Per-message allowance for role and framing tokens
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# (previous summary, messages to fold in) -> updated summary
+Summarizer = Callable[[str, List[Dict[str, Any]]], Awaitable[str]]
+
+
+def _message_chars(message: Dict[str, Any]) -> int:
+    content = message.get("content")
+    chars = len(content) if isinstance(content, str) else 0
+    for tool_call in message.get("toolCalls") or ():
+        function = tool_call.get("function") or {}
+        chars += len(function.get("name", "")) + len(function.get("arguments", ""))
+    return chars
+
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Approximate prompt tokens taken by ``messages``."""
+    return sum(
+        _message_chars(message) // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+        for message in messages
+    )
+
+
+def build_summary_prompt(previous_summary: str, messages: List[Dict[str, Any]]) -> str:
+    """The user prompt asking a model to fold ``messages`` into the summary."""
+    transcript = "\n\n".join(
+        f"{message.get('role', 'unknown')}: {message.get('content') or ''}"
+        for message in messages
+    )
+    return (
+        f"Existing summary:\n{previous_summary or '(none yet)'}\n\n"
+        f"New turns:\n{transcript}\n\n"
+        "Updated summary:"
+    )
+
+
+@dataclass
+class HistorySummary:
+    """The running summary of the first ``covered`` messages of a history."""
+
+    text: str = ""
+    covered: int = 0
+
+    def message(self) -> Dict[str, Any]:
+        return {
+            "id": SUMMARY_MESSAGE_ID,
+            "role": "system",
+            "content": f"Summary of the earlier conversation:\n{self.text}",
+        }
+
+
+class HistoryCompactor:
+    """
+    Keeps a history within ``token_budget`` by summarizing all but the last
+    ``keep_recent`` messages with ``summarize``.
+
+    compact() is cheap and synchronous: it applies the summary that already
+    exists. refresh() makes the model call and is meant to run in the
+    background whenever needs_refresh() says the compacted history is over
+    budget, so requests never wait for a summary.
+    """
+
+    def __init__(
+        self, summarize: Summarizer, token_budget: int, keep_recent: int = 6
+    ) -> None:
+        self.summarize = summarize
+        self.token_budget = token_budget
+        self.keep_recent = max(0, keep_recent)
+
+    def compact(
+        self, history: List[Dict[str, Any]], summary: HistorySummary
+    ) -> List[Dict[str, Any]]:
+        """``history`` with its summarized prefix replaced by the summary."""
+        if summary.covered <= 0 or summary.covered > len(history):
+            return history
+        return [summary.message()] + history[summary.covered :]
+
+    def needs_refresh(
+        self, history: List[Dict[str, Any]], summary: HistorySummary
+    ) -> bool:
+        """True if the compacted history is over budget and can shrink further."""
+        if len(history) - self.keep_recent <= summary.covered:
+            return False
+        return estimate_tokens(self.compact(history, summary)) > self.token_budget
+
+    async def refresh(
+        self, history: List[Dict[str, Any]], summary: HistorySummary
+    ) -> HistorySummary:
+        """
+        Folds the messages between ``summary.covered`` and the last
+        ``keep_recent`` into a new summary; ``summary`` itself is not changed.
+        """
+        end = len(history) - self.keep_recent
+        if end <= summary.covered:
+            return summary
+        folded = history[summary.covered : end]
+        text = await self.summarize(summary.text, folded)
+        logger.debug(
+            f"Folded {len(folded)} messages into history summary "
+            f"({summary.covered} -> {end} covered)"
+        )
+        return HistorySummary(text=text.strip(), covered=end)
+
+
+def llm_summarizer(get_model: Callable[[], Any]) -> Summarizer:
+    """
+    A Summarizer backed by a PydanticAI agent on the model returned by
+    ``get_model``, which is only called (once) when the first summary is due.
+    """
+    summary_agent: Optional[Agent] = None
+
+    async def summarize(previous_summary: str, messages: List[Dict[str, Any]]) -> str:
+        nonlocal summary_agent
+        if summary_agent is None:
+            summary_agent = Agent(
+                get_model(), system_prompt=HISTORY_SUMMARY_INSTRUCTIONS
+            )
+        result = await summary_agent.run(
+            build_summary_prompt(previous_summary, messages)
+        )
+        return str(result.output)
+
+    return summarize
+
+
+def compactor_for(agent_config: Any) -> Optional[HistoryCompactor]:
+    """
+    The compactor for histories sent to the agent configured by
+    ``agent_config`` (a BasePydanticAgentConfig), or None if compaction is
+    not enabled or the agent has no history_token_budget. The summarizing
+    model is history_summary_model, else the agent's llm_model.
+    """
+    if not settings.HISTORY_COMPACTION_ENABLED:
+        return None
+    if agent_config.history_token_budget is None:
+        return None
+    model_config = {
+        "provider": agent_config.history_summary_provider,
+        "model_name": agent_config.history_summary_model or agent_config.llm_model,
+    }
+    return HistoryCompactor(
+        llm_summarizer(lambda: get_llm_factory().create_llm_from_config(model_config)),
+        token_budget=agent_config.history_token_budget,
+        keep_recent=agent_config.history_keep_recent,
+    )
@@ -0,0 +1,225 @@
+# src/ai_research_assistant/core/loop_monitor.py
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from ai_research_assistant.core.metrics import (
+    EVENT_LOOP_LAG,
+    admin_token_error,
+    metrics_registry,
+)
+
+logger = logging.getLogger(__name__)
+
+EVENT_LOOP_LAG_LAST = metrics_registry.gauge(
+    "event_loop_lag_last_seconds",
+    "Most recent event loop lag sample.",
+)
+SLOW_CALLBACKS = metrics_registry.counter(
+    "event_loop_slow_callbacks",
+    "Loop stalls longer than the slow-callback threshold.",
+)
+SLOW_CALLBACK_DURATION = metrics_registry.histogram(
+    "event_loop_slow_callback_seconds",
+    "How long slow callbacks blocked the event loop.",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+
+class EventLoopLagMonitor:
+    """
+    Measures event loop lag by sleeping for a fixed interval and recording how
+    much later than requested the loop woke the sampler up.
+    """
+
+    def __init__(self, interval: float = 0.5) -> None:
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Starts sampling on the running loop. Calling it twice is a no-op."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - scheduled - self.interval)
+            EVENT_LOOP_LAG.observe(lag)
+            EVENT_LOOP_LAG_LAST.set(lag)
+
+
+@dataclass
+class SlowCallbackRecord:
+    """A single stall of the event loop."""
+
+    started_at: float
+    duration_seconds: float
+    stack: Optional[List[str]]
+    task: Optional[str] = None
+
+
+class SlowCallbackDetector:
+    """
+    Detects callbacks that block the event loop for longer than ``threshold``.
+
+    The loop re-arms a cheap heartbeat every ``threshold / 4`` seconds. A
+    watchdog thread notices when the heartbeat is overdue and captures the loop
+    thread's stack while the offending code is still running, so the record
+    points at the blocking call rather than at the callback that follows it.
+    """
+
+    def __init__(self, threshold: float = 0.1, max_records: int = 100) -> None:
+        if threshold <= 0:
+            raise ValueError("threshold must be positive")
+        self.threshold = threshold
+        self.records: Deque[SlowCallbackRecord] = deque(maxlen=max_records)
+        self.total = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._last_beat = 0.0
+        self._pending: Optional[Dict[str, Any]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._watchdog is not None and self._watchdog.is_alive()
+
+    @property
+    def _beat_interval(self) -> float:
+        return self.threshold / 4
+
+    def start(self) -> None:
+        """Starts watching the running loop. Calling it twice is a no-op."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop_event.clear()
+        self._last_beat = time.monotonic()
+        self._handle = self._loop.call_later(self._beat_interval, self._beat)
+        self._watchdog = threading.Thread(
+            target=self._watch, name="slow-callback-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._stop_event.set()
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    def _beat(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            stall = now - self._last_beat - self._beat_interval
+            pending, self._pending = self._pending, None
+            self._last_beat = now
+        if stall >= self.threshold or pending is not None:
+            self._record(
+                SlowCallbackRecord(
+                    started_at=time.time() - stall,
+                    duration_seconds=max(stall, 0.0),
+                    stack=pending["stack"] if pending else None,
+                    task=pending["task"] if pending else None,
+                )
+            )
+        if self._loop is not None and not self._stop_event.is_set():
+            self._handle = self._loop.call_later(self._beat_interval, self._beat)
+
+    def _watch(self) -> None:
+        while not self._stop_event.wait(self._beat_interval):
+            with self._lock:
+                overdue = time.monotonic() - self._last_beat - self._beat_interval
+                if overdue < self.threshold or self._pending is not None:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread_id)
+                self._pending = {
+                    "stack": traceback.format_stack(frame, limit=30) if frame else None,
+                    "task": self._current_task_name(),
+                }
+
+    def _current_task_name(self) -> Optional[str]:
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            return None
+        return task.get_name() if task is not None else None
+
+    def _record(self, record: SlowCallbackRecord) -> None:
+        self.total += 1
+        self.records.append(record)
+        SLOW_CALLBACKS.inc()
+        SLOW_CALLBACK_DURATION.observe(record.duration_seconds)
+        location = record.stack[-1].strip().splitlines()[0] if record.stack else "?"
+        logger.warning(
+            f"Event loop blocked for {record.duration_seconds * 1000:.0f} ms "
+            f"(task={record.task}) at {location}"
+        )
+
+    def snapshot(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        records = list(self.records)[::-1]
+        if limit is not None:
+            records = records[:limit]
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "running": self.running,
+            "total": self.total,
+            "slow_callbacks": [asdict(record) for record in records],
+        }
+
+
+def make_slow_callbacks_endpoint(
+    detector: SlowCallbackDetector, admin_token: str
+) -> Callable[[Request], Awaitable[Response]]:
+    """
+    Builds GET /debug/slow-callbacks, the most recent loop stalls recorded by
+    ``detector`` with their stacks, guarded by ``Authorization: Bearer
+    <admin_token>``.
+    """
+
+    async def slow_callbacks_endpoint(request: Request) -> Response:
+        unauthorized = admin_token_error(request, admin_token)
+        if unauthorized is not None:
+            return unauthorized
+        try:
+            limit = int(request.query_params.get("limit", 20))
+        except ValueError:
+            return JSONResponse(
+                {"status": "error", "error": "limit must be an integer"},
+                status_code=400,
+            )
+        return JSONResponse(detector.snapshot(limit=max(limit, 0)))
+
+    return slow_callbacks_endpoint
@@ -0,0 +1,565 @@
+# src/ai_research_assistant/core/metrics.py
+"""
+In-process performance metrics with OpenMetrics/Prometheus text exposition.
+
+Instruments are plain in-memory values guarded by a lock, so recording a sample
+never touches SQLite or the network. instrument_app() adds a /metrics endpoint
+and request timing to any Starlette/FastAPI app (A2A agent apps and the AG-UI
+backend).
+"""
+
+import bisect
+import logging
+import math
+import secrets
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+class _Metric:
+    """Base class for a labelled metric family."""
+
+    metric_type = ""
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if len(labels) != len(self.labelnames) or set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} expects labels {list(self.labelnames)}, "
+                f"got {sorted(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def clear(self) -> None:
+        """Drops all recorded label sets."""
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value; exposed with a _total suffix."""
+
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only be incremented")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            return [
+                (f"{self.name}_total", self._labels(key), value)
+                for key, value in self._values.items()
+            ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed when scraped."""
+
+    metric_type = "gauge"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._functions: Dict[LabelValues, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float], **labels: Any) -> None:
+        """Evaluates function on every scrape instead of storing a value."""
+        key = self._key(labels)
+        with self._lock:
+            self._functions[key] = function
+
+    def value(self, **labels: Any) -> float:
+        key = self._key(labels)
+        with self._lock:
+            function = self._functions.get(key)
+            if function is None:
+                return self._values.get(key, 0.0)
+        return float(function())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+            self._functions.clear()
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for key, function in functions.items():
+            try:
+                values[key] = float(function())
+            except Exception as e:
+                logger.warning(f"Gauge callback for {self.name} failed: {e}")
+        return [(self.name, self._labels(key), value) for key, value in values.items()]
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        if "le" in self.labelnames:
+            raise ValueError("Histograms cannot use the reserved label 'le'")
+        self.buckets = tuple(sorted(float(bound) for bound in buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [per-bucket counts (+Inf last), sum, count]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels: Any) -> "_Timer":
+        """Context manager observing the elapsed wall time of its block."""
+        return _Timer(self, labels)
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[2] if state else 0
+
+    def sum(self, **labels: Any) -> float:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[1] if state else 0.0
+
+    def samples(self) -> List[Sample]:
+        samples: List[Sample] = []
+        with self._lock:
+            items = [
+                (key, list(state[0]), state[1], state[2])
+                for key, state in self._values.items()
+            ]
+        for key, bucket_counts, total, count in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), bucket_counts):
+                cumulative += bucket_count
+                samples.append(
+                    (
+                        f"{self.name}_bucket",
+                        {**labels, "le": _format_value(bound)},
+                        cumulative,
+                    )
+                )
+            samples.append((f"{self.name}_count", labels, count))
+            samples.append((f"{self.name}_sum", labels, total))
+        return samples
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Dict[str, Any]) -> None:
+        self.histogram = histogram
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together on /metrics."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: type, name: str, *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(
+                    f"Metric {name} is already registered as a {metric.metric_type}"
+                )
+            return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(
+            Histogram, name, documentation, labelnames, buckets=buckets
+        )
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def clear(self) -> None:
+        """Resets every registered metric (mainly for tests)."""
+        for metric in list(self._metrics.values()):
+            metric.clear()
+
+    def render(self, openmetrics: bool = True) -> str:
+        """
+        Renders all metrics in the OpenMetrics 1.0 text format, or in the
+        Prometheus 0.0.4 text format when openmetrics is False.
+        """
+        lines: List[str] = []
+        for name in sorted(self._metrics):
+            metric = self._metrics[name]
+            family = name
+            if not openmetrics and isinstance(metric, Counter):
+                family = f"{name}_total"
+            lines.append(f"# HELP {family} {metric.documentation}")
+            lines.append(f"# TYPE {family} {metric.metric_type}")
+            for sample_name, labels, value in metric.samples():
+                if labels:
+                    label_text = ",".join(
+                        f'{key}="{_escape_label(val)}"' for key, val in labels.items()
+                    )
+                    lines.append(
+                        f"{sample_name}{{{label_text}}} {_format_value(value)}"
+                    )
+                else:
+                    lines.append(f"{sample_name} {_format_value(value)}")
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+# Global registry shared by every component of the process
+metrics_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Returns the process-wide metrics registry."""
+    return metrics_registry
+
+
+# --- Standard instruments ---
+
+HTTP_REQUEST_DURATION = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route.",
+    ("service", "method", "route", "status"),
+)
+SKILL_DURATION = metrics_registry.histogram(
+    "agent_skill_duration_seconds",
+    "Agent skill execution latency.",
+    ("agent", "skill", "status"),
+)
+LLM_REQUEST_DURATION = metrics_registry.histogram(
+    "llm_request_duration_seconds",
+    "Wall time of agent LLM runs, including tool calls.",
+    ("agent", "skill", "status"),
+)
+LLM_TIME_TO_FIRST_RESPONSE = metrics_registry.histogram(
+    "llm_time_to_first_response_seconds",
+    "Time from the start of an agent run to the first model response.",
+    ("agent", "skill"),
+)
+LLM_MODEL_REQUESTS = metrics_registry.counter(
+    "llm_model_requests",
+    "Model round-trips made by agent runs.",
+    ("agent", "skill"),
+)
+LLM_RETRIES = metrics_registry.counter(
+    "llm_retries",
+    "Retry prompts sent back to the model (validation or tool retries).",
+    ("agent", "skill"),
+)
+LLM_TOKENS = metrics_registry.counter(
+    "llm_tokens",
+    "LLM tokens consumed, by direction (in = prompt, out = completion).",
+    ("agent", "skill", "direction"),
+)
+LLM_TOOL_DURATION = metrics_registry.histogram(
+    "llm_tool_duration_seconds",
+    "Latency of tool calls made by the model during agent runs.",
+    ("agent", "tool", "status"),
+)
+RATE_LIMIT_WAIT = metrics_registry.histogram(
+    "rate_limiter_wait_seconds",
+    "Time spent waiting on client-side rate limits and retry backoff.",
+    ("provider", "reason"),
+)
+TASKS_QUEUED = metrics_registry.gauge(
+    "agent_tasks_queued",
+    "Tasks waiting for a ResourceManager execution slot.",
+)
+TASKS_RUNNING = metrics_registry.gauge(
+    "agent_tasks_running",
+    "Tasks currently executing under a ResourceManager.",
+)
+WEBSOCKET_CONNECTIONS = metrics_registry.gauge(
+    "ag_ui_websocket_connections",
+    "Open AG-UI websocket connections.",
+)
+AG_UI_CONVERSATIONS = metrics_registry.gauge(
+    "ag_ui_conversations_in_memory",
+    "AG-UI conversations currently held in memory.",
+)
+AG_UI_CONVERSATION_EVICTIONS = metrics_registry.counter(
+    "ag_ui_conversation_evictions",
+    "AG-UI conversations spilled to disk, by reason (capacity or idle).",
+    ("reason",),
+)
+AG_UI_CONVERSATION_REHYDRATIONS = metrics_registry.counter(
+    "ag_ui_conversation_rehydrations",
+    "AG-UI conversations loaded back into memory from the spill store.",
+)
+EVENT_LOOP_LAG = metrics_registry.histogram(
+    "event_loop_lag_seconds",
+    "Delay between when a loop callback was due and when it ran.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+
+# --- Starlette/FastAPI integration ---
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Serves the registry, negotiating OpenMetrics vs Prometheus text."""
+    openmetrics = "application/openmetrics-text" in request.headers.get("accept", "")
+    return Response(
+        metrics_registry.render(openmetrics=openmetrics),
+        media_type=OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE,
+    )
+
+
+def admin_token_error(request: Request, admin_token: str) -> Optional[Response]:
+    """
+    None if the request presents ``Authorization: Bearer <admin_token>``, else
+    the 401 response to return. Guards the /debug endpoints.
+    """
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and secrets.compare_digest(
+        token.encode(), admin_token.encode()
+    ):
+        return None
+    return JSONResponse({"status": "error", "error": "Unauthorized"}, status_code=401)
+
+
+def _route_template(scope: Scope) -> str:
+    """Returns the matching route path so labels stay low-cardinality."""
+    for route in getattr(scope.get("app"), "routes", []):
+        match, _ = route.matches(scope)
+        if match is Match.FULL:
+            return getattr(route, "path", scope["path"])
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording HTTP request latency and running the event loop
+    lag monitor and, if given, a slow-callback detector for the lifetime of the
+    application.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        service: str = "app",
+        slow_callback_detector: Optional[Any] = None,
+    ) -> None:
+        self.app = app
+        self.service = service
+        self.slow_callback_detector = slow_callback_detector
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            from ai_research_assistant.core.loop_monitor import EventLoopLagMonitor
+
+            monitor = EventLoopLagMonitor()
+            monitor.start()
+            if self.slow_callback_detector is not None:
+                self.slow_callback_detector.start()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                if self.slow_callback_detector is not None:
+                    self.slow_callback_detector.stop()
+                await monitor.stop()
+            return
+
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = _route_template(scope)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                service=self.service,
+                method=scope["method"],
+                route=route,
+                status=str(status_code),
+            )
+
+
+def instrument_app(
+    app: Any,
+    service: str,
+    slow_callback_threshold: Optional[float] = None,
+    admin_token: Optional[str] = None,
+) -> Any:
+    """
+    Adds request metrics and a GET /metrics endpoint to a Starlette app, and
+    watches its event loop with a slow-callback detector of its own, kept in
+    ``app.state.slow_callback_detector``. ``slow_callback_threshold`` (seconds)
+    is how long a callback may block the loop before it is reported.
+
+    When ``admin_token`` is set, callers presenting it as a bearer token can
+    read GET /debug/slow-callbacks (recent stalls with their stacks) and run
+    the sampling profiler with GET /debug/profile.
+    """
+    from ai_research_assistant.core.loop_monitor import (
+        SlowCallbackDetector,
+        make_slow_callbacks_endpoint,
+    )
+    from ai_research_assistant.core.profiler import make_profile_endpoint
+
+    detector = (
+        SlowCallbackDetector(threshold=slow_callback_threshold)
+        if slow_callback_threshold is not None
+        else SlowCallbackDetector()
+    )
+    app.state.slow_callback_detector = detector
+    app.add_middleware(
+        MetricsMiddleware, service=service, slow_callback_detector=detector
+    )
+    app.add_route(
+        "/metrics", metrics_endpoint, methods=["GET"], include_in_schema=False
+    )
+    if admin_token:
+        app.add_route(
+            "/debug/slow-callbacks",
+            make_slow_callbacks_endpoint(detector, admin_token),
+            methods=["GET"],
+            include_in_schema=False,
+        )
+        app.add_route(
+            "/debug/profile",
+            make_profile_endpoint(admin_token),
+            methods=["GET"],
+            include_in_schema=False,
+        )
+        logger.info(
+            f"Debug endpoints enabled at /debug/slow-callbacks and /debug/profile "
+            f"for {service}"
+        )
+    logger.info(f"Metrics endpoint enabled at /metrics for {service}")
+    return app
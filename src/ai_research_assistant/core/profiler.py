@@ -0,0 +1,214 @@
+# src/ai_research_assistant/core/profiler.py
+"""
+On-demand statistical profiling of a live process.
+
+SamplingProfiler snapshots every thread's Python stack from a background
+thread at a fixed interval and aggregates the samples into the collapsed-stack
+format read by flamegraph.pl, speedscope and similar tools. dump_asyncio_tasks
+describes what each pending task on the loop is currently awaiting.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+
+from ai_research_assistant.core.metrics import admin_token_error
+
+logger = logging.getLogger(__name__)
+
+MAX_PROFILE_SECONDS = 60.0
+MIN_INTERVAL_SECONDS = 0.001
+
+
+def _frame_label(frame: Any) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class SamplingProfiler:
+    """Samples the stacks of all threads (except its own) at ``interval``."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = max(interval, MIN_INTERVAL_SECONDS)
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            self.sample(exclude=own_id)
+
+    def sample(
+        self, exclude: Optional[int] = None, frames: Optional[Dict[int, Any]] = None
+    ) -> None:
+        """
+        Adds one sample of every thread's current stack, or of ``frames``
+        (thread id to innermost frame) when given.
+        """
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        if frames is None:
+            frames = sys._current_frames()
+        for thread_id, frame in frames.items():
+            if thread_id == exclude:
+                continue
+            labels: List[str] = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(names.get(thread_id, f"thread-{thread_id}"))
+            self.stacks[";".join(reversed(labels))] += 1
+        self.samples += 1
+
+    def collapsed(self) -> str:
+        """Samples as ``frame;frame;frame count`` lines, heaviest first."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+
+async def profile(duration: float, interval: float = 0.005) -> SamplingProfiler:
+    """Profiles the process for ``duration`` seconds without blocking the loop."""
+    profiler = SamplingProfiler(interval=interval)
+    profiler.start()
+    try:
+        await asyncio.sleep(duration)
+    finally:
+        await asyncio.to_thread(profiler.stop)
+    return profiler
+
+
+def _awaiting_chain(task: asyncio.Task) -> List[str]:
+    """
+    Follows cr_await/gi_yieldfrom from the task's coroutine down to the innermost
+    coroutine, then appends the future the task is blocked on.
+    """
+    chain: List[str] = []
+    current: Any = task.get_coro()
+    while current is not None and len(chain) < 50:
+        frame = getattr(current, "cr_frame", None) or getattr(current, "gi_frame", None)
+        if frame is None:
+            break
+        name = getattr(current, "__qualname__", type(current).__name__)
+        chain.append(f"{name} ({_frame_label(frame)})")
+        current = getattr(current, "cr_await", None) or getattr(
+            current, "gi_yieldfrom", None
+        )
+    waiter = getattr(task, "_fut_waiter", None)
+    if waiter is not None:
+        chain.append(repr(waiter))
+    return chain
+
+
+def dump_asyncio_tasks(
+    loop: Optional[asyncio.AbstractEventLoop] = None,
+) -> List[Dict[str, Any]]:
+    """Describes every pending task on the loop and what it is awaiting."""
+    loop = loop or asyncio.get_running_loop()
+    current = asyncio.current_task(loop)
+    tasks = []
+    for task in asyncio.all_tasks(loop):
+        coro = task.get_coro()
+        tasks.append(
+            {
+                "name": task.get_name(),
+                "coroutine": getattr(coro, "__qualname__", repr(coro)),
+                "current": task is current,
+                "awaiting": _awaiting_chain(task),
+                "stack": [_frame_label(frame) for frame in task.get_stack()],
+            }
+        )
+    return sorted(tasks, key=lambda task: task["name"])
+
+
+def make_profile_endpoint(
+    admin_token: str,
+) -> Callable[[Request], Awaitable[Response]]:
+    """
+    Builds GET /debug/profile, guarded by ``Authorization: Bearer <admin_token>``.
+
+    Query parameters: ``seconds`` (default 5, max 60), ``interval_ms`` (default
+    5) and ``tasks`` (``true`` to return JSON with the collapsed stacks plus an
+    asyncio task dump instead of the plain collapsed-stack file).
+    """
+    lock = asyncio.Lock()
+
+    async def profile_endpoint(request: Request) -> Response:
+        unauthorized = admin_token_error(request, admin_token)
+        if unauthorized is not None:
+            return unauthorized
+
+        try:
+            seconds = float(request.query_params.get("seconds", 5))
+            interval = float(request.query_params.get("interval_ms", 5)) / 1000
+        except ValueError:
+            return JSONResponse(
+                {"status": "error", "error": "seconds and interval_ms must be numbers"},
+                status_code=400,
+            )
+        if not 0 < seconds <= MAX_PROFILE_SECONDS:
+            return JSONResponse(
+                {
+                    "status": "error",
+                    "error": f"seconds must be in (0, {MAX_PROFILE_SECONDS:g}]",
+                },
+                status_code=400,
+            )
+        include_tasks = request.query_params.get("tasks", "").lower() in (
+            "1",
+            "true",
+            "yes",
+        )
+
+        if lock.locked():
+            return JSONResponse(
+                {"status": "error", "error": "A profile is already running"},
+                status_code=409,
+            )
+        async with lock:
+            logger.info(f"Profiling for {seconds:g}s at {interval * 1000:g}ms")
+            started = time.time()
+            tasks = dump_asyncio_tasks() if include_tasks else None
+            profiler = await profile(seconds, interval)
+
+        if tasks is None:
+            return PlainTextResponse(
+                profiler.collapsed(),
+                headers={
+                    "Content-Disposition": 'attachment; filename="profile.collapsed"'
+                },
+            )
+        return JSONResponse(
+            {
+                "status": "success",
+                "started_at": started,
+                "duration_seconds": seconds,
+                "samples": profiler.samples,
+                "collapsed": profiler.collapsed(),
+                "tasks": tasks,
+            }
+        )
+
+    return profile_endpoint
@@ -19,6 +19,8 @@ from enum import Enum
 from functools import wraps
 from typing import Any, Callable, Dict, Optional, Union
 
+from ai_research_assistant.core.metrics import RATE_LIMIT_WAIT
+
 logger = logging.getLogger(__name__)
 
 
@@ -171,6 +173,9 @@ class UniversalRateLimiter:
         if wait_time > 0:
             logger.info(f"Rate limit preventive wait: {wait_time:.2f}s")
             time.sleep(wait_time)
+        RATE_LIMIT_WAIT.observe(
+            wait_time, provider=self.config.provider.value, reason="throttle"
+        )
 
         # Consume tokens
         self.request_bucket.consume(1)
@@ -195,6 +200,9 @@ class UniversalRateLimiter:
         if wait_time > 0:
             logger.info(f"Rate limit preventive wait: {wait_time:.2f}s")
             await asyncio.sleep(wait_time)
+        RATE_LIMIT_WAIT.observe(
+            wait_time, provider=self.config.provider.value, reason="throttle"
+        )
 
         # Consume tokens
         self.request_bucket.consume(1)
@@ -375,6 +383,9 @@ class RateLimitedClient:
                     f"Rate limit hit (attempt {attempt + 1}), waiting {delay:.2f}s: {e}"
                 )
                 time.sleep(delay)
+                RATE_LIMIT_WAIT.observe(
+                    delay, provider=self.limiter.config.provider.value, reason="backoff"
+                )
 
         # Should never reach here
         raise RuntimeError("Retry logic error")
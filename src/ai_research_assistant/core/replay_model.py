@@ -0,0 +1,397 @@
+# src/ai_research_assistant/core/replay_model.py
+"""
+Record/replay wrapper for pydantic-ai models, for offline benchmarks.
+
+In record mode a RecordReplayModel forwards each request to the real model
+and appends the response to a JSON Lines fixture. The recorded response keeps
+its tool calls, its usage, and its timing: how long the request took, or for a
+stream the delay before each event. In replay mode no model is called. Each
+request is answered from the fixture with the recorded timing multiplied by
+``latency_scale``; 0 replays with no delay at all.
+
+A request is matched by a hash of the conversation so far, leaving out
+volatile fields such as timestamps, tool call ids and usage, plus the names
+of the tools offered. A request that was never recorded raises
+ReplayMissError. Load tests whose prompts differ from the recorded ones can
+set ``fallback`` to answer such requests with the next unused recording in
+file order instead.
+
+UnifiedLLMFactory applies the wrapper according to LLM_REPLAY_MODE.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set
+
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelMessagesTypeAdapter,
+    ModelResponse,
+    ModelResponseStreamEvent,
+    PartDeltaEvent,
+    PartStartEvent,
+    TextPart,
+    TextPartDelta,
+    ToolCallPart,
+    ToolCallPartDelta,
+)
+from pydantic_ai.models import Model, ModelRequestParameters, StreamedResponse
+from pydantic_ai.settings import ModelSettings
+from pydantic_ai.usage import Usage
+
+logger = logging.getLogger(__name__)
+
+REPLAY_MODES = ("record", "replay")
+
+# Differ between otherwise identical requests, so are not part of the key
+_VOLATILE_KEYS = frozenset(
+    {"timestamp", "tool_call_id", "usage", "vendor_id", "vendor_details", "model_name"}
+)
+
+
+class ReplayMissError(LookupError):
+    """No recording is left to answer a request in replay mode."""
+
+
+def _strip_volatile(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: _strip_volatile(item)
+            for key, item in value.items()
+            if key not in _VOLATILE_KEYS
+        }
+    if isinstance(value, list):
+        return [_strip_volatile(item) for item in value]
+    return value
+
+
+def request_key(
+    messages: List[ModelMessage], model_request_parameters: ModelRequestParameters
+) -> str:
+    """Stable hash identifying a request across runs."""
+    tools = (
+        model_request_parameters.function_tools + model_request_parameters.output_tools
+    )
+    payload = {
+        "messages": _strip_volatile(
+            ModelMessagesTypeAdapter.dump_python(messages, mode="json")
+        ),
+        # Names only: providers rewrite schemas when customizing parameters
+        "tools": sorted(tool.name for tool in tools),
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def fixture_path(directory: str, provider: str, model_name: str) -> str:
+    """The fixture file for one provider's model."""
+    name = re.sub(r"[^A-Za-z0-9._-]+", "_", f"{provider}-{model_name}")
+    return os.path.join(directory, f"{name}.jsonl")
+
+
+def _dump_response(response: ModelResponse) -> Dict[str, Any]:
+    return ModelMessagesTypeAdapter.dump_python([response], mode="json")[0]
+
+
+def _load_response(data: Dict[str, Any]) -> ModelResponse:
+    return ModelMessagesTypeAdapter.validate_python([data])[0]
+
+
+class ReplayFixture:
+    """The recordings of one model, read from and appended to a JSONL file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.recordings: List[Dict[str, Any]] = []
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.recordings = [json.loads(line) for line in f if line.strip()]
+        self._by_key: Dict[str, Deque[int]] = {}
+        for index, recording in enumerate(self.recordings):
+            self._index(index, recording)
+        self._used: Set[int] = set()
+        self._next_unused = 0
+
+    def append(self, recording: Dict[str, Any]) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # One line per write, so concurrent recorders do not interleave
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(recording, separators=(",", ":")) + "\n")
+        self.recordings.append(recording)
+        self._index(len(self.recordings) - 1, recording)
+
+    def _index(self, index: int, recording: Dict[str, Any]) -> None:
+        self._by_key.setdefault(recording["key"], deque()).append(index)
+
+    def take(self, key: str, fallback: bool = False) -> Dict[str, Any]:
+        """
+        The recording answering ``key``.
+
+        Recordings of the same request are replayed in order, the last one
+        repeating. A request never recorded raises ReplayMissError, or with
+        ``fallback`` gets the next unused recording, starting over once all
+        have been used, so that a load test can send more requests than were
+        recorded.
+        """
+        indexes = self._by_key.get(key)
+        if indexes:
+            index = indexes.popleft() if len(indexes) > 1 else indexes[0]
+            self._used.add(index)
+            return self.recordings[index]
+        if not fallback:
+            raise ReplayMissError(
+                f"No recording of request {key[:12]} in {self.path}; "
+                f"record it with LLM_REPLAY_MODE=record"
+            )
+        if not self.recordings:
+            raise ReplayMissError(f"No recordings in {self.path}")
+        while self._next_unused in self._used:
+            self._next_unused += 1
+        if self._next_unused >= len(self.recordings):
+            self._used.clear()
+            self._next_unused = 0
+        index = self._next_unused
+        self._used.add(index)
+        logger.warning(
+            f"Request {key[:12]} was not recorded in {self.path}; "
+            f"replaying recording {index} instead"
+        )
+        return self.recordings[index]
+
+
+def _event_record(event: ModelResponseStreamEvent) -> Optional[Dict[str, Any]]:
+    """What is needed to replay a stream event through a parts manager."""
+    if isinstance(event, PartStartEvent):
+        part = event.part
+        if isinstance(part, TextPart):
+            return {"index": event.index, "text": part.content}
+        if isinstance(part, ToolCallPart):
+            return {
+                "index": event.index,
+                "tool_name": part.tool_name,
+                "args": part.args,
+                "tool_call_id": part.tool_call_id,
+            }
+    elif isinstance(event, PartDeltaEvent):
+        delta = event.delta
+        if isinstance(delta, TextPartDelta):
+            return {"index": event.index, "text": delta.content_delta}
+        if isinstance(delta, ToolCallPartDelta):
+            return {
+                "index": event.index,
+                "tool_name": delta.tool_name_delta,
+                "args": delta.args_delta,
+                "tool_call_id": delta.tool_call_id,
+            }
+    return None
+
+
+def _events_from_response(response: ModelResponse) -> List[Dict[str, Any]]:
+    """Stream events for a response recorded without a stream."""
+    events = []
+    for index, part in enumerate(response.parts):
+        event = _event_record(PartStartEvent(index=index, part=part))
+        if event is not None:
+            events.append({"delay": 0.0, **event})
+    return events
+
+
+async def _sleep(seconds: float) -> None:
+    if seconds > 0:
+        await asyncio.sleep(seconds)
+
+
+@dataclass
+class _ReplayStreamedResponse(StreamedResponse):
+    """A stream replayed from a recording with its event timing."""
+
+    _model_name: str
+    _recording: Dict[str, Any]
+    _latency_scale: float = 1.0
+    _timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    async def _get_event_iterator(self) -> AsyncIterator[ModelResponseStreamEvent]:
+        response = _load_response(self._recording["response"])
+        events = self._recording.get("events")
+        if events is None:
+            events = _events_from_response(response)
+            await _sleep(self._recording.get("latency", 0.0) * self._latency_scale)
+        for event in events:
+            await _sleep(event["delay"] * self._latency_scale)
+            if "text" in event:
+                yield self._parts_manager.handle_text_delta(
+                    vendor_part_id=event["index"], content=event["text"]
+                )
+                continue
+            maybe_event = self._parts_manager.handle_tool_call_delta(
+                vendor_part_id=event["index"],
+                tool_name=event.get("tool_name"),
+                args=event.get("args"),
+                tool_call_id=event.get("tool_call_id"),
+            )
+            if maybe_event is not None:
+                yield maybe_event
+        self._usage = response.usage
+
+    @property
+    def model_name(self) -> str:
+        return self._model_name
+
+    @property
+    def timestamp(self) -> datetime:
+        return self._timestamp
+
+
+@dataclass
+class _RecordingStreamedResponse(StreamedResponse):
+    """Passes a real stream through, noting each event and the delay before it."""
+
+    _wrapped: StreamedResponse
+    _started: float
+    _events: List[Dict[str, Any]] = field(default_factory=list)
+
+    async def _get_event_iterator(self) -> AsyncIterator[ModelResponseStreamEvent]:
+        last = self._started
+        async for event in self._wrapped:
+            now = time.perf_counter()
+            record = _event_record(event)
+            if record is not None:
+                self._events.append({"delay": round(now - last, 6), **record})
+                last = now
+            yield event
+
+    def get(self) -> ModelResponse:
+        return self._wrapped.get()
+
+    def usage(self) -> Usage:
+        return self._wrapped.usage()
+
+    @property
+    def model_name(self) -> str:
+        return self._wrapped.model_name
+
+    @property
+    def timestamp(self) -> datetime:
+        return self._wrapped.timestamp
+
+
+class RecordReplayModel(Model):
+    """
+    Records a model's responses to a fixture, or replays them from it.
+
+    ``wrapped`` is the real model and is only needed to record: replaying
+    calls no provider, so needs neither network nor API key.
+    """
+
+    def __init__(
+        self,
+        fixture: ReplayFixture,
+        mode: str,
+        wrapped: Optional[Model] = None,
+        model_name: Optional[str] = None,
+        system: str = "replay",
+        latency_scale: float = 1.0,
+        fallback: bool = False,
+    ) -> None:
+        if mode not in REPLAY_MODES:
+            raise ValueError(f"Unknown replay mode '{mode}', expected {REPLAY_MODES}")
+        if mode == "record" and wrapped is None:
+            raise ValueError("Recording needs the model to record")
+        self.fixture = fixture
+        self.mode = mode
+        self.wrapped = wrapped
+        self.latency_scale = latency_scale
+        self.fallback = fallback
+        self._model_name = model_name or (wrapped.model_name if wrapped else "replay")
+        self._system = wrapped.system if wrapped else system
+
+    @property
+    def model_name(self) -> str:
+        return self._model_name
+
+    @property
+    def system(self) -> str:
+        return self._system
+
+    def customize_request_parameters(
+        self, model_request_parameters: ModelRequestParameters
+    ) -> ModelRequestParameters:
+        if self.wrapped is None:
+            return model_request_parameters
+        return self.wrapped.customize_request_parameters(model_request_parameters)
+
+    async def request(
+        self,
+        messages: List[ModelMessage],
+        model_settings: Optional[ModelSettings],
+        model_request_parameters: ModelRequestParameters,
+    ) -> ModelResponse:
+        key = request_key(messages, model_request_parameters)
+        if self.mode == "replay":
+            recording = self.fixture.take(key, self.fallback)
+            await _sleep(self._recorded_latency(recording) * self.latency_scale)
+            response = _load_response(recording["response"])
+            return replace(response, timestamp=datetime.now(timezone.utc))
+
+        started = time.perf_counter()
+        response = await self.wrapped.request(
+            messages, model_settings, model_request_parameters
+        )
+        self.fixture.append(
+            {
+                "key": key,
+                "latency": round(time.perf_counter() - started, 6),
+                "response": _dump_response(response),
+            }
+        )
+        return response
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: List[ModelMessage],
+        model_settings: Optional[ModelSettings],
+        model_request_parameters: ModelRequestParameters,
+    ) -> AsyncIterator[StreamedResponse]:
+        key = request_key(messages, model_request_parameters)
+        if self.mode == "replay":
+            recording = self.fixture.take(key, self.fallback)
+            yield _ReplayStreamedResponse(
+                _model_name=self.model_name,
+                _recording=recording,
+                _latency_scale=self.latency_scale,
+            )
+            return
+
+        started = time.perf_counter()
+        async with self.wrapped.request_stream(
+            messages, model_settings, model_request_parameters
+        ) as stream:
+            recording = _RecordingStreamedResponse(_wrapped=stream, _started=started)
+            yield recording
+        self.fixture.append(
+            {
+                "key": key,
+                "latency": round(time.perf_counter() - started, 6),
+                "response": _dump_response(recording.get()),
+                "events": recording._events,
+            }
+        )
+
+    @staticmethod
+    def _recorded_latency(recording: Dict[str, Any]) -> float:
+        # A streamed recording answered whole takes as long as its events did
+        if "events" in recording:
+            return sum(event["delay"] for event in recording["events"])
+        return recording.get("latency", 0.0)
@@ -4,12 +4,19 @@ import logging
 import time
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List
+from typing import Any, Awaitable, Callable, Dict, List
 
 # --- CORRECTED IMPORTS ---
 # Import the correct base agent class and the AgentTask model from core.models
 from ai_research_assistant.agents.base_pydantic_agent import BasePydanticAgent
+from ai_research_assistant.core.metrics import (
+    SKILL_DURATION,
+    TASKS_QUEUED,
+    TASKS_RUNNING,
+)
 from ai_research_assistant.core.models import AgentTask
+from ai_research_assistant.core.run_instrumentation import instrumentation_context
+from ai_research_assistant.core.tracing import start_span
 
 logger = logging.getLogger(__name__)
 
@@ -65,9 +72,14 @@ class ResourceManager:
         NOTE: Memory and priority logic is placeholder for future implementation.
         """
         logger.info(f"Submitting task {task.id} with priority {task.priority}")
+        TASKS_QUEUED.inc()
         async with self.resource_semaphore:
+            TASKS_QUEUED.dec()
+            TASKS_RUNNING.inc()
             task_id_str = str(task.id)
             self.running_tasks[task_id_str] = task
+            start = time.perf_counter()
+            status = "error"
             try:
                 # The BasePydanticAgent has a `run_skill` method, not `run_task`.
                 # This simulates calling that skill with a generic prompt.
@@ -77,14 +89,74 @@ class ResourceManager:
 
                 # Create a prompt from the task parameters for the agent to run.
                 prompt = f"Execute task '{task.task_type}' with parameters: {task.parameters}"
-                result = await agent.run_skill(prompt=prompt)
+                with (
+                    instrumentation_context(skill=task.task_type),
+                    start_span(
+                        f"skill {agent.agent_name}.{task.task_type}",
+                        attributes={"task.id": task_id_str},
+                    ),
+                ):
+                    result = await agent.run_skill(prompt=prompt)
+
+                status = "success"
+                return {"status": "success", "task_id": task_id_str, "result": result}
+            except Exception as e:
+                logger.error(f"Error executing task {task.id}: {e}", exc_info=True)
+                return {"status": "error", "task_id": task_id_str, "error": str(e)}
+            finally:
+                self.running_tasks.pop(task_id_str, None)
+                TASKS_RUNNING.dec()
+                SKILL_DURATION.observe(
+                    time.perf_counter() - start,
+                    agent=getattr(agent, "agent_name", type(agent).__name__),
+                    skill=task.task_type,
+                    status=status,
+                )
 
+    async def submit_skill(
+        self, task: AgentTask, skill: Callable[..., Awaitable[Any]]
+    ) -> Dict[str, Any]:
+        """
+        Runs a bound agent skill for a task under the same concurrency limits
+        as submit_task. The task parameters are passed as keyword arguments.
+        """
+        logger.info(f"Submitting skill task {task.id} ({task.task_type})")
+        owner = getattr(skill, "__self__", None)
+        agent_name = getattr(owner, "agent_name", type(owner).__name__)
+        TASKS_QUEUED.inc()
+        async with self.resource_semaphore:
+            TASKS_QUEUED.dec()
+            TASKS_RUNNING.inc()
+            task_id_str = str(task.id)
+            self.running_tasks[task_id_str] = task
+            start = time.perf_counter()
+            status = "error"
+            try:
+                with (
+                    instrumentation_context(skill=task.task_type),
+                    start_span(
+                        f"skill {agent_name}.{task.task_type}",
+                        attributes={"task.id": task_id_str},
+                    ) as span,
+                ):
+                    result = await skill(**task.parameters)
+                    if isinstance(result, dict) and result.get("status") == "error":
+                        span.record_error(result.get("error", "skill returned error"))
+                    else:
+                        status = "success"
                 return {"status": "success", "task_id": task_id_str, "result": result}
             except Exception as e:
                 logger.error(f"Error executing task {task.id}: {e}", exc_info=True)
                 return {"status": "error", "task_id": task_id_str, "error": str(e)}
             finally:
                 self.running_tasks.pop(task_id_str, None)
+                TASKS_RUNNING.dec()
+                SKILL_DURATION.observe(
+                    time.perf_counter() - start,
+                    agent=agent_name,
+                    skill=task.task_type,
+                    status=status,
+                )
 
     def get_resource_status(self) -> Dict[str, Any]:
         """Gets the current resource utilization status."""
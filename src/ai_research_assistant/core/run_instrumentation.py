@@ -0,0 +1,337 @@
+# src/ai_research_assistant/core/run_instrumentation.py
+"""
+Per-run instrumentation for PydanticAI agent runs.
+
+Every instrumented run produces an LLMRunRecord (wall time, time to first
+response, model round-trips, tool calls with latency, tokens and retries) that
+is handed to pluggable sinks: the in-process metrics registry, the
+AgentStateManager metric store, or a JSONL trace file.
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from pydantic_ai.messages import (
+    ModelRequest,
+    ModelResponse,
+    RetryPromptPart,
+    ToolCallPart,
+    ToolReturnPart,
+)
+
+from ai_research_assistant.core.metrics import (
+    LLM_MODEL_REQUESTS,
+    LLM_REQUEST_DURATION,
+    LLM_RETRIES,
+    LLM_TIME_TO_FIRST_RESPONSE,
+    LLM_TOKENS,
+    LLM_TOOL_DURATION,
+)
+from ai_research_assistant.core.state_manager import AgentStateManager
+from ai_research_assistant.core.tracing import start_span
+
+logger = logging.getLogger(__name__)
+
+_run_context: contextvars.ContextVar[Dict[str, Optional[str]]] = contextvars.ContextVar(
+    "llm_run_context", default={}
+)
+
+
+@contextmanager
+def instrumentation_context(
+    skill: Optional[str] = None, conversation_id: Optional[str] = None
+) -> Iterator[None]:
+    """
+    Tags every agent run started inside the block with a skill and/or
+    conversation. Values from an enclosing context are kept unless overridden.
+    """
+    current = dict(_run_context.get())
+    if skill is not None:
+        current["skill"] = skill
+    if conversation_id is not None:
+        current["conversation_id"] = conversation_id
+    token = _run_context.set(current)
+    try:
+        yield
+    finally:
+        _run_context.reset(token)
+
+
+def current_instrumentation_context() -> Dict[str, Optional[str]]:
+    return dict(_run_context.get())
+
+
+@dataclass
+class ToolCallRecord:
+    """A single tool invocation made by the model during a run."""
+
+    tool_name: str
+    duration_seconds: Optional[float]
+    status: str  # "success" or "retry"
+
+
+@dataclass
+class LLMRunRecord:
+    """Measurements for one agent run."""
+
+    agent: str
+    skill: str
+    conversation_id: Optional[str]
+    status: str
+    started_at: float
+    wall_time_seconds: float
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    time_to_first_response_seconds: Optional[float] = None
+    model_requests: int = 0
+    retries: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    tool_calls: List[ToolCallRecord] = field(default_factory=list)
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _int_attr(obj: Any, name: str) -> int:
+    value = getattr(obj, name, None)
+    return value if isinstance(value, int) else 0
+
+
+def _apply_result(record: LLMRunRecord, result: Any, started: datetime) -> None:
+    """Derives round-trips, tool calls, retries and tokens from a run result."""
+    new_messages = getattr(result, "new_messages", None)
+    messages = new_messages() if callable(new_messages) else []
+    if not isinstance(messages, list):
+        messages = []
+
+    first_response_at: Optional[datetime] = None
+    pending_calls: Dict[str, tuple] = {}
+    for message in messages:
+        if isinstance(message, ModelResponse):
+            record.model_requests += 1
+            if first_response_at is None:
+                first_response_at = message.timestamp
+            for part in message.parts:
+                if isinstance(part, ToolCallPart):
+                    pending_calls[part.tool_call_id] = (
+                        part.tool_name,
+                        message.timestamp,
+                    )
+        elif isinstance(message, ModelRequest):
+            for part in message.parts:
+                if isinstance(part, (ToolReturnPart, RetryPromptPart)):
+                    if isinstance(part, RetryPromptPart):
+                        record.retries += 1
+                    call = pending_calls.pop(part.tool_call_id, None)
+                    if call is None:
+                        continue
+                    tool_name, called_at = call
+                    record.tool_calls.append(
+                        ToolCallRecord(
+                            tool_name=tool_name,
+                            duration_seconds=max(
+                                0.0, (part.timestamp - called_at).total_seconds()
+                            ),
+                            status="success"
+                            if isinstance(part, ToolReturnPart)
+                            else "retry",
+                        )
+                    )
+
+    if first_response_at is not None:
+        ttfr = (first_response_at - started).total_seconds()
+        if 0 <= ttfr <= record.wall_time_seconds:
+            record.time_to_first_response_seconds = ttfr
+
+    usage_method = getattr(result, "usage", None)
+    if callable(usage_method):
+        try:
+            usage = usage_method()
+        except Exception:
+            usage = None
+        record.input_tokens = _int_attr(usage, "request_tokens")
+        record.output_tokens = _int_attr(usage, "response_tokens")
+        record.model_requests = max(record.model_requests, _int_attr(usage, "requests"))
+
+
+class RunInstrumentationSink:
+    """Receives a record after every instrumented run."""
+
+    async def emit(self, record: LLMRunRecord) -> None:
+        raise NotImplementedError
+
+
+class MetricsSink(RunInstrumentationSink):
+    """Feeds run records into the /metrics registry."""
+
+    async def emit(self, record: LLMRunRecord) -> None:
+        labels = {"agent": record.agent, "skill": record.skill}
+        LLM_REQUEST_DURATION.observe(
+            record.wall_time_seconds, status=record.status, **labels
+        )
+        if record.time_to_first_response_seconds is not None:
+            LLM_TIME_TO_FIRST_RESPONSE.observe(
+                record.time_to_first_response_seconds, **labels
+            )
+        if record.model_requests:
+            LLM_MODEL_REQUESTS.inc(record.model_requests, **labels)
+        if record.retries:
+            LLM_RETRIES.inc(record.retries, **labels)
+        if record.input_tokens:
+            LLM_TOKENS.inc(record.input_tokens, direction="in", **labels)
+        if record.output_tokens:
+            LLM_TOKENS.inc(record.output_tokens, direction="out", **labels)
+        for call in record.tool_calls:
+            if call.duration_seconds is not None:
+                LLM_TOOL_DURATION.observe(
+                    call.duration_seconds,
+                    agent=record.agent,
+                    tool=call.tool_name,
+                    status=call.status,
+                )
+
+
+class StateManagerSink(RunInstrumentationSink):
+    """Persists run records as tagged metrics in an AgentStateManager."""
+
+    def __init__(self, state_manager: AgentStateManager) -> None:
+        self.state_manager = state_manager
+
+    async def emit(self, record: LLMRunRecord) -> None:
+        await self.state_manager.initialize()
+        tags = {
+            "skill": record.skill,
+            "conversation_id": record.conversation_id,
+            "run_id": record.run_id,
+            "status": record.status,
+        }
+        values = {
+            "llm_wall_time_seconds": ("histogram", record.wall_time_seconds),
+            "llm_time_to_first_response_seconds": (
+                "histogram",
+                record.time_to_first_response_seconds,
+            ),
+            "llm_model_requests": ("counter", record.model_requests),
+            "llm_retries": ("counter", record.retries),
+            "llm_input_tokens": ("counter", record.input_tokens),
+            "llm_output_tokens": ("counter", record.output_tokens),
+        }
+        for name, (metric_type, value) in values.items():
+            if value is None:
+                continue
+            await self.state_manager.store_metric(
+                {
+                    "name": name,
+                    "value": value,
+                    "metric_type": metric_type,
+                    "tags": tags,
+                    "agent_id": record.agent,
+                }
+            )
+        for call in record.tool_calls:
+            if call.duration_seconds is None:
+                continue
+            await self.state_manager.store_metric(
+                {
+                    "name": "llm_tool_duration_seconds",
+                    "value": call.duration_seconds,
+                    "metric_type": "histogram",
+                    "tags": {
+                        **tags,
+                        "tool": call.tool_name,
+                        "tool_status": call.status,
+                    },
+                    "agent_id": record.agent,
+                }
+            )
+
+
+class JsonlTraceSink(RunInstrumentationSink):
+    """Appends one JSON object per run to a trace file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        self._lock = asyncio.Lock()
+
+    def _append(self, line: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+
+    async def emit(self, record: LLMRunRecord) -> None:
+        line = json.dumps(record.to_dict(), default=str)
+        async with self._lock:
+            await asyncio.to_thread(self._append, line)
+
+
+async def emit_run_record(
+    sinks: List[RunInstrumentationSink], record: LLMRunRecord
+) -> None:
+    """Delivers a record to every sink; sink failures are logged, never raised."""
+    if not sinks:
+        return
+    results = await asyncio.gather(
+        *(sink.emit(record) for sink in sinks), return_exceptions=True
+    )
+    for sink, outcome in zip(sinks, results):
+        if isinstance(outcome, Exception):
+            logger.warning(
+                f"Instrumentation sink {type(sink).__name__} failed: {outcome}"
+            )
+
+
+async def instrumented_run(
+    run: Callable[..., Awaitable[Any]],
+    prompt: str,
+    *,
+    agent: str,
+    skill: str,
+    sinks: List[RunInstrumentationSink],
+    **kwargs: Any,
+) -> Any:
+    """
+    Awaits run(prompt, **kwargs), emits an LLMRunRecord to the sinks and
+    returns the run result unchanged (exceptions are re-raised).
+    """
+    context = current_instrumentation_context()
+    started = datetime.now(timezone.utc)
+    start = time.perf_counter()
+    record = LLMRunRecord(
+        agent=agent,
+        skill=context.get("skill") or skill,
+        conversation_id=context.get("conversation_id"),
+        status="error",
+        started_at=started.timestamp(),
+        wall_time_seconds=0.0,
+    )
+    with start_span(
+        f"llm.run {record.agent}.{record.skill}",
+        attributes={"agent": record.agent, "skill": record.skill},
+    ) as span:
+        span.set_attribute("llm.run_id", record.run_id)
+        try:
+            result = await run(prompt, **kwargs)
+        except Exception as e:
+            record.wall_time_seconds = time.perf_counter() - start
+            record.error = str(e)
+            await emit_run_record(sinks, record)
+            raise
+
+        record.wall_time_seconds = time.perf_counter() - start
+        record.status = "success"
+        _apply_result(record, result, started)
+        span.set_attribute("llm.model_requests", record.model_requests)
+        span.set_attribute("llm.input_tokens", record.input_tokens)
+        span.set_attribute("llm.output_tokens", record.output_tokens)
+        await emit_run_record(sinks, record)
+        return result
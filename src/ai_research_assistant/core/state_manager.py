@@ -1,32 +1,114 @@
 # src/ai_research_assistant/core/state_manager.py
+import asyncio
 import json
 import logging
-from datetime import datetime, timedelta
+import math
+import re
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import aiosqlite
 
+from ai_research_assistant.config.global_settings import settings
+from ai_research_assistant.core.metric_sketch import QuantileSketch
+
 logger = logging.getLogger(__name__)
 
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+# Rollup tiers, finest first, with their bucket width in seconds.
+ROLLUP_RESOLUTIONS: Dict[str, int] = {"minute": 60, "hour": 3600, "day": 86400}
+
+# Days of history kept per tier; None keeps a tier forever.
+DEFAULT_RETENTION_DAYS: Dict[str, Optional[float]] = {
+    "raw": 7,
+    "minute": 2,
+    "hour": 90,
+    "day": None,
+}
+
+_BUCKET_UNITS = {"m": 60, "h": 3600, "d": 86400}
+_METRIC_COLUMNS = (
+    "id, metric_name, metric_value, metric_type, tags, agent_id, timestamp"
+)
+_SERIES_AGGREGATIONS = {"count", "sum", "avg", "min", "max"}
+
+# Stored in PRAGMA user_version; bump it when _migrate gains a step.
+_SCHEMA_VERSION = 2
+# Raw rows read per pass when rollups are rebuilt on migration.
+_BACKFILL_BATCH_SIZE = 1000
+
+
+def _tag_value(value: Any) -> str:
+    """Normalizes a tag value for the tag index; strings are stored verbatim."""
+    return value if isinstance(value, str) else json.dumps(value, sort_keys=True)
+
 
 class AgentStateManager:
     """
     Centralized state management for the agent ecosystem using aiosqlite.
     Handles agent configurations, task history, and metrics.
+
+    Metrics are written behind: store_metric buffers rows in memory and they are
+    flushed in a single transaction once metric_batch_size rows are pending or
+    metric_flush_interval seconds have passed. The flush runs in the background;
+    only when max_pending_metrics rows are buffered does store_metric wait for
+    one before accepting more. Workflow writes share the connection, so they
+    take the same write lock and never commit part of a metric batch.
+
+    Every flush also folds the batch into per-minute/hour/day rollups (count,
+    sum, min, max and a quantile sketch), and raw rows and rollups are pruned
+    according to retention_days. get_metric_series reads the rollups; raw rows
+    stored before rollups existed are folded into them on first open.
+
+    Tags are additionally normalized into agent_metric_tags (one row per
+    key/value) so get_metrics and summarize_metrics_by_tag can filter and group
+    on tags in SQL. Databases created before that index existed are backfilled
+    once when they are first opened.
     """
 
-    def __init__(self, db_path: Optional[str] = None) -> None:
+    # Minimum seconds between automatic retention passes.
+    RETENTION_CHECK_INTERVAL = 3600.0
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        metric_batch_size: int = 100,
+        metric_flush_interval: float = 1.0,
+        max_pending_metrics: int = 10_000,
+        retention_days: Optional[Dict[str, Optional[float]]] = None,
+    ) -> None:
         """Initializes the state manager."""
-        self.db_path = db_path or "tmp/agent_state.db"
+        self.db_path = db_path or settings.AGENT_STATE_DB_PATH
         self._connection_pool: Optional[aiosqlite.Connection] = None
+        self.metric_batch_size = max(1, metric_batch_size)
+        self.metric_flush_interval = metric_flush_interval
+        self.max_pending_metrics = max(self.metric_batch_size, max_pending_metrics)
+        # (metric row, normalized tag pairs) awaiting the next flush
+        self._pending_metrics: List[Tuple[Tuple[Any, ...], List[Tuple[str, str]]]] = []
+        self._write_lock = asyncio.Lock()
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self.retention_days = {**DEFAULT_RETENTION_DAYS, **(retention_days or {})}
+        self._last_retention_run = 0.0
 
     async def initialize(self) -> None:
         """Initializes the database connection and creates the schema."""
         self._ensure_db_directory()
         if not self._connection_pool:
-            self._connection_pool = await aiosqlite.connect(self.db_path)
+            connection = aiosqlite.connect(self.db_path)
+            # Agents keep their state manager open for their whole lifetime, so
+            # the worker thread must not block interpreter shutdown.
+            connection.daemon = True
+            self._connection_pool = await connection
             self._connection_pool.row_factory = aiosqlite.Row
+            # WAL lets readers proceed during metric flushes and avoids an fsync
+            # of the main database file on every commit.
+            await self._connection_pool.execute("PRAGMA journal_mode=WAL")
+            await self._connection_pool.execute("PRAGMA synchronous=NORMAL")
+            await self._connection_pool.execute("PRAGMA foreign_keys=ON")
             await self._create_schema()
             logger.info(f"Initialized AgentStateManager with {self.db_path}")
 
@@ -51,39 +133,360 @@ class AgentStateManager:
             agent_id TEXT
         );
         CREATE INDEX IF NOT EXISTS idx_metrics_timestamp ON agent_metrics(timestamp);
+        CREATE INDEX IF NOT EXISTS idx_metrics_name_agent_timestamp
+            ON agent_metrics(metric_name, agent_id, timestamp);
+
+        CREATE TABLE IF NOT EXISTS agent_metric_tags (
+            metric_id INTEGER NOT NULL
+                REFERENCES agent_metrics(id) ON DELETE CASCADE,
+            tag_key TEXT NOT NULL,
+            tag_value TEXT NOT NULL,
+            PRIMARY KEY (metric_id, tag_key)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_metric_tags_key_value
+            ON agent_metric_tags(tag_key, tag_value, metric_id);
+
+        CREATE TABLE IF NOT EXISTS workflow_runs (
+            workflow_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            status TEXT NOT NULL,
+            total_steps INTEGER NOT NULL,
+            metadata TEXT NOT NULL DEFAULT '{}',
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS workflow_steps (
+            workflow_id TEXT NOT NULL,
+            step_id TEXT NOT NULL,
+            status TEXT NOT NULL,
+            output TEXT,
+            error TEXT,
+            started_at REAL,
+            finished_at REAL,
+            PRIMARY KEY (workflow_id, step_id)
+        );
+
+        CREATE TABLE IF NOT EXISTS agent_metric_rollups (
+            resolution TEXT NOT NULL,
+            bucket_start INTEGER NOT NULL,
+            metric_name TEXT NOT NULL,
+            agent_id TEXT NOT NULL DEFAULT '',
+            count INTEGER NOT NULL,
+            sum REAL NOT NULL,
+            min REAL NOT NULL,
+            max REAL NOT NULL,
+            sketch TEXT NOT NULL,
+            PRIMARY KEY (resolution, metric_name, agent_id, bucket_start)
+        );
         """
         await self._connection_pool.executescript(schema_sql)
         await self._connection_pool.commit()
+        await self._migrate(self._connection_pool)
+
+    async def _migrate(self, conn: aiosqlite.Connection) -> None:
+        """Brings a database written by an earlier version up to _SCHEMA_VERSION."""
+        async with conn.execute("PRAGMA user_version") as cursor:
+            version = (await cursor.fetchone())[0]
+        if version >= _SCHEMA_VERSION:
+            return
+        try:
+            if version < 1:
+                await self._backfill_metric_tags(conn)
+            if version < 2:
+                await self._backfill_metric_rollups(conn)
+            await conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            await conn.commit()
+        except Exception:
+            await conn.rollback()
+            raise
+
+    @staticmethod
+    async def _backfill_metric_tags(conn: aiosqlite.Connection) -> None:
+        """Indexes the tags of metrics stored before agent_metric_tags existed."""
+        async with conn.execute(
+            "SELECT id, tags FROM agent_metrics "
+            "WHERE id NOT IN (SELECT metric_id FROM agent_metric_tags)"
+        ) as cursor:
+            rows = await cursor.fetchall()
+        tag_rows = []
+        for metric_id, raw_tags in rows:
+            try:
+                tags = json.loads(raw_tags)
+            except ValueError:
+                continue
+            if isinstance(tags, dict):
+                tag_rows.extend(
+                    (metric_id, str(key), _tag_value(value))
+                    for key, value in tags.items()
+                )
+        await conn.executemany(
+            """
+            INSERT OR IGNORE INTO agent_metric_tags (metric_id, tag_key, tag_value)
+            VALUES (?, ?, ?)
+            """,
+            tag_rows,
+        )
+        if tag_rows:
+            logger.info(f"Indexed tags of {len(rows)} existing metrics")
+
+    async def _backfill_metric_rollups(self, conn: aiosqlite.Connection) -> None:
+        """Folds the raw metrics stored before rollups existed into every tier."""
+        last_id, total = 0, 0
+        while True:
+            async with conn.execute(
+                "SELECT id, metric_name, metric_value, metric_type, tags, agent_id, "
+                "timestamp FROM agent_metrics WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, _BACKFILL_BATCH_SIZE),
+            ) as cursor:
+                rows = await cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+            total += len(rows)
+            await self._update_rollups(conn, [tuple(row)[1:] for row in rows])
+        if total:
+            logger.info(f"Rolled up {total} existing metrics")
 
     async def store_metric(self, metric_data: Dict[str, Any]) -> None:
-        """Stores an agent metric in the database."""
+        """
+        Buffers an agent metric for a batched write.
+
+        The row is timestamped when it is stored, not when it is flushed. Call
+        flush_metrics() to force pending metrics to disk; get_metrics() and
+        close() do so automatically.
+        """
         if not self._connection_pool:
             raise RuntimeError(
                 "Database connection not initialized. Call initialize() first."
             )
 
-        await self._connection_pool.execute(
-            """
-            INSERT INTO agent_metrics (metric_name, metric_value, metric_type, tags, agent_id)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (
-                metric_data["name"],
-                metric_data["value"],
-                metric_data["metric_type"],
-                json.dumps(metric_data["tags"]),
-                metric_data.get("agent_id"),
-            ),
+        tags = metric_data["tags"]
+        row = (
+            metric_data["name"],
+            metric_data["value"],
+            metric_data["metric_type"],
+            json.dumps(tags),
+            metric_data.get("agent_id"),
+            datetime.now(timezone.utc).strftime(_TIMESTAMP_FORMAT),
         )
-        await self._connection_pool.commit()
+        tag_pairs = (
+            [(str(key), _tag_value(value)) for key, value in tags.items()]
+            if isinstance(tags, dict)
+            else []
+        )
+
+        # Backpressure: a full buffer is drained before the new row is accepted.
+        while len(self._pending_metrics) >= self.max_pending_metrics:
+            await self.flush_metrics()
+
+        self._pending_metrics.append((row, tag_pairs))
+        if len(self._pending_metrics) >= self.metric_batch_size:
+            self._schedule_flush()
+        elif self._flush_timer is None:
+            self._start_flush_timer()
+
+    def _start_flush_timer(self) -> None:
+        self._flush_timer = asyncio.get_running_loop().call_later(
+            self.metric_flush_interval, self._schedule_flush
+        )
+
+    def _schedule_flush(self) -> None:
+        """Starts a background flush unless one is already running."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if self._pending_metrics and (
+            self._flush_task is None or self._flush_task.done()
+        ):
+            self._flush_task = asyncio.create_task(self._flush_in_background())
+
+    async def _flush_in_background(self) -> None:
+        try:
+            await self.flush_metrics()
+            # Rows stored during that flush may have filled another batch.
+            while len(self._pending_metrics) >= self.metric_batch_size:
+                await self.flush_metrics()
+        except Exception as e:
+            logger.error(f"Background metric flush failed: {e}")
+        # Leftover or re-queued rows go out with the next interval.
+        if self._pending_metrics and self._flush_timer is None:
+            self._start_flush_timer()
+
+    async def flush_metrics(self) -> int:
+        """Writes all buffered metrics in one transaction. Returns rows written."""
+        async with self._write_lock:
+            if not self._pending_metrics:
+                return 0
+            conn = self._require_connection()
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+
+            batch, self._pending_metrics = self._pending_metrics, []
+            try:
+                # Ids are assigned here rather than by SQLite so the tag rows of
+                # the whole batch can be written with executemany as well.
+                if not conn.in_transaction:
+                    await conn.execute("BEGIN IMMEDIATE")
+                async with conn.execute(
+                    "SELECT seq FROM sqlite_sequence WHERE name = 'agent_metrics'"
+                ) as cursor:
+                    sequence = await cursor.fetchone()
+                first_id = (sequence[0] if sequence else 0) + 1
+
+                rows = [row for row, _ in batch]
+                await conn.executemany(
+                    """
+                    INSERT INTO agent_metrics
+                        (id, metric_name, metric_value, metric_type, tags, agent_id,
+                         timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    [(first_id + offset,) + row for offset, row in enumerate(rows)],
+                )
+                await conn.executemany(
+                    """
+                    INSERT INTO agent_metric_tags (metric_id, tag_key, tag_value)
+                    VALUES (?, ?, ?)
+                    """,
+                    [
+                        (first_id + offset, key, value)
+                        for offset, (_, tag_pairs) in enumerate(batch)
+                        for key, value in tag_pairs
+                    ],
+                )
+                await self._update_rollups(conn, rows)
+                await conn.commit()
+            except Exception:
+                await conn.rollback()
+                # Keep the rows so a later flush can retry them.
+                self._pending_metrics[:0] = batch
+                raise
+
+            if time.time() - self._last_retention_run >= self.RETENTION_CHECK_INTERVAL:
+                try:
+                    await self._apply_retention(conn)
+                except Exception as e:
+                    logger.error(f"Metric retention pass failed: {e}")
+            return len(batch)
+
+    async def _update_rollups(
+        self, conn: aiosqlite.Connection, rows: List[Tuple[Any, ...]]
+    ) -> None:
+        """Merges a batch of raw metric rows into every rollup tier."""
+        groups: Dict[Tuple[str, str, str, int], Dict[str, Any]] = {}
+        for name, value, _, _, agent_id, timestamp in rows:
+            value = float(value)
+            # fromisoformat also reads the second-precision CURRENT_TIMESTAMP
+            # values of rows written by earlier versions.
+            epoch = (
+                datetime.fromisoformat(timestamp)
+                .replace(tzinfo=timezone.utc)
+                .timestamp()
+            )
+            for resolution, width in ROLLUP_RESOLUTIONS.items():
+                key = (resolution, name, agent_id or "", int(epoch // width) * width)
+                group = groups.get(key)
+                if group is None:
+                    group = groups[key] = {
+                        "count": 0,
+                        "sum": 0.0,
+                        "min": value,
+                        "max": value,
+                        "sketch": QuantileSketch(),
+                    }
+                group["count"] += 1
+                group["sum"] += value
+                group["min"] = min(group["min"], value)
+                group["max"] = max(group["max"], value)
+                group["sketch"].add(value)
+
+        for (resolution, name, agent_id, bucket_start), group in groups.items():
+            async with conn.execute(
+                """
+                SELECT count, sum, min, max, sketch FROM agent_metric_rollups
+                WHERE resolution = ? AND metric_name = ? AND agent_id = ?
+                    AND bucket_start = ?
+                """,
+                (resolution, name, agent_id, bucket_start),
+            ) as cursor:
+                existing = await cursor.fetchone()
+            if existing is not None:
+                group["count"] += existing["count"]
+                group["sum"] += existing["sum"]
+                group["min"] = min(group["min"], existing["min"])
+                group["max"] = max(group["max"], existing["max"])
+                group["sketch"].merge(
+                    QuantileSketch.from_dict(json.loads(existing["sketch"]))
+                )
+            await conn.execute(
+                """
+                INSERT OR REPLACE INTO agent_metric_rollups
+                    (resolution, bucket_start, metric_name, agent_id,
+                     count, sum, min, max, sketch)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    resolution,
+                    bucket_start,
+                    name,
+                    agent_id,
+                    group["count"],
+                    group["sum"],
+                    group["min"],
+                    group["max"],
+                    json.dumps(group["sketch"].to_dict()),
+                ),
+            )
+
+    async def apply_retention(self) -> Dict[str, int]:
+        """Prunes raw metrics and rollups older than their retention window."""
+        async with self._write_lock:
+            return await self._apply_retention(self._require_connection())
+
+    async def _apply_retention(self, conn: aiosqlite.Connection) -> Dict[str, int]:
+        now = time.time()
+        deleted: Dict[str, int] = {}
+        for tier, days in self.retention_days.items():
+            if days is None:
+                continue
+            cutoff = now - days * 86400
+            if tier == "raw":
+                cursor = await conn.execute(
+                    "DELETE FROM agent_metrics WHERE timestamp < ?",
+                    (
+                        datetime.fromtimestamp(cutoff, timezone.utc).strftime(
+                            _TIMESTAMP_FORMAT
+                        ),
+                    ),
+                )
+            else:
+                cursor = await conn.execute(
+                    "DELETE FROM agent_metric_rollups "
+                    "WHERE resolution = ? AND bucket_start < ?",
+                    (tier, cutoff),
+                )
+            deleted[tier] = cursor.rowcount
+        await conn.commit()
+        self._last_retention_run = now
+        if any(deleted.values()):
+            logger.info(f"Pruned expired metrics: {deleted}")
+        return deleted
 
     async def get_metrics(
         self,
         metric_name: Optional[str] = None,
         agent_id: Optional[str] = None,
         days_back: int = 7,
+        tags: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
-        """Retrieves metrics with optional filtering."""
+        """
+        Retrieves metrics with optional filtering.
+
+        tags maps a tag key to the required value, or to a list/tuple/set of
+        accepted values; all predicates must match.
+        """
         if not self._connection_pool:
             raise RuntimeError(
                 "Database connection not initialized. Call initialize() first."
@@ -93,28 +496,336 @@ class AgentStateManager:
         if days_back <= 0:
             return []
 
-        query = "SELECT * FROM agent_metrics WHERE timestamp > ?"
-        params: List[Any] = [datetime.now() - timedelta(days=days_back)]
+        await self.flush_metrics()
+
+        where, params = self._metric_filters(metric_name, agent_id, days_back, tags)
+        query = (
+            f"SELECT {_METRIC_COLUMNS} FROM agent_metrics m WHERE {where} "
+            "ORDER BY timestamp DESC"
+        )
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        async with self._connection_pool.execute(query, params) as cursor:
+            rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
+
+    async def summarize_metrics_by_tag(
+        self,
+        metric_name: str,
+        tag_key: str,
+        agent_id: Optional[str] = None,
+        days_back: int = 7,
+        tags: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Aggregates a metric per value of one tag, e.g. latency per case_id or
+        per provider. Returns count/avg/min/max rows ordered by count.
+        """
+        conn = self._require_connection()
+        await self.flush_metrics()
+
+        where, params = self._metric_filters(metric_name, agent_id, days_back, tags)
+        query = f"""
+            SELECT t.tag_value AS tag_value,
+                   COUNT(*) AS count,
+                   AVG(m.metric_value) AS avg,
+                   MIN(m.metric_value) AS min,
+                   MAX(m.metric_value) AS max
+            FROM agent_metrics m
+            JOIN agent_metric_tags t ON t.metric_id = m.id AND t.tag_key = ?
+            WHERE {where}
+            GROUP BY t.tag_value
+            ORDER BY count DESC, t.tag_value
+        """
+        async with conn.execute(query, [tag_key, *params]) as cursor:
+            return [dict(row) for row in await cursor.fetchall()]
+
+    @staticmethod
+    def _metric_filters(
+        metric_name: Optional[str],
+        agent_id: Optional[str],
+        days_back: float,
+        tags: Optional[Dict[str, Any]],
+    ) -> Tuple[str, List[Any]]:
+        """Builds the WHERE clause shared by the raw metric queries."""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days_back)
+        clauses = ["m.timestamp > ?"]
+        params: List[Any] = [cutoff.strftime(_TIMESTAMP_FORMAT)]
 
         if metric_name:
-            query += " AND metric_name = ?"
+            clauses.append("m.metric_name = ?")
             params.append(metric_name)
         if agent_id:
+            clauses.append("m.agent_id = ?")
+            params.append(agent_id)
+        for key, expected in (tags or {}).items():
+            values = (
+                list(expected)
+                if isinstance(expected, (list, tuple, set, frozenset))
+                else [expected]
+            )
+            if not values:
+                clauses.append("0")
+                continue
+            placeholders = ", ".join("?" * len(values))
+            clauses.append(
+                "m.id IN (SELECT metric_id FROM agent_metric_tags "
+                f"WHERE tag_key = ? AND tag_value IN ({placeholders}))"
+            )
+            params.append(str(key))
+            params.extend(_tag_value(value) for value in values)
+        return " AND ".join(clauses), params
+
+    async def get_metric_series(
+        self,
+        metric_name: str,
+        bucket: str = "hour",
+        agg: str = "avg",
+        agent_id: Optional[str] = None,
+        days_back: float = 7,
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns a downsampled time series for a metric.
+
+        Args:
+            metric_name: Metric to read
+            bucket: Bucket width: "minute", "hour", "day" or "<n>m", "<n>h", "<n>d"
+            agg: count, sum, avg, min, max or a percentile such as p50 or p99
+            agent_id: Restrict to one agent; all agents are combined otherwise
+            days_back: How much history to return
+
+        Returns:
+            One {"timestamp", "value", "count"} dict per non-empty bucket, oldest
+            first. The coarsest rollup tier that evenly divides the bucket is read.
+        """
+        conn = self._require_connection()
+        bucket_seconds = self._parse_bucket(bucket)
+        quantile = self._parse_aggregation(agg)
+        resolution = self._select_rollup_resolution(bucket_seconds)
+
+        await self.flush_metrics()
+
+        cutoff = time.time() - days_back * 86400
+        query = (
+            "SELECT bucket_start, count, sum, min, max, sketch "
+            "FROM agent_metric_rollups "
+            "WHERE resolution = ? AND metric_name = ? AND bucket_start >= ?"
+        )
+        params: List[Any] = [
+            resolution,
+            metric_name,
+            math.floor(cutoff / bucket_seconds) * bucket_seconds,
+        ]
+        if agent_id is not None:
             query += " AND agent_id = ?"
             params.append(agent_id)
-        query += " ORDER BY timestamp DESC"
+        query += " ORDER BY bucket_start"
 
-        async with self._connection_pool.execute(query, params) as cursor:
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
+        buckets: Dict[int, Dict[str, Any]] = {}
+        async with conn.execute(query, params) as cursor:
+            async for row in cursor:
+                start = row["bucket_start"] // bucket_seconds * bucket_seconds
+                entry = buckets.get(start)
+                if entry is None:
+                    entry = buckets[start] = {
+                        "count": 0,
+                        "sum": 0.0,
+                        "min": row["min"],
+                        "max": row["max"],
+                        "sketch": None,
+                    }
+                entry["count"] += row["count"]
+                entry["sum"] += row["sum"]
+                entry["min"] = min(entry["min"], row["min"])
+                entry["max"] = max(entry["max"], row["max"])
+                if quantile is not None:
+                    sketch = QuantileSketch.from_dict(json.loads(row["sketch"]))
+                    if entry["sketch"] is None:
+                        entry["sketch"] = sketch
+                    else:
+                        entry["sketch"].merge(sketch)
+
+        series = []
+        for start in sorted(buckets):
+            entry = buckets[start]
+            if quantile is not None:
+                value = entry["sketch"].quantile(quantile)
+            elif agg == "avg":
+                value = entry["sum"] / entry["count"]
+            else:
+                value = entry[agg]
+            series.append(
+                {
+                    "timestamp": datetime.fromtimestamp(
+                        start, timezone.utc
+                    ).isoformat(),
+                    "value": value,
+                    "count": entry["count"],
+                }
+            )
+        return series
+
+    @staticmethod
+    def _parse_bucket(bucket: str) -> int:
+        """Converts a bucket name such as "hour" or "15m" into seconds."""
+        if bucket in ROLLUP_RESOLUTIONS:
+            return ROLLUP_RESOLUTIONS[bucket]
+        match = re.fullmatch(r"(\d+)([mhd])", bucket)
+        if not match or int(match.group(1)) == 0:
+            raise ValueError(f"Invalid bucket: {bucket}")
+        return int(match.group(1)) * _BUCKET_UNITS[match.group(2)]
+
+    @staticmethod
+    def _parse_aggregation(agg: str) -> Optional[float]:
+        """Validates agg and returns the quantile for percentile aggregations."""
+        if agg in _SERIES_AGGREGATIONS:
+            return None
+        match = re.fullmatch(r"p(\d{1,2}(?:\.\d+)?|100)", agg)
+        if not match:
+            raise ValueError(f"Unsupported aggregation: {agg}")
+        return float(match.group(1)) / 100
+
+    @staticmethod
+    def _select_rollup_resolution(bucket_seconds: int) -> str:
+        """Returns the coarsest rollup tier whose width divides the bucket."""
+        for resolution, width in reversed(ROLLUP_RESOLUTIONS.items()):
+            if bucket_seconds % width == 0:
+                return resolution
+        raise ValueError(
+            f"Bucket of {bucket_seconds}s is finer than the smallest rollup tier"
+        )
+
+    def _require_connection(self) -> aiosqlite.Connection:
+        """Returns the open connection or raises if initialize() was not called."""
+        if not self._connection_pool:
+            raise RuntimeError(
+                "Database connection not initialized. Call initialize() first."
+            )
+        return self._connection_pool
+
+    async def save_workflow(
+        self,
+        workflow_id: str,
+        name: str,
+        total_steps: int,
+        status: str = "running",
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Creates a workflow record, or refreshes status and size if it exists."""
+        conn = self._require_connection()
+        now = time.time()
+        async with self._write_lock:
+            await conn.execute(
+                """
+                INSERT INTO workflow_runs
+                    (workflow_id, name, status, total_steps, metadata, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(workflow_id) DO UPDATE SET
+                    status = excluded.status,
+                    total_steps = excluded.total_steps,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    workflow_id,
+                    name,
+                    status,
+                    total_steps,
+                    json.dumps(metadata or {}, default=str),
+                    now,
+                    now,
+                ),
+            )
+            await conn.commit()
+
+    async def update_workflow_status(self, workflow_id: str, status: str) -> None:
+        """Updates the overall status of a workflow."""
+        conn = self._require_connection()
+        async with self._write_lock:
+            await conn.execute(
+                "UPDATE workflow_runs SET status = ?, updated_at = ? WHERE workflow_id = ?",
+                (status, time.time(), workflow_id),
+            )
+            await conn.commit()
+
+    async def checkpoint_workflow_step(
+        self,
+        workflow_id: str,
+        step_id: str,
+        status: str,
+        output: Any = None,
+        error: Optional[str] = None,
+        started_at: Optional[float] = None,
+        finished_at: Optional[float] = None,
+    ) -> None:
+        """Durably records the outcome of a workflow step."""
+        conn = self._require_connection()
+        async with self._write_lock:
+            await conn.execute(
+                """
+                INSERT OR REPLACE INTO workflow_steps
+                    (workflow_id, step_id, status, output, error, started_at, finished_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    workflow_id,
+                    step_id,
+                    status,
+                    json.dumps(output, default=str) if output is not None else None,
+                    error,
+                    started_at,
+                    finished_at,
+                ),
+            )
+            await conn.execute(
+                "UPDATE workflow_runs SET updated_at = ? WHERE workflow_id = ?",
+                (time.time(), workflow_id),
+            )
+            await conn.commit()
+
+    async def get_workflow(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Returns a workflow record with its checkpointed steps, or None."""
+        conn = self._require_connection()
+        async with conn.execute(
+            "SELECT * FROM workflow_runs WHERE workflow_id = ?", (workflow_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+
+        workflow = dict(row)
+        workflow["metadata"] = json.loads(workflow["metadata"])
+        async with conn.execute(
+            """
+            SELECT step_id, status, output, error, started_at, finished_at
+            FROM workflow_steps WHERE workflow_id = ?
+            ORDER BY COALESCE(finished_at, started_at)
+            """,
+            (workflow_id,),
+        ) as cursor:
+            steps = [dict(step) for step in await cursor.fetchall()]
+        for step in steps:
+            if step["output"] is not None:
+                step["output"] = json.loads(step["output"])
+        workflow["steps"] = steps
+        return workflow
 
     async def close(self) -> None:
-        """Closes the database connection."""
+        """Flushes buffered metrics and closes the database connection."""
         if self._connection_pool:
+            if self._flush_task is not None and not self._flush_task.done():
+                await asyncio.gather(self._flush_task, return_exceptions=True)
+            try:
+                await self.flush_metrics()
+            except Exception as e:
+                logger.error(
+                    f"Dropping {len(self._pending_metrics)} unflushed metrics: {e}"
+                )
+                self._pending_metrics = []
             await self._connection_pool.close()
             self._connection_pool = None
             # Add a small delay on Windows to ensure file handle is released
-            import asyncio
             import platform
 
             if platform.system() == "Windows":
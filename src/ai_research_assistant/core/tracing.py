@@ -0,0 +1,268 @@
+# src/ai_research_assistant/core/tracing.py
+"""
+Lightweight distributed tracing with W3C trace-context propagation.
+
+Spans are opened with start_span() and nest through a contextvar, so work done
+inside a span (including awaited calls) becomes its child. inject()/extract()
+carry the current span across process hops as a ``traceparent`` entry in
+A2A payload metadata, MessageEnvelope.metadata, HTTP headers and MCP request
+``_meta``. Finished spans go to the configured exporters; JsonlSpanExporter
+writes one JSON object per span for the trace_view CLI.
+"""
+
+import contextvars
+import json
+import logging
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, MutableMapping, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT = "traceparent"
+TRACESTATE = "tracestate"
+
+_TRACEPARENT_RE = re.compile(
+    r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})(-.*)?$"
+)
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    """The propagated part of a span: trace id, span id and sampling flag."""
+
+    trace_id: str
+    span_id: str
+    sampled: bool = True
+    tracestate: Optional[str] = None
+
+    def to_traceparent(self) -> str:
+        flags = "01" if self.sampled else "00"
+        return f"00-{self.trace_id}-{self.span_id}-{flags}"
+
+    @classmethod
+    def from_traceparent(
+        cls, header: Optional[str], tracestate: Optional[str] = None
+    ) -> Optional["SpanContext"]:
+        """Parses a W3C traceparent header, returning None if it is invalid."""
+        if not header:
+            return None
+        match = _TRACEPARENT_RE.match(header.strip().lower())
+        if match is None:
+            return None
+        version, trace_id, span_id, flags, rest = match.groups()
+        if version == "ff" or (version == "00" and rest):
+            return None
+        if trace_id == "0" * 32 or span_id == "0" * 16:
+            return None
+        return cls(
+            trace_id=trace_id,
+            span_id=span_id,
+            sampled=bool(int(flags, 16) & 0x01),
+            tracestate=tracestate,
+        )
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace."""
+
+    name: str
+    context: SpanContext
+    parent_span_id: Optional[str]
+    service: str
+    kind: str = "internal"
+    start_time: float = field(default_factory=time.time)
+    end_time: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+    error: Optional[str] = None
+
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        if self.end_time is None:
+            return None
+        return self.end_time - self.start_time
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: Any) -> None:
+        self.status = "error"
+        self.error = str(error)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "service": self.service,
+            "kind": self.kind,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "duration_seconds": self.duration_seconds,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class SpanExporter:
+    """Receives every finished, sampled span."""
+
+    def export(self, span: Span) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+
+class JsonlSpanExporter(SpanExporter):
+    """Appends finished spans to a JSON Lines file shared across services."""
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._handle = None
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            if self._handle is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._handle = self.path.open("a", encoding="utf-8")
+            self._handle.write(line + "\n")
+            self._handle.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+
+_current_span: contextvars.ContextVar[Optional[SpanContext]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+_service_name = "ai_research_assistant"
+_exporters: List[SpanExporter] = []
+
+
+def configure_tracing(
+    service_name: Optional[str] = None,
+    export_path: Optional[str] = None,
+    exporters: Optional[List[SpanExporter]] = None,
+) -> None:
+    """
+    Sets the service name stamped on new spans and replaces the exporters.
+    ``export_path`` is shorthand for a JsonlSpanExporter on that file.
+    """
+    global _service_name, _exporters
+    if service_name:
+        _service_name = service_name
+    new_exporters = list(exporters or [])
+    if export_path:
+        new_exporters.append(JsonlSpanExporter(export_path))
+    for exporter in _exporters:
+        exporter.shutdown()
+    _exporters = new_exporters
+
+
+def current_span_context() -> Optional[SpanContext]:
+    return _current_span.get()
+
+
+def _export(span: Span) -> None:
+    if not span.context.sampled:
+        return
+    for exporter in _exporters:
+        try:
+            exporter.export(span)
+        except Exception as e:
+            logger.warning(f"Span exporter {type(exporter).__name__} failed: {e}")
+
+
+@contextmanager
+def start_span(
+    name: str,
+    kind: str = "internal",
+    attributes: Optional[Dict[str, Any]] = None,
+    parent: Optional[SpanContext] = None,
+) -> Iterator[Span]:
+    """
+    Opens a span as a child of ``parent`` (default: the current span) and makes
+    it current for the duration of the block. Exceptions mark it as an error.
+    """
+    parent = parent or _current_span.get()
+    context = SpanContext(
+        trace_id=parent.trace_id if parent else secrets.token_hex(16),
+        span_id=secrets.token_hex(8),
+        sampled=parent.sampled if parent else True,
+        tracestate=parent.tracestate if parent else None,
+    )
+    span = Span(
+        name=name,
+        context=context,
+        parent_span_id=parent.span_id if parent else None,
+        service=_service_name,
+        kind=kind,
+        attributes={
+            key: value for key, value in (attributes or {}).items() if value is not None
+        },
+    )
+    token = _current_span.set(context)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(str(e) or type(e).__name__)
+        raise
+    finally:
+        span.end_time = time.time()
+        _current_span.reset(token)
+        _export(span)
+
+
+def inject(
+    carrier: MutableMapping[str, Any], context: Optional[SpanContext] = None
+) -> MutableMapping[str, Any]:
+    """Writes the current (or given) span context into a metadata/header dict."""
+    context = context or _current_span.get()
+    if context is not None:
+        carrier[TRACEPARENT] = context.to_traceparent()
+        if context.tracestate:
+            carrier[TRACESTATE] = context.tracestate
+    return carrier
+
+
+def extract(carrier: Optional[Mapping[str, Any]]) -> Optional[SpanContext]:
+    """Reads a span context written by inject(), or None if absent/invalid."""
+    if not carrier:
+        return None
+    header = carrier.get(TRACEPARENT)
+    if not isinstance(header, str):
+        return None
+    tracestate = carrier.get(TRACESTATE)
+    return SpanContext.from_traceparent(
+        header, tracestate if isinstance(tracestate, str) else None
+    )
+
+
+def read_spans(path: str) -> List[Dict[str, Any]]:
+    """Loads spans written by JsonlSpanExporter, skipping malformed lines."""
+    spans: List[Dict[str, Any]] = []
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                spans.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping malformed span line in {path}")
+    return spans
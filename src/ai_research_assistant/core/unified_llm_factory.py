@@ -2,8 +2,10 @@
 import logging
 from typing import Any, Dict, Optional
 
+from ..config.global_settings import settings
 from . import llm_provider
 from .env_manager import env_manager
+from .replay_model import REPLAY_MODES, RecordReplayModel, ReplayFixture, fixture_path
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +36,18 @@ class UnifiedLLMFactory:
             logger.debug(f"Returning cached pydantic-ai Model: {cache_key}")
             return self._llm_cache[cache_key]
 
+        replay_mode = settings.LLM_REPLAY_MODE
+        if replay_mode and replay_mode not in REPLAY_MODES:
+            raise ValueError(
+                f"Invalid LLM_REPLAY_MODE '{replay_mode}', expected one of {REPLAY_MODES}"
+            )
+        if replay_mode == "replay":
+            # Answered from fixtures: no provider, API key or network needed
+            llm_model_instance = self._wrap_for_replay(provider, model_name)
+            self._llm_cache[cache_key] = llm_model_instance
+            logger.info(f"Replaying recorded responses for {provider}:{model_name}")
+            return llm_model_instance
+
         logger.info(
             f"Creating new pydantic-ai Model: Provider={provider}, Model={model_name}"
         )
@@ -54,6 +68,10 @@ class UnifiedLLMFactory:
                 raise RuntimeError(
                     f"Failed to create pydantic-ai Model for '{provider}'"
                 )
+            if replay_mode == "record":
+                llm_model_instance = self._wrap_for_replay(
+                    provider, model_name, llm_model_instance
+                )
 
             self._llm_cache[cache_key] = llm_model_instance
             logger.info(
@@ -66,6 +84,20 @@ class UnifiedLLMFactory:
             logger.error(error_msg, exc_info=True)
             raise RuntimeError(error_msg) from e
 
+    def _wrap_for_replay(
+        self, provider: str, model_name: str, wrapped: Optional[Any] = None
+    ) -> RecordReplayModel:
+        path = fixture_path(settings.LLM_REPLAY_DIR, provider, model_name)
+        return RecordReplayModel(
+            ReplayFixture(path),
+            mode=settings.LLM_REPLAY_MODE,
+            wrapped=wrapped,
+            model_name=model_name,
+            system=provider,
+            latency_scale=settings.LLM_REPLAY_LATENCY_SCALE,
+            fallback=settings.LLM_REPLAY_FALLBACK,
+        )
+
     def clear_cache(self) -> None:
         self._llm_cache.clear()
         logger.info("LLM cache cleared")
@@ -0,0 +1,440 @@
+# src/ai_research_assistant/core/workflow_engine.py
+import asyncio
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional, Set
+
+from ai_research_assistant.core.models import AgentTask
+from ai_research_assistant.core.resource_manager import ResourceManager
+from ai_research_assistant.core.state_manager import AgentStateManager
+
+logger = logging.getLogger(__name__)
+
+
+class NodeStatus(Enum):
+    """Execution states for a workflow node."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+
+@dataclass(frozen=True)
+class ArtifactRef:
+    """
+    Reference to the output of an upstream node.
+
+    Placed in a node's parameters, it is resolved against the artifact store
+    right before the node runs, so outputs are handed over without copying.
+    If `key` is set and the output is a dict, only that entry is passed on.
+    """
+
+    node_id: str
+    key: Optional[str] = None
+
+
+@dataclass
+class WorkflowNode:
+    """A single skill invocation on an agent."""
+
+    node_id: str
+    agent: Any
+    skill_name: str
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    depends_on: List[str] = field(default_factory=list)
+    priority: int = 1
+
+    def dependencies(self) -> Set[str]:
+        """Explicit dependencies plus every node referenced by an ArtifactRef."""
+        deps = set(self.depends_on)
+        _collect_refs(self.parameters, deps)
+        return deps
+
+
+@dataclass
+class NodeResult:
+    """Execution record for a workflow node."""
+
+    node_id: str
+    skill_name: str
+    status: NodeStatus = NodeStatus.PENDING
+    task_id: Optional[str] = None
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    resumed: bool = False
+
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "node_id": self.node_id,
+            "skill_name": self.skill_name,
+            "status": self.status.value,
+            "task_id": self.task_id,
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_seconds": self.duration_seconds,
+            "resumed": self.resumed,
+        }
+
+
+def _collect_refs(value: Any, refs: Set[str]) -> None:
+    if isinstance(value, ArtifactRef):
+        refs.add(value.node_id)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _collect_refs(item, refs)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _collect_refs(item, refs)
+
+
+def _resolve_refs(value: Any, artifacts: Dict[str, Any]) -> Any:
+    if isinstance(value, ArtifactRef):
+        output = artifacts[value.node_id]
+        if value.key is not None and isinstance(output, dict):
+            return output.get(value.key)
+        return output
+    if isinstance(value, dict):
+        return {k: _resolve_refs(v, artifacts) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_resolve_refs(v, artifacts) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_resolve_refs(v, artifacts) for v in value)
+    return value
+
+
+class WorkflowDAG:
+    """
+    Directed acyclic graph of skill invocations.
+    Edges are data dependencies between nodes.
+
+    `metadata` describes the inputs the graph was built from. It is stored
+    with the workflow's checkpoints, and resuming is refused when it differs.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        workflow_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.name = name
+        self.workflow_id = workflow_id or str(uuid.uuid4())
+        self.metadata: Dict[str, Any] = metadata or {}
+        self.nodes: Dict[str, WorkflowNode] = {}
+
+    def add_node(
+        self,
+        node_id: str,
+        agent: Any,
+        skill_name: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        depends_on: Optional[List[str]] = None,
+        priority: int = 1,
+    ) -> WorkflowNode:
+        """Adds a node to the graph and returns it."""
+        if node_id in self.nodes:
+            raise ValueError(f"Duplicate workflow node id: {node_id}")
+        node = WorkflowNode(
+            node_id=node_id,
+            agent=agent,
+            skill_name=skill_name,
+            parameters=parameters or {},
+            depends_on=depends_on or [],
+            priority=priority,
+        )
+        self.nodes[node_id] = node
+        return node
+
+    def topological_order(self) -> List[str]:
+        """
+        Returns node ids in dependency order.
+        Raises ValueError for unknown dependencies or cycles.
+        """
+        in_degree: Dict[str, int] = {}
+        dependents: Dict[str, List[str]] = {node_id: [] for node_id in self.nodes}
+        for node_id, node in self.nodes.items():
+            deps = node.dependencies()
+            unknown = deps - self.nodes.keys()
+            if unknown:
+                raise ValueError(
+                    f"Node '{node_id}' depends on unknown nodes: {sorted(unknown)}"
+                )
+            in_degree[node_id] = len(deps)
+            for dep in deps:
+                dependents[dep].append(node_id)
+
+        ready = [node_id for node_id, degree in in_degree.items() if degree == 0]
+        order: List[str] = []
+        while ready:
+            node_id = ready.pop(0)
+            order.append(node_id)
+            for dependent in dependents[node_id]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    ready.append(dependent)
+
+        if len(order) != len(self.nodes):
+            cyclic = sorted(set(self.nodes) - set(order))
+            raise ValueError(f"Workflow '{self.name}' contains a cycle: {cyclic}")
+        return order
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable view of the graph structure for inspection."""
+        return {
+            "workflow_id": self.workflow_id,
+            "name": self.name,
+            "nodes": [
+                {
+                    "node_id": node.node_id,
+                    "agent": getattr(
+                        node.agent, "agent_name", type(node.agent).__name__
+                    ),
+                    "skill_name": node.skill_name,
+                    "depends_on": sorted(node.dependencies()),
+                }
+                for node in self.nodes.values()
+            ],
+        }
+
+
+@dataclass
+class WorkflowRun:
+    """Outcome of executing a WorkflowDAG."""
+
+    workflow_id: str
+    name: str
+    node_results: Dict[str, NodeResult]
+    artifacts: Dict[str, Any]
+    started_at: float
+    finished_at: float
+
+    @property
+    def status(self) -> str:
+        statuses = {result.status for result in self.node_results.values()}
+        if statuses <= {NodeStatus.COMPLETED}:
+            return "completed"
+        if NodeStatus.COMPLETED in statuses:
+            return "completed_with_errors"
+        return "error"
+
+    def output(self, node_id: str) -> Any:
+        return self.artifacts.get(node_id)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "workflow_id": self.workflow_id,
+            "name": self.name,
+            "status": self.status,
+            "duration_seconds": self.finished_at - self.started_at,
+            "nodes": [result.to_dict() for result in self.node_results.values()],
+        }
+
+
+class WorkflowEngine:
+    """
+    Executes a WorkflowDAG, running every node whose dependencies are satisfied
+    in parallel under the ResourceManager concurrency limits.
+
+    A node fails when its skill raises or returns a dict with status "error",
+    following the result convention used by the agents. Nodes downstream of a
+    failure are skipped; independent branches keep running.
+
+    With a state manager, every finished node is checkpointed. Running a DAG
+    with the same workflow_id again restores completed nodes from the store
+    instead of executing them, so interrupted workflows resume where they
+    stopped.
+    """
+
+    def __init__(
+        self,
+        resource_manager: Optional[ResourceManager] = None,
+        state_manager: Optional[AgentStateManager] = None,
+    ) -> None:
+        self.resource_manager = resource_manager or ResourceManager()
+        self.state_manager = state_manager
+
+    async def run(self, dag: WorkflowDAG) -> WorkflowRun:
+        """Executes the graph and returns per-node results and artifacts."""
+        order = dag.topological_order()
+        deps = {node_id: dag.nodes[node_id].dependencies() for node_id in order}
+        results = {
+            node_id: NodeResult(
+                node_id=node_id, skill_name=dag.nodes[node_id].skill_name
+            )
+            for node_id in order
+        }
+        artifacts: Dict[str, Any] = {}
+        in_flight: Dict[asyncio.Task, str] = {}
+        started_at = time.time()
+
+        if self.state_manager:
+            await self._restore_checkpoints(dag, results, artifacts)
+            await self.state_manager.save_workflow(
+                dag.workflow_id, dag.name, len(order), metadata=dag.metadata
+            )
+
+        logger.info(
+            f"Running workflow '{dag.name}' ({dag.workflow_id}) with {len(order)} nodes"
+        )
+
+        def launch_ready() -> None:
+            for node_id in order:
+                result = results[node_id]
+                if result.status is not NodeStatus.PENDING:
+                    continue
+                dep_statuses = {results[dep].status for dep in deps[node_id]}
+                if dep_statuses & {NodeStatus.FAILED, NodeStatus.SKIPPED}:
+                    result.status = NodeStatus.SKIPPED
+                    result.error = "Skipped because an upstream node did not complete"
+                    continue
+                if dep_statuses <= {NodeStatus.COMPLETED}:
+                    result.status = NodeStatus.RUNNING
+                    result.started_at = time.time()
+                    task = asyncio.create_task(
+                        self._run_node(dag, dag.nodes[node_id], artifacts)
+                    )
+                    in_flight[task] = node_id
+
+        try:
+            launch_ready()
+            while in_flight:
+                done, _ = await asyncio.wait(
+                    in_flight.keys(), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    node_id = in_flight.pop(task)
+                    self._record_outcome(results[node_id], task.result(), artifacts)
+                    await self._checkpoint(dag, results[node_id], artifacts)
+                launch_ready()
+        finally:
+            for task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+        run = WorkflowRun(
+            workflow_id=dag.workflow_id,
+            name=dag.name,
+            node_results=results,
+            artifacts=artifacts,
+            started_at=started_at,
+            finished_at=time.time(),
+        )
+        if self.state_manager:
+            await self.state_manager.update_workflow_status(dag.workflow_id, run.status)
+        logger.info(
+            f"Workflow '{dag.name}' ({dag.workflow_id}) finished with status "
+            f"{run.status} in {run.finished_at - run.started_at:.2f}s"
+        )
+        return run
+
+    async def _restore_checkpoints(
+        self,
+        dag: WorkflowDAG,
+        results: Dict[str, NodeResult],
+        artifacts: Dict[str, Any],
+    ) -> None:
+        """
+        Marks nodes completed in a previous run as done and reloads outputs.
+        Raises ValueError if that run was built from different metadata.
+        """
+        workflow = await self.state_manager.get_workflow(dag.workflow_id)
+        if not workflow:
+            return
+        if workflow["metadata"] != json.loads(json.dumps(dag.metadata, default=str)):
+            raise ValueError(
+                f"Workflow {dag.workflow_id} was started with different inputs "
+                f"and cannot be resumed with these"
+            )
+        for step in workflow["steps"]:
+            result = results.get(step["step_id"])
+            if result is None or step["status"] != NodeStatus.COMPLETED.value:
+                continue
+            result.status = NodeStatus.COMPLETED
+            result.started_at = step["started_at"]
+            result.finished_at = step["finished_at"]
+            result.resumed = True
+            artifacts[result.node_id] = step["output"]
+        resumed = sum(1 for result in results.values() if result.resumed)
+        if resumed:
+            logger.info(
+                f"Resuming workflow {dag.workflow_id}: {resumed} of "
+                f"{len(results)} nodes restored from checkpoints"
+            )
+
+    async def _checkpoint(
+        self, dag: WorkflowDAG, result: NodeResult, artifacts: Dict[str, Any]
+    ) -> None:
+        if not self.state_manager:
+            return
+        try:
+            await self.state_manager.checkpoint_workflow_step(
+                dag.workflow_id,
+                result.node_id,
+                result.status.value,
+                output=artifacts.get(result.node_id),
+                error=result.error,
+                started_at=result.started_at,
+                finished_at=result.finished_at,
+            )
+        except Exception as e:
+            # A lost checkpoint only costs a re-run on resume; keep the workflow going.
+            logger.error(
+                f"Failed to checkpoint node {result.node_id} of {dag.workflow_id}: {e}",
+                exc_info=True,
+            )
+
+    async def _run_node(
+        self, dag: WorkflowDAG, node: WorkflowNode, artifacts: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        try:
+            skill = getattr(node.agent, node.skill_name)
+            parameters = _resolve_refs(node.parameters, artifacts)
+        except Exception as e:
+            # Fails this node only, like an error raised by the skill itself.
+            logger.error(
+                f"Could not prepare node {node.node_id} of {dag.workflow_id}: {e}",
+                exc_info=True,
+            )
+            return {"status": "error", "error": str(e)}
+        task = AgentTask(
+            task_type=node.skill_name,
+            parameters=parameters,
+            priority=node.priority,
+            parent_workflow_id=dag.workflow_id,
+        )
+        return await self.resource_manager.submit_skill(task, skill)
+
+    @staticmethod
+    def _record_outcome(
+        result: NodeResult, outcome: Dict[str, Any], artifacts: Dict[str, Any]
+    ) -> None:
+        result.finished_at = time.time()
+        result.task_id = outcome.get("task_id")
+        if outcome["status"] != "success":
+            result.status = NodeStatus.FAILED
+            result.error = outcome.get("error")
+            return
+
+        output = outcome.get("result")
+        if isinstance(output, dict) and output.get("status") == "error":
+            result.status = NodeStatus.FAILED
+            result.error = output.get("error", "Skill reported an error")
+        else:
+            result.status = NodeStatus.COMPLETED
+        # Failed outputs are kept too so callers can surface partial results.
+        artifacts[result.node_id] = output
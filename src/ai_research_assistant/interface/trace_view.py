@@ -0,0 +1,172 @@
+# src/ai_research_assistant/interface/trace_view.py
+"""
+Renders spans written by JsonlSpanExporter as text waterfalls.
+
+Usage:
+    python -m ai_research_assistant.interface.trace_view traces.jsonl
+    python -m ai_research_assistant.interface.trace_view traces.jsonl --conversation <id>
+    python -m ai_research_assistant.interface.trace_view traces.jsonl --trace <trace_id>
+
+Without a filter the traces in the file are listed, newest last.
+"""
+
+import argparse
+import sys
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ai_research_assistant.core.tracing import read_spans
+
+Span = Dict[str, Any]
+
+
+def group_traces(spans: List[Span]) -> Dict[str, List[Span]]:
+    """Groups spans by trace id, each trace sorted by start time."""
+    traces: Dict[str, List[Span]] = defaultdict(list)
+    for span in spans:
+        traces[span["trace_id"]].append(span)
+    for trace_spans in traces.values():
+        trace_spans.sort(key=lambda span: span["start_time"])
+    return dict(traces)
+
+
+def conversation_trace_ids(spans: List[Span], conversation_id: str) -> List[str]:
+    """Trace ids containing a span tagged with the conversation, oldest first."""
+    starts: Dict[str, float] = {}
+    for span in spans:
+        if span.get("attributes", {}).get("conversation.id") == conversation_id:
+            trace_id = span["trace_id"]
+            starts[trace_id] = min(
+                starts.get(trace_id, span["start_time"]), span["start_time"]
+            )
+    return sorted(starts, key=starts.__getitem__)
+
+
+def _span_end(span: Span) -> float:
+    return span.get("end_time") or span["start_time"]
+
+
+def _ordered_with_depth(trace_spans: List[Span]) -> List[tuple]:
+    """Depth-first walk of the span tree; orphaned spans are treated as roots."""
+    span_ids = {span["span_id"] for span in trace_spans}
+    children: Dict[Optional[str], List[Span]] = defaultdict(list)
+    for span in trace_spans:
+        parent = span.get("parent_span_id")
+        children[parent if parent in span_ids else None].append(span)
+
+    ordered: List[tuple] = []
+
+    def visit(span: Span, depth: int) -> None:
+        ordered.append((span, depth))
+        for child in sorted(children[span["span_id"]], key=lambda s: s["start_time"]):
+            visit(child, depth + 1)
+
+    for root in sorted(children[None], key=lambda s: s["start_time"]):
+        visit(root, 0)
+    return ordered
+
+
+def render_waterfall(trace_spans: List[Span], width: int = 60) -> str:
+    """Renders one trace as an indented span tree with proportional timing bars."""
+    if not trace_spans:
+        return ""
+    trace_start = min(span["start_time"] for span in trace_spans)
+    trace_end = max(_span_end(span) for span in trace_spans)
+    total = max(trace_end - trace_start, 1e-9)
+
+    rows = []
+    for span, depth in _ordered_with_depth(trace_spans):
+        label = f"{'  ' * depth}{span['name']} [{span.get('service', '?')}]"
+        if span.get("status") == "error":
+            label += " !"
+        offset = span["start_time"] - trace_start
+        duration = _span_end(span) - span["start_time"]
+        start_col = min(width - 1, int(offset / total * width))
+        length = max(1, min(width - start_col, round(duration / total * width)))
+        bar = (" " * start_col + "█" * length).ljust(width)
+        rows.append((label, bar, offset, duration))
+
+    label_width = max(len(label) for label, _, _, _ in rows)
+    header = (
+        f"trace {trace_spans[0]['trace_id']}  "
+        f"{datetime.fromtimestamp(trace_start).isoformat(timespec='milliseconds')}  "
+        f"{total * 1000:.1f} ms, {len(trace_spans)} spans"
+    )
+    lines = [header]
+    for label, bar, offset, duration in rows:
+        lines.append(
+            f"{label.ljust(label_width)} |{bar}| "
+            f"+{offset * 1000:>9.1f} ms {duration * 1000:>9.1f} ms"
+        )
+    return "\n".join(lines)
+
+
+def render_trace_list(spans: List[Span]) -> str:
+    """One line per trace: start, duration, span count, root span and conversation."""
+    lines = []
+    traces = group_traces(spans)
+    for trace_id, trace_spans in sorted(
+        traces.items(), key=lambda item: item[1][0]["start_time"]
+    ):
+        start = trace_spans[0]["start_time"]
+        end = max(_span_end(span) for span in trace_spans)
+        root = _ordered_with_depth(trace_spans)[0][0]
+        conversation = next(
+            (
+                span["attributes"]["conversation.id"]
+                for span in trace_spans
+                if span.get("attributes", {}).get("conversation.id")
+            ),
+            "-",
+        )
+        lines.append(
+            f"{trace_id}  {datetime.fromtimestamp(start).isoformat(timespec='seconds')}  "
+            f"{(end - start) * 1000:>9.1f} ms  {len(trace_spans):>4} spans  "
+            f"{root['name']}  conversation={conversation}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Render distributed traces from a JSONL span file"
+    )
+    parser.add_argument("path", help="Span file written by JsonlSpanExporter")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--conversation", help="Show every trace for a conversation")
+    group.add_argument("--trace", help="Show a single trace id")
+    parser.add_argument(
+        "--width", type=int, default=60, help="Width of the timing bars"
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        spans = read_spans(args.path)
+    except OSError as e:
+        print(f"Could not read spans: {e}", file=sys.stderr)
+        return 1
+
+    if args.conversation:
+        trace_ids = conversation_trace_ids(spans, args.conversation)
+    elif args.trace:
+        trace_ids = [args.trace]
+    else:
+        print(render_trace_list(spans) or "No traces found.")
+        return 0
+
+    traces = group_traces(spans)
+    waterfalls = [
+        render_waterfall(traces[trace_id], width=args.width)
+        for trace_id in trace_ids
+        if trace_id in traces
+    ]
+    if not waterfalls:
+        print("No matching traces found.", file=sys.stderr)
+        return 1
+    print("\n\n".join(waterfalls))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,42 @@
 # src/ai_research_assistant/mcp/client.py
 import logging
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic_ai.mcp import (
+    CallToolFunc,
     MCPServer,
     MCPServerSSE,
     MCPServerStdio,
     MCPServerStreamableHTTP,
+    ToolResult,
 )
+from pydantic_ai.tools import RunContext
 
 # --- FIX: Import the INSTANCE from the config package ---
 from ..config import mcp_config
+from ..core.tracing import inject, start_span
 
 logger = logging.getLogger(__name__)
 
 
+async def trace_mcp_tool_call(
+    ctx: RunContext[Any],
+    call_tool: CallToolFunc,
+    tool_name: str,
+    args: Dict[str, Any],
+) -> ToolResult:
+    """
+    process_tool_call hook that wraps each MCP tool call in a client span and
+    sends the W3C trace context to the server in the request ``_meta``.
+    """
+    with start_span(
+        f"mcp.call_tool {tool_name}",
+        kind="client",
+        attributes={"mcp.tool": tool_name, "run.step": ctx.run_step},
+    ):
+        return await call_tool(tool_name, args, dict(inject({})) or None)
+
+
 def create_mcp_toolsets_from_config() -> List[MCPServer]:
     """
     Reads the mcp.json configuration and creates a list of MCPServer
@@ -49,6 +71,7 @@ def create_mcp_toolsets_from_config() -> List[MCPServer]:
                     cwd=config.get("cwd"),
                     env=config.get("env"),
                     tool_prefix=tool_prefix,
+                    process_tool_call=trace_mcp_tool_call,
                 )
                 logger.info(f"Created MCPServerStdio toolset for '{server_name}'")
 
@@ -59,7 +82,11 @@ def create_mcp_toolsets_from_config() -> List[MCPServer]:
                         f"No URL specified for SSE server '{server_name}'. Skipping."
                     )
                     continue
-                server_toolset = MCPServerSSE(url=url, tool_prefix=tool_prefix)
+                server_toolset = MCPServerSSE(
+                    url=url,
+                    tool_prefix=tool_prefix,
+                    process_tool_call=trace_mcp_tool_call,
+                )
                 logger.info(f"Created MCPServerSSE toolset for '{server_name}'")
 
             elif transport_type == "streamable-http":
@@ -70,7 +97,9 @@ def create_mcp_toolsets_from_config() -> List[MCPServer]:
                     )
                     continue
                 server_toolset = MCPServerStreamableHTTP(
-                    url=url, tool_prefix=tool_prefix
+                    url=url,
+                    tool_prefix=tool_prefix,
+                    process_tool_call=trace_mcp_tool_call,
                 )
                 logger.info(
                     f"Created MCPServerStreamableHTTP toolset for '{server_name}'"
@@ -114,6 +114,28 @@ def build_agent_card_embeddings(
     return df
 
 
+# --- Agent Search ---
+def find_best_agent_card(
+    agent_cards: List[Dict[str, Any]],
+    card_embeddings: np.ndarray,
+    query_embedding: List[float],
+) -> Dict[str, Any]:
+    """
+    Finds the agent card whose embedding best matches a query embedding.
+
+    Args:
+        agent_cards: The agent card dictionaries, in embedding order.
+        card_embeddings: One embedding per card, stacked into a matrix once
+            when the server starts rather than on every query.
+        query_embedding: The embedding of the natural language query.
+
+    Returns:
+        The agent card with the highest dot product similarity.
+    """
+    dot_products = card_embeddings @ np.asarray(query_embedding)
+    return agent_cards[int(np.argmax(dot_products))]
+
+
 # --- Main Server Logic ---
 def serve(
     host: str,
@@ -145,6 +167,8 @@ def serve(
         logger.error(
             "No agent card embeddings created. The 'find_agent' tool will be disabled."
         )
+    agent_cards: List[Dict[str, Any]] = [] if df.empty else df["agent_card"].to_list()
+    card_embeddings = None if df.empty else np.stack(df["card_embeddings"].tolist())
 
     @mcp.tool(
         name="find_agent",
@@ -165,23 +189,16 @@ def serve(
             return {"error": "Agent embedding data is not available."}
 
         query_embedding = embedding_client.embed_query(query)
+        agent_card = find_best_agent_card(agent_cards, card_embeddings, query_embedding)
 
-        # Correctly convert Series of lists to a list of lists for np.stack
-        card_embeddings = np.stack(df["card_embeddings"].tolist())
-
-        dot_products = np.dot(card_embeddings, query_embedding)
-        best_match_index = np.argmax(dot_products)
-
-        agent_name = df.iloc[best_match_index]["agent_card"]["agent_name"]
+        agent_name = agent_card["agent_name"]
         logger.info(f"Query '{query[:50]}...' best matched with agent: {agent_name}")
-        return df.iloc[best_match_index]["agent_card"]
+        return agent_card
 
     @mcp.resource("resource://agent_cards/list", mime_type="application/json")
     def get_agent_cards_list() -> Dict[str, List[Any]]:
         """Retrieves a list of all loaded agent card dictionaries."""
-        if df.empty:
-            return {"agent_cards": []}
-        return {"agent_cards": df["agent_card"].to_list()}
+        return {"agent_cards": agent_cards}
 
     logger.info(
         f"Agent Finder MCP Server running at {host}:{port} with transport {transport}"
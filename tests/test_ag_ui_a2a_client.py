@@ -26,16 +26,62 @@ from ag_ui.core import (
 )
 
 from ai_research_assistant.ag_ui_backend.a2a_client import (
+    PART_DECODERS,
     A2AClient,
+    CodeDiffEvent,
+    ContractSummaryEvent,
     CustomEventType,
+    FileContentEvent,
+    HistoryContext,
+    IDECommandEvent,
+    LegalAnalysisEvent,
     NotificationEvent,
     PlanEvent,
     StatusEvent,
+    decode_parts,
+    register_part_type,
+    text_message_events,
 )
 from ai_research_assistant.core.models import (
+    Part,
     SkillInvocation,
 )
 
+# One valid content per built-in MIME type, with the event class it maps to
+SAMPLE_PARTS = {
+    "application/vnd.agent-plan.v1+json": (PlanEvent, {"plan": ["Gather records"]}),
+    "application/vnd.agent-status.v1+json": (StatusEvent, {"message": "Searching"}),
+    "application/vnd.code-diff.v1+json": (
+        CodeDiffEvent,
+        {"uri": "file:///a.py", "diff": "-a\n+b"},
+    ),
+    "application/vnd.file-content.v1+json": (
+        FileContentEvent,
+        {"uri": "file:///a.py", "content": "print()"},
+    ),
+    "application/vnd.notification.v1+json": (
+        NotificationEvent,
+        {"severity": "info", "message": "Saved"},
+    ),
+    "application/vnd.ide-command.v1+json": (
+        IDECommandEvent,
+        {"commandId": "open", "args": [1]},
+    ),
+    "application/vnd.legal-clause-analysis.v1+json": (
+        LegalAnalysisEvent,
+        {
+            "uri": "file:///decision.pdf",
+            "clause_text": "s. 22",
+            "analysis": "Applies",
+            "risk_level": "low",
+        },
+    ),
+    "application/vnd.contract-summary.v1+json": (
+        ContractSummaryEvent,
+        {"uri": "file:///decision.pdf", "summary": {"parties": ["WCB"]}},
+    ),
+}
+
 
 class TestA2AClient:
     """Test suite for A2AClient class."""
@@ -472,6 +518,209 @@ class TestA2AClient:
             assert len(content_events) == 1
 
 
+class TestHistoryContext:
+    """Test suite for sending history by context id and delta."""
+
+    @pytest.fixture
+    def client(self):
+        return A2AClient("http://localhost:8001")
+
+    @pytest.fixture
+    def conversation_id(self):
+        return str(uuid.uuid4())
+
+    def history(self, count):
+        return [
+            AGUIUserMessage(id=str(index), role="user", content=f"Message {index}")
+            for index in range(count)
+        ]
+
+    def response(self, conversation_id, status_code=200, metadata=None):
+        response = Mock()
+        response.status_code = status_code
+        response.raise_for_status.return_value = None
+        response.json.return_value = {
+            "conversation_id": conversation_id,
+            "source_agent_id": "chief_legal_orchestrator",
+            "target_agent_id": "ag_ui_backend",
+            "task_result": {"parts": [{"type": "text/plain", "content": "Done"}]},
+            "metadata": metadata or {},
+        }
+        return response
+
+    def sent_parameters(self, post):
+        return [
+            call.kwargs["json"]["skill_invocation"]["parameters"]
+            for call in post.call_args_list
+        ]
+
+    async def send(self, client, conversation_id, history, context):
+        return await client.send_to_orchestrator(
+            conversation_id, "Next?", history, [], {}, history_context=context
+        )
+
+    @pytest.mark.asyncio
+    async def test_only_new_messages_are_sent_once_context_is_known(
+        self, client, conversation_id
+    ):
+        """Test that a returned contextId turns later requests into deltas."""
+        context = HistoryContext()
+        post = AsyncMock(
+            return_value=self.response(conversation_id, metadata={"contextId": "ctx"})
+        )
+
+        with patch.object(client.http_client, "post", post):
+            await self.send(client, conversation_id, self.history(3), context)
+            await self.send(client, conversation_id, self.history(5), context)
+
+        first, second = self.sent_parameters(post)
+        assert len(first["history"]) == 3
+        assert "context_id" not in first
+        assert second["context_id"] == "ctx"
+        assert second["history_offset"] == 3
+        assert [message["id"] for message in second["history"]] == ["3", "4"]
+        assert (context.context_id, context.length) == ("ctx", 5)
+
+    @pytest.mark.asyncio
+    async def test_lost_context_resends_full_history(self, client, conversation_id):
+        """Test that a 409 answer is retried with the whole history."""
+        context = HistoryContext(context_id="stale", length=2)
+        post = AsyncMock(
+            side_effect=[
+                self.response(conversation_id, status_code=409),
+                self.response(conversation_id, metadata={"contextId": "fresh"}),
+            ]
+        )
+
+        with patch.object(client.http_client, "post", post):
+            events = await self.send(client, conversation_id, self.history(4), context)
+
+        delta, full = self.sent_parameters(post)
+        assert delta["history_offset"] == 2
+        assert "context_id" not in full
+        assert len(full["history"]) == 4
+        assert events[1]["delta"] == "Done"
+        assert (context.context_id, context.length) == ("fresh", 4)
+
+    @pytest.mark.asyncio
+    async def test_orchestrator_without_context_support(self, client, conversation_id):
+        """Test that the context is dropped if the orchestrator returns none."""
+        context = HistoryContext(context_id="old", length=1)
+        post = AsyncMock(return_value=self.response(conversation_id))
+
+        with patch.object(client.http_client, "post", post):
+            await self.send(client, conversation_id, self.history(2), context)
+
+        assert context.context_id is None
+        assert context.length == 0
+
+    @pytest.mark.asyncio
+    async def test_serialized_history_is_sent_as_given(self, client, conversation_id):
+        """Test that pre-dumped history is not dumped again."""
+        serialized = [{"id": "cached", "role": "user", "content": "From cache"}]
+        post = AsyncMock(return_value=self.response(conversation_id))
+
+        with patch.object(client.http_client, "post", post):
+            await client.send_to_orchestrator(
+                conversation_id,
+                "Next?",
+                self.history(1),
+                [],
+                {},
+                serialized_history=serialized,
+            )
+
+        assert self.sent_parameters(post)[0]["history"] == serialized
+
+
+class TestPartDecoding:
+    """Test suite for the MIME type registry used to decode task results."""
+
+    @pytest.mark.parametrize("mime_type", sorted(SAMPLE_PARTS))
+    def test_wire_dicts_match_event_model_dumps(self, mime_type):
+        """Test that the fast path emits exactly what the event models dump."""
+        event_class, content = SAMPLE_PARTS[mime_type]
+        data_type = event_class.model_fields["data"].annotation
+
+        events = decode_parts([Part(type=mime_type, content=content)], "m-1")
+
+        expected = event_class(
+            message_id="m-1", data=data_type.model_validate(content)
+        ).model_dump(by_alias=True, exclude_none=True)
+        assert events[1] == expected
+        assert [event["type"] for event in events] == [
+            EventType.TEXT_MESSAGE_START,
+            expected["type"],
+            EventType.TEXT_MESSAGE_END,
+        ]
+
+    def test_text_events_match_sdk_model_dumps(self):
+        """Test the hand-built TEXT_MESSAGE_* dicts against the SDK models."""
+        from ag_ui.core import (
+            TextMessageContentEvent,
+            TextMessageEndEvent,
+            TextMessageStartEvent,
+        )
+
+        assert text_message_events("m-1", "Hello") == [
+            TextMessageStartEvent(
+                type=EventType.TEXT_MESSAGE_START, message_id="m-1", role="assistant"
+            ).model_dump(by_alias=True, exclude_none=True),
+            TextMessageContentEvent(
+                type=EventType.TEXT_MESSAGE_CONTENT, message_id="m-1", delta="Hello"
+            ).model_dump(by_alias=True, exclude_none=True),
+            TextMessageEndEvent(
+                type=EventType.TEXT_MESSAGE_END, message_id="m-1"
+            ).model_dump(by_alias=True, exclude_none=True),
+        ]
+
+    def test_invalid_content_becomes_error_text(self):
+        """Test that a part failing validation is reported in the text."""
+        events = decode_parts(
+            [
+                Part(type="text/plain", content="Summary."),
+                Part(
+                    type="application/vnd.notification.v1+json",
+                    content={"severity": "loud", "message": "x"},
+                ),
+            ],
+            "m-1",
+        )
+
+        assert len(events) == 3
+        assert events[1]["delta"].startswith("Summary. Error processing content:")
+
+    def test_registered_custom_part_type(self):
+        """Test that new part types are decoded once registered."""
+        from pydantic import BaseModel
+
+        class DeadlinePart(BaseModel):
+            name: str
+            days_left: int
+
+        register_part_type(
+            "application/vnd.test-deadline.v1+json", "deadline", DeadlinePart
+        )
+        try:
+            events = decode_parts(
+                [
+                    Part(
+                        type="application/vnd.test-deadline.v1+json",
+                        content={"name": "Appeal", "days_left": "30"},
+                    )
+                ],
+                "m-1",
+            )
+        finally:
+            del PART_DECODERS["application/vnd.test-deadline.v1+json"]
+
+        assert events[1] == {
+            "type": "deadline",
+            "message_id": "m-1",
+            "data": {"name": "Appeal", "days_left": 30},
+        }
+
+
 class TestCustomEvents:
     """Test suite for custom event classes."""
 
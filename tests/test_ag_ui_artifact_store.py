@@ -0,0 +1,55 @@
+"""
+Test suite for ag_ui_backend.artifact_store module.
+
+This module contains tests for the content-addressed store of oversized
+AG-UI message bodies.
+"""
+
+import pytest
+
+from ai_research_assistant.ag_ui_backend.artifact_store import ArtifactStore
+
+
+@pytest.fixture
+def artifact_store(tmp_path):
+    return ArtifactStore(str(tmp_path / "artifacts"), inline_limit=8)
+
+
+class TestArtifactStore:
+    """Test cases for ArtifactStore."""
+
+    @pytest.mark.asyncio
+    async def test_put_and_get_round_trip(self, artifact_store):
+        """Test that stored content is returned unchanged."""
+        ref = await artifact_store.put("résumé of findings")
+
+        assert ref["bytes"] == len("résumé of findings".encode("utf-8"))
+        assert await artifact_store.get(ref["id"]) == "résumé of findings"
+
+    @pytest.mark.asyncio
+    async def test_identical_content_is_stored_once(self, artifact_store, tmp_path):
+        """Test content addressing."""
+        first = await artifact_store.put("same body")
+        second = await artifact_store.put("same body")
+
+        assert first == second
+        assert len(list((tmp_path / "artifacts").rglob("*"))) == 2  # dir + file
+
+    @pytest.mark.asyncio
+    async def test_unknown_and_malformed_ids(self, artifact_store):
+        """Test that bad ids never touch paths outside the store."""
+        assert await artifact_store.get("0" * 64) is None
+        assert await artifact_store.get("../../etc/passwd") is None
+        assert artifact_store.path("not-a-hash") is None
+
+    def test_is_oversized_counts_bytes(self, artifact_store):
+        """Test that the limit applies to the UTF-8 size, not characters."""
+        assert not artifact_store.is_oversized("12345678")
+        assert artifact_store.is_oversized("123456789")
+        assert artifact_store.is_oversized("ééééé")  # 5 chars, 10 bytes
+
+    def test_nothing_is_written_until_put(self, tmp_path):
+        """Test that creating a store does not create its directory."""
+        ArtifactStore(str(tmp_path / "unused"))
+
+        assert not (tmp_path / "unused").exists()
@@ -0,0 +1,349 @@
+"""
+Test suite for ag_ui_backend.conversation_store module.
+
+This module contains tests for the durable, append-only conversation history
+and its integration with AGUIStateManager.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from ag_ui.core import AssistantMessage, ToolMessage, UserMessage
+
+from ai_research_assistant.ag_ui_backend.conversation_store import ConversationStore
+from ai_research_assistant.ag_ui_backend.spill_store import ConversationSpillStore
+from ai_research_assistant.ag_ui_backend.state_manager import AGUIStateManager
+
+
+def user_message(index: int) -> UserMessage:
+    return UserMessage(id=f"m{index}", role="user", content=f"Message {index}")
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "nested" / "history.db")
+
+
+@pytest.fixture
+async def store(db_path):
+    store = ConversationStore(db_path, batch_size=1000, flush_interval=60)
+    await store.initialize()
+    yield store
+    await store.close()
+
+
+class TestConversationStore:
+    """Test cases for ConversationStore."""
+
+    @pytest.mark.asyncio
+    async def test_round_trip_preserves_order_and_types(self, store):
+        """Test that messages come back in append order with their seq."""
+        messages = [
+            UserMessage(id="1", role="user", content="Appeal my claim"),
+            AssistantMessage(id="2", role="assistant", content="On it"),
+            ToolMessage(id="3", role="tool", content="{}", tool_call_id="call-1"),
+        ]
+        for message in messages:
+            store.append_message("thread", message)
+        store.save_state("thread", {"case": {"id": 7}})
+        await store.flush()
+
+        stored = await store.load_conversation("thread")
+
+        assert stored.state == {"case": {"id": 7}}
+        assert stored.state_version == 1
+        assert stored.messages == list(zip([1, 2, 3], messages))
+        assert stored.last_seq == 3
+
+    @pytest.mark.asyncio
+    async def test_writes_are_buffered_until_flush(self, store):
+        """Test that appends are not committed one at a time."""
+        store.append_message("thread", user_message(1))
+        store.append_message("thread", user_message(2))
+
+        assert await store.message_count("thread") == 0
+        assert await store.flush() == 2
+        assert await store.message_count("thread") == 2
+
+    @pytest.mark.asyncio
+    async def test_batch_size_triggers_background_flush(self, db_path):
+        """Test that a full batch is committed without an explicit flush."""
+        store = ConversationStore(db_path, batch_size=3, flush_interval=60)
+        await store.initialize()
+        try:
+            for index in range(3):
+                store.append_message("thread", user_message(index))
+            await store._flush_task
+
+            assert await store.message_count("thread") == 3
+        finally:
+            await store.close()
+
+    @pytest.mark.asyncio
+    async def test_flush_interval_commits_partial_batch(self, db_path):
+        """Test that a partial batch is committed once the interval elapses."""
+        store = ConversationStore(db_path, batch_size=100, flush_interval=0.01)
+        await store.initialize()
+        try:
+            store.append_message("thread", user_message(1))
+            await asyncio.sleep(0.05)
+
+            assert await store.message_count("thread") == 1
+        finally:
+            await store.close()
+
+    @pytest.mark.asyncio
+    async def test_paged_reads(self, db_path):
+        """Test that reads are paged by seq and iterate across pages."""
+        store = ConversationStore(db_path, page_size=4)
+        await store.initialize()
+        try:
+            for index in range(10):
+                store.append_message("thread", user_message(index))
+            await store.flush()
+
+            first_page = await store.load_messages("thread")
+            next_page = await store.load_messages("thread", after_seq=first_page[-1][0])
+            everything = [seq async for seq, _ in store.iter_messages("thread")]
+            tail = await store.load_conversation("thread", after_seq=8)
+
+            assert [seq for seq, _ in first_page] == [1, 2, 3, 4]
+            assert [seq for seq, _ in next_page] == [5, 6, 7, 8]
+            assert everything == list(range(1, 11))
+            assert [message.id for _, message in tail.messages] == ["m8", "m9"]
+        finally:
+            await store.close()
+
+    @pytest.mark.asyncio
+    async def test_state_versions_increase_and_latest_write_wins(self, store):
+        """Test that only the newest buffered state is written per flush."""
+        store.save_state("thread", {"step": 1})
+        store.save_state("thread", {"step": 2})
+        await store.flush()
+        store.save_state("thread", {"step": 3})
+        await store.flush()
+
+        stored = await store.load_conversation("thread")
+
+        assert stored.state == {"step": 3}
+        assert stored.state_version == 2
+
+    @pytest.mark.asyncio
+    async def test_on_stored_reports_where_writes_landed(self, store):
+        """Test that committed writes report their seq and state version."""
+        stored = []
+        store.append_message("thread", user_message(1))
+        await store.flush()
+        store.append_message("thread", user_message(1), on_stored=stored.append)
+        store.append_message("thread", user_message(2), on_stored=stored.append)
+        store.save_state("thread", {"step": 1}, on_stored=stored.append)
+
+        assert stored == []
+        await store.flush()
+
+        # m1 was already stored at seq 1, so only m2 reports its seq
+        assert stored == [3, 1]
+        assert [seq for seq, _ in await store.load_messages("thread")] == [1, 3]
+
+    @pytest.mark.asyncio
+    async def test_last_event_seq_only_moves_forward(self, store):
+        """Test that the stored event seq is the highest ever saved."""
+        store.append_message("thread", user_message(1))
+        store.save_event_seq("thread", 7)
+        store.save_event_seq("thread", 5)
+        await store.flush()
+        store.save_event_seq("thread", 6)
+        await store.flush()
+
+        assert (await store.load_conversation("thread")).last_event_seq == 7
+
+    @pytest.mark.asyncio
+    async def test_workers_share_a_thread_without_duplicates(self, store, db_path):
+        """Test that two stores on one database continue the same history."""
+        other_worker = ConversationStore(db_path)
+        await other_worker.initialize()
+        try:
+            store.append_message("thread", user_message(1))
+            await store.flush()
+            other_worker.append_message("thread", user_message(1))
+            other_worker.append_message("thread", user_message(2))
+            await other_worker.flush()
+
+            stored = await store.load_conversation("thread")
+        finally:
+            await other_worker.close()
+
+        assert [message.id for _, message in stored.messages] == ["m1", "m2"]
+
+    @pytest.mark.asyncio
+    async def test_writes_before_initialize_survive_restart(self, db_path):
+        """Test that buffered writes are committed by initialize and close."""
+        store = ConversationStore(db_path)
+        store.append_message("thread", user_message(1))
+        await store.initialize()
+        store.append_message("thread", user_message(2))
+        await store.close()
+
+        reopened = ConversationStore(db_path)
+        await reopened.initialize()
+        try:
+            assert await reopened.message_count("thread") == 2
+        finally:
+            await reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_delete_thread(self, store):
+        """Test that deleting a thread drops its rows and pending writes."""
+        store.append_message("thread", user_message(1))
+        await store.flush()
+        store.append_message("thread", user_message(2))
+
+        await store.delete_thread("thread")
+
+        assert await store.load_conversation("thread") is None
+        assert await store.flush() == 0
+
+    @pytest.mark.asyncio
+    async def test_unknown_thread_is_none(self, store):
+        """Test that a thread with no rows loads as None."""
+        assert await store.load_conversation("missing") is None
+
+
+class TestStateManagerWithConversationStore:
+    """Test cases for write-through and sync_conversation."""
+
+    @pytest.mark.asyncio
+    async def test_messages_and_state_write_through(self, store):
+        """Test that conversation updates reach the store."""
+        manager = AGUIStateManager(conversation_store=store)
+        conversation = manager.get_or_create_conversation("thread")
+
+        conversation.add_message(user_message(1))
+        conversation.update_state({"step": 1})
+        conversation.patch_state([{"op": "replace", "path": "/step", "value": 2}])
+        await store.flush()
+
+        stored = await store.load_conversation("thread")
+        assert [message.id for _, message in stored.messages] == ["m1"]
+        assert stored.state == {"step": 2}
+
+    @pytest.mark.asyncio
+    async def test_sync_restores_history_after_restart(self, store):
+        """Test that a fresh manager recovers a stored conversation."""
+        before = AGUIStateManager(conversation_store=store)
+        conversation = before.get_or_create_conversation("thread")
+        conversation.add_message(user_message(1))
+        conversation.update_state({"step": 1})
+
+        after = AGUIStateManager(conversation_store=store)
+        restored = after.get_or_create_conversation("thread")
+        merged = await after.sync_conversation(restored)
+
+        assert merged == 1
+        assert restored.messages == [user_message(1)]
+        assert restored.current_state == {"step": 1}
+
+    @pytest.mark.asyncio
+    async def test_sync_merges_messages_from_another_worker(self, store):
+        """Test that only messages this worker does not hold are merged."""
+        worker_a = AGUIStateManager(conversation_store=store)
+        worker_b = AGUIStateManager(conversation_store=store)
+        conversation_a = worker_a.get_or_create_conversation("thread")
+        conversation_b = worker_b.get_or_create_conversation("thread")
+        conversation_a.add_message(user_message(1))
+        await worker_b.sync_conversation(conversation_b)
+
+        conversation_b.add_message(user_message(2))
+        merged = await worker_a.sync_conversation(conversation_a)
+
+        assert merged == 1
+        assert [message.id for message in conversation_a.messages] == ["m1", "m2"]
+        assert await worker_a.sync_conversation(conversation_a) == 0
+
+    @pytest.mark.asyncio
+    async def test_own_writes_are_not_reloaded(self, store):
+        """Test that committed writes advance synced_seq and state_version."""
+        manager = AGUIStateManager(conversation_store=store)
+        conversation = manager.get_or_create_conversation("thread")
+        conversation.add_message(user_message(1))
+        conversation.add_message(user_message(2))
+        conversation.update_state({"step": 1})
+        await store.flush()
+
+        assert conversation.synced_seq == 2
+        assert conversation.state_version == 1
+        with patch.object(
+            conversation, "replace_state", wraps=conversation.replace_state
+        ) as replace_state:
+            assert await manager.sync_conversation(conversation) == 0
+        replace_state.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_own_writes_do_not_skip_another_workers(self, store):
+        """Test that synced_seq stops below messages this worker never saw."""
+        worker_a = AGUIStateManager(conversation_store=store)
+        worker_b = AGUIStateManager(conversation_store=store)
+        conversation_a = worker_a.get_or_create_conversation("thread")
+        conversation_b = worker_b.get_or_create_conversation("thread")
+        conversation_b.add_message(user_message(1))
+        await store.flush()
+
+        conversation_a.add_message(user_message(2))
+        await store.flush()
+
+        assert conversation_a.synced_seq == 0
+        assert await worker_a.sync_conversation(conversation_a) == 1
+        assert conversation_a.synced_seq == 2
+
+    @pytest.mark.asyncio
+    async def test_rehydrated_conversation_keeps_its_sync_position(
+        self, store, tmp_path
+    ):
+        """Test that a spilled thread does not reload its stored history."""
+        spill_store = ConversationSpillStore(str(tmp_path / "spill.db"))
+        manager = AGUIStateManager(
+            max_conversations=1, spill_store=spill_store, conversation_store=store
+        )
+        try:
+            conversation = manager.get_or_create_conversation("thread")
+            conversation.add_message(user_message(1))
+            conversation.update_state({"step": 1})
+            await store.flush()
+            manager.get_or_create_conversation("other")
+            await manager.flush_spills()
+
+            restored = await manager.open_conversation("thread")
+        finally:
+            spill_store.close()
+
+        assert restored is not conversation
+        assert (restored.synced_seq, restored.state_version) == (1, 1)
+        assert restored.messages == [user_message(1)]
+
+    @pytest.mark.asyncio
+    async def test_new_event_log_continues_after_stored_seq(self, store):
+        """Test that a restarted thread does not reuse event seqs."""
+        before = AGUIStateManager(conversation_store=store)
+        conversation = before.get_or_create_conversation("thread")
+        conversation.add_message(user_message(1))
+        last = conversation.event_log.append({"type": "CUSTOM"})["seq"]
+        await store.flush()
+
+        after = AGUIStateManager(conversation_store=store)
+        # A clock behind the old log's seqs, as after many fast events
+        with patch(
+            "ai_research_assistant.ag_ui_backend.event_log.time.time", return_value=0
+        ):
+            restored = after.get_or_create_conversation("thread")
+        await after.sync_conversation(restored)
+
+        assert restored.event_log.append({"type": "CUSTOM"})["seq"] == last + 1
+
+    @pytest.mark.asyncio
+    async def test_sync_without_initialized_store_is_a_no_op(self, db_path):
+        """Test that an unopened store leaves the conversation alone."""
+        manager = AGUIStateManager(conversation_store=ConversationStore(db_path))
+        conversation = manager.get_or_create_conversation("thread")
+
+        assert await manager.sync_conversation(conversation) == 0
@@ -0,0 +1,83 @@
+"""
+Test suite for ag_ui_backend.event_log module.
+
+This module contains tests for the per-thread event replay buffer.
+"""
+
+import time
+
+from ai_research_assistant.ag_ui_backend.event_log import ThreadEventLog
+
+
+class TestThreadEventLog:
+    """Test cases for ThreadEventLog."""
+
+    def test_append_stamps_consecutive_seqs(self):
+        """Test that each event gets the next seq without mutating the input."""
+        log = ThreadEventLog()
+        event = {"type": "RUN_STARTED"}
+
+        first = log.append(event)
+        second = log.append({"type": "RUN_FINISHED"})
+
+        assert "seq" not in event
+        assert second["seq"] == first["seq"] + 1
+        assert log.last_seq == second["seq"]
+
+    def test_new_logs_start_after_remembered_seqs(self):
+        """Test that a seq from an earlier log cannot replay into a new one."""
+        old_log = ThreadEventLog()
+        remembered = old_log.append({"type": "CUSTOM"})["seq"]
+        time.sleep(0.002)
+
+        new_log = ThreadEventLog()
+        new_log.append({"type": "CUSTOM"})
+
+        assert new_log.since(remembered) is None
+
+    def test_since_returns_only_missed_events(self):
+        """Test replay from a known position."""
+        log = ThreadEventLog()
+        seqs = [log.append({"type": "CUSTOM", "n": n})["seq"] for n in range(4)]
+
+        assert [event["n"] for event in log.since(seqs[1])] == [2, 3]
+        assert log.since(seqs[-1]) == []
+        assert len(log.since(seqs[0] - 1)) == 4
+
+    def test_since_detects_rollover_and_unknown_seqs(self):
+        """Test that dropped or future positions need a snapshot."""
+        log = ThreadEventLog(capacity=3)
+        seqs = [log.append({"type": "CUSTOM"})["seq"] for _ in range(5)]
+
+        assert len(log) == 3
+        assert log.since(seqs[0]) is None
+        assert len(log.since(seqs[1])) == 3
+        assert log.since(seqs[-1] + 1) is None
+
+    def test_continue_after_an_earlier_logs_last_seq(self):
+        """Test that a new log never reuses seqs an earlier one issued."""
+        log = ThreadEventLog()
+        stored = log.last_seq + 10_000
+
+        log.continue_after(stored)
+        log.continue_after(stored - 5)
+
+        assert log.append({"type": "CUSTOM"})["seq"] == stored + 1
+        assert log.since(stored - 1) is None
+        log.continue_after(stored + 100)
+        assert log.append({"type": "CUSTOM"})["seq"] == stored + 2
+
+    def test_on_append_gets_each_seq(self):
+        """Test that the append hook sees every stamped seq."""
+        seqs = []
+        log = ThreadEventLog(on_append=seqs.append)
+
+        stamped = [log.append({"type": "CUSTOM"})["seq"] for _ in range(2)]
+
+        assert seqs == stamped
+
+    def test_empty_log_is_current_at_its_start(self):
+        """Test that a client at last_seq of an empty log needs nothing."""
+        log = ThreadEventLog()
+
+        assert log.since(log.last_seq) == []
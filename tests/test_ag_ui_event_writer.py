@@ -0,0 +1,163 @@
+"""
+Test suite for ag_ui_backend.event_writer module.
+
+This module contains tests for outbound event coalescing, batching and
+backpressure on AG-UI websocket connections.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from ag_ui.core import EventType
+from fastapi import WebSocket
+
+from ai_research_assistant.ag_ui_backend.event_writer import (
+    SLOW_CLIENT_CLOSE_CODE,
+    EventWriter,
+    coalesce_events,
+)
+
+
+def content(delta, seq, message_id="m1"):
+    return {
+        "type": EventType.TEXT_MESSAGE_CONTENT,
+        "messageId": message_id,
+        "delta": delta,
+        "seq": seq,
+    }
+
+
+@pytest.fixture
+def mock_websocket():
+    websocket = Mock(spec=WebSocket)
+    websocket.send_json = AsyncMock()
+    websocket.close = AsyncMock()
+    return websocket
+
+
+def sent(websocket):
+    return [call.args[0] for call in websocket.send_json.call_args_list]
+
+
+class TestCoalesceEvents:
+    """Test cases for coalesce_events."""
+
+    def test_adjacent_deltas_merge_keeping_last_seq(self):
+        """Test that a run of deltas becomes one event."""
+        events = [content("Hel", 1), content("lo", 2), content("!", 3)]
+
+        assert coalesce_events(events) == [content("Hello!", 3)]
+        assert events[0]["delta"] == "Hel"
+
+    def test_other_events_and_messages_break_runs(self):
+        """Test that only same-message neighbours are merged."""
+        start = {"type": EventType.TEXT_MESSAGE_START, "messageId": "m2", "seq": 3}
+        events = [
+            content("a", 1),
+            content("b", 2, message_id="m0"),
+            start,
+            content("c", 4, message_id="m2"),
+            content("d", 5, message_id="m2"),
+        ]
+
+        assert coalesce_events(events) == [
+            content("a", 1),
+            content("b", 2, message_id="m0"),
+            start,
+            content("cd", 5, message_id="m2"),
+        ]
+
+
+class TestEventWriter:
+    """Test cases for EventWriter."""
+
+    @pytest.mark.asyncio
+    async def test_streamed_deltas_leave_as_few_frames(self, mock_websocket):
+        """Test that deltas queued within the window are merged."""
+        writer = EventWriter(mock_websocket, coalesce_window=0.05)
+        for seq in range(100):
+            await writer.send_json(content("x", seq))
+        await writer.close()
+
+        frames = sent(mock_websocket)
+        assert "".join(frame["delta"] for frame in frames) == "x" * 100
+        assert len(frames) < 10
+        assert frames[-1]["seq"] == 99
+        assert writer.events_sent == 100
+
+    @pytest.mark.asyncio
+    async def test_batch_frames_are_json_arrays(self, mock_websocket):
+        """Test that batching clients get one list per flush."""
+        writer = EventWriter(mock_websocket, batch_frames=True)
+        await writer.send_json({"type": EventType.RUN_STARTED, "seq": 1})
+        await writer.send_json({"type": EventType.RUN_FINISHED, "seq": 2})
+        await writer.close()
+
+        frames = sent(mock_websocket)
+        assert all(isinstance(frame, list) for frame in frames)
+        assert [event["seq"] for frame in frames for event in frame] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_events_are_sent_without_waiting_for_close(self, mock_websocket):
+        """Test that non-streaming events are flushed promptly."""
+        writer = EventWriter(mock_websocket, coalesce_window=10.0)
+        await writer.send_json({"type": EventType.RUN_STARTED, "seq": 1})
+        await asyncio.sleep(0.01)
+
+        assert sent(mock_websocket) == [{"type": EventType.RUN_STARTED, "seq": 1}]
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_slow_client_is_dropped_when_queue_stays_full(self, mock_websocket):
+        """Test bounded memory: a stalled reader is disconnected."""
+
+        async def stall(frame):
+            await asyncio.Event().wait()
+
+        mock_websocket.send_json = AsyncMock(side_effect=stall)
+        writer = EventWriter(mock_websocket, max_queue=2, send_timeout=0.05)
+
+        with pytest.raises(ConnectionError):
+            for seq in range(10):
+                await writer.send_json({"type": EventType.CUSTOM, "seq": seq})
+
+        assert writer.failed
+        mock_websocket.close.assert_called_once_with(code=SLOW_CLIENT_CLOSE_CODE)
+        with pytest.raises(ConnectionError):
+            await writer.send_json({"type": EventType.CUSTOM})
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_push_queues_in_order_and_room_is_awaited_later(self, mock_websocket):
+        """Test that push never waits and wait_for_room applies the bound."""
+        release = asyncio.Event()
+
+        async def stall(frame):
+            await release.wait()
+
+        mock_websocket.send_json = AsyncMock(side_effect=stall)
+        writer = EventWriter(mock_websocket, max_queue=2, max_batch=1)
+        for seq in range(5):
+            writer.push({"type": EventType.CUSTOM, "seq": seq})
+
+        waiting = asyncio.create_task(writer.wait_for_room())
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+
+        release.set()
+        await waiting
+        await writer.close()
+        assert [event["seq"] for event in sent(mock_websocket)] == list(range(5))
+
+    @pytest.mark.asyncio
+    async def test_send_failure_stops_writer(self, mock_websocket):
+        """Test that a dead socket makes later sends fail fast."""
+        mock_websocket.send_json = AsyncMock(side_effect=RuntimeError("closed"))
+        writer = EventWriter(mock_websocket)
+        await writer.send_json({"type": EventType.CUSTOM})
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(ConnectionError):
+            await writer.send_json({"type": EventType.CUSTOM})
+        await writer.close()
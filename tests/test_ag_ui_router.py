@@ -11,21 +11,31 @@ Tests WebSocket router functionality including:
 - Error handling and validation
 """
 
+import asyncio
 import json
 import uuid
+from collections import defaultdict
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from ag_ui.core import (
     EventType,
 )
+from ag_ui.core import UserMessage as AGUIUserMessage
 from fastapi import WebSocket, WebSocketDisconnect
 from fastapi.testclient import TestClient
 
+from ai_research_assistant.ag_ui_backend.a2a_client import HistoryContext
+from ai_research_assistant.ag_ui_backend.artifact_store import ArtifactStore
+from ai_research_assistant.ag_ui_backend.event_log import ThreadEventLog
+from ai_research_assistant.ag_ui_backend.event_writer import EventWriter
 from ai_research_assistant.ag_ui_backend.router import (
     APIKeyTestRequest,
+    active_connections,
     router,
 )
+from ai_research_assistant.ag_ui_backend.shared_bus import InProcessBus
+from ai_research_assistant.ag_ui_backend.state_manager import AGUIConversationState
 
 
 class TestWebSocketEndpoint:
@@ -96,6 +106,12 @@ class TestWebSocketEndpoint:
         mock_conversation.send_state_snapshot = AsyncMock()
         mock_conversation.send_messages_snapshot = AsyncMock()
         mock_manager.get_or_create_conversation.return_value = mock_conversation
+        mock_manager.open_conversation = AsyncMock(
+            return_value=mock_manager.get_or_create_conversation.return_value
+        )
+        mock_manager.get_or_create_conversation.return_value.event_log = (
+            ThreadEventLog()
+        )
         return mock_manager
 
     @patch("ai_research_assistant.ag_ui_backend.router.global_state_manager")
@@ -106,6 +122,12 @@ class TestWebSocketEndpoint:
     ):
         """Test WebSocket connection establishment and initial setup."""
         mock_state_manager.get_or_create_conversation.return_value = Mock()
+        mock_state_manager.open_conversation = AsyncMock(
+            return_value=mock_state_manager.get_or_create_conversation.return_value
+        )
+        mock_state_manager.get_or_create_conversation.return_value.event_log = (
+            ThreadEventLog()
+        )
         mock_conversation = mock_state_manager.get_or_create_conversation.return_value
         mock_conversation.send_state_snapshot = AsyncMock()
         mock_conversation.send_messages_snapshot = AsyncMock()
@@ -122,9 +144,12 @@ class TestWebSocketEndpoint:
 
         # Verify connection setup
         mock_websocket.accept.assert_called_once()
-        mock_state_manager.get_or_create_conversation.assert_called_once_with(thread_id)
-        mock_conversation.send_state_snapshot.assert_called_once_with(mock_websocket)
-        mock_conversation.send_messages_snapshot.assert_called_once_with(mock_websocket)
+        mock_state_manager.open_conversation.assert_awaited_once_with(thread_id)
+        # Sent through the socket's writer, like every other event
+        (writer,) = mock_conversation.send_state_snapshot.call_args.args
+        assert isinstance(writer, EventWriter)
+        assert writer.websocket is mock_websocket
+        mock_conversation.send_messages_snapshot.assert_called_once_with(writer)
 
     @patch("ai_research_assistant.ag_ui_backend.router.global_state_manager")
     @patch("ai_research_assistant.ag_ui_backend.router.a2a_client")
@@ -142,9 +167,16 @@ class TestWebSocketEndpoint:
         mock_conversation.add_message = Mock()
         mock_conversation.messages = []
         mock_conversation.current_state = {}
+        mock_conversation.history_request.return_value = ([], HistoryContext(), 0)
         mock_conversation.send_state_snapshot = AsyncMock()
         mock_conversation.send_messages_snapshot = AsyncMock()
         mock_state_manager.get_or_create_conversation.return_value = mock_conversation
+        mock_state_manager.open_conversation = AsyncMock(
+            return_value=mock_state_manager.get_or_create_conversation.return_value
+        )
+        mock_state_manager.get_or_create_conversation.return_value.event_log = (
+            ThreadEventLog()
+        )
 
         # Mock orchestrator response
         mock_events = [
@@ -205,6 +237,12 @@ class TestWebSocketEndpoint:
         mock_conversation.send_state_snapshot = AsyncMock()
         mock_conversation.send_messages_snapshot = AsyncMock()
         mock_state_manager.get_or_create_conversation.return_value = mock_conversation
+        mock_state_manager.open_conversation = AsyncMock(
+            return_value=mock_state_manager.get_or_create_conversation.return_value
+        )
+        mock_state_manager.get_or_create_conversation.return_value.event_log = (
+            ThreadEventLog()
+        )
 
         # Simulate receiving tool message then disconnect
         mock_websocket.receive_text.side_effect = [
@@ -240,6 +278,12 @@ class TestWebSocketEndpoint:
         mock_conversation.send_state_snapshot = AsyncMock()
         mock_conversation.send_messages_snapshot = AsyncMock()
         mock_state_manager.get_or_create_conversation.return_value = mock_conversation
+        mock_state_manager.open_conversation = AsyncMock(
+            return_value=mock_state_manager.get_or_create_conversation.return_value
+        )
+        mock_state_manager.get_or_create_conversation.return_value.event_log = (
+            ThreadEventLog()
+        )
 
         # Simulate receiving invalid message then disconnect
         invalid_message = {"unknown": "message", "structure": True}
@@ -273,6 +317,12 @@ class TestWebSocketEndpoint:
         mock_conversation.send_state_snapshot = AsyncMock()
         mock_conversation.send_messages_snapshot = AsyncMock()
         mock_state_manager.get_or_create_conversation.return_value = mock_conversation
+        mock_state_manager.open_conversation = AsyncMock(
+            return_value=mock_state_manager.get_or_create_conversation.return_value
+        )
+        mock_state_manager.get_or_create_conversation.return_value.event_log = (
+            ThreadEventLog()
+        )
 
         # Simulate receiving invalid JSON then disconnect
         mock_websocket.receive_text.side_effect = [
@@ -306,9 +356,16 @@ class TestWebSocketEndpoint:
         mock_conversation.add_message = Mock()
         mock_conversation.messages = []
         mock_conversation.current_state = {}
+        mock_conversation.history_request.return_value = ([], HistoryContext(), 0)
         mock_conversation.send_state_snapshot = AsyncMock()
         mock_conversation.send_messages_snapshot = AsyncMock()
         mock_state_manager.get_or_create_conversation.return_value = mock_conversation
+        mock_state_manager.open_conversation = AsyncMock(
+            return_value=mock_state_manager.get_or_create_conversation.return_value
+        )
+        mock_state_manager.get_or_create_conversation.return_value.event_log = (
+            ThreadEventLog()
+        )
 
         # RunAgentInput without user message
         run_input = {
@@ -352,9 +409,16 @@ class TestWebSocketEndpoint:
         mock_conversation.add_message = Mock()
         mock_conversation.messages = []
         mock_conversation.current_state = {}
+        mock_conversation.history_request.return_value = ([], HistoryContext(), 0)
         mock_conversation.send_state_snapshot = AsyncMock()
         mock_conversation.send_messages_snapshot = AsyncMock()
         mock_state_manager.get_or_create_conversation.return_value = mock_conversation
+        mock_state_manager.open_conversation = AsyncMock(
+            return_value=mock_state_manager.get_or_create_conversation.return_value
+        )
+        mock_state_manager.get_or_create_conversation.return_value.event_log = (
+            ThreadEventLog()
+        )
 
         mock_a2a_client.send_to_orchestrator = AsyncMock(
             return_value=[
@@ -399,6 +463,913 @@ class TestWebSocketEndpoint:
         call_args = mock_a2a_client.send_to_orchestrator.call_args[1]
         assert call_args["user_prompt"] == "Prompt from forwarded props"
 
+    @patch("ai_research_assistant.ag_ui_backend.router.global_state_manager")
+    @patch("ai_research_assistant.ag_ui_backend.router.a2a_client")
+    @pytest.mark.asyncio
+    async def test_orchestrator_state_events_become_sequenced_deltas(
+        self,
+        mock_a2a_client,
+        mock_state_manager,
+        mock_websocket,
+        thread_id,
+        run_agent_input,
+    ):
+        """Test that state snapshots are reduced to patches carrying a seq."""
+        conversation = AGUIConversationState(thread_id, initial_state={"step": 1})
+        mock_state_manager.get_or_create_conversation.return_value = conversation
+        mock_state_manager.open_conversation = AsyncMock(
+            return_value=mock_state_manager.get_or_create_conversation.return_value
+        )
+        mock_a2a_client.send_to_orchestrator = AsyncMock(
+            return_value=[
+                {"type": "STATE_SNAPSHOT", "snapshot": {"step": 1}},
+                {"type": "STATE_SNAPSHOT", "snapshot": {"step": 2}},
+                {
+                    "type": "STATE_DELTA",
+                    "delta": [{"op": "add", "path": "/done", "value": True}],
+                },
+            ]
+        )
+        mock_websocket.receive_text.side_effect = [
+            json.dumps(run_agent_input),
+            WebSocketDisconnect(),
+        ]
+
+        from ai_research_assistant.ag_ui_backend.router import websocket_endpoint
+
+        await websocket_endpoint(mock_websocket, thread_id)
+
+        sent = [call.args[0] for call in mock_websocket.send_json.call_args_list]
+        state_events = [
+            {key: event[key] for key in ("type", "delta", "stateSeq")}
+            for event in sent
+            if event["type"] == EventType.STATE_DELTA
+        ]
+        assert state_events == [
+            {
+                "type": EventType.STATE_DELTA,
+                "delta": [{"op": "replace", "path": "/step", "value": 2}],
+                "stateSeq": 1,
+            },
+            {
+                "type": EventType.STATE_DELTA,
+                "delta": [{"op": "add", "path": "/done", "value": True}],
+                "stateSeq": 2,
+            },
+        ]
+        assert conversation.current_state == {"step": 2, "done": True}
+
+    @patch("ai_research_assistant.ag_ui_backend.router.global_state_manager")
+    @pytest.mark.asyncio
+    async def test_reconnect_with_state_seq_sends_delta(
+        self, mock_state_manager, mock_websocket, thread_id
+    ):
+        """Test that a client that knows its seq gets a delta, not a snapshot."""
+        conversation = AGUIConversationState(thread_id)
+        conversation.patch_state([{"op": "add", "path": "/a", "value": 1}])
+        conversation.patch_state([{"op": "add", "path": "/b", "value": 2}])
+        mock_state_manager.get_or_create_conversation.return_value = conversation
+        mock_state_manager.open_conversation = AsyncMock(
+            return_value=mock_state_manager.get_or_create_conversation.return_value
+        )
+        mock_websocket.receive_text.side_effect = WebSocketDisconnect()
+
+        from ai_research_assistant.ag_ui_backend.router import websocket_endpoint
+
+        await websocket_endpoint(mock_websocket, thread_id, state_seq=1)
+
+        first_event = mock_websocket.send_json.call_args_list[0].args[0]
+        assert first_event == {
+            "type": EventType.STATE_DELTA,
+            "delta": [{"op": "add", "path": "/b", "value": 2}],
+            "stateSeq": 2,
+            "seq": conversation.event_log.last_seq,
+        }
+
+
+class TestResumableSessions:
+    """Test suite for event log replay on reconnect."""
+
+    @pytest.fixture
+    def thread_id(self):
+        return f"resume-{uuid.uuid4()}"
+
+    @pytest.fixture
+    def conversation(self, thread_id):
+        return AGUIConversationState(thread_id, event_buffer_size=5)
+
+    @pytest.fixture
+    def state_manager(self, conversation):
+        with patch(
+            "ai_research_assistant.ag_ui_backend.router.global_state_manager"
+        ) as manager:
+            manager.get_or_create_conversation.return_value = conversation
+            manager.open_conversation = AsyncMock(
+                return_value=manager.get_or_create_conversation.return_value
+            )
+            yield manager
+
+    def make_websocket(self, *messages):
+        websocket = Mock(spec=WebSocket)
+        websocket.accept = AsyncMock()
+        websocket.send_json = AsyncMock()
+        websocket.receive_text = AsyncMock(
+            side_effect=[*messages, WebSocketDisconnect()]
+        )
+        return websocket
+
+    def sent(self, websocket):
+        return [call.args[0] for call in websocket.send_json.call_args_list]
+
+    async def emit_offline(self, thread_id, conversation, count):
+        from ai_research_assistant.ag_ui_backend.router import _emit
+
+        for index in range(count):
+            await _emit(
+                thread_id, conversation, {"type": "CUSTOM", "name": f"e{index}"}
+            )
+
+    @pytest.mark.asyncio
+    async def test_emitted_events_carry_consecutive_seqs(
+        self, state_manager, conversation, thread_id
+    ):
+        """Test that events sent after connect are stamped and logged."""
+        from ai_research_assistant.ag_ui_backend.router import websocket_endpoint
+
+        websocket = self.make_websocket("not json", "{}")
+        await websocket_endpoint(websocket, thread_id)
+
+        errors = [event for event in self.sent(websocket) if "seq" in event][2:]
+        assert [event["type"] for event in errors] == [
+            EventType.RUN_ERROR,
+            EventType.RUN_ERROR,
+        ]
+        assert errors[1]["seq"] == errors[0]["seq"] + 1
+        assert conversation.event_log.last_seq == errors[1]["seq"]
+
+    @pytest.mark.asyncio
+    async def test_reconnect_replays_events_missed_while_offline(
+        self, state_manager, conversation, thread_id
+    ):
+        """Test that only the missed events are sent, without snapshots."""
+        from ai_research_assistant.ag_ui_backend.router import websocket_endpoint
+
+        await self.emit_offline(thread_id, conversation, 1)
+        last_seen = conversation.event_log.last_seq
+        await self.emit_offline(thread_id, conversation, 2)
+
+        websocket = self.make_websocket()
+        await websocket_endpoint(websocket, thread_id, last_seq=last_seen)
+
+        assert [event["seq"] for event in self.sent(websocket)] == [
+            last_seen + 1,
+            last_seen + 2,
+        ]
+        assert [event["type"] for event in self.sent(websocket)] == ["CUSTOM"] * 2
+
+    @pytest.mark.asyncio
+    async def test_up_to_date_reconnect_sends_nothing(
+        self, state_manager, conversation, thread_id
+    ):
+        """Test that a client that missed nothing gets no snapshots."""
+        from ai_research_assistant.ag_ui_backend.router import websocket_endpoint
+
+        await self.emit_offline(thread_id, conversation, 2)
+
+        websocket = self.make_websocket()
+        await websocket_endpoint(
+            websocket, thread_id, last_seq=conversation.event_log.last_seq
+        )
+
+        websocket.send_json.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_batching_client_gets_replay_as_array_frames(
+        self, state_manager, conversation, thread_id
+    ):
+        """Test that replayed events go through the writer's batching."""
+        from ai_research_assistant.ag_ui_backend.router import websocket_endpoint
+
+        await self.emit_offline(thread_id, conversation, 1)
+        last_seen = conversation.event_log.last_seq
+        await self.emit_offline(thread_id, conversation, 2)
+
+        websocket = self.make_websocket()
+        await websocket_endpoint(websocket, thread_id, last_seq=last_seen, batch=True)
+
+        frames = self.sent(websocket)
+        assert all(isinstance(frame, list) for frame in frames)
+        assert [event["seq"] for frame in frames for event in frame] == [
+            last_seen + 1,
+            last_seen + 2,
+        ]
+
+    @pytest.mark.asyncio
+    async def test_rolled_over_buffer_falls_back_to_snapshots(
+        self, state_manager, conversation, thread_id
+    ):
+        """Test that a seq older than the buffer gets both snapshots."""
+        from ai_research_assistant.ag_ui_backend.router import websocket_endpoint
+
+        await self.emit_offline(thread_id, conversation, 1)
+        last_seen = conversation.event_log.last_seq
+        await self.emit_offline(thread_id, conversation, 6)
+
+        websocket = self.make_websocket()
+        await websocket_endpoint(websocket, thread_id, last_seq=last_seen)
+
+        sent = self.sent(websocket)
+        assert [event["type"] for event in sent] == [
+            EventType.STATE_SNAPSHOT,
+            EventType.MESSAGES_SNAPSHOT,
+        ]
+        assert sent[0]["seq"] == conversation.event_log.last_seq
+
+    @pytest.mark.asyncio
+    async def test_old_connection_does_not_unregister_new_one(
+        self, state_manager, conversation, thread_id
+    ):
+        """Test that a stale handler leaves the newer socket registered."""
+        from ai_research_assistant.ag_ui_backend.router import (
+            active_connections,
+            websocket_endpoint,
+        )
+
+        newer = Mock(spec=WebSocket)
+        old = self.make_websocket()
+
+        async def take_over(*args, **kwargs):
+            active_connections[thread_id] = newer
+            raise WebSocketDisconnect()
+
+        old.receive_text = AsyncMock(side_effect=take_over)
+        try:
+            await websocket_endpoint(old, thread_id)
+
+            assert active_connections[thread_id] is newer
+        finally:
+            active_connections.pop(thread_id, None)
+
+    @pytest.mark.asyncio
+    async def test_disconnect_during_snapshot_releases_the_thread(
+        self, state_manager, thread_id
+    ):
+        """Test that a client gone before the snapshots leaks nothing."""
+        from ai_research_assistant.ag_ui_backend.router import (
+            _thread_sockets,
+            websocket_endpoint,
+        )
+
+        websocket = self.make_websocket()
+        websocket.send_json.side_effect = WebSocketDisconnect()
+
+        await websocket_endpoint(websocket, thread_id)
+
+        assert thread_id not in active_connections
+        assert thread_id not in _thread_sockets
+        state_manager.pin_conversation.assert_called_once_with(thread_id)
+        state_manager.release_conversation.assert_called_once_with(thread_id)
+
+
+class TestConcurrentRuns:
+    """Test suite for runs executing alongside the receive loop."""
+
+    @pytest.fixture
+    def conversation(self):
+        return AGUIConversationState(f"runs-{uuid.uuid4()}")
+
+    @pytest.fixture
+    def state_manager(self, conversation):
+        with patch(
+            "ai_research_assistant.ag_ui_backend.router.global_state_manager"
+        ) as manager:
+            manager.get_or_create_conversation.return_value = conversation
+            manager.open_conversation = AsyncMock(
+                return_value=manager.get_or_create_conversation.return_value
+            )
+            yield manager
+
+    @pytest.fixture
+    def orchestrator(self):
+        """An orchestrator whose runs block until ``release`` is set."""
+        release = asyncio.Event()
+
+        async def send_to_orchestrator(**kwargs):
+            await release.wait()
+            return [{"type": EventType.TEXT_MESSAGE_START, "message_id": "m"}]
+
+        with patch("ai_research_assistant.ag_ui_backend.router.a2a_client") as client:
+            client.send_to_orchestrator = AsyncMock(side_effect=send_to_orchestrator)
+            client.release = release
+            yield client
+
+    def run_input(self, conversation, run_id):
+        return json.dumps(
+            {
+                "thread_id": conversation.thread_id,
+                "run_id": run_id,
+                "messages": [{"id": run_id, "role": "user", "content": "Status?"}],
+                "tools": [],
+                "context": [],
+                "state": {},
+                "forwarded_props": {},
+            }
+        )
+
+    def make_websocket(self):
+        """A socket whose client messages are pushed onto ``incoming``."""
+        websocket = Mock(spec=WebSocket)
+        websocket.accept = AsyncMock()
+        websocket.incoming = asyncio.Queue()
+        # Set once an event of the type has been sent
+        websocket.sent = defaultdict(asyncio.Event)
+
+        async def send_json(data):
+            websocket.sent[data["type"]].set()
+
+        websocket.send_json = AsyncMock(side_effect=send_json)
+
+        async def receive_text():
+            message = await websocket.incoming.get()
+            if message is None:
+                raise WebSocketDisconnect()
+            return message
+
+        websocket.receive_text = AsyncMock(side_effect=receive_text)
+        return websocket
+
+    def sent_types(self, websocket):
+        return [call.args[0]["type"] for call in websocket.send_json.call_args_list]
+
+    @pytest.mark.asyncio
+    async def test_socket_stays_responsive_and_run_can_be_cancelled(
+        self, state_manager, orchestrator, conversation
+    ):
+        """Test that requests are served mid-run and CANCEL_RUN stops it."""
+        from ai_research_assistant.ag_ui_backend.router import (
+            run_tasks,
+            websocket_endpoint,
+        )
+
+        websocket = self.make_websocket()
+        endpoint = asyncio.create_task(
+            websocket_endpoint(websocket, conversation.thread_id)
+        )
+        await websocket.incoming.put(self.run_input(conversation, "run-1"))
+        await websocket.incoming.put(json.dumps({"type": "GET_MESSAGES"}))
+        await websocket.sent[EventType.CUSTOM].wait()
+
+        run = run_tasks[conversation.thread_id]["run-1"]
+        assert not run.done()
+
+        await websocket.incoming.put(
+            json.dumps({"type": "CANCEL_RUN", "run_id": "run-1"})
+        )
+        with pytest.raises(asyncio.CancelledError):
+            await run
+        await websocket.sent["RUN_CANCELLED"].wait()
+        await websocket.incoming.put(None)
+        await endpoint
+
+        assert EventType.RUN_FINISHED not in self.sent_types(websocket)
+        assert conversation.thread_id not in run_tasks
+
+    @pytest.mark.asyncio
+    async def test_concurrent_run_limit(
+        self, state_manager, orchestrator, conversation
+    ):
+        """Test that runs beyond the per-thread limit are refused."""
+        from ai_research_assistant.ag_ui_backend.router import websocket_endpoint
+
+        websocket = self.make_websocket()
+        with patch(
+            "ai_research_assistant.ag_ui_backend.router.settings.AG_UI_MAX_CONCURRENT_RUNS",
+            1,
+        ):
+            endpoint = asyncio.create_task(
+                websocket_endpoint(websocket, conversation.thread_id)
+            )
+            await websocket.incoming.put(self.run_input(conversation, "run-1"))
+            await websocket.incoming.put(self.run_input(conversation, "run-2"))
+            await websocket.sent[EventType.RUN_ERROR].wait()
+            orchestrator.release.set()
+            await websocket.sent[EventType.RUN_FINISHED].wait()
+            await websocket.incoming.put(None)
+            await endpoint
+
+        assert orchestrator.send_to_orchestrator.call_count == 1
+        assert self.sent_types(websocket).count(EventType.RUN_FINISHED) == 1
+        # The refused run's message was not added to the conversation
+        assert [message.id for message in conversation.messages] == ["run-1"]
+
+    @pytest.mark.asyncio
+    async def test_disconnect_cancels_runs_after_grace_period(
+        self, state_manager, orchestrator, conversation
+    ):
+        """Test that a closed socket's unfinished runs are torn down."""
+        from ai_research_assistant.ag_ui_backend.router import (
+            run_tasks,
+            websocket_endpoint,
+        )
+
+        websocket = self.make_websocket()
+        await websocket.incoming.put(self.run_input(conversation, "run-1"))
+        await websocket.incoming.put(None)
+        with patch(
+            "ai_research_assistant.ag_ui_backend.router.settings.AG_UI_RUN_DISCONNECT_GRACE_SECONDS",
+            0.05,
+        ):
+            await websocket_endpoint(websocket, conversation.thread_id)
+
+        assert conversation.thread_id not in run_tasks
+        logged = [
+            event["type"]
+            for event in conversation.event_log.since(
+                conversation.event_log.last_seq - len(conversation.event_log)
+            )
+        ]
+        assert logged == [EventType.RUN_STARTED, "RUN_CANCELLED"]
+
+
+class TestMessageHistoryPages:
+    """Test suite for paging message history and fetching artifacts."""
+
+    @pytest.fixture
+    def artifact_store(self, tmp_path):
+        return ArtifactStore(str(tmp_path / "artifacts"), inline_limit=16)
+
+    @pytest.fixture
+    def conversation(self, artifact_store):
+        conversation = AGUIConversationState(
+            f"pages-{uuid.uuid4()}", snapshot_window=2, artifact_store=artifact_store
+        )
+        for index in range(5):
+            conversation.add_message(
+                AGUIUserMessage(id=f"m{index}", role="user", content=f"{index}")
+            )
+        return conversation
+
+    @pytest.fixture
+    def state_manager(self, conversation, artifact_store):
+        with patch(
+            "ai_research_assistant.ag_ui_backend.router.global_state_manager"
+        ) as manager:
+            manager.get_or_create_conversation.return_value = conversation
+            manager.open_conversation = AsyncMock(
+                return_value=manager.get_or_create_conversation.return_value
+            )
+            manager.artifact_store = artifact_store
+            yield manager
+
+    @pytest.mark.asyncio
+    async def test_get_messages_returns_older_page(self, state_manager, conversation):
+        """Test that the snapshot cursor pages back through history."""
+        from ai_research_assistant.ag_ui_backend.router import websocket_endpoint
+
+        websocket = Mock(spec=WebSocket)
+        websocket.accept = AsyncMock()
+        websocket.send_json = AsyncMock()
+        websocket.receive_text = AsyncMock(
+            side_effect=[
+                json.dumps({"type": "GET_MESSAGES", "before": 3, "limit": 2}),
+                WebSocketDisconnect(),
+            ]
+        )
+
+        await websocket_endpoint(websocket, conversation.thread_id)
+
+        sent = [call.args[0] for call in websocket.send_json.call_args_list]
+        snapshot, page = sent[1], sent[2]
+        assert [message["id"] for message in snapshot["messages"]] == ["m3", "m4"]
+        assert snapshot["cursor"] == 3
+        assert page["type"] == EventType.CUSTOM
+        assert page["name"] == "MESSAGES_PAGE"
+        assert [message["id"] for message in page["value"]["messages"]] == [
+            "m1",
+            "m2",
+        ]
+        assert page["value"]["cursor"] == 1
+        # Page replies are for the requester only
+        assert len(conversation.event_log) == 0
+
+    @pytest.mark.asyncio
+    async def test_artifact_endpoint(self, state_manager, artifact_store):
+        """Test that stored artifacts are served and unknown ids are 404."""
+        from fastapi import FastAPI
+
+        ref = await artifact_store.put("full tool output body")
+        app = FastAPI()
+        app.include_router(router)
+        client = TestClient(app)
+
+        response = client.get(f"/artifacts/{ref['id']}")
+        missing = client.get(f"/artifacts/{'0' * 64}")
+
+        assert response.status_code == 200
+        assert response.text == "full tool output body"
+        assert missing.status_code == 404
+        assert missing.json()["status"] == "error"
+
+
+class TestCrossWorkerRouting:
+    """Test suite for relaying events and cancellation between workers."""
+
+    @pytest.fixture
+    def bus(self):
+        bus = InProcessBus()
+        with patch("ai_research_assistant.ag_ui_backend.router.shared_bus", bus):
+            yield bus
+
+    @pytest.fixture
+    def conversation(self):
+        return AGUIConversationState(f"workers-{uuid.uuid4()}")
+
+    async def published(self, bus, channel):
+        messages = []
+
+        async def handler(message):
+            messages.append(message)
+
+        await bus.subscribe(channel, handler)
+        return messages
+
+    async def settle(self):
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+    @pytest.mark.asyncio
+    async def test_events_without_local_socket_are_published(self, bus, conversation):
+        """Test that a run's events reach a socket held by another worker."""
+        from ai_research_assistant.ag_ui_backend.router import WORKER_ID, _emit
+
+        messages = await self.published(bus, f"ag_ui:thread:{conversation.thread_id}")
+
+        await _emit(conversation.thread_id, conversation, {"type": "RUN_STARTED"})
+        await self.settle()
+
+        assert messages[0]["worker"] == WORKER_ID
+        assert messages[0]["event"]["type"] == "RUN_STARTED"
+        assert messages[0]["event"]["seq"] == conversation.event_log.last_seq
+
+    @pytest.mark.asyncio
+    async def test_slow_publish_keeps_order_without_holding_the_log(
+        self, bus, conversation
+    ):
+        """Test that events emitted during a publish follow it, in seq order."""
+        from ai_research_assistant.ag_ui_backend.router import _emit
+
+        published = []
+        release = asyncio.Event()
+
+        async def publish(channel, message):
+            await release.wait()
+            published.append(message["event"]["seq"])
+
+        with patch.object(bus, "publish", side_effect=publish):
+            first = asyncio.create_task(
+                _emit(conversation.thread_id, conversation, {"type": "CUSTOM"})
+            )
+            await self.settle()
+            assert not conversation.event_log.lock.locked()
+
+            # Queued behind the publish in flight, which sends it too
+            await _emit(conversation.thread_id, conversation, {"type": "CUSTOM"})
+            release.set()
+            await first
+
+        last_seq = conversation.event_log.last_seq
+        assert published == [last_seq - 1, last_seq]
+
+    @pytest.mark.asyncio
+    async def test_full_writer_is_awaited_outside_the_log_lock(self, conversation):
+        """Test that a slow client does not block a reconnect's replay."""
+        from ai_research_assistant.ag_ui_backend.router import _emit
+
+        release = asyncio.Event()
+
+        async def stall(frame):
+            await release.wait()
+
+        websocket = Mock(spec=WebSocket)
+        websocket.send_json = AsyncMock(side_effect=stall)
+        writer = EventWriter(websocket, max_queue=1, max_batch=1)
+        active_connections[conversation.thread_id] = writer
+        try:
+            for _ in range(3):
+                writer.push({"type": "CUSTOM"})
+            emit = asyncio.create_task(
+                _emit(conversation.thread_id, conversation, {"type": "CUSTOM"})
+            )
+            await asyncio.sleep(0.01)
+
+            assert not emit.done()
+            assert not conversation.event_log.lock.locked()
+            release.set()
+            await emit
+        finally:
+            del active_connections[conversation.thread_id]
+            await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_relayed_events_go_to_the_local_socket(self, bus, conversation):
+        """Test that events from another worker are sent on this worker's socket."""
+        from ai_research_assistant.ag_ui_backend.router import (
+            _join_thread,
+            _leave_thread,
+            active_connections,
+        )
+
+        thread_id = conversation.thread_id
+        connection = Mock()
+        connection.send_json = AsyncMock()
+        active_connections[thread_id] = connection
+        await _join_thread(thread_id)
+        try:
+            await bus.publish(
+                f"ag_ui:thread:{thread_id}",
+                {"threadId": thread_id, "worker": "other", "event": {"seq": 7}},
+            )
+            await self.settle()
+        finally:
+            del active_connections[thread_id]
+            await _leave_thread(thread_id)
+
+        connection.send_json.assert_awaited_once_with({"seq": 7})
+
+    @pytest.mark.asyncio
+    async def test_takeover_by_another_worker_detaches_socket(self, bus):
+        """Test that the newest socket for a thread wins across workers."""
+        from ai_research_assistant.ag_ui_backend.router import (
+            _on_control_message,
+            active_connections,
+        )
+
+        websocket = Mock(spec=WebSocket)
+        websocket.send_json = AsyncMock()
+        websocket.close = AsyncMock()
+        writer = EventWriter(websocket)
+        writer.push({"type": "CUSTOM"})
+        active_connections["taken-thread"] = writer
+        await _on_control_message(
+            {"kind": "takeover", "threadId": "taken-thread", "worker": "other"}
+        )
+
+        assert "taken-thread" not in active_connections
+        websocket.close.assert_awaited_once_with(code=1008)
+        # Nothing more is sent on the old socket
+        websocket.send_json.assert_not_called()
+        with pytest.raises(ConnectionError):
+            writer.push({"type": "CUSTOM"})
+
+    @pytest.mark.asyncio
+    async def test_cancel_is_forwarded_to_the_owning_worker(self, bus, conversation):
+        """Test that CANCEL_RUN for a run on another worker is broadcast."""
+        from ai_research_assistant.ag_ui_backend.router import _cancel_run_request
+
+        thread_id = conversation.thread_id
+        await bus.set(f"ag_ui:run:{thread_id}:remote-run", "other")
+        messages = await self.published(bus, "ag_ui:control")
+
+        await _cancel_run_request(thread_id, conversation, "remote-run")
+        await self.settle()
+
+        assert messages[0]["kind"] == "cancel"
+        assert messages[0]["runId"] == "remote-run"
+        # Not reported as unknown
+        assert len(conversation.event_log) == 0
+
+    @pytest.mark.asyncio
+    async def test_cancel_from_another_worker_stops_local_run(self, bus):
+        """Test that a broadcast cancel reaches the run's task."""
+        from ai_research_assistant.ag_ui_backend.router import (
+            _on_control_message,
+            run_tasks,
+        )
+
+        task = asyncio.create_task(asyncio.sleep(10))
+        run_tasks["cancel-thread"] = {"run-1": task}
+        try:
+            await _on_control_message(
+                {
+                    "kind": "cancel",
+                    "threadId": "cancel-thread",
+                    "runId": "run-1",
+                    "worker": "other",
+                }
+            )
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        finally:
+            del run_tasks["cancel-thread"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_run_is_still_an_error(self, bus, conversation):
+        """Test that a run no worker holds is reported as before."""
+        from ai_research_assistant.ag_ui_backend.router import _cancel_run_request
+
+        await _cancel_run_request(conversation.thread_id, conversation, "missing")
+
+        event_log = conversation.event_log
+        assert event_log.since(event_log.last_seq - 1)[0]["type"] == EventType.RUN_ERROR
+
+
+class TestServerSentEvents:
+    """Test suite for the POST /runs Server-Sent Events transport."""
+
+    @pytest.fixture
+    def conversation(self):
+        return AGUIConversationState(f"sse-{uuid.uuid4()}")
+
+    @pytest.fixture
+    def state_manager(self, conversation):
+        with patch(
+            "ai_research_assistant.ag_ui_backend.router.global_state_manager"
+        ) as manager:
+            manager.get_or_create_conversation.return_value = conversation
+            manager.open_conversation = AsyncMock(
+                return_value=manager.get_or_create_conversation.return_value
+            )
+            yield manager
+
+    @pytest.fixture
+    def orchestrator(self):
+        with patch("ai_research_assistant.ag_ui_backend.router.a2a_client") as client:
+            client.send_to_orchestrator = AsyncMock(
+                return_value=[
+                    {"type": EventType.TEXT_MESSAGE_START, "messageId": "m"},
+                    {"type": EventType.TEXT_MESSAGE_END, "messageId": "m"},
+                ]
+            )
+            yield client
+
+    @pytest.fixture
+    def client(self):
+        import httpx
+        from fastapi import FastAPI
+
+        app = FastAPI()
+        app.include_router(router)
+        return httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        )
+
+    def run_input(self, conversation, run_id="run-1", content="Status?"):
+        return {
+            "threadId": conversation.thread_id,
+            "runId": run_id,
+            "messages": [{"id": run_id, "role": "user", "content": content}],
+            "tools": [],
+            "context": [],
+            "state": {},
+            "forwardedProps": {},
+        }
+
+    def parse(self, body):
+        """(id, event) for each frame of an SSE body."""
+        frames = []
+        for block in body.strip().split("\n\n"):
+            fields = dict(line.split(": ", 1) for line in block.splitlines())
+            frames.append((fields.get("id"), json.loads(fields["data"])))
+        return frames
+
+    @pytest.mark.asyncio
+    async def test_run_is_streamed_as_events(
+        self, state_manager, orchestrator, conversation, client
+    ):
+        """Test that a run's events arrive as SSE frames with their seq as id."""
+        async with client:
+            response = await client.post("/runs", json=self.run_input(conversation))
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        frames = self.parse(response.text)
+        assert [event["type"] for _, event in frames] == [
+            EventType.RUN_STARTED,
+            EventType.TEXT_MESSAGE_START,
+            EventType.TEXT_MESSAGE_END,
+            EventType.RUN_FINISHED,
+        ]
+        assert all(frame_id == str(event["seq"]) for frame_id, event in frames)
+        assert [message.id for message in conversation.messages] == ["run-1"]
+        # The request let go of the thread once the run was over
+        assert conversation.thread_id not in active_connections
+        state_manager.release_conversation.assert_called_with(conversation.thread_id)
+
+    @pytest.mark.asyncio
+    async def test_last_event_id_resumes_without_new_run(
+        self, state_manager, orchestrator, conversation, client
+    ):
+        """Test that a resumed request replays only the missed events."""
+        async with client:
+            first = self.parse(
+                (await client.post("/runs", json=self.run_input(conversation))).text
+            )
+            resumed = await client.post(
+                "/runs",
+                json=self.run_input(conversation),
+                headers={"Last-Event-ID": first[1][0]},
+            )
+
+        assert self.parse(resumed.text) == first[2:]
+        assert orchestrator.send_to_orchestrator.call_count == 1
+        assert len(conversation.messages) == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_last_event_id_gets_snapshots(
+        self, state_manager, orchestrator, conversation, client
+    ):
+        """Test that a seq no longer in the buffer falls back to snapshots."""
+        async with client:
+            response = await client.post(
+                "/runs",
+                json=self.run_input(conversation),
+                headers={"Last-Event-ID": "1"},
+            )
+
+        assert [event["type"] for _, event in self.parse(response.text)] == [
+            EventType.STATE_SNAPSHOT,
+            EventType.MESSAGES_SNAPSHOT,
+        ]
+        orchestrator.send_to_orchestrator.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_refused_runs_are_http_errors(
+        self, state_manager, orchestrator, conversation, client
+    ):
+        """Test that runs that cannot start are refused before streaming."""
+        async with client:
+            empty = await client.post(
+                "/runs", json=self.run_input(conversation, content="")
+            )
+            with patch(
+                "ai_research_assistant.ag_ui_backend.router.settings.AG_UI_MAX_CONCURRENT_RUNS",
+                0,
+            ):
+                busy = await client.post("/runs", json=self.run_input(conversation))
+
+        assert empty.status_code == 400
+        assert busy.status_code == 409
+        assert busy.json()["status"] == "error"
+        orchestrator.send_to_orchestrator.assert_not_called()
+        # Neither refused request added its message to the history
+        assert conversation.messages == []
+
+    @pytest.mark.asyncio
+    async def test_displaced_socket_gets_the_thread_back(
+        self, state_manager, orchestrator, conversation, client
+    ):
+        """Test that a socket on the thread gets the stream's events afterwards."""
+        websocket = Mock()
+        websocket.send_json = AsyncMock()
+        socket_writer = EventWriter(websocket)
+        active_connections[conversation.thread_id] = socket_writer
+        try:
+            async with client:
+                response = await client.post("/runs", json=self.run_input(conversation))
+
+            assert active_connections[conversation.thread_id] is socket_writer
+            await socket_writer.close()
+        finally:
+            active_connections.pop(conversation.thread_id, None)
+
+        streamed = [event for _, event in self.parse(response.text)]
+        caught_up = [call.args[0] for call in websocket.send_json.call_args_list]
+        assert caught_up == streamed
+
+    @pytest.mark.asyncio
+    async def test_run_is_reserved_before_streaming_starts(
+        self, state_manager, orchestrator, conversation
+    ):
+        """Test that a second request is refused before the first streams."""
+        from ag_ui.core import RunAgentInput
+
+        from ai_research_assistant.ag_ui_backend.router import run_over_sse, run_tasks
+
+        with patch(
+            "ai_research_assistant.ag_ui_backend.router.settings.AG_UI_MAX_CONCURRENT_RUNS",
+            1,
+        ):
+            first, second = [
+                await run_over_sse(
+                    RunAgentInput.model_validate(self.run_input(conversation, run_id)),
+                    last_event_id=None,
+                )
+                for run_id in ("run-1", "run-2")
+            ]
+        run = run_tasks[conversation.thread_id]["run-1"]
+        await run
+
+        assert second.status_code == 409
+        assert [message.id for message in conversation.messages] == ["run-1"]
+        # Streamed only after the run ended, yet it gets every event of it
+        body = "".join([frame async for frame in first.body_iterator])
+        assert [event["type"] for _, event in self.parse(body)] == [
+            EventType.RUN_STARTED,
+            EventType.TEXT_MESSAGE_START,
+            EventType.TEXT_MESSAGE_END,
+            EventType.RUN_FINISHED,
+        ]
+
 
 class TestAPIKeyTestEndpoint:
     """Test suite for API key testing endpoint."""
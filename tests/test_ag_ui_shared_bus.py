@@ -0,0 +1,174 @@
+"""
+Test suite for ag_ui_backend.shared_bus and ag_ui_backend.resp_standin.
+
+This module contains tests for the shared state and pub/sub layer between
+backend workers, with the Redis-protocol bus run against the local stand-in.
+"""
+
+import asyncio
+
+import pytest
+
+from ai_research_assistant.ag_ui_backend.resp_standin import RespStandIn
+from ai_research_assistant.ag_ui_backend.shared_bus import (
+    InProcessBus,
+    RedisBus,
+    SharedBusError,
+    create_shared_bus,
+)
+
+
+async def wait_for(condition):
+    for _ in range(400):
+        if condition():
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError("condition not reached")
+
+
+@pytest.fixture
+async def standin():
+    server = RespStandIn()
+    await server.start(port=0)
+    yield server
+    await server.close()
+
+
+@pytest.fixture
+async def redis_buses(standin):
+    """Two buses on one server, as two workers would have."""
+    buses = [RedisBus("127.0.0.1", standin.port) for _ in range(2)]
+    yield buses
+    for bus in buses:
+        await bus.close()
+
+
+@pytest.fixture
+async def in_process_buses():
+    """The same bus twice: InProcessBus only spans one worker."""
+    bus = InProcessBus()
+    yield [bus, bus]
+    await bus.close()
+
+
+@pytest.fixture(params=["in_process", "redis"])
+def buses(request):
+    return request.getfixturevalue(f"{request.param}_buses")
+
+
+class TestSharedBus:
+    """Behaviour common to every SharedBus implementation."""
+
+    @pytest.mark.asyncio
+    async def test_values_are_shared(self, buses):
+        """Test that a value set by one worker is read by another."""
+        first, second = buses
+
+        await first.set("ag_ui:run:t:r", "worker-1")
+        assert await second.get("ag_ui:run:t:r") == "worker-1"
+
+        await second.delete("ag_ui:run:t:r")
+        assert await first.get("ag_ui:run:t:r") is None
+
+    @pytest.mark.asyncio
+    async def test_published_messages_arrive_in_order(self, buses):
+        """Test pub/sub delivery between workers."""
+        first, second = buses
+        received = []
+
+        async def handler(message):
+            received.append(message["n"])
+
+        await second.subscribe("ag_ui:thread:t", handler)
+        for n in range(5):
+            assert await first.publish("ag_ui:thread:t", {"n": n}) == 1
+
+        await wait_for(lambda: len(received) == 5)
+        assert received == [0, 1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_unsubscribed_channels_receive_nothing(self, buses):
+        """Test that the last handler leaving ends the subscription."""
+        first, second = buses
+        received = []
+
+        async def handler(message):
+            received.append(message)
+
+        await second.subscribe("ag_ui:thread:t", handler)
+        await second.unsubscribe("ag_ui:thread:t", handler)
+        await asyncio.sleep(0.02)
+
+        assert await first.publish("ag_ui:thread:t", {"n": 1}) == 0
+        await asyncio.sleep(0.02)
+        assert received == []
+
+    @pytest.mark.asyncio
+    async def test_failing_handler_does_not_stop_delivery(self, buses):
+        """Test that one handler's error is isolated."""
+        first, second = buses
+        received = []
+
+        async def broken(message):
+            raise RuntimeError("boom")
+
+        async def handler(message):
+            received.append(message)
+
+        await second.subscribe("control", broken)
+        await second.subscribe("control", handler)
+        await first.publish("control", {"kind": "cancel"})
+        await first.publish("control", {"kind": "takeover"})
+
+        await wait_for(lambda: len(received) == 2)
+
+
+class TestRedisBus:
+    """Test cases specific to the Redis-protocol bus."""
+
+    @pytest.mark.asyncio
+    async def test_error_replies_raise(self, standin):
+        """Test that server errors surface as SharedBusError."""
+        bus = RedisBus("127.0.0.1", standin.port)
+        try:
+            with pytest.raises(SharedBusError, match="unsupported"):
+                await bus._command("FLUSHALL")
+            # The connection is still usable afterwards
+            assert await bus._command("PING") == "PONG"
+        finally:
+            await bus.close()
+
+    @pytest.mark.asyncio
+    async def test_standin_counts_subscribers(self, standin, redis_buses):
+        """Test that PUBLISH reports the subscriber count, like Redis."""
+        first, second = redis_buses
+
+        async def handler(message):
+            pass
+
+        await first.subscribe("channel", handler)
+        await second.subscribe("channel", handler)
+
+        assert await first.publish("channel", {}) == 2
+        assert set(standin.channels) == {"channel"}
+
+
+class TestCreateSharedBus:
+    """Test cases for choosing a bus from AG_UI_SHARED_BUS_URL."""
+
+    def test_default_is_in_process(self):
+        """Test that an empty URL keeps a single-worker bus."""
+        assert isinstance(create_shared_bus(""), InProcessBus)
+        assert isinstance(create_shared_bus("memory://"), InProcessBus)
+
+    def test_redis_url(self):
+        """Test host, port and db parsing."""
+        bus = create_shared_bus("redis://cache.internal:6380/2")
+
+        assert isinstance(bus, RedisBus)
+        assert (bus.host, bus.port, bus.db) == ("cache.internal", 6380, 2)
+
+    def test_unknown_scheme(self):
+        """Test that unsupported URLs are rejected."""
+        with pytest.raises(ValueError):
+            create_shared_bus("kafka://broker:9092")
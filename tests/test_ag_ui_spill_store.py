@@ -0,0 +1,89 @@
+"""
+Test suite for ag_ui_backend.spill_store module.
+
+This module contains tests for the compressed SQLite spill area used by the
+bounded AGUIStateManager.
+"""
+
+import sqlite3
+
+import pytest
+from ag_ui.core import AssistantMessage, ToolMessage, UserMessage
+
+from ai_research_assistant.ag_ui_backend import spill_store as spill_module
+from ai_research_assistant.ag_ui_backend.spill_store import ConversationSpillStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ConversationSpillStore(str(tmp_path / "nested" / "spill.db"))
+    yield store
+    store.close()
+
+
+class TestConversationSpillStore:
+    """Test cases for ConversationSpillStore."""
+
+    def test_round_trip_preserves_message_types(self, store):
+        """Test that every message role comes back as its own model."""
+        messages = [
+            UserMessage(id="1", role="user", content="Appeal my claim"),
+            AssistantMessage(id="2", role="assistant", content="On it"),
+            ToolMessage(id="3", role="tool", content="{}", tool_call_id="call-1"),
+        ]
+
+        store.save("thread", {"case": {"id": 7}}, messages, {"state_seq": 4})
+        state, restored, extras = store.load("thread")
+
+        assert state == {"case": {"id": 7}}
+        assert restored == messages
+        assert extras == {"state_seq": 4}
+
+    def test_payload_is_compressed(self, store, tmp_path):
+        """Test that repetitive conversations are stored compactly."""
+        messages = [
+            UserMessage(id=str(i), role="user", content="WCAT decision text " * 20)
+            for i in range(50)
+        ]
+
+        size = store.save("thread", {}, messages)
+
+        raw_size = sum(len(m.content) for m in messages)
+        assert size < raw_size / 10
+
+    def test_replace_and_delete(self, store):
+        """Test that saving twice replaces the row and delete removes it."""
+        store.save("thread", {"v": 1}, [])
+        store.save("thread", {"v": 2}, [])
+
+        assert store.count() == 1
+        assert store.load("thread")[0] == {"v": 2}
+
+        store.delete("thread")
+
+        assert store.load("thread") is None
+        assert not store.contains("thread")
+
+    def test_no_file_until_first_write(self, tmp_path):
+        """Test that reads and deletes do not create the database."""
+        path = tmp_path / "unused" / "spill.db"
+        unused = ConversationSpillStore(str(path))
+
+        assert unused.load("thread") is None
+        assert not unused.contains("thread")
+        assert unused.count() == 0
+        unused.delete("thread")
+
+        assert not path.parent.exists()
+
+    def test_reads_zlib_rows_regardless_of_build(self, store, monkeypatch):
+        """Test that the per-row codec column drives decompression."""
+        monkeypatch.setattr(spill_module, "zstandard", None)
+        store.save("thread", {"a": 1}, [])
+
+        conn = sqlite3.connect(store.db_path)
+        codec = conn.execute("SELECT codec FROM ag_ui_conversations").fetchone()[0]
+        conn.close()
+
+        assert codec == "zlib"
+        assert store.load("thread")[0] == {"a": 1}
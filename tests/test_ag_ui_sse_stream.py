@@ -0,0 +1,105 @@
+"""
+Test suite for ag_ui_backend.sse_stream module.
+
+This module contains tests for SSE framing, Last-Event-ID parsing, and the
+websocket stand-in that streams a run's events over HTTP.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from ai_research_assistant.ag_ui_backend.sse_stream import (
+    KEEPALIVE_FRAME,
+    SSEStream,
+    format_sse,
+    parse_last_event_id,
+)
+
+
+class TestFraming:
+    """Test cases for SSE frames and event ids."""
+
+    def test_frame_carries_seq_as_id(self):
+        """Test that the seq becomes the event id."""
+        frame = format_sse({"type": "RUN_STARTED", "seq": 42})
+
+        assert frame.startswith("id: 42\ndata: ")
+        assert frame.endswith("\n\n")
+        assert json.loads(frame.split("data: ", 1)[1]) == {
+            "type": "RUN_STARTED",
+            "seq": 42,
+        }
+
+    def test_frame_without_seq(self):
+        """Test that unsequenced events have no id."""
+        assert format_sse({"type": "CUSTOM"}) == 'data: {"type":"CUSTOM"}\n\n'
+
+    @pytest.mark.parametrize(
+        "value, expected", [("17", 17), (None, None), ("", None), ("abc", None)]
+    )
+    def test_parse_last_event_id(self, value, expected):
+        """Test that only our numeric ids are accepted."""
+        assert parse_last_event_id(value) == expected
+
+
+class TestSSEStream:
+    """Test cases for SSEStream."""
+
+    @pytest.mark.asyncio
+    async def test_frames_sent_before_streaming_are_buffered(self):
+        """Test that a replay can be sent before the response starts."""
+        stream = SSEStream()
+
+        await stream.send_json({"type": "A", "seq": 1})
+        await stream.send_json([{"type": "B", "seq": 2}, {"type": "C", "seq": 3}])
+        stream.end()
+
+        frames = [frame async for frame in stream.frames()]
+        assert [frame.split("\n")[0] for frame in frames] == [
+            "id: 1",
+            "id: 2",
+            "id: 3",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_send_waits_for_the_client(self):
+        """Test that a send returns only once its frame has been written."""
+        stream = SSEStream()
+        frames = stream.frames()
+        reader = asyncio.create_task(frames.__anext__())
+        await asyncio.sleep(0)
+
+        send = asyncio.create_task(stream.send_json({"type": "A", "seq": 1}))
+        await reader
+        await asyncio.sleep(0.01)
+        assert not send.done()
+
+        # The generator resumes once the frame has been written out
+        next_frame = asyncio.create_task(frames.__anext__())
+        await asyncio.wait_for(send, 1)
+        stream.end()
+        with pytest.raises(StopAsyncIteration):
+            await next_frame
+
+    @pytest.mark.asyncio
+    async def test_closed_stream_refuses_events(self):
+        """Test that sends to a departed client raise ConnectionError."""
+        stream = SSEStream()
+        await stream.send_json({"type": "A", "seq": 1})
+
+        await stream.close()
+
+        with pytest.raises(ConnectionError):
+            await stream.send_json({"type": "B", "seq": 2})
+        assert [frame async for frame in stream.frames()] == []
+
+    @pytest.mark.asyncio
+    async def test_idle_stream_sends_keepalives(self):
+        """Test that comment frames keep an idle stream open."""
+        stream = SSEStream(keepalive=0.01)
+        frames = stream.frames()
+
+        assert await frames.__anext__() == KEEPALIVE_FRAME
+        await frames.aclose()
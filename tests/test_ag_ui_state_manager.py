@@ -10,23 +10,38 @@ Tests AG-UI protocol compliance for state management including:
 - AG-UI protocol event structure validation
 """
 
+import threading
 import uuid
-from unittest.mock import AsyncMock, Mock
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from ag_ui.core import (
     EventType,
 )
+from ag_ui.core import (
+    ToolMessage as AGUIToolMessage,
+)
 from ag_ui.core import (
     UserMessage as AGUIUserMessage,
 )
 from fastapi import WebSocket
 
+from ai_research_assistant.ag_ui_backend.artifact_store import (
+    PREVIEW_CHARS,
+    ArtifactStore,
+)
+from ai_research_assistant.ag_ui_backend.spill_store import ConversationSpillStore
 from ai_research_assistant.ag_ui_backend.state_manager import (
+    STATE_HISTORY_LIMIT,
     AGUIConversationState,
     AGUIStateManager,
     global_state_manager,
 )
+from ai_research_assistant.core.history_compaction import (
+    SUMMARY_MESSAGE_ID,
+    HistoryCompactor,
+    HistorySummary,
+)
 
 
 class TestAGUIConversationState:
@@ -409,5 +424,515 @@ class TestAGUIProtocolCompliance:
             assert result == should_succeed
 
 
+class TestBoundedStateManager:
+    """Test suite for LRU/TTL eviction with disk spill."""
+
+    @pytest.fixture
+    def spill_store(self, tmp_path):
+        store = ConversationSpillStore(str(tmp_path / "spill.db"))
+        yield store
+        store.close()
+
+    def make_manager(self, spill_store, **limits):
+        return AGUIStateManager(spill_store=spill_store, **limits)
+
+    def test_capacity_evicts_least_recently_used(self, spill_store):
+        """Test that the oldest untouched conversation is spilled first."""
+        manager = self.make_manager(spill_store, max_conversations=2)
+        manager.get_or_create_conversation("a")
+        manager.get_or_create_conversation("b")
+        manager.get_conversation("a")
+
+        manager.get_or_create_conversation("c")
+
+        assert list(manager.conversations) == ["a", "c"]
+        assert spill_store.contains("b")
+
+    def test_spilled_conversation_rehydrates_lazily(self, spill_store):
+        """Test that state and messages survive a round trip to disk."""
+        manager = self.make_manager(spill_store, max_conversations=1)
+        first = manager.get_or_create_conversation("a", initial_state={"step": 3})
+        first.add_message(AGUIUserMessage(id="m1", role="user", content="My claim"))
+        manager.get_or_create_conversation("b")
+        assert "a" not in manager.conversations
+
+        restored = manager.get_or_create_conversation("a")
+
+        assert restored is not first
+        assert restored.current_state == {"step": 3}
+        assert restored.messages[0].content == "My claim"
+        assert isinstance(restored.messages[0], AGUIUserMessage)
+        assert not spill_store.contains("a")
+        assert spill_store.contains("b")
+
+    def test_idle_conversations_are_spilled(self, spill_store):
+        """Test that conversations idle past the TTL leave memory."""
+        manager = self.make_manager(spill_store, idle_ttl_seconds=60)
+        clock = [1000.0]
+        with patch(
+            "ai_research_assistant.ag_ui_backend.state_manager.time.monotonic",
+            side_effect=lambda: clock[0],
+        ):
+            manager.get_or_create_conversation("old")
+            clock[0] += 120
+            manager.get_or_create_conversation("new")
+
+        assert list(manager.conversations) == ["new"]
+        assert spill_store.contains("old")
+
+    def test_pinned_conversations_are_not_evicted(self, spill_store):
+        """Test that open websockets keep their conversation in memory."""
+        manager = self.make_manager(spill_store, max_conversations=1)
+        manager.pin_conversation("live")
+        manager.get_or_create_conversation("live")
+        manager.get_or_create_conversation("other")
+
+        assert list(manager.conversations) == ["live", "other"]
+
+        manager.release_conversation("live")
+        manager.get_or_create_conversation("fresh")
+
+        assert list(manager.conversations) == ["fresh"]
+        assert spill_store.contains("live")
+
+    def test_get_conversation_unknown_thread(self, spill_store):
+        """Test that unknown threads are neither created nor spilled."""
+        manager = self.make_manager(spill_store, max_conversations=1)
+
+        assert manager.get_conversation("missing") is None
+        assert manager.conversations == {}
+
+    def test_remove_conversation_deletes_spilled_copy(self, spill_store):
+        """Test that removal also clears the on-disk copy."""
+        manager = self.make_manager(spill_store, max_conversations=1)
+        manager.get_or_create_conversation("a")
+        manager.get_or_create_conversation("b")
+
+        manager.remove_conversation("a")
+
+        assert not spill_store.contains("a")
+        assert manager.get_conversation("a") is None
+
+    def test_memory_stays_flat(self, spill_store):
+        """Test that many threads never exceed the configured capacity."""
+        manager = self.make_manager(spill_store, max_conversations=10)
+
+        for i in range(200):
+            conversation = manager.get_or_create_conversation(f"thread-{i}")
+            conversation.add_message(
+                AGUIUserMessage(id=str(i), role="user", content="x" * 100)
+            )
+            assert len(manager.conversations) <= 10
+
+        assert spill_store.count() == 190
+
+    def test_without_spill_store_nothing_is_evicted(self):
+        """Test that limits need a spill store to take effect."""
+        manager = AGUIStateManager(max_conversations=1)
+        manager.get_or_create_conversation("a")
+        manager.get_or_create_conversation("b")
+
+        assert list(manager.conversations) == ["a", "b"]
+
+    def test_spill_keeps_event_log_and_summary(self, spill_store):
+        """Test that a rehydrated thread replays events and keeps its seqs."""
+        manager = self.make_manager(spill_store, max_conversations=1)
+        first = manager.get_or_create_conversation("a")
+        first.update_state({"step": 1})
+        seen = first.event_log.append({"type": "RUN_STARTED"})["seq"]
+        missed = first.event_log.append({"type": "RUN_FINISHED"})
+        first.history_summary = HistorySummary(text="Earlier turns", covered=4)
+        first.history_context.context_id = "ctx-1"
+        manager.get_or_create_conversation("b")
+
+        restored = manager.get_or_create_conversation("a")
+
+        assert restored is not first
+        assert restored.state_seq == first.state_seq
+        assert restored.event_log.since(seen) == [missed]
+        assert restored.event_log.append({})["seq"] == missed["seq"] + 1
+        assert restored.history_summary == HistorySummary("Earlier turns", 4)
+        assert restored.history_context.context_id == "ctx-1"
+
+    @pytest.mark.asyncio
+    async def test_spill_is_written_off_the_loop(self, spill_store):
+        """Test that eviction inside a loop writes the spill in a thread."""
+        manager = self.make_manager(spill_store, max_conversations=1)
+        manager.get_or_create_conversation("a")
+        save = spill_store.save
+        writers = []
+
+        def record_writer(*args):
+            writers.append(threading.get_ident())
+            return save(*args)
+
+        with patch.object(spill_store, "save", side_effect=record_writer):
+            manager.get_or_create_conversation("b")
+            assert writers == []
+
+            await manager.flush_spills()
+
+        assert len(writers) == 1
+        assert writers[0] != threading.get_ident()
+        assert spill_store.contains("a")
+
+    @pytest.mark.asyncio
+    async def test_conversation_taken_back_while_spilling(self, spill_store):
+        """Test that a spill still being written is reclaimed from memory."""
+        manager = self.make_manager(spill_store, max_conversations=1)
+        first = manager.get_or_create_conversation("a")
+        manager.get_or_create_conversation("b")
+
+        assert manager.get_or_create_conversation("a") is first
+        await manager.flush_spills()
+
+        assert not spill_store.contains("a")
+        assert spill_store.contains("b")
+
+    @pytest.mark.asyncio
+    async def test_open_conversation_rehydrates_and_syncs(self, spill_store):
+        """Test that open_conversation reads a spilled thread back."""
+        manager = self.make_manager(spill_store, max_conversations=1)
+        manager.get_or_create_conversation("a", initial_state={"step": 3})
+        manager.get_or_create_conversation("b")
+        await manager.flush_spills()
+
+        with patch.object(
+            manager, "sync_conversation", AsyncMock(return_value=0)
+        ) as sync:
+            restored = await manager.open_conversation("a")
+
+        assert restored.current_state == {"step": 3}
+        assert manager.conversations["a"] is restored
+        sync.assert_awaited_once_with(restored)
+        await manager.flush_spills()
+        assert not spill_store.contains("a")
+        assert spill_store.contains("b")
+
+
+class TestIncrementalStateSync:
+    """Test suite for sequenced, copy-on-write state changes."""
+
+    @pytest.fixture
+    def conversation_state(self):
+        return AGUIConversationState(
+            "delta-thread", initial_state={"case": {"id": 1}, "docs": []}
+        )
+
+    @pytest.fixture
+    def mock_websocket(self):
+        websocket = Mock(spec=WebSocket)
+        websocket.send_json = AsyncMock()
+        return websocket
+
+    def test_update_state_returns_minimal_patch(self, conversation_state):
+        """Test that a snapshot is applied as the patch against the old state."""
+        patch_ops = conversation_state.update_state(
+            {"case": {"id": 1}, "docs": ["a.pdf"]}
+        )
+
+        assert patch_ops == [{"op": "add", "path": "/docs/0", "value": "a.pdf"}]
+        assert conversation_state.state_seq == 1
+
+    def test_unchanged_snapshot_does_not_advance_seq(self, conversation_state):
+        """Test that a no-op snapshot produces no patch and no new seq."""
+        assert conversation_state.update_state({"case": {"id": 1}, "docs": []}) == []
+        assert conversation_state.state_seq == 0
+
+    def test_previous_state_is_not_mutated(self, conversation_state):
+        """Test copy-on-write: earlier state objects stay valid."""
+        before = conversation_state.current_state
+        conversation_state.patch_state(
+            [{"op": "replace", "path": "/case/id", "value": 2}]
+        )
+
+        assert before == {"case": {"id": 1}, "docs": []}
+        assert conversation_state.current_state["docs"] is before["docs"]
+
+    def test_snapshot_is_not_aliased(self, conversation_state):
+        """Test that mutating a snapshot afterwards does not change state."""
+        snapshot = {"case": {"id": 1}, "docs": [{"name": "a.pdf"}]}
+        conversation_state.update_state(snapshot)
+        snapshot["docs"][0]["name"] = "changed"
+
+        assert conversation_state.current_state["docs"] == [{"name": "a.pdf"}]
+        assert conversation_state.state_delta_since(0) == [
+            {"op": "add", "path": "/docs/0", "value": {"name": "a.pdf"}}
+        ]
+
+    def test_failed_patch_does_not_advance_seq(self, conversation_state):
+        """Test that a rejected patch leaves state and seq alone."""
+        assert not conversation_state.patch_state(
+            [
+                {"op": "add", "path": "/ok", "value": 1},
+                {"op": "remove", "path": "/missing"},
+            ]
+        )
+        assert "ok" not in conversation_state.current_state
+        assert conversation_state.state_seq == 0
+
+    def test_state_delta_since(self, conversation_state):
+        """Test catch-up patches across several changes."""
+        conversation_state.patch_state([{"op": "add", "path": "/a", "value": 1}])
+        conversation_state.patch_state([{"op": "add", "path": "/b", "value": 2}])
+
+        assert conversation_state.state_delta_since(2) == []
+        assert conversation_state.state_delta_since(1) == [
+            {"op": "add", "path": "/b", "value": 2}
+        ]
+        assert len(conversation_state.state_delta_since(0)) == 2
+        assert conversation_state.state_delta_since(5) is None
+
+    def test_state_delta_since_expired_history(self, conversation_state):
+        """Test that seqs older than the kept history need a snapshot."""
+        for index in range(STATE_HISTORY_LIMIT + 1):
+            conversation_state.patch_state(
+                [{"op": "add", "path": f"/k{index}", "value": index}]
+            )
+
+        assert conversation_state.state_delta_since(0) is None
+        assert conversation_state.state_delta_since(1) is not None
+
+    @pytest.mark.asyncio
+    async def test_events_carry_seq(self, conversation_state, mock_websocket):
+        """Test that snapshot and delta events include both seqs."""
+        patch_ops = conversation_state.update_state({"case": {"id": 2}, "docs": []})
+        await conversation_state.send_state_delta(mock_websocket, patch_ops)
+        await conversation_state.send_state_snapshot(mock_websocket)
+
+        delta, snapshot = [
+            call.args[0] for call in mock_websocket.send_json.call_args_list
+        ]
+        assert delta["type"] == EventType.STATE_DELTA
+        assert delta["stateSeq"] == 1
+        assert snapshot["type"] == EventType.STATE_SNAPSHOT
+        assert snapshot["stateSeq"] == 1
+        assert snapshot["seq"] == conversation_state.event_log.last_seq
+
+    @pytest.mark.asyncio
+    async def test_send_state_catch_up(self, conversation_state, mock_websocket):
+        """Test that catch-up sends a delta, nothing, or asks for a snapshot."""
+        conversation_state.patch_state([{"op": "add", "path": "/a", "value": 1}])
+
+        assert await conversation_state.send_state_catch_up(mock_websocket, 0)
+        assert await conversation_state.send_state_catch_up(mock_websocket, 1)
+        assert not await conversation_state.send_state_catch_up(mock_websocket, 7)
+
+        mock_websocket.send_json.assert_called_once()
+        assert mock_websocket.send_json.call_args[0][0]["delta"] == [
+            {"op": "add", "path": "/a", "value": 1}
+        ]
+
+
+class TestSerializedHistory:
+    """Test suite for the cached orchestrator history."""
+
+    def test_messages_are_dumped_once(self):
+        """Test that later calls reuse earlier dumps and add new ones."""
+        conversation = AGUIConversationState("history-thread")
+        conversation.add_message(AGUIUserMessage(id="1", role="user", content="a"))
+        first = conversation.serialized_history()
+
+        conversation.add_message(AGUIUserMessage(id="2", role="user", content="b"))
+        with patch.object(
+            AGUIUserMessage,
+            "model_dump",
+            autospec=True,
+            side_effect=AGUIUserMessage.model_dump,
+        ) as model_dump:
+            second = conversation.serialized_history()
+
+        assert second[0] is first[0]
+        assert second[1] == {"id": "2", "role": "user", "content": "b"}
+        model_dump.assert_called_once()
+
+    def test_end_excludes_later_messages(self):
+        """Test that history can stop before the current user message."""
+        conversation = AGUIConversationState("history-thread")
+        for index in range(3):
+            conversation.add_message(
+                AGUIUserMessage(id=str(index), role="user", content="x")
+            )
+
+        assert [message["id"] for message in conversation.serialized_history(2)] == [
+            "0",
+            "1",
+        ]
+
+
+class TestCompactedHistory:
+    """Test suite for summarizing long orchestrator histories."""
+
+    @pytest.fixture
+    def conversation(self):
+        conversation = AGUIConversationState("compaction-thread")
+        for index in range(6):
+            conversation.add_message(
+                AGUIUserMessage(id=str(index), role="user", content="x" * 40)
+            )
+        return conversation
+
+    def test_without_compactor_history_is_unchanged(self, conversation):
+        """Test that compaction is off unless a compactor is given."""
+        assert conversation.compacted_history(None, None) == (
+            conversation.serialized_history()
+        )
+
+    @pytest.mark.asyncio
+    async def test_summary_is_refreshed_in_background_and_used_next_time(
+        self, conversation
+    ):
+        """Test that an over-budget history is summarized for later calls."""
+        summarize = AsyncMock(return_value="The user asked six times.")
+        compactor = HistoryCompactor(summarize, token_budget=20, keep_recent=2)
+        conversation.history_context.context_id = "ctx"
+        conversation.history_context.length = 6
+
+        first = conversation.compacted_history(None, compactor)
+        await conversation._summary_task
+        second = conversation.compacted_history(None, compactor)
+
+        assert [message["id"] for message in first] == ["0", "1", "2", "3", "4", "5"]
+        assert [message["id"] for message in second] == [
+            SUMMARY_MESSAGE_ID,
+            "4",
+            "5",
+        ]
+        assert "The user asked six times." in second[0]["content"]
+        assert conversation.history_summary.covered == 4
+        # The orchestrator's cached history no longer matches
+        assert conversation.history_context.context_id is None
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_full_history(self, conversation):
+        """Test that a summarizer error does not break the run."""
+        compactor = HistoryCompactor(
+            AsyncMock(side_effect=RuntimeError("no model")),
+            token_budget=20,
+            keep_recent=2,
+        )
+
+        conversation.compacted_history(None, compactor)
+        await conversation._summary_task
+
+        assert conversation.history_summary == HistorySummary()
+        assert len(conversation.compacted_history(None, None)) == 6
+
+    def test_overlapping_runs_update_context_one_at_a_time(self, conversation):
+        """Test that a context from a superseded request is not taken back."""
+        _, first, first_version = conversation.history_request(5, None)
+        _, second, second_version = conversation.history_request(6, None)
+        first.context_id, first.length = "ctx-1", 5
+        second.context_id, second.length = "ctx-2", 6
+
+        assert conversation.commit_history_context(second, second_version)
+        assert not conversation.commit_history_context(first, first_version)
+        assert conversation.history_context.context_id == "ctx-2"
+
+    @pytest.mark.asyncio
+    async def test_summary_refresh_supersedes_runs_in_flight(self, conversation):
+        """Test that a run started before a new summary keeps no context."""
+        compactor = HistoryCompactor(
+            AsyncMock(return_value="Summary."), token_budget=20, keep_recent=2
+        )
+
+        _, context, version = conversation.history_request(None, compactor)
+        await conversation._summary_task
+        context.context_id, context.length = "ctx", 6
+
+        assert not conversation.commit_history_context(context, version)
+        assert conversation.history_context.context_id is None
+
+
+class TestMessageHistoryPaging:
+    """Test suite for windowed message snapshots and history pages."""
+
+    @pytest.fixture
+    def artifact_store(self, tmp_path):
+        return ArtifactStore(str(tmp_path / "artifacts"), inline_limit=100)
+
+    @pytest.fixture
+    def conversation_state(self, artifact_store):
+        conversation = AGUIConversationState(
+            "paging-thread", snapshot_window=3, artifact_store=artifact_store
+        )
+        for index in range(10):
+            conversation.add_message(
+                AGUIUserMessage(id=f"m{index}", role="user", content=f"{index}")
+            )
+        return conversation
+
+    @pytest.fixture
+    def mock_websocket(self):
+        websocket = Mock(spec=WebSocket)
+        websocket.send_json = AsyncMock()
+        return websocket
+
+    @pytest.mark.asyncio
+    async def test_snapshot_sends_newest_window_with_cursor(
+        self, conversation_state, mock_websocket
+    ):
+        """Test that only the last snapshot_window messages are sent."""
+        await conversation_state.send_messages_snapshot(mock_websocket)
+
+        event = mock_websocket.send_json.call_args[0][0]
+        assert event["type"] == EventType.MESSAGES_SNAPSHOT
+        assert [message["id"] for message in event["messages"]] == ["m7", "m8", "m9"]
+        assert event["cursor"] == 7
+        assert event["hasMore"] is True
+
+    @pytest.mark.asyncio
+    async def test_pages_walk_back_to_the_start(self, conversation_state):
+        """Test that following cursors yields all history exactly once."""
+        seen = []
+        cursor = None
+        while True:
+            page = await conversation_state.message_page(before=cursor, limit=4)
+            seen = [message["id"] for message in page["messages"]] + seen
+            cursor = page["cursor"]
+            if not page["hasMore"]:
+                break
+
+        assert seen == [f"m{index}" for index in range(10)]
+        assert cursor is None
+
+    @pytest.mark.asyncio
+    async def test_without_window_snapshot_is_complete(self, mock_websocket):
+        """Test that conversations without a window still send everything."""
+        conversation = AGUIConversationState("full-thread")
+        conversation.add_message(AGUIUserMessage(id="1", role="user", content="a"))
+
+        await conversation.send_messages_snapshot(mock_websocket)
+
+        event = mock_websocket.send_json.call_args[0][0]
+        assert len(event["messages"]) == 1
+        assert event["cursor"] is None
+        assert event["hasMore"] is False
+
+    @pytest.mark.asyncio
+    async def test_oversized_tool_output_becomes_artifact_reference(
+        self, conversation_state, artifact_store
+    ):
+        """Test that large tool bodies are replaced by a preview and a ref."""
+        body = "x" * 500
+        conversation_state.add_message(
+            AGUIToolMessage(id="t1", role="tool", content=body, tool_call_id="call-1")
+        )
+        conversation_state.add_message(
+            AGUIToolMessage(id="t2", role="tool", content="ok", tool_call_id="call-2")
+        )
+
+        page = await conversation_state.message_page(limit=2)
+
+        large, small = page["messages"]
+        assert large["content"] == body[:PREVIEW_CHARS]
+        assert large["artifact"]["bytes"] == 500
+        assert await artifact_store.get(large["artifact"]["id"]) == body
+        assert small["content"] == "ok"
+        assert "artifact" not in small
+        # The conversation itself keeps the full output
+        assert conversation_state.messages[-2].content == body
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
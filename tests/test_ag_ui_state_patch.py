@@ -0,0 +1,134 @@
+"""
+Test suite for ag_ui_backend.state_patch module.
+
+This module contains tests for the copy-on-write JSON Patch used by
+AGUIConversationState.
+"""
+
+import copy
+
+import jsonpatch
+import pytest
+
+from ai_research_assistant.ag_ui_backend.state_patch import (
+    apply_state_patch,
+    make_state_patch,
+)
+
+
+@pytest.fixture
+def case_state():
+    return {
+        "case": {"id": 7, "issues": ["hearing loss", "tinnitus"]},
+        "documents": [{"name": "decision.pdf", "pages": 12}],
+        "evidence": {"medical": {"reports": list(range(1000))}},
+    }
+
+
+class TestApplyStatePatch:
+    """Test cases for apply_state_patch."""
+
+    def test_input_is_never_mutated(self, case_state):
+        """Test that the original document is left as it was."""
+        original = copy.deepcopy(case_state)
+
+        apply_state_patch(
+            case_state,
+            [
+                {"op": "add", "path": "/case/issues/-", "value": "vertigo"},
+                {"op": "remove", "path": "/documents/0"},
+                {"op": "replace", "path": "/case/id", "value": 8},
+            ],
+        )
+
+        assert case_state == original
+
+    def test_untouched_subtrees_are_shared(self, case_state):
+        """Test that only containers on the patched path are copied."""
+        patched = apply_state_patch(
+            case_state, [{"op": "replace", "path": "/case/id", "value": 8}]
+        )
+
+        assert patched["case"] is not case_state["case"]
+        assert patched["case"]["issues"] is case_state["case"]["issues"]
+        assert patched["evidence"] is case_state["evidence"]
+        assert patched["documents"] is case_state["documents"]
+
+    def test_patch_values_are_copied(self, case_state):
+        """Test that later changes to a patch value do not leak into state."""
+        value = {"name": "appeal.pdf"}
+        patched = apply_state_patch(
+            case_state, [{"op": "add", "path": "/documents/-", "value": value}]
+        )
+        value["name"] = "changed"
+
+        assert patched["documents"][-1] == {"name": "appeal.pdf"}
+
+    @pytest.mark.parametrize(
+        "operation, expected",
+        [
+            ({"op": "add", "path": "/list/1", "value": "x"}, ["a", "x", "b", "c"]),
+            ({"op": "remove", "path": "/list/0"}, ["b", "c"]),
+            ({"op": "replace", "path": "/list/2", "value": "z"}, ["a", "b", "z"]),
+            ({"op": "move", "from": "/list/0", "path": "/list/2"}, ["b", "c", "a"]),
+            (
+                {"op": "copy", "from": "/list/1", "path": "/list/-"},
+                ["a", "b", "c", "b"],
+            ),
+        ],
+    )
+    def test_list_operations(self, operation, expected):
+        """Test RFC 6902 list semantics for each operation."""
+        patched = apply_state_patch({"list": ["a", "b", "c"]}, [operation])
+
+        assert patched["list"] == expected
+
+    def test_whole_document_replace(self):
+        """Test that an empty path replaces the document."""
+        assert (
+            apply_state_patch({"a": 1}, [{"op": "replace", "path": "", "value": {}}])
+            == {}
+        )
+
+    @pytest.mark.parametrize(
+        "operations, error",
+        [
+            (
+                [{"op": "replace", "path": "/missing/field", "value": 1}],
+                jsonpatch.JsonPatchConflict,
+            ),
+            ([{"op": "remove", "path": "/list/9"}], jsonpatch.JsonPatchConflict),
+            ([{"op": "add", "path": "/field"}], jsonpatch.JsonPatchException),
+            (
+                [{"op": "test", "path": "/list/0", "value": "z"}],
+                jsonpatch.JsonPatchTestFailed,
+            ),
+            (
+                [{"op": "move", "from": "/nested", "path": "/nested/child"}],
+                jsonpatch.JsonPatchConflict,
+            ),
+            ([{"op": "frobnicate", "path": "/list"}], jsonpatch.JsonPatchException),
+        ],
+    )
+    def test_invalid_operations_raise(self, operations, error):
+        """Test that malformed or conflicting operations raise jsonpatch errors."""
+        with pytest.raises(error):
+            apply_state_patch({"list": ["a"], "nested": {}}, operations)
+
+    def test_round_trip_with_make_state_patch(self, case_state):
+        """Test that the computed patch reproduces the new state exactly."""
+        new_state = copy.deepcopy(case_state)
+        new_state["case"]["issues"].insert(0, "vertigo")
+        new_state["documents"].append({"name": "appeal.pdf", "pages": 3})
+        del new_state["evidence"]["medical"]
+        new_state["status"] = "filed"
+
+        patch = make_state_patch(case_state, new_state)
+
+        assert apply_state_patch(case_state, patch) == new_state
+        assert len(patch) < 10
+
+    def test_identical_states_produce_no_patch(self, case_state):
+        """Test that equal and identical documents diff to nothing."""
+        assert make_state_patch(case_state, case_state) == []
+        assert make_state_patch(case_state, copy.deepcopy(case_state)) == []
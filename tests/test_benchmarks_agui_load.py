@@ -0,0 +1,107 @@
+"""
+Test suite for benchmarks/agui_load.py.
+
+This module contains tests for the offline AG-UI load test: the fake LLM, the
+orchestrator app it serves, and a small end-to-end load run as run in CI.
+"""
+
+import uuid
+
+import httpx
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelRequest, ModelResponse
+
+from ai_research_assistant.agents.base_pydantic_agent import BasePydanticAgent
+from ai_research_assistant.agents.base_pydantic_agent_config import (
+    BasePydanticAgentConfig,
+)
+from ai_research_assistant.core.models import MessageEnvelope, SkillInvocation
+from benchmarks.agui_load import (
+    LoadConfig,
+    create_orchestrator_app,
+    fake_llm,
+    format_report,
+    model_history,
+    run_load,
+)
+
+
+class TestFakeLLM:
+    """Test cases for the configurable fake model."""
+
+    @pytest.mark.asyncio
+    async def test_output_has_requested_tokens(self):
+        """Test that the answer is ``tokens`` words long."""
+        result = await Agent(fake_llm(latency=0, tokens=7)).run("Status?")
+
+        assert len(result.output.split()) == 7
+
+    @pytest.mark.asyncio
+    async def test_streamed_output_matches(self):
+        """Test that streaming yields the same text."""
+        async with Agent(fake_llm(latency=0, tokens=5)).run_stream("Status?") as run:
+            streamed = await run.get_output()
+
+        assert streamed == "token0 token1 token2 token3 token4"
+
+
+class TestOrchestratorApp:
+    """Test cases for the orchestrator side of the load test."""
+
+    def test_history_becomes_model_messages(self):
+        """Test the AG-UI history conversion."""
+        messages = model_history(
+            [
+                {"id": "1", "role": "user", "content": "Hi"},
+                {"id": "2", "role": "assistant", "content": "Hello"},
+            ]
+        )
+
+        assert [type(message) for message in messages] == [
+            ModelRequest,
+            ModelResponse,
+        ]
+
+    @pytest.mark.asyncio
+    async def test_answers_a2a_client_envelopes(self):
+        """Test that the app answers in the form a2a_client decodes."""
+        agent = BasePydanticAgent(
+            BasePydanticAgentConfig(agent_id="o", agent_name="Orchestrator"),
+            llm_instance=fake_llm(latency=0, tokens=3),
+        )
+        app = create_orchestrator_app(agent)
+        envelope = MessageEnvelope(
+            conversation_id=uuid.uuid4(),
+            source_agent_id="ag_ui_backend",
+            target_agent_id="chief_legal_orchestrator",
+            skill_invocation=SkillInvocation(
+                skill_name="handle_user_request",
+                parameters={"user_prompt": "Status?", "history": []},
+            ),
+        )
+
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.post(
+                "/", json=envelope.model_dump(mode="json", exclude_none=True)
+            )
+
+        reply = MessageEnvelope(**response.json())
+        assert reply.task_result.parts[0].content == "token0 token1 token2"
+
+
+class TestLoadRun:
+    """End-to-end load run against real servers in a child process."""
+
+    @pytest.mark.asyncio
+    async def test_small_load_run(self):
+        """Test that a small offline run completes every run without errors."""
+        report = await run_load(
+            LoadConfig(clients=3, runs_per_client=2, llm_latency=0.01, tokens=20)
+        )
+
+        assert (report.runs, report.completed, report.errors) == (6, 6, 0)
+        assert report.latency_ms["completed"]["p50"] > 0
+        assert "6/6" in format_report(report)
@@ -0,0 +1,167 @@
+"""
+Test suite for benchmarks/microbench.py.
+
+This module contains tests for the micro-benchmark runner, the baseline file
+and regression thresholds, and a single quick pass over every benchmark.
+"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+
+from benchmarks.microbench import (
+    BENCHMARKS,
+    DEFAULT_THRESHOLD_PERCENT,
+    Benchmark,
+    BenchmarkResult,
+    compare,
+    confirm_regressions,
+    load_baseline,
+    measure,
+    run_benchmark,
+    run_benchmarks,
+    save_baseline,
+)
+
+
+def result(name, best_us):
+    return BenchmarkResult(name=name, best_us=best_us, median_us=best_us, loops=1)
+
+
+def baseline(**benchmarks):
+    return {
+        "threshold_percent": 25.0,
+        "benchmarks": {name: {"best_us": us} for name, us in benchmarks.items()},
+    }
+
+
+class TestCompare:
+    """Test cases for regression detection against a baseline."""
+
+    def test_slowdown_past_threshold_regresses(self):
+        """Test that only slowdowns beyond the threshold fail."""
+        comparisons = compare(
+            [result("a", 13.0), result("b", 12.0), result("c", 5.0)],
+            baseline(a=10.0, b=10.0, c=10.0),
+        )
+
+        assert [c.regressed for c in comparisons] == [True, False, False]
+        assert comparisons[0].change_percent == pytest.approx(30.0)
+
+    def test_new_benchmark_is_not_a_regression(self):
+        """Test that a benchmark without a baseline only reports."""
+        (comparison,) = compare([result("new", 99.0)], baseline())
+
+        assert comparison.baseline_us is None
+        assert not comparison.regressed
+
+    def test_threshold_precedence(self):
+        """Test command line, then benchmark, then baseline file threshold."""
+        noisy = next(b for b in BENCHMARKS.values() if b.threshold_percent)
+        results = [result(noisy.name, 14.0), result("plain", 14.0)]
+        recorded = baseline(**{noisy.name: 10.0, "plain": 10.0})
+
+        default = compare(results, recorded)
+        assert [c.threshold_percent for c in default] == [noisy.threshold_percent, 25]
+        assert [c.regressed for c in default] == [False, True]
+
+        overridden = compare(results, recorded, threshold_percent=50)
+        assert not any(c.regressed for c in overridden)
+
+    def test_apparent_regression_is_measured_again(self):
+        """Test that a noisy slow result is replaced by a faster re-run."""
+        name = "rate_limiter.token_bucket_consume"
+
+        confirmed = confirm_regressions(
+            [result(name, 1e9)], baseline(**{name: 1e6}), min_time=0, repeat=1
+        )
+
+        assert confirmed[0].best_us < 1e6
+        assert not compare(confirmed, baseline(**{name: 1e6}))[0].regressed
+
+
+class TestBaselineFile:
+    """Test cases for storing and loading baselines."""
+
+    def test_missing_file_is_an_empty_baseline(self, tmp_path):
+        """Test that a first run has nothing to compare with."""
+        loaded = load_baseline(str(tmp_path / "none.json"))
+
+        assert loaded == {
+            "threshold_percent": DEFAULT_THRESHOLD_PERCENT,
+            "benchmarks": {},
+        }
+
+    def test_save_merges_with_existing_benchmarks(self, tmp_path):
+        """Test that saving a filtered run keeps the other baselines."""
+        path = str(tmp_path / "baseline.json")
+        previous = {**baseline(a=1.0, b=2.0), "threshold_percent": 40.0}
+
+        save_baseline(
+            path,
+            [result("b", 3.0), BenchmarkResult(name="c", skipped="missing")],
+            previous,
+        )
+
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+        assert saved["benchmarks"] == {"a": {"best_us": 1.0}, "b": {"best_us": 3.0}}
+        assert saved["threshold_percent"] == 40.0
+        assert "python" in saved["machine"]
+
+
+class TestRunner:
+    """Test cases for timing operations."""
+
+    @pytest.mark.asyncio
+    async def test_loops_reach_min_time(self):
+        """Test that the loop count grows until a sample is long enough."""
+        calls = []
+
+        result = await measure(lambda: calls.append(1), min_time=0.001, repeat=3)
+
+        assert result.loops > 1
+        assert 0 < result.best_us <= result.median_us
+        # Warm-up, calibration and samples all call the operation
+        assert len(calls) > 3 * result.loops
+
+    @pytest.mark.asyncio
+    async def test_async_operations_are_awaited(self):
+        """Test that coroutine functions are timed including their await."""
+
+        async def sleep():
+            await asyncio.sleep(0.002)
+
+        result = await measure(sleep, min_time=0, repeat=1)
+
+        assert result.best_us >= 2000
+
+    @pytest.mark.asyncio
+    async def test_missing_dependency_skips(self):
+        """Test that a benchmark whose code cannot be imported is skipped."""
+
+        @asynccontextmanager
+        async def setup():
+            import not_installed_module  # noqa: F401
+
+            yield lambda: None
+
+        result = await run_benchmark(Benchmark("x", "needs a module", setup))
+
+        assert result.best_us is None
+        assert "not_installed_module" in result.skipped
+
+
+class TestSuite:
+    """One quick pass over every registered benchmark."""
+
+    @pytest.mark.asyncio
+    async def test_every_benchmark_runs(self):
+        """Test that each benchmark's setup and operation work."""
+        results = await run_benchmarks(list(BENCHMARKS), min_time=0, repeat=1)
+
+        assert [r.name for r in results] == list(BENCHMARKS)
+        for result in results:
+            assert result.skipped or result.best_us > 0, result.name
@@ -0,0 +1,199 @@
+"""
+Test suite for core.history_compaction module.
+
+This module contains tests for rolling history summarization: token
+estimates, applying a summary, deciding when to refresh it, incremental
+refreshes, and the opt-in per-agent compactor built by compactor_for.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from pydantic_ai.messages import ModelResponse, TextPart
+from pydantic_ai.models.function import FunctionModel
+
+from ai_research_assistant.agents.base_pydantic_agent_config import (
+    BasePydanticAgentConfig,
+)
+from ai_research_assistant.config.global_settings import settings
+from ai_research_assistant.core.history_compaction import (
+    SUMMARY_MESSAGE_ID,
+    HistoryCompactor,
+    HistorySummary,
+    build_summary_prompt,
+    compactor_for,
+    estimate_tokens,
+)
+
+
+def make_history(count, chars=40):
+    return [
+        {
+            "id": str(index),
+            "role": "user" if index % 2 == 0 else "assistant",
+            "content": f"{index}".ljust(chars, "x"),
+        }
+        for index in range(count)
+    ]
+
+
+class RecordingSummarizer:
+    """Summarizer that records its calls and numbers its summaries."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, previous_summary, messages):
+        self.calls.append((previous_summary, [message["id"] for message in messages]))
+        return f" summary {len(self.calls)} "
+
+
+class TestEstimateTokens:
+    """Test cases for the token estimate."""
+
+    def test_counts_content_tool_calls_and_overhead(self):
+        """Test that content and tool call arguments both count."""
+        messages = [
+            {"role": "user", "content": "x" * 400},
+            {
+                "role": "assistant",
+                "toolCalls": [{"function": {"name": "search", "arguments": "y" * 194}}],
+            },
+        ]
+
+        assert estimate_tokens(messages) == (100 + 4) + (50 + 4)
+
+    def test_empty_history(self):
+        """Test that an empty history costs nothing."""
+        assert estimate_tokens([]) == 0
+
+
+class TestHistoryCompactor:
+    """Test cases for HistoryCompactor."""
+
+    def test_compact_without_summary_returns_history(self):
+        """Test that a history nothing has been folded from is unchanged."""
+        compactor = HistoryCompactor(RecordingSummarizer(), token_budget=10)
+        history = make_history(4)
+
+        assert compactor.compact(history, HistorySummary()) is history
+
+    def test_compact_replaces_covered_prefix(self):
+        """Test that covered messages become one summary message."""
+        compactor = HistoryCompactor(RecordingSummarizer(), token_budget=10)
+        history = make_history(5)
+
+        compacted = compactor.compact(history, HistorySummary("earlier", covered=3))
+
+        assert compacted[0]["id"] == SUMMARY_MESSAGE_ID
+        assert compacted[0]["role"] == "system"
+        assert "earlier" in compacted[0]["content"]
+        assert compacted[1:] == history[3:]
+
+    def test_needs_refresh_only_over_budget(self):
+        """Test the budget check against the compacted history."""
+        history = make_history(10)  # 14 tokens per message
+
+        assert not HistoryCompactor(
+            RecordingSummarizer(), token_budget=200, keep_recent=2
+        ).needs_refresh(history, HistorySummary())
+        assert HistoryCompactor(
+            RecordingSummarizer(), token_budget=100, keep_recent=2
+        ).needs_refresh(history, HistorySummary())
+
+    def test_recent_messages_alone_never_trigger_refresh(self):
+        """Test that there is nothing to fold once only recent turns remain."""
+        compactor = HistoryCompactor(
+            RecordingSummarizer(), token_budget=1, keep_recent=4
+        )
+        history = make_history(6)
+
+        assert not compactor.needs_refresh(history, HistorySummary("s", covered=2))
+
+    @pytest.mark.asyncio
+    async def test_refresh_folds_only_new_older_turns(self):
+        """Test that each refresh summarizes the previous summary plus new turns."""
+        summarizer = RecordingSummarizer()
+        compactor = HistoryCompactor(summarizer, token_budget=1, keep_recent=2)
+        history = make_history(6)
+
+        first = await compactor.refresh(history, HistorySummary())
+        second = await compactor.refresh(history + make_history(9)[6:], first)
+
+        assert first == HistorySummary("summary 1", covered=4)
+        assert second == HistorySummary("summary 2", covered=7)
+        assert summarizer.calls == [
+            ("", ["0", "1", "2", "3"]),
+            ("summary 1", ["4", "5", "6"]),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_refresh_with_nothing_to_fold_keeps_summary(self):
+        """Test that no model call is made when only recent turns are new."""
+        summarizer = RecordingSummarizer()
+        compactor = HistoryCompactor(summarizer, token_budget=1, keep_recent=4)
+        summary = HistorySummary("s", covered=2)
+
+        assert await compactor.refresh(make_history(6), summary) is summary
+        assert summarizer.calls == []
+
+    def test_summary_prompt_carries_summary_and_turns(self):
+        """Test the prompt sent to the summarization model."""
+        prompt = build_summary_prompt(
+            "Worker injured 2023.", [{"role": "user", "content": "Appeal filed."}]
+        )
+
+        assert "Worker injured 2023." in prompt
+        assert "user: Appeal filed." in prompt
+
+
+class TestCompactorFor:
+    """Test cases for the per-agent compactor built from agent configs."""
+
+    def config(self, **fields):
+        return BasePydanticAgentConfig(agent_id="a", agent_name="Agent", **fields)
+
+    def test_off_unless_enabled(self):
+        """Test that compaction is opt-in even for agents with a budget."""
+        with patch.object(settings, "HISTORY_COMPACTION_ENABLED", False):
+            assert compactor_for(self.config(history_token_budget=50)) is None
+
+    def test_disabled_without_budget(self):
+        """Test that agents compact nothing unless configured to."""
+        with patch.object(settings, "HISTORY_COMPACTION_ENABLED", True):
+            assert compactor_for(self.config()) is None
+
+    @pytest.mark.asyncio
+    async def test_compactor_uses_agent_settings_and_model(self):
+        """Test that the budget, recent turns and summarizing model come from the agent."""
+        prompts = []
+
+        def model(messages, info):
+            prompts.append(messages[-1].parts[-1].content)
+            return ModelResponse(parts=[TextPart("Claim 123 was denied.")])
+
+        config = self.config(
+            history_token_budget=50,
+            history_keep_recent=3,
+            history_summary_model="summary-model",
+        )
+        with (
+            patch.object(settings, "HISTORY_COMPACTION_ENABLED", True),
+            patch(
+                "ai_research_assistant.core.history_compaction.get_llm_factory"
+            ) as get_llm_factory,
+        ):
+            create = get_llm_factory.return_value.create_llm_from_config
+            create.return_value = FunctionModel(model)
+            compactor = compactor_for(config)
+            # The model is only created once a summary is due
+            create.assert_not_called()
+
+            summary = await compactor.refresh(make_history(8), HistorySummary())
+
+        assert (compactor.token_budget, compactor.keep_recent) == (50, 3)
+        assert summary == HistorySummary("Claim 123 was denied.", covered=5)
+        assert "New turns:" in prompts[0]
+        create.assert_called_once_with(
+            {"provider": "google", "model_name": "summary-model"}
+        )
@@ -0,0 +1,167 @@
+"""
+Test suite for core.loop_monitor module.
+
+This module contains tests for the slow-callback detector: catching blocking
+calls with the stack that caused them, metrics, and the /debug/slow-callbacks
+endpoint.
+"""
+
+import asyncio
+import time
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from ai_research_assistant.core.loop_monitor import (
+    SLOW_CALLBACK_DURATION,
+    SLOW_CALLBACKS,
+    SlowCallbackDetector,
+)
+from ai_research_assistant.core.metrics import instrument_app
+
+TOKEN = "s3cret-admin-token"
+AUTH = {"Authorization": f"Bearer {TOKEN}"}
+
+
+def blocking_helper(seconds):
+    time.sleep(seconds)
+
+
+class TestSlowCallbackDetector:
+    """Test cases for SlowCallbackDetector."""
+
+    @pytest.mark.asyncio
+    async def test_blocking_call_is_recorded_with_stack(self):
+        """Test that a blocking call is caught with its own stack frame."""
+        detector = SlowCallbackDetector(threshold=0.05)
+        before = SLOW_CALLBACKS.value()
+        detector.start()
+        try:
+            await asyncio.sleep(0.05)
+            blocking_helper(0.25)
+            await asyncio.sleep(0.05)
+        finally:
+            detector.stop()
+
+        assert detector.total == 1
+        record = detector.records[0]
+        assert record.duration_seconds >= 0.15
+        assert any("blocking_helper" in line for line in record.stack)
+        assert record.task is not None
+        assert SLOW_CALLBACKS.value() == before + 1
+        assert not detector.running
+
+    @pytest.mark.asyncio
+    async def test_cooperative_code_is_not_reported(self):
+        """Test that awaiting code never trips the detector."""
+        detector = SlowCallbackDetector(threshold=0.05)
+        detector.start()
+        try:
+            for _ in range(10):
+                await asyncio.sleep(0.01)
+        finally:
+            detector.stop()
+
+        assert detector.total == 0
+        assert detector.snapshot()["slow_callbacks"] == []
+
+    @pytest.mark.asyncio
+    async def test_records_are_bounded_and_newest_first(self):
+        """Test that only max_records stalls are kept, newest first."""
+        detector = SlowCallbackDetector(threshold=0.02, max_records=2)
+        detector.start()
+        try:
+            for seconds in (0.06, 0.08, 0.1):
+                await asyncio.sleep(0.02)
+                blocking_helper(seconds)
+            await asyncio.sleep(0.02)
+        finally:
+            detector.stop()
+
+        snapshot = detector.snapshot()
+        durations = [r["duration_seconds"] for r in snapshot["slow_callbacks"]]
+        assert snapshot["total"] == 3
+        assert len(durations) == 2
+        assert durations[0] > durations[1]
+
+    def test_threshold_must_be_positive(self):
+        """Test that a zero threshold is rejected."""
+        with pytest.raises(ValueError):
+            SlowCallbackDetector(threshold=0)
+
+
+class TestSlowCallbacksEndpoint:
+    """Test cases for the /debug/slow-callbacks endpoint."""
+
+    @pytest.fixture
+    def app(self):
+        async def block(request):
+            blocking_helper(0.2)
+            return JSONResponse({"ok": True})
+
+        app = Starlette(routes=[Route("/block", block)])
+        instrument_app(
+            app, service="test_app", slow_callback_threshold=0.05, admin_token=TOKEN
+        )
+        return app
+
+    @pytest.fixture
+    def client(self, app):
+        with TestClient(app) as client:
+            yield client
+
+    def test_endpoint_reports_blocking_route(self, client):
+        """Test that a blocking handler shows up with its stack."""
+        before = SLOW_CALLBACK_DURATION.count()
+
+        client.get("/block")
+        time.sleep(0.05)
+        response = client.get(
+            "/debug/slow-callbacks", params={"limit": 5}, headers=AUTH
+        )
+
+        data = response.json()
+        assert response.status_code == 200
+        assert data["threshold_ms"] == 50
+        assert data["running"] is True
+        assert any(
+            "blocking_helper" in line
+            for record in data["slow_callbacks"]
+            for line in record["stack"] or []
+        )
+        assert SLOW_CALLBACK_DURATION.count() > before
+
+    def test_endpoint_rejects_bad_limit(self, client):
+        """Test that a non-numeric limit returns an error payload."""
+        response = client.get(
+            "/debug/slow-callbacks", params={"limit": "many"}, headers=AUTH
+        )
+
+        assert response.status_code == 400
+        assert response.json()["status"] == "error"
+
+    def test_endpoint_requires_admin_token(self, client):
+        """Test that stacks are only returned to callers with the token."""
+        assert client.get("/debug/slow-callbacks").status_code == 401
+        response = client.get(
+            "/debug/slow-callbacks", headers={"Authorization": "Bearer wrong"}
+        )
+        assert response.status_code == 401
+
+    def test_endpoint_absent_without_token(self):
+        """Test that the endpoint is not mounted unless a token is configured."""
+        app = Starlette()
+        instrument_app(app, service="test_app")
+        with TestClient(app) as client:
+            assert client.get("/debug/slow-callbacks").status_code == 404
+
+    def test_each_app_has_its_own_threshold(self, app):
+        """Test that instrumenting one app leaves another's detector alone."""
+        other = Starlette()
+        instrument_app(other, service="other_app", slow_callback_threshold=0.5)
+
+        assert app.state.slow_callback_detector.threshold == 0.05
+        assert other.state.slow_callback_detector.threshold == 0.5
@@ -0,0 +1,75 @@
+"""
+Test suite for core.metric_sketch module.
+
+This module contains tests for the mergeable quantile sketch used by the
+metric rollup tables.
+"""
+
+import random
+
+import pytest
+
+from ai_research_assistant.core.metric_sketch import QuantileSketch
+
+
+class TestQuantileSketch:
+    """Test cases for QuantileSketch."""
+
+    def test_empty_sketch_has_no_quantiles(self):
+        """Test that an empty sketch returns None."""
+        assert QuantileSketch().quantile(0.5) is None
+
+    def test_quantiles_within_relative_accuracy(self):
+        """Test that estimates stay within the configured relative error."""
+        rng = random.Random(7)
+        values = sorted(rng.lognormvariate(0, 2) for _ in range(5000))
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        for q in (0.0, 0.5, 0.9, 0.99, 1.0):
+            expected = values[int(q * (len(values) - 1))]
+            assert sketch.quantile(q) == pytest.approx(expected, rel=0.01)
+
+    def test_zero_and_negative_values(self):
+        """Test that non-positive observations are ordered correctly."""
+        sketch = QuantileSketch()
+        for value in (-10.0, 0.0, 10.0):
+            sketch.add(value)
+
+        assert sketch.quantile(0.0) == pytest.approx(-10.0, rel=0.01)
+        assert sketch.quantile(0.5) == 0.0
+        assert sketch.quantile(1.0) == pytest.approx(10.0, rel=0.01)
+
+    def test_merge_matches_single_sketch(self):
+        """Test that merging partial sketches equals sketching everything."""
+        whole, left, right = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        for value in range(1, 201):
+            whole.add(value)
+            (left if value % 2 else right).add(value)
+
+        left.merge(right)
+
+        assert left.count == whole.count
+        assert left.quantile(0.75) == whole.quantile(0.75)
+
+    def test_merge_rejects_different_accuracy(self):
+        """Test that sketches with different bin widths cannot be merged."""
+        with pytest.raises(ValueError):
+            QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+    def test_round_trip_through_dict(self):
+        """Test that serialized sketches keep their counts."""
+        sketch = QuantileSketch()
+        for value in (-1.0, 0.0, 2.5, 2.5, 100.0):
+            sketch.add(value)
+
+        restored = QuantileSketch.from_dict(sketch.to_dict())
+
+        assert restored.count == 5
+        assert restored.quantile(0.5) == sketch.quantile(0.5)
+
+    def test_invalid_quantile_raises(self):
+        """Test that quantiles outside [0, 1] are rejected."""
+        with pytest.raises(ValueError):
+            QuantileSketch().quantile(1.5)
@@ -0,0 +1,221 @@
+"""
+Test suite for core.metrics module.
+
+This module contains tests for the in-process metrics registry, the
+OpenMetrics/Prometheus text exposition and the Starlette integration that
+serves it at /metrics.
+"""
+
+import asyncio
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from ai_research_assistant.core.loop_monitor import EventLoopLagMonitor
+from ai_research_assistant.core.metrics import (
+    EVENT_LOOP_LAG,
+    HTTP_REQUEST_DURATION,
+    SKILL_DURATION,
+    TASKS_RUNNING,
+    MetricsRegistry,
+    instrument_app,
+)
+from ai_research_assistant.core.models import AgentTask
+from ai_research_assistant.core.resource_manager import ResourceManager
+
+
+class TestMetricsRegistry:
+    """Test cases for metric instruments and text rendering."""
+
+    def test_counter_renders_total_sample(self):
+        """Test that counters expose a _total sample per label set."""
+        registry = MetricsRegistry()
+        tokens = registry.counter("llm_tokens", "Tokens.", ("direction",))
+        tokens.inc(10, direction="in")
+        tokens.inc(5, direction="in")
+
+        text = registry.render()
+
+        assert "# TYPE llm_tokens counter" in text
+        assert 'llm_tokens_total{direction="in"} 15.0' in text
+        assert text.endswith("# EOF\n")
+
+    def test_prometheus_format_names_counter_family_with_total(self):
+        """Test that the 0.0.4 text format omits EOF and suffixes the family."""
+        registry = MetricsRegistry()
+        registry.counter("requests", "Requests.").inc()
+
+        text = registry.render(openmetrics=False)
+
+        assert "# TYPE requests_total counter" in text
+        assert "# EOF" not in text
+
+    def test_counter_rejects_negative_increment(self):
+        """Test that counters cannot decrease."""
+        registry = MetricsRegistry()
+        with pytest.raises(ValueError):
+            registry.counter("requests", "Requests.").inc(-1)
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram bucket, count and sum samples."""
+        registry = MetricsRegistry()
+        latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            latency.observe(value)
+
+        text = registry.render()
+
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{le="1.0"} 2' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+        assert "latency_seconds_count 3" in text
+        assert latency.sum() == pytest.approx(5.55)
+
+    def test_gauge_set_function_evaluated_on_render(self):
+        """Test that callback gauges report the current value."""
+        registry = MetricsRegistry()
+        items = []
+        registry.gauge("queue_depth", "Depth.").set_function(lambda: len(items))
+        items.extend([1, 2, 3])
+
+        assert "queue_depth 3.0" in registry.render()
+
+    def test_labels_must_match_declaration(self):
+        """Test that missing or unexpected labels are rejected."""
+        registry = MetricsRegistry()
+        counter = registry.counter("calls", "Calls.", ("agent",))
+
+        with pytest.raises(ValueError, match="expects labels"):
+            counter.inc()
+        with pytest.raises(ValueError, match="expects labels"):
+            counter.inc(agent="a", skill="b")
+
+    def test_label_values_are_escaped(self):
+        """Test escaping of quotes, backslashes and newlines."""
+        registry = MetricsRegistry()
+        registry.counter("calls", "Calls.", ("agent",)).inc(agent='a"b\\c\nd')
+
+        assert r'calls_total{agent="a\"b\\c\nd"} 1.0' in registry.render()
+
+    def test_registering_same_name_returns_existing_metric(self):
+        """Test get-or-create semantics and type conflicts."""
+        registry = MetricsRegistry()
+        first = registry.counter("calls", "Calls.")
+
+        assert registry.counter("calls", "Calls.") is first
+        with pytest.raises(ValueError, match="already registered"):
+            registry.gauge("calls", "Calls.")
+
+
+class TestMetricsEndpoint:
+    """Test cases for instrument_app and the /metrics endpoint."""
+
+    @pytest.fixture
+    def client(self):
+        async def item(request):
+            return JSONResponse({"id": request.path_params["item_id"]})
+
+        app = Starlette(routes=[Route("/items/{item_id}", item)])
+        instrument_app(app, service="test_service")
+        with TestClient(app) as client:
+            yield client
+
+    def test_metrics_endpoint_serves_prometheus_text(self, client):
+        """Test the default text format served to plain scrapers."""
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    def test_metrics_endpoint_negotiates_openmetrics(self, client):
+        """Test that OpenMetrics is served when the scraper asks for it."""
+        response = client.get(
+            "/metrics", headers={"Accept": "application/openmetrics-text"}
+        )
+
+        assert response.headers["content-type"].startswith(
+            "application/openmetrics-text"
+        )
+        assert response.text.endswith("# EOF\n")
+
+    def test_requests_are_timed_by_route_template(self, client):
+        """Test that request latency is labelled by route, not raw path."""
+        labels = {
+            "service": "test_service",
+            "method": "GET",
+            "route": "/items/{item_id}",
+            "status": "200",
+        }
+        before = HTTP_REQUEST_DURATION.count(**labels)
+
+        client.get("/items/1")
+        client.get("/items/2")
+
+        assert HTTP_REQUEST_DURATION.count(**labels) == before + 2
+        assert 'route="/items/{item_id}"' in client.get("/metrics").text
+
+    def test_ag_ui_backend_exposes_metrics(self, tmp_path, monkeypatch):
+        """Test that the AG-UI backend app serves /metrics."""
+        from ai_research_assistant.ag_ui_backend.conversation_store import (
+            ConversationStore,
+        )
+        from ai_research_assistant.ag_ui_backend.main import app
+        from ai_research_assistant.ag_ui_backend.state_manager import (
+            global_state_manager,
+        )
+
+        # The startup hook opens the durable conversation store
+        monkeypatch.setattr(
+            global_state_manager,
+            "conversation_store",
+            ConversationStore(str(tmp_path / "history.db")),
+        )
+
+        with TestClient(app) as client:
+            response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert "ag_ui_websocket_connections" in response.text
+
+
+class TestInstrumentation:
+    """Test cases for the instrumented hot paths."""
+
+    @pytest.mark.asyncio
+    async def test_resource_manager_records_skill_latency(self):
+        """Test that submit_skill records per-skill latency and running tasks."""
+        observed_running = []
+
+        class Agent:
+            agent_name = "MetricsAgent"
+
+            async def summarize(self):
+                observed_running.append(TASKS_RUNNING.value())
+                return {"status": "success"}
+
+        labels = {"agent": "MetricsAgent", "skill": "summarize", "status": "success"}
+        before = SKILL_DURATION.count(**labels)
+        running_before = TASKS_RUNNING.value()
+
+        await ResourceManager().submit_skill(
+            AgentTask(task_type="summarize", parameters={}), Agent().summarize
+        )
+
+        assert SKILL_DURATION.count(**labels) == before + 1
+        assert observed_running == [running_before + 1]
+        assert TASKS_RUNNING.value() == running_before
+
+    @pytest.mark.asyncio
+    async def test_event_loop_lag_monitor_samples(self):
+        """Test that the lag monitor records samples while running."""
+        before = EVENT_LOOP_LAG.count()
+        monitor = EventLoopLagMonitor(interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+        assert EVENT_LOOP_LAG.count() > before
+        assert not monitor.running
@@ -0,0 +1,211 @@
+"""
+Test suite for core.profiler module.
+
+This module contains tests for the sampling profiler, the asyncio task dump and
+the authenticated /debug/profile endpoint.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from ai_research_assistant.core.metrics import instrument_app
+from ai_research_assistant.core.profiler import (
+    SamplingProfiler,
+    dump_asyncio_tasks,
+    profile,
+)
+
+TOKEN = "s3cret-admin-token"
+
+
+def hot_function():
+    return sys._getframe()
+
+
+def cold_function():
+    return sys._getframe()
+
+
+def spin_until(condition, timeout=5.0):
+    end = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < end:
+        pass
+
+
+class TestSamplingProfiler:
+    """Test cases for SamplingProfiler."""
+
+    def test_sample_collapses_current_stacks(self):
+        """Test that a sample records the calling thread root-to-leaf."""
+        profiler = SamplingProfiler()
+
+        profiler.sample()
+
+        assert profiler.samples == 1
+        own_stack = next(
+            stack
+            for stack in profiler.stacks
+            if "test_sample_collapses_current_stacks" in stack
+        )
+        assert own_stack.startswith("MainThread;")
+        assert own_stack.split(";")[-1].startswith("sample (profiler.py:")
+
+    def test_collapsed_counts_samples_per_stack(self):
+        """Test that time is attributed to the sampled frames, heaviest first."""
+        profiler = SamplingProfiler()
+        thread_id = threading.get_ident()
+
+        for _ in range(3):
+            profiler.sample(frames={thread_id: hot_function()})
+        profiler.sample(frames={thread_id: cold_function()})
+
+        lines = profiler.collapsed().splitlines()
+        assert profiler.samples == 4
+        assert len(lines) == 2
+        assert lines[0].startswith("MainThread;")
+        assert lines[0].split(";")[-1].startswith("hot_function (test_core_profiler")
+        assert lines[0].endswith(" 3")
+        assert "cold_function (" in lines[1]
+        assert lines[1].endswith(" 1")
+
+    def test_background_thread_samples_busy_caller(self):
+        """Test that the sampler thread sees a CPU-bound caller, not itself."""
+        profiler = SamplingProfiler(interval=0.001)
+
+        profiler.start()
+        try:
+            spin_until(lambda: profiler.samples >= 5)
+        finally:
+            profiler.stop()
+
+        assert profiler.samples >= 5
+        assert any("spin_until (" in stack for stack in profiler.stacks)
+        assert not any("sampling-profiler" in stack for stack in profiler.stacks)
+
+    @pytest.mark.asyncio
+    async def test_profile_keeps_the_loop_running(self):
+        """Test that profile() samples while other tasks keep running."""
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        ticker_task = asyncio.create_task(ticker())
+        try:
+            profiler = await profile(0.1, interval=0.005)
+        finally:
+            ticker_task.cancel()
+
+        assert profiler.samples > 0
+        assert ticks > 1
+        assert all(
+            line.rsplit(" ", 1)[1].isdigit()
+            for line in profiler.collapsed().splitlines()
+        )
+
+
+class TestTaskDump:
+    """Test cases for dump_asyncio_tasks."""
+
+    @pytest.mark.asyncio
+    async def test_dump_shows_what_tasks_await(self):
+        """Test that pending tasks report their await chain."""
+        event = asyncio.Event()
+
+        async def waiter():
+            await event.wait()
+
+        task = asyncio.create_task(waiter(), name="case-waiter")
+        await asyncio.sleep(0)
+
+        dump = {entry["name"]: entry for entry in dump_asyncio_tasks()}
+        event.set()
+        await task
+
+        entry = dump["case-waiter"]
+        assert entry["coroutine"].endswith("waiter")
+        assert entry["current"] is False
+        assert entry["awaiting"][0].startswith(
+            "TestTaskDump.test_dump_shows_what_tasks_await.<locals>.waiter"
+        )
+        assert any("Event.wait" in step for step in entry["awaiting"])
+        assert entry["awaiting"][-1].startswith("<Future pending")
+
+
+class TestProfileEndpoint:
+    """Test cases for the /debug/profile endpoint."""
+
+    @pytest.fixture
+    def client(self):
+        async def ok(request):
+            return JSONResponse({"ok": True})
+
+        app = Starlette(routes=[Route("/ok", ok)])
+        instrument_app(app, service="test_app", admin_token=TOKEN)
+        with TestClient(app) as client:
+            yield client
+
+    def test_requires_bearer_token(self, client):
+        """Test that missing or wrong tokens are rejected."""
+        assert client.get("/debug/profile").status_code == 401
+        response = client.get(
+            "/debug/profile", headers={"Authorization": "Bearer wrong"}
+        )
+        assert response.status_code == 401
+        assert response.json()["status"] == "error"
+
+    def test_returns_collapsed_stacks(self, client):
+        """Test that the default response is a collapsed-stack file."""
+        response = client.get(
+            "/debug/profile",
+            params={"seconds": "0.1", "interval_ms": "2"},
+            headers={"Authorization": f"Bearer {TOKEN}"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "profile.collapsed" in response.headers["content-disposition"]
+        first = response.text.splitlines()[0]
+        assert first.rsplit(" ", 1)[1].isdigit()
+
+    def test_task_dump_in_json(self, client):
+        """Test that tasks=true adds the asyncio task dump."""
+        response = client.get(
+            "/debug/profile",
+            params={"seconds": "0.05", "tasks": "true"},
+            headers={"Authorization": f"Bearer {TOKEN}"},
+        )
+
+        data = response.json()
+        assert data["status"] == "success"
+        assert data["samples"] > 0
+        assert any(task["current"] for task in data["tasks"])
+
+    def test_rejects_out_of_range_duration(self, client):
+        """Test that profiles longer than the maximum are refused."""
+        response = client.get(
+            "/debug/profile",
+            params={"seconds": "600"},
+            headers={"Authorization": f"Bearer {TOKEN}"},
+        )
+
+        assert response.status_code == 400
+
+    def test_endpoint_absent_without_token(self):
+        """Test that the profiler is not mounted unless a token is configured."""
+        app = Starlette()
+        instrument_app(app, service="test_app")
+
+        with TestClient(app) as client:
+            assert client.get("/debug/profile").status_code == 404
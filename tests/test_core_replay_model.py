@@ -0,0 +1,245 @@
+"""
+Test suite for core.replay_model module.
+
+This module contains tests for recording model responses to fixtures and
+replaying them, with and without streaming, and for the UnifiedLLMFactory
+integration selected by LLM_REPLAY_MODE.
+"""
+
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelResponse, TextPart, ToolCallPart
+from pydantic_ai.models.function import DeltaToolCall, FunctionModel
+
+from ai_research_assistant.config.global_settings import settings
+from ai_research_assistant.core.replay_model import (
+    RecordReplayModel,
+    ReplayFixture,
+    ReplayMissError,
+    fixture_path,
+)
+from ai_research_assistant.core.unified_llm_factory import UnifiedLLMFactory
+
+
+def lookup_model():
+    """Calls the lookup tool once, then answers with what it returned."""
+
+    async def respond(messages, info):
+        returns = [
+            part.content
+            for message in messages
+            for part in message.parts
+            if part.part_kind == "tool-return"
+        ]
+        if not returns:
+            return ModelResponse(
+                parts=[ToolCallPart("lookup", {"case": "A-1"}, tool_call_id="c1")]
+            )
+        return ModelResponse(parts=[TextPart(f"Status: {returns[0]}")])
+
+    async def stream(messages, info):
+        returns = [
+            part.content
+            for message in messages
+            for part in message.parts
+            if part.part_kind == "tool-return"
+        ]
+        if not returns:
+            yield {0: DeltaToolCall(name="lookup", json_args='{"case": "A-1"}')}
+            return
+        for word in ["Status: ", returns[0]]:
+            yield word
+
+    return FunctionModel(respond, stream_function=stream, model_name="real")
+
+
+def lookup_agent(model):
+    agent = Agent(model)
+
+    @agent.tool_plain
+    def lookup(case: str) -> str:
+        return f"{case} open"
+
+    return agent
+
+
+def record(path, agent_model=None):
+    return RecordReplayModel(
+        ReplayFixture(path), mode="record", wrapped=agent_model or lookup_model()
+    )
+
+
+def replay(path, **kwargs):
+    return RecordReplayModel(
+        ReplayFixture(path), mode="replay", model_name="real", **kwargs
+    )
+
+
+class TestRecordAndReplay:
+    """Test cases for the record/replay round trip."""
+
+    @pytest.mark.asyncio
+    async def test_replay_returns_recorded_tool_calls_and_text(self, tmp_path):
+        """Test that a replayed run makes the same tool calls and answer."""
+        path = str(tmp_path / "model.jsonl")
+        recorded = await lookup_agent(record(path)).run("Status of A-1?")
+
+        replayed = await lookup_agent(replay(path)).run("Status of A-1?")
+
+        assert recorded.output == replayed.output == "Status: A-1 open"
+        tool_calls = [
+            part
+            for message in replayed.all_messages()
+            for part in message.parts
+            if isinstance(part, ToolCallPart)
+        ]
+        assert [(call.tool_name, call.args) for call in tool_calls] == [
+            ("lookup", {"case": "A-1"})
+        ]
+
+    @pytest.mark.asyncio
+    async def test_recording_keeps_latency(self, tmp_path):
+        """Test that each response is written with how long it took."""
+        path = str(tmp_path / "model.jsonl")
+        await lookup_agent(record(path)).run("Status of A-1?")
+
+        with open(path, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        assert len(lines) == 2
+        assert all(line["latency"] >= 0 and line["key"] for line in lines)
+        assert lines[0]["response"]["parts"][0]["tool_name"] == "lookup"
+
+    @pytest.mark.asyncio
+    async def test_streamed_replay(self, tmp_path):
+        """Test that a recorded stream replays event by event."""
+        path = str(tmp_path / "model.jsonl")
+        async with lookup_agent(record(path)).run_stream("Status of A-1?") as run:
+            assert await run.get_output() == "Status: A-1 open"
+
+        async with lookup_agent(replay(path)).run_stream("Status of A-1?") as run:
+            chunks = [chunk async for chunk in run.stream_text(delta=True)]
+
+        assert "".join(chunks) == "Status: A-1 open"
+        with open(path, encoding="utf-8") as f:
+            events = [json.loads(line)["events"] for line in f]
+        assert [event["text"] for event in events[-1]] == ["Status: ", "A-1 open"]
+
+    @pytest.mark.asyncio
+    async def test_latency_is_scaled(self, tmp_path):
+        """Test that replay waits the recorded latency times the scale."""
+        path = str(tmp_path / "model.jsonl")
+        ReplayFixture(path).append(
+            {
+                "key": "unrelated",
+                "latency": 0.2,
+                "response": {
+                    "kind": "response",
+                    "parts": [{"part_kind": "text", "content": "Done"}],
+                },
+            }
+        )
+
+        model = replay(path, latency_scale=0.25, fallback=True)
+
+        started = time.perf_counter()
+        result = await Agent(model).run("Anything")
+
+        assert result.output == "Done"
+        assert 0.04 <= time.perf_counter() - started < 0.2
+
+
+class TestReplayMatching:
+    """Test cases for answering requests that were not recorded as made."""
+
+    def test_unrecorded_request_gets_next_unused_recording(self, tmp_path):
+        """Test the opt-in in-order fallback for requests that changed slightly."""
+        fixture = ReplayFixture(str(tmp_path / "model.jsonl"))
+        for n in range(2):
+            fixture.append({"key": f"k{n}", "latency": 0, "response": {}})
+
+        assert fixture.take("k1") is fixture.recordings[1]
+        assert fixture.take("other", fallback=True) is fixture.recordings[0]
+        # All used: start over rather than fail a long benchmark
+        assert fixture.take("another", fallback=True) is fixture.recordings[0]
+
+    def test_empty_fixture_cannot_replay(self, tmp_path):
+        """Test that replaying without recordings fails clearly."""
+        with pytest.raises(ReplayMissError, match="No recordings"):
+            ReplayFixture(str(tmp_path / "missing.jsonl")).take("k", fallback=True)
+
+    def test_repeated_request_repeats_last_recording(self, tmp_path):
+        """Test that recordings of one request are used in order."""
+        fixture = ReplayFixture(str(tmp_path / "model.jsonl"))
+        for n in range(2):
+            fixture.append({"key": "k", "latency": n, "response": {}})
+
+        assert [fixture.take("k")["latency"] for _ in range(3)] == [0, 1, 1]
+
+    def test_unrecorded_requests_are_refused_by_default(self, tmp_path):
+        """Test that replay fails instead of guessing unless fallback is set."""
+        fixture = ReplayFixture(str(tmp_path / "model.jsonl"))
+        fixture.append({"key": "k", "latency": 0, "response": {}})
+
+        with pytest.raises(ReplayMissError, match="LLM_REPLAY_MODE=record"):
+            fixture.take("other")
+
+    def test_record_needs_a_model(self, tmp_path):
+        """Test that recording without a real model is rejected."""
+        with pytest.raises(ValueError):
+            RecordReplayModel(ReplayFixture(str(tmp_path / "m.jsonl")), "record")
+
+
+class TestFactoryIntegration:
+    """Test cases for LLM_REPLAY_MODE in UnifiedLLMFactory."""
+
+    def test_replay_needs_no_provider(self, tmp_path):
+        """Test that replay builds no real model and needs no API key."""
+        factory = UnifiedLLMFactory()
+        with (
+            patch.object(settings, "LLM_REPLAY_MODE", "replay"),
+            patch.object(settings, "LLM_REPLAY_DIR", str(tmp_path)),
+            patch(
+                "ai_research_assistant.core.llm_provider.get_llm_model"
+            ) as get_llm_model,
+        ):
+            model = factory.create_llm_from_config(
+                {"provider": "google", "model_name": "gemini-2.5-pro"}
+            )
+
+        get_llm_model.assert_not_called()
+        assert isinstance(model, RecordReplayModel)
+        assert model.mode == "replay"
+        assert model.fixture.path == fixture_path(
+            str(tmp_path), "google", "gemini-2.5-pro"
+        )
+
+    def test_record_wraps_the_real_model(self, tmp_path):
+        """Test that record mode wraps what the provider returns."""
+        factory = UnifiedLLMFactory()
+        real = lookup_model()
+        with (
+            patch.object(settings, "LLM_REPLAY_MODE", "record"),
+            patch.object(settings, "LLM_REPLAY_DIR", str(tmp_path)),
+            patch(
+                "ai_research_assistant.core.llm_provider.get_llm_model",
+                return_value=real,
+            ),
+        ):
+            model = factory.create_llm_from_config(
+                {"provider": "google", "model_name": "gemini-2.5-pro"}
+            )
+
+        assert isinstance(model, RecordReplayModel)
+        assert model.wrapped is real
+
+    def test_unknown_mode_is_rejected(self):
+        """Test that a mistyped mode fails loudly."""
+        with patch.object(settings, "LLM_REPLAY_MODE", "playback"):
+            with pytest.raises(ValueError, match="LLM_REPLAY_MODE"):
+                UnifiedLLMFactory().create_llm_from_config(
+                    {"provider": "google", "model_name": "gemini-2.5-pro"}
+                )
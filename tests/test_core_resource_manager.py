@@ -279,6 +279,35 @@ class TestResourceManager:
         # (2 batches of 2 concurrent tasks)
         assert end_time - start_time >= 0.15  # Allow some tolerance
 
+    @pytest.mark.asyncio
+    async def test_submit_skill_passes_parameters(self):
+        """Test that submit_skill calls the skill with the task parameters."""
+        manager = ResourceManager()
+        skill = AsyncMock(return_value={"status": "success"})
+        task = AgentTask(task_type="draft_memo", parameters={"memo_type": "brief"})
+
+        result = await manager.submit_skill(task, skill)
+
+        assert result == {
+            "status": "success",
+            "task_id": str(task.id),
+            "result": {"status": "success"},
+        }
+        skill.assert_called_once_with(memo_type="brief")
+        assert str(task.id) not in manager.running_tasks
+
+    @pytest.mark.asyncio
+    async def test_submit_skill_execution_error(self):
+        """Test that submit_skill reports skill exceptions as errors."""
+        manager = ResourceManager()
+        skill = AsyncMock(side_effect=Exception("Skill failed"))
+        task = AgentTask(task_type="draft_memo", parameters={})
+
+        result = await manager.submit_skill(task, skill)
+
+        assert result["status"] == "error"
+        assert "Skill failed" in result["error"]
+
     def test_get_resource_status_empty(self):
         """Test resource status when no tasks are running."""
         manager = ResourceManager(max_concurrent_tasks=5, memory_limit_mb=1024)
@@ -0,0 +1,255 @@
+"""
+Test suite for core.run_instrumentation module.
+
+This module contains tests for per-run LLM instrumentation: record contents
+derived from real PydanticAI runs (driven by a FunctionModel), skill and
+conversation tagging, and the metrics, state manager and JSONL sinks.
+"""
+
+import json
+
+import pytest
+from pydantic_ai import ModelRetry
+from pydantic_ai.messages import ModelResponse, TextPart, ToolCallPart
+from pydantic_ai.models.function import FunctionModel
+
+from ai_research_assistant.agents.base_pydantic_agent import BasePydanticAgent
+from ai_research_assistant.agents.base_pydantic_agent_config import (
+    BasePydanticAgentConfig,
+)
+from ai_research_assistant.core.metrics import LLM_TOKENS, LLM_TOOL_DURATION
+from ai_research_assistant.core.run_instrumentation import (
+    JsonlTraceSink,
+    RunInstrumentationSink,
+    StateManagerSink,
+    instrumentation_context,
+)
+from ai_research_assistant.core.state_manager import AgentStateManager
+
+
+class ListSink(RunInstrumentationSink):
+    """Collects records in memory."""
+
+    def __init__(self):
+        self.records = []
+
+    async def emit(self, record):
+        self.records.append(record)
+
+
+class FailingSink(RunInstrumentationSink):
+    async def emit(self, record):
+        raise RuntimeError("sink down")
+
+
+def tool_calling_model(messages, info):
+    """Calls the lookup tool once, then answers."""
+    if len(messages) == 1:
+        return ModelResponse(parts=[ToolCallPart("lookup", {"query": "wcat"})])
+    return ModelResponse(parts=[TextPart("done")])
+
+
+class SkillAgent(BasePydanticAgent):
+    """Agent exposing a skill method that runs the model."""
+
+    async def summarize(self, prompt: str = "Summarize the appeal"):
+        return await self._instrumented_run(prompt, skill="summarize")
+
+
+def make_agent(model, **config_overrides):
+    config = BasePydanticAgentConfig(
+        agent_id="skill_agent", agent_name="SkillAgent", **config_overrides
+    )
+    agent = SkillAgent(config=config, llm_instance=model)
+    sink = ListSink()
+    agent.add_instrumentation_sink(sink)
+    return agent, sink
+
+
+class TestRunRecords:
+    """Test cases for the content of run records."""
+
+    @pytest.mark.asyncio
+    async def test_record_captures_round_trips_tools_and_tokens(self):
+        """Test that a tool-using run is fully described."""
+        agent, sink = make_agent(FunctionModel(tool_calling_model))
+
+        @agent.pydantic_agent.tool_plain
+        def lookup(query: str) -> str:
+            return f"results for {query}"
+
+        result = await agent.summarize()
+
+        assert result.output == "done"
+        record = sink.records[0]
+        assert record.agent == "SkillAgent"
+        assert record.skill == "summarize"
+        assert record.status == "success"
+        assert record.model_requests == 2
+        assert [call.tool_name for call in record.tool_calls] == ["lookup"]
+        assert record.tool_calls[0].status == "success"
+        assert record.tool_calls[0].duration_seconds >= 0
+        assert record.input_tokens > 0 and record.output_tokens > 0
+        assert record.time_to_first_response_seconds is not None
+        assert record.time_to_first_response_seconds <= record.wall_time_seconds
+
+    @pytest.mark.asyncio
+    async def test_tool_retries_are_counted(self):
+        """Test that ModelRetry from a tool increments the retry count."""
+        attempts = []
+
+        def model(messages, info):
+            if len(messages) < 5:
+                return ModelResponse(parts=[ToolCallPart("flaky", {})])
+            return ModelResponse(parts=[TextPart("ok")])
+
+        agent, sink = make_agent(FunctionModel(model))
+
+        @agent.pydantic_agent.tool_plain(retries=3)
+        def flaky() -> str:
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ModelRetry("try again")
+            return "fine"
+
+        await agent.summarize()
+
+        record = sink.records[0]
+        assert record.retries == 1
+        assert [call.status for call in record.tool_calls] == ["retry", "success"]
+
+    @pytest.mark.asyncio
+    async def test_run_uses_run_as_skill(self):
+        """Test that the public run() attributes records to 'run'."""
+        agent, sink = make_agent(FunctionModel(tool_calling_model))
+
+        @agent.pydantic_agent.tool_plain
+        def lookup(query: str) -> str:
+            return query
+
+        assert await agent.run("hello") == "done"
+        assert sink.records[0].skill == "run"
+
+    @pytest.mark.asyncio
+    async def test_run_takes_the_calling_skill(self):
+        """Test that skills delegating to run() label records themselves."""
+        agent, sink = make_agent(
+            FunctionModel(lambda messages, info: ModelResponse(parts=[TextPart("x")]))
+        )
+
+        await agent.run("hello", skill="respond_to_user")
+
+        assert sink.records[0].skill == "respond_to_user"
+
+    @pytest.mark.asyncio
+    async def test_context_sets_skill_and_conversation(self):
+        """Test that instrumentation_context tags nested runs."""
+        agent, sink = make_agent(
+            FunctionModel(lambda messages, info: ModelResponse(parts=[TextPart("x")]))
+        )
+
+        with instrumentation_context(conversation_id="thread-1"):
+            with instrumentation_context(skill="draft_memo"):
+                await agent.summarize()
+            await agent.summarize()
+
+        assert [(r.skill, r.conversation_id) for r in sink.records] == [
+            ("draft_memo", "thread-1"),
+            ("summarize", "thread-1"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_failed_run_is_recorded_and_reraised(self):
+        """Test that model errors are recorded before propagating."""
+
+        def broken(messages, info):
+            raise RuntimeError("model unavailable")
+
+        agent, sink = make_agent(FunctionModel(broken))
+
+        with pytest.raises(RuntimeError, match="model unavailable"):
+            await agent.summarize()
+
+        assert sink.records[0].status == "error"
+        assert "model unavailable" in sink.records[0].error
+
+    @pytest.mark.asyncio
+    async def test_sink_failure_does_not_break_run(self):
+        """Test that a failing sink is isolated from the run."""
+        agent, sink = make_agent(
+            FunctionModel(lambda messages, info: ModelResponse(parts=[TextPart("x")]))
+        )
+        agent.instrumentation_sinks.insert(0, FailingSink())
+
+        result = await agent.summarize()
+
+        assert result.output == "x"
+        assert len(sink.records) == 1
+
+
+class TestSinks:
+    """Test cases for the built-in sinks."""
+
+    @pytest.mark.asyncio
+    async def test_metrics_sink_is_installed_by_default(self):
+        """Test that token and tool metrics reach the registry."""
+        agent, _ = make_agent(FunctionModel(tool_calling_model))
+
+        @agent.pydantic_agent.tool_plain
+        def lookup(query: str) -> str:
+            return query
+
+        tokens_before = LLM_TOKENS.value(
+            agent="SkillAgent", skill="summarize", direction="out"
+        )
+        tools_before = LLM_TOOL_DURATION.count(
+            agent="SkillAgent", tool="lookup", status="success"
+        )
+
+        await agent.summarize()
+
+        assert (
+            LLM_TOKENS.value(agent="SkillAgent", skill="summarize", direction="out")
+            > tokens_before
+        )
+        assert (
+            LLM_TOOL_DURATION.count(agent="SkillAgent", tool="lookup", status="success")
+            == tools_before + 1
+        )
+
+    @pytest.mark.asyncio
+    async def test_jsonl_sink_from_config(self, tmp_path):
+        """Test that llm_trace_path appends one JSON line per run."""
+        trace_path = tmp_path / "traces" / "runs.jsonl"
+        agent, _ = make_agent(
+            FunctionModel(lambda messages, info: ModelResponse(parts=[TextPart("x")])),
+            llm_trace_path=str(trace_path),
+        )
+
+        await agent.summarize()
+        await agent.summarize()
+
+        lines = trace_path.read_text().splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[0])["skill"] == "summarize"
+        assert any(isinstance(s, JsonlTraceSink) for s in agent.instrumentation_sinks)
+
+    @pytest.mark.asyncio
+    async def test_state_manager_sink_stores_tagged_metrics(self, tmp_path):
+        """Test that records become metrics filterable by skill."""
+        state_manager = AgentStateManager(db_path=str(tmp_path / "runs.db"))
+        agent, _ = make_agent(
+            FunctionModel(lambda messages, info: ModelResponse(parts=[TextPart("x")]))
+        )
+        agent.add_instrumentation_sink(StateManagerSink(state_manager))
+
+        with instrumentation_context(conversation_id="case-42"):
+            await agent.summarize()
+
+        rows = await state_manager.get_metrics(
+            metric_name="llm_wall_time_seconds",
+            tags={"skill": "summarize", "conversation_id": "case-42"},
+        )
+        assert len(rows) == 1
+        assert rows[0]["agent_id"] == "SkillAgent"
+        await state_manager.close()
@@ -6,16 +6,43 @@ including database operations, metrics storage and retrieval, connection
 management, and async functionality.
 """
 
+import asyncio
 import json
 import logging
+import sqlite3
 import tempfile
 from pathlib import Path
 
 import pytest
 
+from ai_research_assistant.config.global_settings import settings
 from ai_research_assistant.core.state_manager import AgentStateManager
 
 
+def _create_pre_upgrade_db(db_path, rows):
+    """Writes (name, value, tags JSON) metrics with the schema of earlier versions."""
+    with sqlite3.connect(db_path) as legacy:
+        legacy.execute(
+            """
+            CREATE TABLE agent_metrics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                metric_name TEXT NOT NULL,
+                metric_value REAL NOT NULL,
+                metric_type TEXT NOT NULL,
+                tags TEXT NOT NULL,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                agent_id TEXT
+            )
+            """
+        )
+        legacy.executemany(
+            "INSERT INTO agent_metrics "
+            "(metric_name, metric_value, metric_type, tags, agent_id) "
+            "VALUES (?, ?, 'histogram', ?, 'agent_001')",
+            rows,
+        )
+
+
 class TestAgentStateManagerInitialization:
     """Test cases for AgentStateManager initialization."""
 
@@ -23,7 +50,7 @@ class TestAgentStateManagerInitialization:
         """Test AgentStateManager initialization with default database path."""
         manager = AgentStateManager()
 
-        assert manager.db_path == "tmp/agent_state.db"
+        assert manager.db_path == settings.AGENT_STATE_DB_PATH
         assert manager._connection_pool is None
 
     def test_agent_state_manager_custom_db_path(self):
@@ -38,7 +65,7 @@ class TestAgentStateManagerInitialization:
         """Test AgentStateManager initialization with None db_path (uses default)."""
         manager = AgentStateManager(db_path=None)
 
-        assert manager.db_path == "tmp/agent_state.db"
+        assert manager.db_path == settings.AGENT_STATE_DB_PATH
 
     @pytest.mark.asyncio
     async def test_initialize_creates_directory_and_connection(self):
@@ -206,6 +233,7 @@ class TestMetricsStorage:
             }
 
             await manager.store_metric(metric_data)
+            await manager.flush_metrics()
 
             # Verify metric was stored
             async with manager._connection_pool.execute(
@@ -243,6 +271,7 @@ class TestMetricsStorage:
             }
 
             await manager.store_metric(metric_data)
+            await manager.flush_metrics()
 
             # Verify metric was stored with None agent_id
             async with manager._connection_pool.execute(
@@ -298,6 +327,7 @@ class TestMetricsStorage:
             }
 
             await manager.store_metric(metric_data)
+            await manager.flush_metrics()
 
             # Verify complex tags are properly stored and retrieved
             async with manager._connection_pool.execute(
@@ -783,3 +813,539 @@ class TestErrorHandling:
             assert len(results) == 1
 
             await manager.close()
+
+
+class TestWorkflowCheckpoints:
+    """Test cases for durable workflow state."""
+
+    @pytest.mark.asyncio
+    async def test_save_and_get_workflow(self):
+        """Test that a workflow record and its steps round-trip."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = AgentStateManager(db_path=f"{temp_dir}/workflow_test.db")
+            await manager.initialize()
+
+            await manager.save_workflow("wf-1", "research", total_steps=2)
+            await manager.checkpoint_workflow_step(
+                "wf-1",
+                "step_a",
+                "completed",
+                output={"answer": 42},
+                started_at=1.0,
+                finished_at=2.0,
+            )
+
+            workflow = await manager.get_workflow("wf-1")
+
+            assert workflow["name"] == "research"
+            assert workflow["status"] == "running"
+            assert workflow["total_steps"] == 2
+            assert workflow["steps"] == [
+                {
+                    "step_id": "step_a",
+                    "status": "completed",
+                    "output": {"answer": 42},
+                    "error": None,
+                    "started_at": 1.0,
+                    "finished_at": 2.0,
+                }
+            ]
+
+            await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_checkpoints_persist_across_sessions(self):
+        """Test that checkpoints survive a restart of the state manager."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = f"{temp_dir}/workflow_persist.db"
+
+            manager1 = AgentStateManager(db_path=db_path)
+            await manager1.initialize()
+            await manager1.save_workflow("wf-2", "research", total_steps=1)
+            await manager1.checkpoint_workflow_step("wf-2", "only", "failed", error="x")
+            await manager1.update_workflow_status("wf-2", "error")
+            await manager1.close()
+
+            manager2 = AgentStateManager(db_path=db_path)
+            await manager2.initialize()
+            workflow = await manager2.get_workflow("wf-2")
+
+            assert workflow["status"] == "error"
+            assert workflow["steps"][0]["error"] == "x"
+            assert workflow["steps"][0]["output"] is None
+
+            await manager2.close()
+
+    @pytest.mark.asyncio
+    async def test_get_unknown_workflow_returns_none(self):
+        """Test that unknown workflow ids return None."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = AgentStateManager(db_path=f"{temp_dir}/workflow_none.db")
+            await manager.initialize()
+
+            assert await manager.get_workflow("missing") is None
+
+            await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_workflow_methods_before_initialization_raise_error(self):
+        """Test that workflow methods require an initialized connection."""
+        manager = AgentStateManager()
+
+        with pytest.raises(RuntimeError, match="not initialized"):
+            await manager.get_workflow("wf")
+
+
+class TestMetricBuffering:
+    """Test cases for write-behind metric buffering."""
+
+    @staticmethod
+    def _metric(value: float) -> dict:
+        return {
+            "name": "latency",
+            "value": value,
+            "metric_type": "histogram",
+            "tags": {},
+            "agent_id": "agent_001",
+        }
+
+    async def _count_rows(self, manager) -> int:
+        async with manager._connection_pool.execute(
+            "SELECT COUNT(*) FROM agent_metrics"
+        ) as cursor:
+            return (await cursor.fetchone())[0]
+
+    @pytest.mark.asyncio
+    async def test_metrics_are_buffered_until_batch_size(self, tmp_path):
+        """Test that rows reach the database only once a batch fills up."""
+        manager = AgentStateManager(
+            db_path=str(tmp_path / "batch.db"),
+            metric_batch_size=3,
+            metric_flush_interval=60,
+        )
+        await manager.initialize()
+
+        await manager.store_metric(self._metric(1.0))
+        await manager.store_metric(self._metric(2.0))
+        assert await self._count_rows(manager) == 0
+
+        await manager.store_metric(self._metric(3.0))
+        # The full batch is flushed in the background, not by store_metric
+        assert manager._pending_metrics != []
+        await manager._flush_task
+        assert await self._count_rows(manager) == 3
+        assert manager._pending_metrics == []
+
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_metrics_flush_after_interval(self, tmp_path):
+        """Test that a partial batch is flushed once the interval elapses."""
+        manager = AgentStateManager(
+            db_path=str(tmp_path / "interval.db"),
+            metric_batch_size=100,
+            metric_flush_interval=0.01,
+        )
+        await manager.initialize()
+
+        await manager.store_metric(self._metric(1.0))
+        await asyncio.sleep(0.05)
+
+        assert await self._count_rows(manager) == 1
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_close_flushes_pending_metrics(self, tmp_path):
+        """Test that close() persists everything still buffered."""
+        db_path = str(tmp_path / "close.db")
+        manager = AgentStateManager(db_path=db_path, metric_flush_interval=60)
+        await manager.initialize()
+        for i in range(5):
+            await manager.store_metric(self._metric(float(i)))
+        await manager.close()
+
+        reopened = AgentStateManager(db_path=db_path)
+        await reopened.initialize()
+        assert await self._count_rows(reopened) == 5
+        await reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_get_metrics_sees_buffered_rows(self, tmp_path):
+        """Test that reads flush first so writers see their own metrics."""
+        manager = AgentStateManager(
+            db_path=str(tmp_path / "read.db"), metric_flush_interval=60
+        )
+        await manager.initialize()
+
+        await manager.store_metric(self._metric(1.0))
+        results = await manager.get_metrics(metric_name="latency")
+
+        assert [row["metric_value"] for row in results] == [1.0]
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_full_buffer_applies_backpressure(self, tmp_path):
+        """Test that the buffer never grows past max_pending_metrics."""
+        manager = AgentStateManager(
+            db_path=str(tmp_path / "full.db"),
+            metric_batch_size=10,
+            max_pending_metrics=10,
+            metric_flush_interval=60,
+        )
+        await manager.initialize()
+
+        flush_calls = 0
+        original_flush = manager.flush_metrics
+
+        async def counting_flush():
+            nonlocal flush_calls
+            flush_calls += 1
+            assert len(manager._pending_metrics) <= manager.max_pending_metrics
+            return await original_flush()
+
+        manager.flush_metrics = counting_flush
+        for i in range(25):
+            await manager.store_metric(self._metric(float(i)))
+            assert len(manager._pending_metrics) <= manager.max_pending_metrics
+
+        assert flush_calls >= 2
+        await manager.flush_metrics()
+        assert await self._count_rows(manager) == 25
+        await manager.close()
+        assert manager._connection_pool is None
+
+    @pytest.mark.asyncio
+    async def test_workflow_writes_wait_for_metric_flush(self, tmp_path):
+        """Test that workflow commits cannot land inside a metric batch."""
+        manager = AgentStateManager(db_path=str(tmp_path / "shared.db"))
+        await manager.initialize()
+
+        async with manager._write_lock:
+            write = asyncio.create_task(manager.save_workflow("wf", "name", 1))
+            await asyncio.sleep(0.05)
+            assert not write.done()
+        await write
+
+        assert (await manager.get_workflow("wf"))["total_steps"] == 1
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_wal_journal_mode_enabled(self, tmp_path):
+        """Test that file-backed databases use write-ahead logging."""
+        manager = AgentStateManager(db_path=str(tmp_path / "wal.db"))
+        await manager.initialize()
+
+        async with manager._connection_pool.execute("PRAGMA journal_mode") as cursor:
+            mode = (await cursor.fetchone())[0]
+
+        assert mode == "wal"
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_rows_for_retry(self, tmp_path):
+        """Test that rows are retained when a batch write fails."""
+        manager = AgentStateManager(
+            db_path=str(tmp_path / "retry.db"), metric_flush_interval=60
+        )
+        await manager.initialize()
+        await manager.store_metric(self._metric(1.0))
+
+        await manager._connection_pool.execute("DROP TABLE agent_metrics")
+        with pytest.raises(Exception):
+            await manager.flush_metrics()
+        assert len(manager._pending_metrics) == 1
+
+        await manager._create_schema()
+        assert await manager.flush_metrics() == 1
+        await manager.close()
+
+
+class TestMetricRollups:
+    """Test cases for metric rollups, retention and series queries."""
+
+    @staticmethod
+    def _metric(value: float, agent_id: str = "agent_001") -> dict:
+        return {
+            "name": "latency",
+            "value": value,
+            "metric_type": "histogram",
+            "tags": {},
+            "agent_id": agent_id,
+        }
+
+    @pytest.mark.asyncio
+    async def test_flush_updates_every_rollup_tier(self, tmp_path):
+        """Test that each flush is merged into the minute, hour and day tiers."""
+        manager = AgentStateManager(db_path=str(tmp_path / "rollup.db"))
+        await manager.initialize()
+
+        for value in (1.0, 2.0):
+            await manager.store_metric(self._metric(value))
+        await manager.flush_metrics()
+        await manager.store_metric(self._metric(6.0))
+        await manager.flush_metrics()
+
+        async with manager._connection_pool.execute(
+            "SELECT resolution, SUM(count), SUM(sum), MIN(min), MAX(max) "
+            "FROM agent_metric_rollups GROUP BY resolution"
+        ) as cursor:
+            rows = {row[0]: tuple(row[1:]) for row in await cursor.fetchall()}
+
+        assert set(rows) == {"minute", "hour", "day"}
+        assert all(value == (3, 9.0, 1.0, 6.0) for value in rows.values())
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_get_metric_series_aggregations(self, tmp_path):
+        """Test that series values are computed from the rollups."""
+        manager = AgentStateManager(db_path=str(tmp_path / "series.db"))
+        await manager.initialize()
+        for value in range(1, 101):
+            await manager.store_metric(self._metric(float(value)))
+
+        avg = await manager.get_metric_series("latency", bucket="day", agg="avg")
+        count = await manager.get_metric_series("latency", bucket="day", agg="count")
+        p95 = await manager.get_metric_series("latency", bucket="day", agg="p95")
+
+        assert len(avg) == 1
+        assert avg[0]["value"] == pytest.approx(50.5)
+        assert count[0]["value"] == 100
+        assert p95[0]["value"] == pytest.approx(95, rel=0.02)
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_get_metric_series_filters_by_agent(self, tmp_path):
+        """Test that agents are combined unless one is requested."""
+        manager = AgentStateManager(db_path=str(tmp_path / "agents.db"))
+        await manager.initialize()
+        await manager.store_metric(self._metric(1.0, agent_id="a"))
+        await manager.store_metric(self._metric(3.0, agent_id="b"))
+
+        combined = await manager.get_metric_series("latency", agg="max")
+        only_a = await manager.get_metric_series("latency", agg="max", agent_id="a")
+
+        assert combined[0]["value"] == 3.0
+        assert combined[0]["count"] == 2
+        assert only_a[0]["value"] == 1.0
+        await manager.close()
+
+    def test_series_reads_coarsest_suitable_tier(self):
+        """Test that bucket widths map onto the cheapest rollup tier."""
+        select = AgentStateManager._select_rollup_resolution
+        parse = AgentStateManager._parse_bucket
+
+        assert select(parse("minute")) == "minute"
+        assert select(parse("15m")) == "minute"
+        assert select(parse("6h")) == "hour"
+        assert select(parse("120m")) == "hour"
+        assert select(parse("7d")) == "day"
+
+    @pytest.mark.asyncio
+    async def test_get_metric_series_rejects_invalid_arguments(self, tmp_path):
+        """Test that unknown buckets and aggregations raise ValueError."""
+        manager = AgentStateManager(db_path=str(tmp_path / "invalid.db"))
+        await manager.initialize()
+
+        with pytest.raises(ValueError, match="Invalid bucket"):
+            await manager.get_metric_series("latency", bucket="fortnight")
+        with pytest.raises(ValueError, match="Unsupported aggregation"):
+            await manager.get_metric_series("latency", agg="median")
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_retention_prunes_expired_rows(self, tmp_path):
+        """Test that raw rows and rollups outside their window are deleted."""
+        manager = AgentStateManager(
+            db_path=str(tmp_path / "retention.db"),
+            retention_days={"raw": 1, "minute": 1},
+        )
+        await manager.initialize()
+        await manager.store_metric(self._metric(1.0))
+        await manager.flush_metrics()
+
+        conn = manager._connection_pool
+        await conn.execute(
+            "INSERT INTO agent_metrics "
+            "(metric_name, metric_value, metric_type, tags, timestamp) "
+            "VALUES ('latency', 9.0, 'histogram', '{}', '2000-01-01 00:00:00.000000')"
+        )
+        await conn.execute(
+            "INSERT INTO agent_metric_rollups VALUES "
+            "('minute', 0, 'latency', '', 1, 9.0, 9.0, 9.0, '{}')"
+        )
+        await conn.commit()
+
+        deleted = await manager.apply_retention()
+
+        assert deleted == {"raw": 1, "minute": 1, "hour": 0}
+        results = await manager.get_metrics()
+        assert [row["metric_value"] for row in results] == [1.0]
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_pre_upgrade_metrics_are_rolled_up(self, tmp_path):
+        """Test that series include metrics written before rollups existed."""
+        db_path = tmp_path / "legacy.db"
+        _create_pre_upgrade_db(
+            db_path, [("latency", float(value), "{}") for value in range(1, 101)]
+        )
+        manager = AgentStateManager(db_path=str(db_path))
+        await manager.initialize()
+        await manager.store_metric(self._metric(100.0))
+
+        series = await manager.get_metric_series("latency", bucket="day", agg="sum")
+        p50 = await manager.get_metric_series("latency", bucket="day", agg="p50")
+
+        assert [point["count"] for point in series] == [101]
+        assert series[0]["value"] == 5150.0
+        assert p50[0]["value"] == pytest.approx(50.0, rel=0.05)
+        await manager.close()
+
+        # The backfill runs once; reopening does not count the rows again
+        manager = AgentStateManager(db_path=str(db_path))
+        await manager.initialize()
+        series = await manager.get_metric_series("latency", bucket="day", agg="sum")
+        assert [point["count"] for point in series] == [101]
+        await manager.close()
+
+
+class TestMetricTagQueries:
+    """Test cases for indexed tag filtering and per-tag reports."""
+
+    @pytest.fixture
+    async def manager(self, tmp_path):
+        manager = AgentStateManager(db_path=str(tmp_path / "tags.db"))
+        await manager.initialize()
+        samples = [
+            (100.0, "case-1", "google", "agent_a"),
+            (200.0, "case-1", "openai", "agent_a"),
+            (300.0, "case-2", "google", "agent_b"),
+            (400.0, "case-3", "google", "agent_a"),
+        ]
+        for value, case_id, provider, agent_id in samples:
+            await manager.store_metric(
+                {
+                    "name": "llm_latency_ms",
+                    "value": value,
+                    "metric_type": "histogram",
+                    "tags": {"case_id": case_id, "provider": provider, "attempt": 1},
+                    "agent_id": agent_id,
+                }
+            )
+        yield manager
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_filter_by_single_tag(self, manager):
+        """Test equality predicates on one tag."""
+        results = await manager.get_metrics(tags={"case_id": "case-1"})
+
+        assert sorted(row["metric_value"] for row in results) == [100.0, 200.0]
+
+    @pytest.mark.asyncio
+    async def test_filter_by_multiple_tags_and_value_sets(self, manager):
+        """Test that predicates are combined and sequences mean IN."""
+        results = await manager.get_metrics(
+            metric_name="llm_latency_ms",
+            agent_id="agent_a",
+            tags={"provider": "google", "case_id": ["case-1", "case-3"]},
+        )
+
+        assert sorted(row["metric_value"] for row in results) == [100.0, 400.0]
+
+    @pytest.mark.asyncio
+    async def test_filter_by_non_string_tag(self, manager):
+        """Test that numeric tag values match their stored form."""
+        assert len(await manager.get_metrics(tags={"attempt": 1})) == 4
+        assert await manager.get_metrics(tags={"attempt": 2}) == []
+
+    @pytest.mark.asyncio
+    async def test_get_metrics_limit(self, manager):
+        """Test that limit returns only the most recent rows."""
+        results = await manager.get_metrics(limit=2)
+
+        assert [row["metric_value"] for row in results] == [400.0, 300.0]
+
+    @pytest.mark.asyncio
+    async def test_summarize_metrics_by_tag(self, manager):
+        """Test per-tag aggregation for provider reports."""
+        report = await manager.summarize_metrics_by_tag("llm_latency_ms", "provider")
+
+        assert report == [
+            {
+                "tag_value": "google",
+                "count": 3,
+                "avg": 800 / 3,
+                "min": 100.0,
+                "max": 400.0,
+            },
+            {
+                "tag_value": "openai",
+                "count": 1,
+                "avg": 200.0,
+                "min": 200.0,
+                "max": 200.0,
+            },
+        ]
+
+    @pytest.mark.asyncio
+    async def test_summarize_with_tag_filter(self, manager):
+        """Test that per-tag reports honour additional tag predicates."""
+        report = await manager.summarize_metrics_by_tag(
+            "llm_latency_ms", "case_id", tags={"provider": "google"}
+        )
+
+        assert [row["tag_value"] for row in report] == ["case-1", "case-2", "case-3"]
+
+    @pytest.mark.asyncio
+    async def test_tag_queries_use_indexes(self, manager):
+        """Test that tag and name/agent filters are served by indexes."""
+        where, params = manager._metric_filters(
+            "llm_latency_ms", "agent_a", 7, {"case_id": "case-1"}
+        )
+        async with manager._connection_pool.execute(
+            f"EXPLAIN QUERY PLAN SELECT * FROM agent_metrics m WHERE {where}", params
+        ) as cursor:
+            plan = " ".join(row[3] for row in await cursor.fetchall())
+
+        assert "idx_metrics_name_agent_timestamp" in plan
+        assert "idx_metric_tags_key_value" in plan
+        assert "SCAN" not in plan
+
+    @pytest.mark.asyncio
+    async def test_tags_of_pre_upgrade_metrics_are_backfilled(self, tmp_path):
+        """Test that metrics written before the tag index existed stay queryable."""
+        db_path = tmp_path / "legacy.db"
+        _create_pre_upgrade_db(
+            db_path,
+            [
+                ("llm_latency_ms", 100.0, '{"provider": "google"}'),
+                ("llm_latency_ms", 200.0, '{"provider": "openai"}'),
+                ("llm_latency_ms", 300.0, "[]"),
+            ],
+        )
+        manager = AgentStateManager(db_path=str(db_path))
+        await manager.initialize()
+
+        results = await manager.get_metrics(tags={"provider": "google"})
+        report = await manager.summarize_metrics_by_tag("llm_latency_ms", "provider")
+
+        assert [row["metric_value"] for row in results] == [100.0]
+        assert [(row["tag_value"], row["count"]) for row in report] == [
+            ("google", 1),
+            ("openai", 1),
+        ]
+        async with manager._connection_pool.execute("PRAGMA user_version") as cursor:
+            assert (await cursor.fetchone())[0] >= 1
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_retention_removes_tag_rows(self, manager):
+        """Test that pruning raw metrics cascades to their tags."""
+        manager.retention_days["raw"] = -1
+        await manager.apply_retention()
+
+        async with manager._connection_pool.execute(
+            "SELECT COUNT(*) FROM agent_metric_tags"
+        ) as cursor:
+            assert (await cursor.fetchone())[0] == 0
@@ -0,0 +1,393 @@
+"""
+Test suite for core.tracing module.
+
+This module contains tests for W3C trace-context parsing, span nesting and
+export, propagation through A2A messages, MessageEnvelope metadata and MCP
+calls, and the trace_view waterfall renderer.
+"""
+
+import asyncio
+import json
+from functools import partial
+from unittest.mock import AsyncMock, Mock
+
+import httpx
+import pytest
+from fasta2a.applications import FastA2A
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelResponse, TextPart
+from pydantic_ai.models.function import FunctionModel
+
+from ai_research_assistant.a2a_services import a2a_compatibility, traced_worker
+from ai_research_assistant.a2a_services.a2a_compatibility import send_a2a_message
+from ai_research_assistant.a2a_services.traced_worker import create_traced_a2a_app
+from ai_research_assistant.core.tracing import (
+    TRACEPARENT,
+    JsonlSpanExporter,
+    SpanContext,
+    SpanExporter,
+    configure_tracing,
+    current_span_context,
+    extract,
+    inject,
+    read_spans,
+    start_span,
+)
+from ai_research_assistant.interface import trace_view
+from ai_research_assistant.mcp.client import trace_mcp_tool_call
+
+
+class ListExporter(SpanExporter):
+    """Keeps finished spans in memory."""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def by_name(self, prefix):
+        return [span for span in self.spans if span.name.startswith(prefix)]
+
+
+@pytest.fixture
+def exporter():
+    exporter = ListExporter()
+    configure_tracing(service_name="test_service", exporters=[exporter])
+    yield exporter
+    configure_tracing(exporters=[])
+
+
+class TestTraceContext:
+    """Test cases for W3C traceparent parsing and formatting."""
+
+    def test_round_trip(self):
+        """Test that a context survives formatting and parsing."""
+        context = SpanContext(trace_id="a" * 32, span_id="b" * 16)
+
+        header = context.to_traceparent()
+
+        assert header == f"00-{'a' * 32}-{'b' * 16}-01"
+        assert SpanContext.from_traceparent(header) == context
+
+    @pytest.mark.parametrize(
+        "header",
+        [
+            "",
+            "garbage",
+            f"00-{'0' * 32}-{'b' * 16}-01",
+            f"00-{'a' * 32}-{'0' * 16}-01",
+            f"ff-{'a' * 32}-{'b' * 16}-01",
+            f"00-{'a' * 32}-{'b' * 16}-01-extra",
+            f"00-{'a' * 31}-{'b' * 16}-01",
+        ],
+    )
+    def test_invalid_headers_are_rejected(self, header):
+        """Test that malformed traceparent values are ignored."""
+        assert SpanContext.from_traceparent(header) is None
+
+    def test_unsampled_flag(self):
+        """Test that the sampled bit is read from the flags."""
+        context = SpanContext.from_traceparent(f"00-{'a' * 32}-{'b' * 16}-00")
+
+        assert context.sampled is False
+
+    def test_inject_and_extract(self):
+        """Test that carriers round-trip the current span."""
+        assert inject({}) == {}
+
+        with start_span("outer"):
+            carrier = inject({})
+            assert extract(carrier) == current_span_context()
+
+        assert extract({TRACEPARENT: 42}) is None
+        assert extract(None) is None
+
+
+class TestSpans:
+    """Test cases for span nesting and export."""
+
+    def test_nested_spans_share_trace(self, exporter):
+        """Test that child spans are parented on the enclosing span."""
+        with start_span("parent", attributes={"conversation.id": "c1", "x": None}):
+            with start_span("child"):
+                pass
+
+        child, parent = exporter.spans
+        assert child.context.trace_id == parent.context.trace_id
+        assert child.parent_span_id == parent.context.span_id
+        assert parent.parent_span_id is None
+        assert parent.service == "test_service"
+        assert parent.attributes == {"conversation.id": "c1"}
+        assert parent.duration_seconds >= child.duration_seconds
+        assert current_span_context() is None
+
+    def test_remote_parent(self, exporter):
+        """Test that an extracted context continues the remote trace."""
+        remote = SpanContext(trace_id="c" * 32, span_id="d" * 16)
+
+        with start_span("server", parent=remote):
+            pass
+
+        assert exporter.spans[0].context.trace_id == "c" * 32
+        assert exporter.spans[0].parent_span_id == "d" * 16
+
+    def test_exception_marks_error(self, exporter):
+        """Test that exceptions are recorded and re-raised."""
+        with pytest.raises(ValueError):
+            with start_span("failing"):
+                raise ValueError("bad input")
+
+        assert exporter.spans[0].status == "error"
+        assert exporter.spans[0].error == "bad input"
+
+    def test_unsampled_spans_are_not_exported(self, exporter):
+        """Test that the sampling decision propagates to children."""
+        remote = SpanContext(trace_id="c" * 32, span_id="d" * 16, sampled=False)
+
+        with start_span("server", parent=remote):
+            with start_span("child"):
+                pass
+
+        assert exporter.spans == []
+
+    @pytest.mark.asyncio
+    async def test_concurrent_tasks_keep_separate_parents(self, exporter):
+        """Test that spans opened in concurrent tasks do not cross-parent."""
+
+        async def work(name):
+            with start_span(name):
+                await asyncio.sleep(0.01)
+                with start_span(f"{name}.inner"):
+                    await asyncio.sleep(0)
+
+        await asyncio.gather(work("a"), work("b"))
+
+        spans = {span.name: span for span in exporter.spans}
+        assert spans["a.inner"].parent_span_id == spans["a"].context.span_id
+        assert spans["b.inner"].parent_span_id == spans["b"].context.span_id
+        assert spans["a"].context.trace_id != spans["b"].context.trace_id
+
+    def test_jsonl_exporter(self, tmp_path):
+        """Test that the JSONL exporter appends readable span lines."""
+        path = tmp_path / "spans" / "trace.jsonl"
+        configure_tracing(export_path=str(path))
+        try:
+            with start_span("one"):
+                with start_span("two"):
+                    pass
+        finally:
+            configure_tracing(exporters=[])
+        with open(path, "a") as handle:
+            handle.write("not json\n")
+
+        spans = read_spans(str(path))
+
+        assert [span["name"] for span in spans] == ["two", "one"]
+        assert spans[0]["parent_span_id"] == spans[1]["span_id"]
+        assert isinstance(JsonlSpanExporter(str(path)), SpanExporter)
+
+
+def echo_model(messages, info):
+    return ModelResponse(parts=[TextPart("orchestrated")])
+
+
+class TestPropagation:
+    """Test cases for trace propagation across service hops."""
+
+    @pytest.mark.asyncio
+    async def test_a2a_hop_continues_trace(self, exporter, monkeypatch):
+        """Test that the receiving A2A worker parents on the sender's span."""
+        agent = Agent(FunctionModel(echo_model), name="Orchestrator")
+        app = create_traced_a2a_app(agent, name="Orchestrator")
+        transport = httpx.ASGITransport(app=app)
+        monkeypatch.setattr(
+            a2a_compatibility.httpx,
+            "AsyncClient",
+            partial(httpx.AsyncClient, transport=transport),
+        )
+
+        async with app.router.lifespan_context(app):
+            with start_span("ceo.delegate"):
+                await send_a2a_message(
+                    url="http://orchestrator/",
+                    prompt="set up my case",
+                    agent_name="Orchestrator",
+                )
+            for _ in range(100):
+                if exporter.by_name("a2a.task"):
+                    break
+                await asyncio.sleep(0.01)
+
+        (root,) = exporter.by_name("ceo.delegate")
+        (client,) = exporter.by_name("a2a.send")
+        (server,) = exporter.by_name("a2a.task")
+        assert client.parent_span_id == root.context.span_id
+        assert server.parent_span_id == client.context.span_id
+        assert server.context.trace_id == root.context.trace_id
+        assert server.kind == "server"
+
+    def test_a2a_app_without_private_worker_api(self, monkeypatch):
+        """Test that a pydantic-ai without AgentWorker still serves, untraced."""
+        agent = Agent(FunctionModel(echo_model), name="Orchestrator")
+        monkeypatch.setattr(traced_worker, "AgentWorker", None)
+        to_a2a = Mock(wraps=agent.to_a2a)
+        monkeypatch.setattr(agent, "to_a2a", to_a2a)
+
+        app = create_traced_a2a_app(agent, name="Orchestrator", version="2.0.0")
+
+        assert isinstance(app, FastA2A)
+        to_a2a.assert_called_once_with(
+            name="Orchestrator",
+            url="http://localhost:8000",
+            version="2.0.0",
+            description=None,
+        )
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("private_worker_api", [True, False])
+    async def test_a2a_app_runs_shutdown_callbacks(
+        self, private_worker_api, monkeypatch
+    ):
+        """Test that on_shutdown callbacks run once the app's lifespan ends."""
+        agent = Agent(FunctionModel(echo_model), name="Orchestrator")
+        if not private_worker_api:
+            monkeypatch.setattr(traced_worker, "AgentWorker", None)
+        close = AsyncMock()
+
+        app = create_traced_a2a_app(agent, name="Orchestrator", on_shutdown=[close])
+        async with app.router.lifespan_context(app):
+            close.assert_not_awaited()
+
+        close.assert_awaited_once_with()
+
+    @pytest.mark.asyncio
+    async def test_a2a_payload_carries_traceparent(self, exporter, monkeypatch):
+        """Test that traceparent is sent in metadata and headers."""
+        captured = {}
+
+        def handler(request):
+            captured["headers"] = request.headers
+            captured["payload"] = json.loads(request.content)
+            return httpx.Response(500, text="down")
+
+        monkeypatch.setattr(
+            a2a_compatibility.httpx,
+            "AsyncClient",
+            partial(httpx.AsyncClient, transport=httpx.MockTransport(handler)),
+        )
+
+        result = await send_a2a_message(url="http://agent/", prompt="hi")
+
+        assert result.startswith("Error: Received HTTP 500")
+        (span,) = exporter.spans
+        traceparent = span.context.to_traceparent()
+        params = captured["payload"]["params"]
+        assert params["metadata"][TRACEPARENT] == traceparent
+        assert params["message"]["metadata"][TRACEPARENT] == traceparent
+        assert captured["headers"][TRACEPARENT] == traceparent
+        assert span.status == "error"
+
+    @pytest.mark.asyncio
+    async def test_message_envelope_metadata(self, exporter):
+        """Test that the AG-UI A2A client stamps the envelope metadata."""
+        from ai_research_assistant.ag_ui_backend.a2a_client import A2AClient
+
+        captured = {}
+
+        def handler(request):
+            captured["payload"] = json.loads(request.content)
+            captured["headers"] = request.headers
+            return httpx.Response(
+                200,
+                json={
+                    "source_agent_id": "chief_legal_orchestrator",
+                    "target_agent_id": "ag_ui_backend",
+                },
+            )
+
+        client = A2AClient(orchestrator_url="http://orchestrator/")
+        client.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        with start_span("ag_ui.run") as span:
+            await client.send_to_orchestrator(
+                conversation_id="12345678-1234-5678-1234-567812345678",
+                user_prompt="hello",
+                message_history=[],
+                tools=[],
+                current_state={},
+            )
+
+        traceparent = span.context.to_traceparent()
+        assert captured["payload"]["metadata"][TRACEPARENT] == traceparent
+        assert captured["headers"][TRACEPARENT] == traceparent
+
+    @pytest.mark.asyncio
+    async def test_mcp_tool_call_sends_meta(self, exporter):
+        """Test that MCP calls get a client span and traceparent in _meta."""
+        calls = []
+
+        async def call_tool(name, args, metadata):
+            calls.append((name, args, metadata))
+            return "ok"
+
+        class Ctx:
+            run_step = 2
+
+        with start_span("agent.run"):
+            result = await trace_mcp_tool_call(
+                Ctx(), call_tool, "chroma_query", {"q": "x"}
+            )
+
+        (mcp_span,) = exporter.by_name("mcp.call_tool")
+        assert result == "ok"
+        assert calls[0][2] == {TRACEPARENT: mcp_span.context.to_traceparent()}
+        assert mcp_span.attributes["mcp.tool"] == "chroma_query"
+
+
+class TestTraceView:
+    """Test cases for the trace_view CLI."""
+
+    def write_trace(self, path):
+        configure_tracing(service_name="ag_ui_backend", export_path=str(path))
+        try:
+            with start_span("ag_ui.run", attributes={"conversation.id": "thread-7"}):
+                with start_span("a2a.send Orchestrator", kind="client"):
+                    pass
+            with start_span("unrelated"):
+                pass
+        finally:
+            configure_tracing(exporters=[])
+
+    def test_waterfall_for_conversation(self, tmp_path, capsys):
+        """Test that a conversation renders as an indented waterfall."""
+        path = tmp_path / "spans.jsonl"
+        self.write_trace(path)
+
+        exit_code = trace_view.main([str(path), "--conversation", "thread-7"])
+
+        output = capsys.readouterr().out.splitlines()
+        assert exit_code == 0
+        assert output[0].startswith("trace ")
+        assert output[1].startswith("ag_ui.run [ag_ui_backend]")
+        assert output[2].startswith("  a2a.send Orchestrator [ag_ui_backend]")
+        assert "unrelated" not in "\n".join(output)
+        assert "█" in output[1]
+
+    def test_lists_traces_without_filter(self, tmp_path, capsys):
+        """Test that the default view lists each trace once."""
+        path = tmp_path / "spans.jsonl"
+        self.write_trace(path)
+
+        assert trace_view.main([str(path)]) == 0
+
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 2
+        assert "conversation=thread-7" in lines[0]
+
+    def test_unknown_conversation(self, tmp_path, capsys):
+        """Test that a missing conversation exits non-zero."""
+        path = tmp_path / "spans.jsonl"
+        self.write_trace(path)
+
+        assert trace_view.main([str(path), "--conversation", "nope"]) == 1
@@ -0,0 +1,282 @@
+"""
+Test suite for core.workflow_engine module.
+
+This module contains tests for the task DAG engine, including graph validation,
+parallel execution of independent nodes, artifact passing between nodes and
+failure propagation.
+"""
+
+import asyncio
+
+import pytest
+
+from ai_research_assistant.core.resource_manager import ResourceManager
+from ai_research_assistant.core.state_manager import AgentStateManager
+from ai_research_assistant.core.workflow_engine import (
+    ArtifactRef,
+    NodeStatus,
+    WorkflowDAG,
+    WorkflowEngine,
+)
+
+
+class FakeAgent:
+    """Minimal agent exposing async skills for DAG tests."""
+
+    agent_name = "FakeAgent"
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+
+    async def fetch(self, value):
+        self.calls.append(("fetch", value))
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return {"status": "success", "value": value}
+
+    async def combine(self, left, right):
+        self.calls.append(("combine", left, right))
+        return {"status": "success", "value": left + right}
+
+    async def fail(self):
+        raise RuntimeError("boom")
+
+    async def soft_fail(self):
+        return {"status": "error", "error": "soft failure"}
+
+
+class TestWorkflowDAG:
+    """Test cases for WorkflowDAG construction and validation."""
+
+    def test_dependencies_inferred_from_artifact_refs(self):
+        """ArtifactRefs in parameters become edges."""
+        agent = FakeAgent()
+        dag = WorkflowDAG("test")
+        dag.add_node("a", agent, "fetch", {"value": 1})
+        node = dag.add_node("b", agent, "combine", {"left": ArtifactRef("a", "value")})
+
+        assert node.dependencies() == {"a"}
+        assert dag.topological_order() == ["a", "b"]
+
+    def test_duplicate_node_raises(self):
+        """Node ids must be unique."""
+        dag = WorkflowDAG("test")
+        dag.add_node("a", FakeAgent(), "fetch")
+
+        with pytest.raises(ValueError, match="Duplicate"):
+            dag.add_node("a", FakeAgent(), "fetch")
+
+    def test_unknown_dependency_raises(self):
+        """Edges to missing nodes are rejected."""
+        dag = WorkflowDAG("test")
+        dag.add_node("a", FakeAgent(), "fetch", depends_on=["missing"])
+
+        with pytest.raises(ValueError, match="unknown nodes"):
+            dag.topological_order()
+
+    def test_cycle_raises(self):
+        """Cyclic graphs are rejected."""
+        dag = WorkflowDAG("test")
+        dag.add_node("a", FakeAgent(), "fetch", depends_on=["b"])
+        dag.add_node("b", FakeAgent(), "fetch", depends_on=["a"])
+
+        with pytest.raises(ValueError, match="cycle"):
+            dag.topological_order()
+
+    def test_to_dict_describes_graph(self):
+        """The graph can be inspected as plain data."""
+        dag = WorkflowDAG("test", workflow_id="wf-1")
+        dag.add_node("a", FakeAgent(), "fetch")
+        dag.add_node("b", FakeAgent(), "combine", depends_on=["a"])
+
+        data = dag.to_dict()
+
+        assert data["workflow_id"] == "wf-1"
+        assert data["nodes"][1] == {
+            "node_id": "b",
+            "agent": "FakeAgent",
+            "skill_name": "combine",
+            "depends_on": ["a"],
+        }
+
+
+class TestWorkflowEngine:
+    """Test cases for WorkflowEngine execution."""
+
+    @pytest.mark.asyncio
+    async def test_independent_nodes_run_in_parallel(self):
+        """Nodes without mutual dependencies run concurrently."""
+        agent = FakeAgent(delay=0.05)
+        dag = WorkflowDAG("parallel")
+        dag.add_node("a", agent, "fetch", {"value": 1})
+        dag.add_node("b", agent, "fetch", {"value": 2})
+        dag.add_node(
+            "c",
+            agent,
+            "combine",
+            {"left": ArtifactRef("a", "value"), "right": ArtifactRef("b", "value")},
+        )
+
+        run = await WorkflowEngine().run(dag)
+
+        assert run.status == "completed"
+        assert agent.max_active == 2
+        assert run.output("c") == {"status": "success", "value": 3}
+
+    @pytest.mark.asyncio
+    async def test_resource_manager_limits_parallelism(self):
+        """The ResourceManager semaphore bounds concurrently running nodes."""
+        agent = FakeAgent(delay=0.02)
+        dag = WorkflowDAG("limited")
+        for i in range(4):
+            dag.add_node(f"n{i}", agent, "fetch", {"value": i})
+
+        engine = WorkflowEngine(ResourceManager(max_concurrent_tasks=1))
+        run = await engine.run(dag)
+
+        assert run.status == "completed"
+        assert agent.max_active == 1
+
+    @pytest.mark.asyncio
+    async def test_failure_skips_dependents_only(self):
+        """A failed node skips its dependents but not independent branches."""
+        agent = FakeAgent()
+        dag = WorkflowDAG("failing")
+        dag.add_node("bad", agent, "fail")
+        dag.add_node("after_bad", agent, "fetch", {"value": 1}, depends_on=["bad"])
+        dag.add_node("good", agent, "fetch", {"value": 2})
+
+        run = await WorkflowEngine().run(dag)
+
+        assert run.node_results["bad"].status is NodeStatus.FAILED
+        assert "boom" in run.node_results["bad"].error
+        assert run.node_results["after_bad"].status is NodeStatus.SKIPPED
+        assert run.node_results["good"].status is NodeStatus.COMPLETED
+        assert run.status == "completed_with_errors"
+
+    @pytest.mark.asyncio
+    async def test_unknown_skill_fails_its_node_only(self):
+        """A node that cannot be prepared fails without aborting the run."""
+        agent = FakeAgent()
+        dag = WorkflowDAG("missing_skill")
+        dag.add_node("missing", agent, "no_such_skill")
+        dag.add_node("good", agent, "fetch", {"value": 2})
+
+        run = await WorkflowEngine().run(dag)
+
+        assert run.node_results["missing"].status is NodeStatus.FAILED
+        assert "no_such_skill" in run.node_results["missing"].error
+        assert run.node_results["good"].status is NodeStatus.COMPLETED
+
+    @pytest.mark.asyncio
+    async def test_cancelled_run_waits_for_its_nodes(self):
+        """Cancelling a run cancels and awaits the nodes still running."""
+        cleaned_up = []
+
+        class SlowAgent:
+            async def work(self):
+                try:
+                    await asyncio.sleep(10)
+                finally:
+                    await asyncio.sleep(0.01)
+                    cleaned_up.append(True)
+
+        dag = WorkflowDAG("slow")
+        dag.add_node("slow", SlowAgent(), "work")
+        run_task = asyncio.create_task(WorkflowEngine().run(dag))
+        await asyncio.sleep(0.05)
+
+        run_task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run_task
+
+        assert cleaned_up == [True]
+
+    @pytest.mark.asyncio
+    async def test_error_status_result_counts_as_failure(self):
+        """Skills returning {'status': 'error'} fail their node."""
+        agent = FakeAgent()
+        dag = WorkflowDAG("soft")
+        dag.add_node("soft", agent, "soft_fail")
+
+        run = await WorkflowEngine().run(dag)
+
+        assert run.node_results["soft"].status is NodeStatus.FAILED
+        assert run.node_results["soft"].error == "soft failure"
+        assert run.output("soft") == {"status": "error", "error": "soft failure"}
+        assert run.status == "error"
+
+    @pytest.mark.asyncio
+    async def test_run_records_timings(self):
+        """Every executed node records timing for inspection."""
+        dag = WorkflowDAG("timed")
+        dag.add_node("a", FakeAgent(), "fetch", {"value": 1})
+
+        run = await WorkflowEngine().run(dag)
+        node = run.to_dict()["nodes"][0]
+
+        assert node["status"] == "completed"
+        assert node["duration_seconds"] is not None
+        assert node["task_id"] is not None
+
+
+class TestWorkflowCheckpointing:
+    """Test cases for checkpointed, resumable workflow runs."""
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_completed_nodes(self, tmp_path):
+        """A re-run with the same workflow_id restores completed nodes."""
+        state_manager = AgentStateManager(db_path=str(tmp_path / "state.db"))
+        await state_manager.initialize()
+        engine = WorkflowEngine(state_manager=state_manager)
+
+        def build(agent):
+            dag = WorkflowDAG("resumable", workflow_id="wf-resume")
+            dag.add_node("a", agent, "fetch", {"value": 1})
+            dag.add_node("b", agent, "fail", depends_on=["a"])
+            return dag
+
+        first_agent = FakeAgent()
+        first = await engine.run(build(first_agent))
+        assert first.node_results["b"].status is NodeStatus.FAILED
+
+        second_agent = FakeAgent()
+        second = await engine.run(build(second_agent))
+
+        assert second_agent.calls == []
+        assert second.node_results["a"].resumed is True
+        assert second.output("a") == {"status": "success", "value": 1}
+        assert second.node_results["b"].status is NodeStatus.FAILED
+
+        workflow = await state_manager.get_workflow("wf-resume")
+        assert workflow["status"] == "completed_with_errors"
+        assert {step["step_id"] for step in workflow["steps"]} == {"a", "b"}
+
+        await state_manager.close()
+
+    @pytest.mark.asyncio
+    async def test_resume_with_different_metadata_is_refused(self, tmp_path):
+        """A workflow_id cannot be resumed with inputs it was not built from."""
+        state_manager = AgentStateManager(db_path=str(tmp_path / "state.db"))
+        await state_manager.initialize()
+        engine = WorkflowEngine(state_manager=state_manager)
+
+        def build(agent, query):
+            dag = WorkflowDAG("guarded", "wf-guarded", metadata={"query": query})
+            dag.add_node("a", agent, "fetch", {"value": query})
+            return dag
+
+        await engine.run(build(FakeAgent(), "first"))
+        agent = FakeAgent()
+        with pytest.raises(ValueError, match="different inputs"):
+            await engine.run(build(agent, "second"))
+
+        assert agent.calls == []
+        workflow = await state_manager.get_workflow("wf-guarded")
+        assert workflow["metadata"] == {"query": "first"}
+        await state_manager.close()
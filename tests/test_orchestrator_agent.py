@@ -7,6 +7,7 @@ as the central coordinator for legal research workflows and task delegation.
 
 import asyncio
 import logging
+from pathlib import Path
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
@@ -15,6 +16,7 @@ from ai_research_assistant.agents.orchestrator_agent.agent import OrchestratorAg
 from ai_research_assistant.agents.orchestrator_agent.config import (
     OrchestratorAgentConfig,
 )
+from ai_research_assistant.config.global_settings import settings
 
 
 # Mock classes for testing
@@ -81,6 +83,14 @@ class MockPydanticAITool:
         self.description = f"Mock tool: {name}"
 
 
+@pytest.fixture(autouse=True)
+def agent_state_db(tmp_path, monkeypatch):
+    """Keeps workflow checkpoints of every test in its own directory."""
+    monkeypatch.setattr(
+        settings, "AGENT_STATE_DB_PATH", str(tmp_path / "agent_state.db")
+    )
+
+
 @pytest.fixture
 def mock_llm():
     """Fixture providing a mock LLM instance."""
@@ -560,3 +570,118 @@ class TestOrchestratorAgentEdgeCases:
         assert "Mock orchestrator response" in result
         call_prompt = orchestrator.pydantic_agent.run_calls[0][0]
         assert unicode_input in call_prompt
+
+
+class TestOrchestratorAgentWorkflowState:
+    """Test cases for durable workflow state behind get_workflow_status."""
+
+    @pytest.fixture
+    def stateful_orchestrator(self, orchestrator_factory, tmp_path):
+        config = OrchestratorAgentConfig(
+            agent_id="stateful_orchestrator",
+            agent_name="StatefulOrchestrator",
+            workflow_state_db_path=str(tmp_path / "workflow_state.db"),
+        )
+        return orchestrator_factory(config=config)
+
+    @pytest.mark.asyncio
+    async def test_completed_workflow_status(self, stateful_orchestrator):
+        """Test that status reflects the checkpointed workflow."""
+        result = await stateful_orchestrator.handle_full_research_workflow("Query")
+
+        status = await stateful_orchestrator.get_workflow_status(result["workflow_id"])
+
+        assert status["status"] == "completed"
+        assert status["progress_percentage"] == 100.0
+        assert status["details"]["total_steps"] == 2
+        assert status["details"]["steps_completed"] == [
+            "execute_request",
+            "write_report",
+        ]
+        assert status["details"]["completed_at"] is not None
+        await stateful_orchestrator.state_manager.close()
+
+    @pytest.mark.asyncio
+    async def test_summary_report_holds_the_run_output(
+        self, stateful_orchestrator, tmp_path
+    ):
+        """Test that the workflow runs the model once and reports its output."""
+        agent = stateful_orchestrator.pydantic_agent
+        agent.set_next_result("Created the six case collections.")
+
+        result = await stateful_orchestrator.handle_full_research_workflow("Set up")
+
+        assert result["status"] == "completed"
+        assert len(agent.run_calls) == 1
+        report = Path(result["summary_report_mcp_path"])
+        assert report.parent == tmp_path / "workflow_reports"
+        assert report.name == f"{result['workflow_id']}_summary.md"
+        content = report.read_text(encoding="utf-8")
+        assert "Set up" in content
+        assert "Created the six case collections." in content
+        await stateful_orchestrator.state_manager.close()
+
+    @pytest.mark.asyncio
+    async def test_resume_reruns_only_the_failed_step(self, stateful_orchestrator):
+        """Test that a failed report is retried without re-running the model."""
+        save_report = stateful_orchestrator._save_report
+        failures = [OSError("Disk full")]
+
+        def flaky_save_report(file_name, content):
+            if file_name.endswith("_summary.md") and failures:
+                raise failures.pop()
+            return save_report(file_name, content)
+
+        stateful_orchestrator._save_report = flaky_save_report
+        first = await stateful_orchestrator.handle_full_research_workflow("Query")
+        status = await stateful_orchestrator.get_workflow_status(first["workflow_id"])
+
+        second = await stateful_orchestrator.handle_full_research_workflow(
+            "Query", workflow_options={"workflow_id": first["workflow_id"]}
+        )
+
+        assert first["status"] == "error"
+        assert Path(first["summary_report_mcp_path"]).name.endswith("_error.md")
+        assert status["details"]["steps_failed"] == ["write_report"]
+        assert status["progress_percentage"] == 50.0
+        assert second["status"] == "completed"
+        assert Path(second["summary_report_mcp_path"]).exists()
+        assert len(stateful_orchestrator.pydantic_agent.run_calls) == 1
+        await stateful_orchestrator.state_manager.close()
+
+    @pytest.mark.asyncio
+    async def test_resume_with_a_different_query_is_refused(
+        self, stateful_orchestrator
+    ):
+        """Test that a workflow id cannot return another query's results."""
+        first = await stateful_orchestrator.handle_full_research_workflow("Query")
+
+        second = await stateful_orchestrator.handle_full_research_workflow(
+            "Another query", workflow_options={"workflow_id": first["workflow_id"]}
+        )
+
+        assert second["status"] == "error"
+        assert len(stateful_orchestrator.pydantic_agent.run_calls) == 1
+        await stateful_orchestrator.state_manager.close()
+
+    @pytest.mark.asyncio
+    async def test_resume_does_not_rerun_completed_steps(self, stateful_orchestrator):
+        """Test that re-submitting a workflow id reuses checkpointed LLM work."""
+        first = await stateful_orchestrator.handle_full_research_workflow("Query")
+        second = await stateful_orchestrator.handle_full_research_workflow(
+            "Query", workflow_options={"workflow_id": first["workflow_id"]}
+        )
+
+        assert second["workflow_id"] == first["workflow_id"]
+        assert second["status"] == "completed"
+        assert len(stateful_orchestrator.pydantic_agent.run_calls) == 1
+        await stateful_orchestrator.state_manager.close()
+
+    @pytest.mark.asyncio
+    async def test_unknown_workflow_status(self, stateful_orchestrator):
+        """Test that unknown workflow ids are reported as not found."""
+        status = await stateful_orchestrator.get_workflow_status("missing")
+
+        assert status["status"] == "not_found"
+        assert status["progress_percentage"] == 0.0
+        await stateful_orchestrator.state_manager.close()